@@ -1089,6 +1089,8 @@ function manualRebuild(session, answers) {
 // ============================================================
 // CALL PYTHON EXTRACTOR
 // ============================================================
+// Python queues validation and answers 202 with a job to poll
+// (GET status_url); nothing is validated yet when this returns.
 async function callPythonExtractor(userId, taxYear) {
   try {
     console.log(`📤 Calling Python extractor for ${userId}...`);
@@ -1105,13 +1107,22 @@ async function callPythonExtractor(userId, taxYear) {
     
     const result = await response.json();
     
-    if (result.success) {
-      console.log(`✅ Python extraction SUCCESS!`);
-    } else {
-      console.log(`❌ Python extraction FAILED: ${result.error}`);
+    if (!response.ok || !result.success) {
+      const error = result.detail || result.error || `HTTP ${response.status}`;
+      console.log(`❌ Python extraction not queued: ${error}`);
+      return { success: false, queued: false, error };
     }
     
-    return result;
+    console.log(`📥 Python validation queued: job ${result.job_id} (${result.job_status})`);
+    
+    return {
+      success: true,
+      queued: Boolean(result.job_id),
+      message: result.message,
+      jobId: result.job_id,
+      jobStatus: result.job_status,
+      statusUrl: result.status_url ? `${CONFIG.pythonApiUrl}${result.status_url}` : null
+    };
   } catch (error) {
     console.error(`❌ Python extractor error:`, error.message);
     return { success: false, error: error.message };
@@ -1719,7 +1730,8 @@ export async function triggerExtraction(req, res) {
     
     const result = await callPythonExtractor(userId, taxYear);
     
-    return res.json({ success: result.success, userId, taxYear, ...result });
+    // 202: validation runs in the background; poll statusUrl for the result
+    return res.status(result.success ? 202 : 502).json({ userId, taxYear, ...result });
     
   } catch (error) {
     console.error('❌ triggerExtraction error:', error);
@@ -0,0 +1,3 @@
+# ============================================================
+# BENCHMARKS - performance harnesses (not part of the API)
+# ============================================================
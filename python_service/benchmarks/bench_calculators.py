@@ -0,0 +1,430 @@
+# ============================================================
+# TAXSKY 2025 - CALCULATOR BENCHMARK (GOLDEN CORPUS)
+# ============================================================
+# Times the three calculator entry points over a deterministic
+# corpus of synthetic returns (all filing statuses, income mixes,
+# 50 states + DC):
+#
+#   calculate_federal       tax_engine.calculator.federal.calculator.calculate
+#   calculate_state_tax     tax_engine.state_router.calculate_state_tax
+#   calculate_tax           tax_engine.tax_engine.calculate_tax (federal + state)
+#
+# Reports p50/p90/p99 latency, throughput and per-call allocation
+# (tracemalloc peak, measured in a separate pass so it doesn't skew
+# timings), and flags regressions against a stored baseline.
+#
+# USAGE (from python_service/):
+#   python -m benchmarks.bench_calculators                  # 20k returns, compare to baseline
+#   python -m benchmarks.bench_calculators -n 50000
+#   python -m benchmarks.bench_calculators --save-baseline  # record new baseline
+#   python -m benchmarks.bench_calculators --corpus corpus.jsonl --write-corpus
+#   python -m benchmarks.bench_calculators --json [--output results.json]
+#
+# Exit code 1 if any target regressed past --threshold.
+#
+# --json writes only the JSON document to stdout (or --output); import
+# banners and anything printed while timing go to stderr.
+#
+# BASELINE: baselines/calculators.json is only meaningful on the machine
+# that recorded it (its "host" block; the report warns on a mismatch).
+# Before judging regressions on another machine, record a local baseline
+# from the commit you are comparing against, then run the change:
+#   git stash / git checkout <base commit>
+#   python -m benchmarks.bench_calculators --save-baseline --baseline /tmp/calc_base.json
+#   git checkout - / git stash pop
+#   python -m benchmarks.bench_calculators --baseline /tmp/calc_base.json
+# ============================================================
+
+import argparse
+import contextlib
+import copy
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+# Module banners go to stderr so --json output stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    from tax_engine.calculator.federal.calculator import calculate as calculate_federal  # noqa: E402
+    from tax_engine.state_router import calculate_state_tax, ALL_STATE_CODES  # noqa: E402
+    from tax_engine.tax_engine import calculate_tax  # noqa: E402
+
+BENCH_VERSION = "v1.0"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "calculators.json"
+DEFAULT_SEED = 2025
+
+FILING_STATUSES = [
+    "single",
+    "married_filing_jointly",
+    "married_filing_separately",
+    "head_of_household",
+    "qualifying_surviving_spouse",
+]
+
+INCOME_MIXES = [
+    "w2_only",
+    "w2_investments",
+    "self_employed",
+    "retiree",
+    "high_earner",
+    "low_income_family",
+]
+
+
+# ============================================================
+# CORPUS
+# ============================================================
+
+def _money(rng: random.Random, low: float, high: float) -> float:
+    return round(rng.uniform(low, high), 2)
+
+
+def generate_return(rng: random.Random, index: int) -> Dict[str, Any]:
+    """One synthetic return; every field name is one the calculators read."""
+    status = FILING_STATUSES[index % len(FILING_STATUSES)]
+    mix = INCOME_MIXES[(index // len(FILING_STATUSES)) % len(INCOME_MIXES)]
+    state = ALL_STATE_CODES[index % len(ALL_STATE_CODES)]
+    married = status == "married_filing_jointly"
+
+    data: Dict[str, Any] = {
+        "filing_status": status,
+        "state": state,
+        "taxpayer_age": rng.randint(19, 85),
+        "_mix": mix,
+    }
+    if married:
+        data["spouse_age"] = rng.randint(19, 85)
+
+    if mix in ("w2_only", "w2_investments", "low_income_family", "high_earner"):
+        high = {"low_income_family": 35000, "high_earner": 650000}.get(mix, 140000)
+        low = {"high_earner": 200000}.get(mix, 8000)
+        data["taxpayer_wages"] = _money(rng, low, high)
+        if married:
+            data["spouse_wages"] = _money(rng, 0, high)
+        data["taxpayer_federal_withheld"] = round(data["taxpayer_wages"] * rng.uniform(0.05, 0.22), 2)
+        data["taxpayer_state_withheld"] = round(data["taxpayer_wages"] * rng.uniform(0, 0.07), 2)
+        data["has_retirement_plan"] = rng.random() < 0.6
+        if rng.random() < 0.2:
+            data["tips_received"] = _money(rng, 500, 30000)
+        if rng.random() < 0.2:
+            data["overtime_pay"] = _money(rng, 500, 20000)
+
+    if mix in ("w2_investments", "high_earner", "retiree"):
+        data["interest_income"] = _money(rng, 0, 8000)
+        data["dividend_income"] = _money(rng, 0, 20000)
+        data["qualified_dividends"] = round(data["dividend_income"] * rng.uniform(0.3, 1.0), 2)
+        data["short_term_gains"] = _money(rng, -3000, 15000)
+        data["long_term_gains"] = _money(rng, -3000, 80000)
+
+    if mix == "self_employed":
+        data["self_employment_income"] = _money(rng, 15000, 250000)
+        data["self_employment_expenses"] = round(data["self_employment_income"] * rng.uniform(0.05, 0.5), 2)
+        data["estimated_payments"] = _money(rng, 0, 20000)
+        data["hsa_contribution"] = _money(rng, 0, 4300)
+
+    if mix == "retiree":
+        data["taxpayer_age"] = rng.randint(62, 90)
+        data["social_security_benefits"] = _money(rng, 12000, 48000)
+        data["pension_income"] = _money(rng, 0, 60000)
+        data["ira_distributions"] = _money(rng, 0, 40000)
+
+    if mix == "low_income_family" or status == "head_of_household":
+        data["qualifying_children_under_17"] = rng.randint(1, 4)
+        data["other_dependents"] = rng.randint(0, 1)
+    elif married:
+        data["qualifying_children_under_17"] = rng.randint(0, 3)
+
+    if rng.random() < 0.3:
+        data["ira_contribution"] = _money(rng, 0, 7000)
+    if rng.random() < 0.2:
+        data["student_loan_interest"] = _money(rng, 0, 2500)
+
+    return data
+
+
+def generate_corpus(n: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [generate_return(rng, i) for i in range(n)]
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_corpus(path: Path, corpus: List[Dict[str, Any]]):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in corpus:
+            f.write(json.dumps(row, sort_keys=True) + "\n")
+
+
+# ============================================================
+# TARGETS
+# ============================================================
+
+def _state_input(row: Dict[str, Any]) -> Dict[str, Any]:
+    """State calculators expect federal AGI already injected."""
+    data = dict(row)
+    wages = (row.get("taxpayer_wages", 0) or 0) + (row.get("spouse_wages", 0) or 0)
+    agi = wages + (row.get("self_employment_income", 0) or 0) + (row.get("interest_income", 0) or 0)
+    data["wages"] = wages
+    data["federal_agi"] = agi
+    data["agi"] = agi
+    return data
+
+
+TARGETS: Dict[str, Dict[str, Callable]] = {
+    "calculate_federal": {
+        "prepare": lambda row: row,
+        "call": calculate_federal,
+    },
+    "calculate_state_tax": {
+        "prepare": _state_input,
+        "call": lambda data: calculate_state_tax(data["state"], data),
+    },
+    "calculate_tax": {
+        "prepare": lambda row: row,
+        "call": calculate_tax,
+    },
+}
+
+
+# ============================================================
+# MEASUREMENT
+# ============================================================
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def time_target(name: str, corpus: List[Dict[str, Any]], warmup: int = 200) -> Dict[str, Any]:
+    target = TARGETS[name]
+    # Inputs are copied up front: calculate_tax mutates its argument
+    inputs = [copy.deepcopy(target["prepare"](row)) for row in corpus]
+    warm = [copy.deepcopy(target["prepare"](row)) for row in corpus[:warmup]]
+    call = target["call"]
+    clock = time.perf_counter_ns
+
+    for data in warm:
+        call(data)
+
+    samples: List[int] = []
+    errors = 0
+    start = clock()
+    for data in inputs:
+        t0 = clock()
+        try:
+            call(data)
+        except Exception:
+            errors += 1
+        samples.append(clock() - t0)
+    wall = (clock() - start) / 1e9
+
+    samples_us = sorted(s / 1000 for s in samples)
+    return {
+        "calls": len(samples),
+        "errors": errors,
+        "mean_us": round(statistics.fmean(samples_us), 2) if samples_us else 0.0,
+        "p50_us": round(_percentile(samples_us, 50), 2),
+        "p90_us": round(_percentile(samples_us, 90), 2),
+        "p99_us": round(_percentile(samples_us, 99), 2),
+        "max_us": round(samples_us[-1], 2) if samples_us else 0.0,
+        "throughput_per_s": round(len(samples) / wall, 1) if wall else 0.0,
+    }
+
+
+def measure_allocations(name: str, corpus: List[Dict[str, Any]], sample: int = 2000) -> Dict[str, Any]:
+    """Per-call tracemalloc peak over an evenly spaced sample of the corpus."""
+    target = TARGETS[name]
+    step = max(1, len(corpus) // sample)
+    inputs = [copy.deepcopy(target["prepare"](row)) for row in corpus[::step][:sample]]
+    call = target["call"]
+
+    peaks: List[int] = []
+    tracemalloc.start()
+    try:
+        for data in inputs:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            try:
+                call(data)
+            except Exception:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(0, peak - base))
+    finally:
+        tracemalloc.stop()
+
+    peaks.sort()
+    return {
+        "alloc_sampled": len(peaks),
+        "alloc_peak_mean_kb": round(statistics.fmean(peaks) / 1024, 2) if peaks else 0.0,
+        "alloc_peak_p99_kb": round(_percentile(peaks, 99) / 1024, 2),
+    }
+
+
+# ============================================================
+# BASELINE
+# ============================================================
+
+# metric -> True if higher is better
+COMPARED_METRICS = {
+    "p50_us": False,
+    "p99_us": False,
+    "throughput_per_s": True,
+    "alloc_peak_mean_kb": False,
+}
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+                        threshold: float) -> List[str]:
+    """Regression messages for metrics worse than baseline by more than threshold."""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get("targets", {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]]):
+    header = f"{'target':<22}{'calls':>8}{'err':>6}{'p50 µs':>10}{'p90 µs':>10}{'p99 µs':>10}{'calls/s':>11}{'alloc KB':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, m in results.items():
+        print(f"{name:<22}{m['calls']:>8}{m['errors']:>6}{m['p50_us']:>10.1f}{m['p90_us']:>10.1f}"
+              f"{m['p99_us']:>10.1f}{m['throughput_per_s']:>11.0f}{m.get('alloc_peak_mean_kb', 0):>10.1f}")
+        base = (baseline or {}).get("targets", {}).get(name)
+        if base:
+            print(f"{'  baseline':<22}{base['calls']:>8}{base['errors']:>6}{base['p50_us']:>10.1f}{base['p90_us']:>10.1f}"
+                  f"{base['p99_us']:>10.1f}{base['throughput_per_s']:>11.0f}{base.get('alloc_peak_mean_kb', 0):>10.1f}")
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def _host() -> Dict[str, Any]:
+    """Where the numbers came from; baselines only compare on the same host."""
+    return {
+        "node": platform.node(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TaxSky calculator benchmark (golden corpus)")
+    parser.add_argument("-n", "--returns", type=int, default=20000, help="synthetic returns to generate")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--corpus", type=Path, help="JSONL corpus to load (or write with --write-corpus)")
+    parser.add_argument("--write-corpus", action="store_true", help="write the generated corpus to --corpus")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated targets")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed regression (0.20 = 20%%)")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", type=Path, help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    # Calculator warnings (e.g. state fallbacks) would flood the output
+    logging.basicConfig(level=os.getenv("TAXSKY_LOG_LEVEL", "ERROR"))
+
+    names = [t.strip() for t in args.targets.split(",") if t.strip()]
+    for name in names:
+        if name not in TARGETS:
+            parser.error(f"unknown target: {name}")
+
+    # Stray prints from the calculators must not end up in the JSON
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        if args.corpus and args.corpus.exists() and not args.write_corpus:
+            corpus = load_corpus(args.corpus)
+        else:
+            corpus = generate_corpus(args.returns, args.seed)
+            if args.corpus and args.write_corpus:
+                write_corpus(args.corpus, corpus)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for name in names:
+            results[name] = time_target(name, corpus)
+            if not args.no_alloc:
+                results[name].update(measure_allocations(name, corpus))
+
+    baseline = None
+    if args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold) if baseline else []
+    host = _host()
+    other_host = bool(baseline) and baseline.get("host", {}) != host
+
+    if args.json or args.output:
+        document = json.dumps({"results": results, "regressions": regressions, "host": host,
+                               "baseline_from_other_host": other_host}, indent=2)
+        if args.output:
+            args.output.write_text(document + "\n", encoding="utf-8")
+        if args.json:
+            print(document)
+    if not args.json:
+        print(f"\nTaxSky calculator benchmark {BENCH_VERSION} - {len(corpus)} returns, seed {args.seed}\n")
+        print_report(results, baseline)
+        print()
+        if not baseline:
+            print(f"No baseline at {args.baseline} (run with --save-baseline)")
+        elif regressions:
+            print(f"REGRESSIONS (> {args.threshold:.0%}):")
+            for r in regressions:
+                print(f"  {r}")
+        else:
+            print(f"No regressions vs baseline (threshold {args.threshold:.0%})")
+        if other_host:
+            print(f"⚠️ Baseline was recorded on {baseline.get('host') or 'another machine'};"
+                  f" regenerate it here before trusting the comparison (see header)")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": BENCH_VERSION,
+                "returns": len(corpus),
+                "seed": args.seed,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "host": host,
+                "targets": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved: {args.baseline}", file=sys.stderr if args.json else sys.stdout)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+# ============================================================
+# TAXSKY 2025 - PDF RENDERING BENCHMARK
+# ============================================================
+# Renders every form generator against fixed inputs and reports,
+# per form:
+#   - wall time per phase (median of --repeat runs)
+#       parse       pypdf PdfReader(template)
+#       clone       PdfWriter(clone_from=...) / append / add_page
+#       fill        PdfWriter.update_page_form_field_values
+#       write       PdfWriter.write
+#       fitz_open   fitz.open (1040 appearance pass)
+#       appearance  fitz Widget.update loop
+#       save        fitz Document.save(garbage=4, deflate=True)
+#       other       everything else (field mapping, math, logging)
+#   - peak RSS (each form runs in its own subprocess, so the number
+#     belongs to that form alone) and Python heap peak (tracemalloc)
+#   - output size
+#
+# Phases are measured by wrapping the pypdf / PyMuPDF methods, so the
+# routers themselves are not modified. Only the outermost wrapped call
+# is timed (PdfWriter(clone_from=...) calling append() counts once).
+#
+# The additional-states router (AL, AZ, ... /generate/<form>) returns
+# JSON computed from STATE_TAX_INFO rather than a PDF; those forms are
+# reported with compute time and response size only.
+#
+# Results are stored per commit in benchmarks/results/pdf_<sha>.json.
+#
+# USAGE (from python_service/):
+#   python -m benchmarks.bench_pdf                         # all forms
+#   python -m benchmarks.bench_pdf --forms 1040,ca540 -r 10
+#   python -m benchmarks.bench_pdf --compare <sha|path>    # diff vs another commit
+# ============================================================
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+BENCH_VERSION = "v1.0"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PHASES = ["parse", "clone", "fill", "write", "fitz_open", "appearance", "save", "other"]
+
+
+# ============================================================
+# FIXED INPUTS
+# ============================================================
+
+_PERSON = {"first_name": "Jordan", "last_name": "Sample", "ssn": "123-45-6789",
+           "address": "100 Benchmark Ave", "city": "Springfield", "zip": "90001"}
+
+INPUT_1040 = {
+    "personal": {**_PERSON, "state": "CA", "filing_status": "married_filing_jointly",
+                 "spouse_first_name": "Casey", "spouse_last_name": "Sample", "spouse_ssn": "987-65-4321"},
+    "dependents": [
+        {"first_name": "Avery", "last_name": "Sample", "ssn": "111-22-3333", "relationship": "son", "age": 8},
+        {"first_name": "Riley", "last_name": "Sample", "ssn": "444-55-6666", "relationship": "daughter", "age": 19},
+    ],
+    "form1040": {
+        "income": {"line_1a_w2_wages": 142000, "line_1z_total_wages": 142000, "line_9_total_income": 143250},
+        "adjustments": {"line_11_agi": 143250},
+        "deductions": {"line_12_deduction": 31500},
+        "tax_and_credits": {"line_15_taxable_income": 111750, "line_16_tax": 13229},
+        "payments": {"line_25a_w2_withholding": 15800},
+        "refund_or_owe": {},
+    },
+    "session_id": "bench",
+}
+
+INPUT_CA540 = {
+    "personal": {**_PERSON, "state": "CA"},
+    "federal": {"filing_status": "single", "wages": 98000, "agi": 98000},
+    "state": {"ca_agi": 98000, "withholding": 4100, "estimated_payments": 500},
+    "dependents": [{"first_name": "Avery", "last_name": "Sample", "ssn": "111-22-3333", "relationship": "son"}],
+    "session_id": "bench",
+}
+
+INPUT_NY_IT201 = {
+    "personal": {"first_name": "Jordan", "last_name": "Sample", "ssn": "123-45-6789",
+                 "mail_address": "100 Benchmark Ave", "mail_city": "Brooklyn", "mail_zip": "11201",
+                 "county": "Kings", "is_nyc_resident": True, "nyc_months": 12},
+    "federal": {"filing_status": "single", "wages": 115000, "interest": 420, "agi": 115420},
+    "state": {"ny_agi": 115420, "withholding": 6200, "nyc_withholding": 3600},
+    "dependents": [],
+    "session_id": "bench",
+}
+
+INPUT_STATE = {
+    "personal": {**_PERSON, "state": ""},
+    "federal": {"filing_status": "single", "agi": 88000, "taxable_income": 72250, "federal_tax": 8400},
+    "state": {"withholding": 3200},
+    "dependents": [],
+    "session_id": "bench",
+}
+
+
+def _form_runners() -> Dict[str, Callable[[], Any]]:
+    """form name -> zero-arg coroutine factory (imports kept lazy)."""
+    runners: Dict[str, Callable[[], Any]] = {}
+
+    def add_1040():
+        from tax_generator.form_1040_router import generate_1040, Request1040
+        return generate_1040(Request1040(**INPUT_1040))
+
+    def add_ca540():
+        from tax_generator.form_ca540_router import generate_form_ca540, RequestCA540
+        return generate_form_ca540(RequestCA540(**INPUT_CA540))
+
+    def add_it201():
+        from tax_generator.form_ny_it201_router import generate_ny_it201, RequestNY_IT201
+        return generate_ny_it201(RequestNY_IT201(**INPUT_NY_IT201))
+
+    runners["1040"] = add_1040
+    runners["ca540"] = add_ca540
+    runners["ny-it201"] = add_it201
+
+    from tax_generator.additional_states_router import STATE_TAX_INFO
+    for code in sorted(STATE_TAX_INFO):
+        def add_state(code=code):
+            from tax_generator.additional_states_router import generate_state_form_handler, StateFormRequest
+            payload = {**INPUT_STATE, "personal": {**INPUT_STATE["personal"], "state": code}}
+            return generate_state_form_handler(code, StateFormRequest(**payload))
+        runners[f"state-{code.lower()}"] = add_state
+
+    return runners
+
+
+# ============================================================
+# PHASE INSTRUMENTATION
+# ============================================================
+
+class PhaseTimer:
+    """Wraps library methods and accumulates outermost-call time per phase."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._local = threading.local()
+        self._patches: List[tuple] = []
+
+    def reset(self):
+        self.totals = {}
+
+    def _wrap(self, owner: Any, attr: str, phase: str):
+        original = getattr(owner, attr)
+        timer = self
+
+        def wrapper(*args, **kwargs):
+            depth = getattr(timer._local, "depth", 0)
+            timer._local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                timer._local.depth = depth
+                if depth == 0:
+                    timer.totals[phase] = timer.totals.get(phase, 0.0) + time.perf_counter() - start
+
+        setattr(owner, attr, wrapper)
+        self._patches.append((owner, attr, original))
+
+    def install(self):
+        import pypdf
+        self._wrap(pypdf.PdfReader, "__init__", "parse")
+        self._wrap(pypdf.PdfWriter, "__init__", "clone")
+        for attr in ("append", "add_page", "clone_reader_document_root"):
+            if hasattr(pypdf.PdfWriter, attr):
+                self._wrap(pypdf.PdfWriter, attr, "clone")
+        self._wrap(pypdf.PdfWriter, "update_page_form_field_values", "fill")
+        self._wrap(pypdf.PdfWriter, "write", "write")
+        try:
+            import fitz
+        except ImportError:
+            return
+        self._wrap(fitz, "open", "fitz_open")
+        self._wrap(fitz.Widget, "update", "appearance")
+        self._wrap(fitz.Document, "save", "save")
+
+    def uninstall(self):
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+
+
+def _output_size(response: Any) -> int:
+    path = getattr(response, "path", None)
+    if path and os.path.exists(path):
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    return len(json.dumps(response, default=str).encode("utf-8"))
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+def run_form(name: str, repeat: int) -> Dict[str, Any]:
+    """Render one form `repeat` times in this process; median per phase."""
+    runners = _form_runners()
+    if name not in runners:
+        raise SystemExit(f"unknown form: {name}")
+
+    timer = PhaseTimer()
+    timer.install()
+    rss_before = _peak_rss_kb()
+    runs: List[Dict[str, float]] = []
+    sizes: List[int] = []
+    heap_peaks: List[int] = []
+    error = None
+
+    try:
+        for i in range(repeat + 1):  # first run warms imports/caches, not recorded
+            timer.reset()
+            tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                response = asyncio.run(runners[name]())
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                tracemalloc.stop()
+                break
+            total = time.perf_counter() - start
+            _, heap_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size = _output_size(response)
+            if i == 0:
+                continue
+            phases = dict(timer.totals)
+            phases["other"] = max(0.0, total - sum(phases.values()))
+            phases["total"] = total
+            runs.append(phases)
+            sizes.append(size)
+            heap_peaks.append(heap_peak)
+    finally:
+        timer.uninstall()
+
+    result: Dict[str, Any] = {"form": name, "runs": len(runs), "error": error}
+    if runs:
+        result["phases_ms"] = {
+            phase: round(statistics.median(r.get(phase, 0.0) for r in runs) * 1000, 2)
+            for phase in PHASES + ["total"]
+            if any(phase in r for r in runs)
+        }
+        result["output_bytes"] = int(statistics.median(sizes))
+        result["heap_peak_kb"] = round(max(heap_peaks) / 1024, 1)
+    result["peak_rss_kb"] = _peak_rss_kb()
+    result["rss_growth_kb"] = result["peak_rss_kb"] - rss_before
+    return result
+
+
+def run_isolated(name: str, repeat: int) -> Dict[str, Any]:
+    """run_form in a fresh interpreter so peak RSS is per form."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pdf", "--child", name, "-r", str(repeat)],
+        cwd=str(SERVICE_DIR), capture_output=True, text=True,
+        env={**os.environ, "TAXSKY_LOG_LEVEL": os.getenv("TAXSKY_LOG_LEVEL", "WARNING")},
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"form": name, "runs": 0, "error": (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+
+
+# ============================================================
+# RESULTS
+# ============================================================
+
+def _git_sha() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(SERVICE_DIR),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "nogit"
+
+
+def _load_results(ref: str) -> Optional[Dict[str, Any]]:
+    path = Path(ref)
+    if not path.exists():
+        path = RESULTS_DIR / f"pdf_{ref}.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_report(results: List[Dict[str, Any]], other: Optional[Dict[str, Any]]):
+    cols = ["parse", "clone", "fill", "write", "appearance", "save", "other", "total"]
+    header = f"{'form':<14}" + "".join(f"{c:>11}" for c in cols) + f"{'out KB':>9}{'RSS MB':>8}{'heap MB':>9}"
+    print(header)
+    print("-" * len(header))
+    previous = {r["form"]: r for r in (other or {}).get("forms", [])}
+
+    for r in results:
+        if r.get("error") and not r.get("phases_ms"):
+            print(f"{r['form']:<14}  ERROR: {r['error']}")
+            continue
+        p = r["phases_ms"]
+        phase_ms = {c: p.get(c, 0.0) + (p.get("fitz_open", 0.0) if c == "appearance" else 0.0) for c in cols}
+        print(f"{r['form']:<14}" + "".join(f"{phase_ms[c]:>11.1f}" for c in cols)
+              + f"{r['output_bytes'] / 1024:>9.1f}{r['peak_rss_kb'] / 1024:>8.1f}{r['heap_peak_kb'] / 1024:>9.1f}")
+        old = previous.get(r["form"])
+        if old and old.get("phases_ms"):
+            old_total = old["phases_ms"].get("total", 0)
+            if old_total:
+                change = (p["total"] - old_total) / old_total
+                print(f"{'':<14}  vs {other.get('commit')}: total {old_total:.1f} -> {p['total']:.1f} ms ({change:+.1%}), "
+                      f"RSS {old['peak_rss_kb'] / 1024:.1f} -> {r['peak_rss_kb'] / 1024:.1f} MB, "
+                      f"size {old['output_bytes'] / 1024:.1f} -> {r['output_bytes'] / 1024:.1f} KB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TaxSky PDF rendering benchmark")
+    parser.add_argument("--forms", default="", help="comma-separated forms (default: all)")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--no-isolate", action="store_true", help="run all forms in this process")
+    parser.add_argument("--compare", help="commit sha or results file to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list form names")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_form(args.child, args.repeat)))
+        return 0
+
+    names = list(_form_runners())
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if args.forms:
+        names = [n.strip() for n in args.forms.split(",") if n.strip()]
+
+    results = [run_form(n, args.repeat) if args.no_isolate else run_isolated(n, args.repeat) for n in names]
+    sha = _git_sha()
+    report = {"version": BENCH_VERSION, "commit": sha, "repeat": args.repeat,
+              "isolated": not args.no_isolate, "forms": results}
+    other = _load_results(args.compare) if args.compare else None
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\nTaxSky PDF benchmark {BENCH_VERSION} - commit {sha}, median of {args.repeat} runs (ms)\n")
+        print_report(results, other)
+        if args.compare and not other:
+            print(f"\nNo stored results for {args.compare}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"pdf_{sha}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        if not args.json:
+            print(f"\nSaved: {path}")
+
+    return 1 if any(r.get("error") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,695 @@
+# ============================================================
+# TAXSKY 2025 - HTTP LOAD TEST HARNESS
+# ============================================================
+# Drives main.py's FastAPI app with a configurable number of
+# concurrent clients and reports per-route latency histograms,
+# percentiles and error rates.
+#
+# Everything external is replaced so it runs on a laptop:
+#   - MongoDB  -> in-memory collection (InMemoryMongoClient), seeded
+#                 with synthetic tax sessions
+#   - OpenAI   -> local stub vision server (OPENAI_BASE_URL), with a
+#                 configurable response delay
+#
+# MODES:
+#   asgi     (default) in-process via httpx.ASGITransport; also samples
+#            event-loop lag, so sync pymongo / pypdf / OpenAI work inside
+#            async handlers shows up as a number
+#   uvicorn  spawns a local uvicorn server (same stand-ins) in a
+#            subprocess and drives it over real HTTP
+#
+# USAGE (from python_service/):
+#   python -m benchmarks.load_test -c 32 -d 30
+#   python -m benchmarks.load_test --mode uvicorn -c 64 -n 5000
+#   python -m benchmarks.load_test --routes calculate,rag_question --json
+#
+# Requires the service's own requirements (fastapi, httpx, pymongo,
+# openai, pypdf, PyMuPDF); no real Mongo or OpenAI access is needed.
+# ============================================================
+
+import argparse
+import asyncio
+import base64
+import copy
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+LOAD_TEST_VERSION = "v1.0"
+DEFAULT_SEED = 2025
+
+
+# ============================================================
+# IN-MEMORY MONGO STAND-IN
+# ============================================================
+
+class _Result:
+    def __init__(self, matched: int = 0, modified: int = 0, upserted_id: Any = None, inserted_id: Any = None):
+        self.matched_count = matched
+        self.modified_count = modified
+        self.upserted_id = upserted_id
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class _Cursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    def limit(self, n: int) -> "_Cursor":
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    def sort(self, *args, **kwargs) -> "_Cursor":
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    node: Any = doc
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    node = doc
+    for part in parts[:-1]:
+        if not isinstance(node.get(part), dict):
+            node[part] = {}
+        node = node[part]
+    node[parts[-1]] = value
+
+
+def _unset_path(doc: Dict[str, Any], path: str):
+    parts = path.split(".")
+    node = doc
+    for part in parts[:-1]:
+        node = node.get(part)
+        if not isinstance(node, dict):
+            return
+    node.pop(parts[-1], None)
+
+
+class InMemoryCollection:
+    """
+    The subset of pymongo.Collection the service uses: equality queries,
+    $set/$unset/$push updates (dotted paths), upsert, projections.
+    """
+
+    def __init__(self):
+        self._docs: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def _matches(self, doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        return all(_get_path(doc, k) == v for k, v in (query or {}).items())
+
+    def _project(self, doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        doc = copy.deepcopy(doc)
+        if not projection:
+            return doc
+        include = {k for k, v in projection.items() if v}
+        if not include:
+            return {k: v for k, v in doc.items() if k not in projection}
+        out = {"_id": doc.get("_id")}
+        for path in include:
+            value = _get_path(doc, path)
+            if value is not None:
+                _set_path(out, path, value)
+        return out
+
+    def _apply(self, doc: Dict[str, Any], update: Dict[str, Any]) -> bool:
+        before = json.dumps(doc, sort_keys=True, default=str)
+        for path, value in update.get("$set", {}).items():
+            _set_path(doc, path, copy.deepcopy(value))
+        for path in update.get("$unset", {}):
+            _unset_path(doc, path)
+        for path, value in update.get("$push", {}).items():
+            current = _get_path(doc, path)
+            if not isinstance(current, list):
+                current = []
+                _set_path(doc, path, current)
+            current.append(copy.deepcopy(value))
+        return json.dumps(doc, sort_keys=True, default=str) != before
+
+    def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs):
+        with self._lock:
+            for doc in self._docs:
+                if self._matches(doc, query):
+                    return self._project(doc, projection)
+        return None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs) -> _Cursor:
+        with self._lock:
+            return _Cursor([self._project(d, projection) for d in self._docs if self._matches(d, query)])
+
+    def insert_one(self, doc: Dict[str, Any]) -> _Result:
+        with self._lock:
+            doc = copy.deepcopy(doc)
+            doc.setdefault("_id", self._next_id)
+            self._next_id += 1
+            self._docs.append(doc)
+            return _Result(inserted_id=doc["_id"])
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs) -> _Result:
+        with self._lock:
+            for doc in self._docs:
+                if self._matches(doc, query):
+                    return _Result(matched=1, modified=int(self._apply(doc, update)))
+            if not upsert:
+                return _Result()
+            doc = {k: v for k, v in query.items() if "." not in k}
+            doc["_id"] = self._next_id
+            self._next_id += 1
+            self._apply(doc, update)
+            self._docs.append(doc)
+            return _Result(upserted_id=doc["_id"])
+
+    def count_documents(self, query: Dict[str, Any], **kwargs) -> int:
+        with self._lock:
+            return sum(1 for d in self._docs if self._matches(d, query))
+
+    def distinct(self, key: str, query: Optional[Dict[str, Any]] = None) -> List[Any]:
+        with self._lock:
+            seen = []
+            for d in self._docs:
+                value = _get_path(d, key)
+                if self._matches(d, query) and value not in seen:
+                    seen.append(value)
+            return seen
+
+
+class _InMemoryDatabase:
+    def __init__(self):
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return self._collections.setdefault(name, InMemoryCollection())
+
+
+class _Admin:
+    def command(self, name: str, *args, **kwargs) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+
+class InMemoryMongoClient:
+    """Drop-in for pymongo.MongoClient; every instance shares one store."""
+
+    _databases: Dict[str, _InMemoryDatabase] = {}
+
+    def __init__(self, *args, **kwargs):
+        self.admin = _Admin()
+
+    def __getitem__(self, name: str) -> _InMemoryDatabase:
+        return self._databases.setdefault(name, _InMemoryDatabase())
+
+
+def seed_sessions(users: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """Insert synthetic taxsessions documents; returns the user ids."""
+    from tax_engine import mongodb_client
+
+    rng = random.Random(seed)
+    collection = InMemoryMongoClient()[mongodb_client.DATABASE_NAME][mongodb_client.COLLECTION_NAME]
+    statuses = ["single", "married_filing_jointly", "head_of_household"]
+    states = ["CA", "NY", "TX", "IL", "PA", "GA", "NC", "NJ", "FL", "WA"]
+    user_ids = []
+
+    for i in range(users):
+        user_id = f"loadtest_user_{i:05d}"
+        wages = round(rng.uniform(20000, 250000), 2)
+        withheld = round(wages * rng.uniform(0.08, 0.2), 2)
+        status = statuses[i % len(statuses)]
+        collection.insert_one({
+            "userId": user_id,
+            "taxYear": 2025,
+            "status": "in_progress",
+            "filing_status": status,
+            "answers": {
+                "filing_status": status,
+                "first_name": "Test",
+                "last_name": f"User{i}",
+                "ssn": "123-45-6789",
+                "address": "1 Main St",
+                "city": "Springfield",
+                "state": states[i % len(states)],
+                "zip": "90001",
+                "taxpayer_w2_1_wages": wages,
+                "taxpayer_w2_1_federal_withheld": withheld,
+            },
+            "input_forms": {
+                "w2": [{"box_1_wages": wages, "box_2_federal_withheld": withheld,
+                        "box_17_state_withheld": round(wages * 0.04, 2), "owner": "taxpayer"}],
+            },
+            "dependents": [],
+            "totals": {},
+            "messages": [],
+        })
+        user_ids.append(user_id)
+
+    return user_ids
+
+
+def install_mongo_stand_in():
+    """Point every MongoClient the service creates at the in-memory store."""
+    from tax_engine import mongodb_client
+    mongodb_client.MongoClient = InMemoryMongoClient
+    mongodb_client.PYMONGO_AVAILABLE = True
+    mongodb_client._client = None
+    mongodb_client._db = None
+    mongodb_client._connection_failed = False
+
+    try:
+        from tax_engine import user_data_router
+        user_data_router.MongoClient = InMemoryMongoClient
+        user_data_router.PYMONGO_AVAILABLE = True
+        user_data_router._collection = None
+    except ImportError:
+        pass
+
+
+# ============================================================
+# STUB VISION SERVER (OpenAI chat.completions)
+# ============================================================
+
+STUB_W2 = {
+    "employee_name": "TEST USER",
+    "employer_name": "ACME CORP",
+    "wages_tips_other_comp": 85000.00,
+    "federal_income_tax_withheld": 9800.00,
+    "social_security_wages": 85000.00,
+    "social_security_tax_withheld": 5270.00,
+    "medicare_wages": 85000.00,
+    "medicare_tax_withheld": 1232.50,
+    "state": "CA",
+    "state_wages": 85000.00,
+    "state_income_tax": 3900.00,
+}
+
+
+def start_vision_stub(delay_ms: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub on 127.0.0.1:<free port>; returns (server, base_url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            # Form-type detection uses a tiny max_tokens budget
+            content = "W-2" if body.get("max_tokens", 0) <= 50 else json.dumps(STUB_W2)
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="vision-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def prepare_environment(users: int, vision_delay_ms: float, seed: int) -> Tuple[Any, List[str], ThreadingHTTPServer]:
+    """Start stubs, import the app with stand-ins installed, seed data."""
+    stub, base_url = start_vision_stub(vision_delay_ms)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest-stub")
+    os.environ.setdefault("TAXSKY_LOG_LEVEL", "WARNING")
+
+    install_mongo_stand_in()
+    import main
+    install_mongo_stand_in()  # routers imported by main may have cached clients
+
+    return main.app, seed_sessions(users, seed), stub
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+
+# A 1x1 PNG - the stub server never looks at it
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
+_QUESTIONS = [
+    "What is the 401k limit?", "standard deduction married filing jointly",
+    "Can I deduct my IRA?", "what is box 12 code DD on my w-2",
+    "child tax credit amount", "how much can I put in an HSA",
+    "what is the SALT cap", "how are capital gains taxed",
+]
+
+
+def _tax_input(rng: random.Random) -> Dict[str, Any]:
+    status = rng.choice(["single", "married_filing_jointly", "head_of_household"])
+    wages = round(rng.uniform(15000, 300000), 2)
+    return {
+        "filing_status": status,
+        "wages": wages,
+        "federal_withheld": round(wages * 0.12, 2),
+        "state": rng.choice(["CA", "NY", "TX", "IL", "PA", "GA"]),
+        "state_withheld": round(wages * 0.04, 2),
+        "qualifying_children_under_17": rng.randint(0, 3) if status != "single" else 0,
+        "interest_income": round(rng.uniform(0, 3000), 2),
+    }
+
+
+def _form1040_payload(rng: random.Random) -> Dict[str, Any]:
+    wages = round(rng.uniform(20000, 200000), 0)
+    return {
+        "personal": {"first_name": "Test", "last_name": "User", "ssn": "123456789",
+                     "address": "1 Main St", "city": "Springfield", "state": "CA",
+                     "zip": "90001", "filing_status": "single"},
+        "dependents": [],
+        "form1040": {
+            "income": {"line_1a_w2_wages": wages, "line_9_total_income": wages},
+            "adjustments": {"line_11_agi": wages},
+            "deductions": {"line_12_deduction": 15750},
+            "payments": {"line_25a_w2_withholding": round(wages * 0.12, 0)},
+        },
+        "session_id": "loadtest",
+    }
+
+
+# route name -> (weight, method, path template)
+SCENARIOS: Dict[str, Tuple[int, str, str]] = {
+    "calculate": (30, "POST", "/calculate"),
+    "calculate_state": (15, "POST", "/calculate/state/{state}"),
+    "rag_question": (15, "POST", "/rag/question"),
+    "user_get": (10, "GET", "/api/user/{user_id}"),
+    "user_form1040_data": (8, "GET", "/api/user/{user_id}/form1040/data"),
+    "user_put": (5, "PUT", "/api/user/{user_id}"),
+    "extract_session": (5, "POST", "/api/extract/session"),
+    "generate_1040": (4, "POST", "/generate/1040"),
+    "ocr_w2": (3, "POST", "/ocr/w2"),
+    "health": (5, "GET", "/health"),
+}
+
+
+def build_request(name: str, rng: random.Random, user_ids: List[str]) -> Dict[str, Any]:
+    """httpx request kwargs for one scenario hit."""
+    _, method, template = SCENARIOS[name]
+    user_id = rng.choice(user_ids)
+    state = rng.choice(["CA", "NY", "IL", "PA", "GA", "NC", "NJ", "AZ", "CO", "TX"])
+    request: Dict[str, Any] = {"method": method, "url": template.format(user_id=user_id, state=state)}
+
+    if name in ("calculate", "calculate_state"):
+        request["json"] = _tax_input(rng)
+    elif name == "rag_question":
+        request["json"] = {"question": rng.choice(_QUESTIONS), "state": state}
+    elif name == "user_put":
+        request["json"] = {"city": rng.choice(["Austin", "Fresno", "Albany"]), "zip": f"{rng.randint(10000, 99999)}"}
+    elif name == "extract_session":
+        request["json"] = {"user_id": user_id, "tax_year": 2025}
+    elif name == "generate_1040":
+        request["json"] = _form1040_payload(rng)
+    elif name == "ocr_w2":
+        request["files"] = {"file": ("w2.png", _PNG, "image/png")}
+
+    return request
+
+
+# ============================================================
+# STATS
+# ============================================================
+
+# Histogram bucket upper bounds in ms (log-spaced)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class RouteStats:
+    __slots__ = ("latencies_ms", "statuses", "errors")
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency_ms: float, status: str, failed: bool):
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if failed:
+            self.errors += 1
+
+    def summary(self, wall_s: float) -> Dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        histogram = [0] * len(BUCKETS_MS)
+        for v in values:
+            for i, bound in enumerate(BUCKETS_MS):
+                if v <= bound:
+                    histogram[i] += 1
+                    break
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "p50_ms": round(_percentile(values, 50), 2),
+            "p90_ms": round(_percentile(values, 90), 2),
+            "p99_ms": round(_percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+            "rps": round(count / wall_s, 1) if wall_s else 0.0,
+            "histogram": {("inf" if b == float("inf") else str(b)): n for b, n in zip(BUCKETS_MS, histogram)},
+        }
+
+
+async def _loop_lag_monitor(samples: List[float], stop: asyncio.Event, interval: float = 0.01):
+    """Record how late a 10 ms sleep wakes up - time the loop spent blocked."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (loop.time() - start - interval) * 1000))
+
+
+# ============================================================
+# LOAD GENERATOR
+# ============================================================
+
+async def run_load(client, user_ids: List[str], routes: List[str], concurrency: int,
+                   duration: Optional[float], total: Optional[int], seed: int,
+                   monitor_loop: bool) -> Dict[str, Any]:
+    stats: Dict[str, RouteStats] = {name: RouteStats() for name in routes}
+    weights = [SCENARIOS[name][0] for name in routes]
+    remaining = [total] if total else None
+    deadline = time.perf_counter() + duration if duration else None
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            if deadline and time.perf_counter() >= deadline:
+                return
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            name = rng.choices(routes, weights)[0]
+            request = build_request(name, rng, user_ids)
+            t0 = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = str(response.status_code)
+                failed = response.status_code >= 400
+                if not failed and response.headers.get("content-type", "").startswith("application/json"):
+                    body = response.json()
+                    failed = isinstance(body, dict) and (body.get("success") is False or body.get("status") == "error")
+            except Exception as e:
+                status, failed = type(e).__name__, True
+            stats[name].record((time.perf_counter() - t0) * 1000, status, failed)
+
+    monitor = asyncio.create_task(_loop_lag_monitor(lag_samples, stop)) if monitor_loop else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+    stop.set()
+    if monitor:
+        await monitor
+
+    lag = sorted(lag_samples)
+    all_requests = sum(len(s.latencies_ms) for s in stats.values())
+    all_errors = sum(s.errors for s in stats.values())
+    return {
+        "wall_s": round(wall, 2),
+        "requests": all_requests,
+        "errors": all_errors,
+        "error_rate": round(all_errors / all_requests, 4) if all_requests else 0.0,
+        "rps": round(all_requests / wall, 1) if wall else 0.0,
+        "routes": {name: s.summary(wall) for name, s in stats.items() if s.latencies_ms},
+        "event_loop_lag_ms": {
+            "samples": len(lag),
+            "p50": round(_percentile(lag, 50), 2),
+            "p99": round(_percentile(lag, 99), 2),
+            "max": round(lag[-1], 2) if lag else 0.0,
+        } if monitor_loop else None,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_for_server(client, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("uvicorn server did not become healthy")
+
+
+async def drive(args) -> Dict[str, Any]:
+    import httpx
+
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()] if args.routes else list(SCENARIOS)
+    unknown = [r for r in routes if r not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown routes: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.mode == "asgi":
+        app, user_ids, stub = prepare_environment(args.users, args.vision_delay_ms, args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            try:
+                return await run_load(client, user_ids, routes, args.concurrency, args.duration,
+                                      args.requests, args.seed, monitor_loop=True)
+            finally:
+                stub.shutdown()
+
+    port = args.port or _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_test", "--serve", "--port", str(port),
+         "--users", str(args.users), "--vision-delay-ms", str(args.vision_delay_ms), "--seed", str(args.seed)],
+        cwd=str(SERVICE_DIR),
+    )
+    user_ids = [f"loadtest_user_{i:05d}" for i in range(args.users)]
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+            await _wait_for_server(client)
+            return await run_load(client, user_ids, routes, args.concurrency, args.duration,
+                                  args.requests, args.seed, monitor_loop=False)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def serve(args):
+    """--serve: run uvicorn with the stand-ins installed (used by --mode uvicorn)."""
+    import uvicorn
+    app, _, _ = prepare_environment(args.users, args.vision_delay_ms, args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def print_report(result: Dict[str, Any], args):
+    print(f"\nTaxSky load test {LOAD_TEST_VERSION} - mode={args.mode} concurrency={args.concurrency}")
+    print(f"{result['requests']} requests in {result['wall_s']}s = {result['rps']} req/s, "
+          f"error rate {result['error_rate']:.2%}\n")
+
+    header = f"{'route':<20}{'reqs':>7}{'err%':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'req/s':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in sorted(result["routes"].items(), key=lambda kv: -kv[1]["p99_ms"]):
+        print(f"{name:<20}{r['requests']:>7}{r['error_rate'] * 100:>7.1f}{r['p50_ms']:>9.1f}{r['p90_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}{r['rps']:>8.1f}")
+
+    print("\nLatency histograms (requests per bucket, upper bound in ms):")
+    for name, r in sorted(result["routes"].items()):
+        peak = max(r["histogram"].values()) or 1
+        print(f"\n  {name}  statuses={r['statuses']}")
+        for bound, count in r["histogram"].items():
+            if count:
+                bar = "#" * max(1, round(40 * count / peak))
+                print(f"    <= {bound:>5} ms {count:>7}  {bar}")
+
+    lag = result.get("event_loop_lag_ms")
+    if lag:
+        print(f"\nEvent-loop lag (10 ms probe): p50={lag['p50']} ms  p99={lag['p99']} ms  max={lag['max']} ms")
+        print("  (high values = sync work blocking the loop inside async handlers)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="TaxSky HTTP load test")
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=None, help="seconds to run")
+    parser.add_argument("-n", "--requests", type=int, default=None, help="total requests (default 2000 if no -d)")
+    parser.add_argument("--routes", default="", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--users", type=int, default=200, help="seeded in-memory sessions")
+    parser.add_argument("--vision-delay-ms", type=float, default=300.0, help="stub OpenAI response delay")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    if not args.duration and not args.requests:
+        args.requests = 2000
+
+    result = asyncio.run(drive(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# ============================================================
+# TAXSKY 2025 - JSON RESPONSES
+# ============================================================
+# - FastJSONResponse: default response class for the app. Uses
+#   orjson when installed (several times faster than json.dumps on
+#   the large calculation results), else falls back to JSONResponse.
+# - StaticPayload: metadata that never changes while the process
+#   runs (/states/all, /forms/status, /languages, ...) is serialized
+#   once into bytes with a strong ETag; repeat GETs carrying
+#   If-None-Match get an empty 304.
+# ============================================================
+
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# json.dumps accepts int/float dict keys; keep that behavior
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson if available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=str, option=_ORJSON_OPTIONS)
+    # Same settings as starlette's JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class StaticPayload:
+    """
+    Pre-serialized JSON body + ETag for endpoints whose output is fixed
+    for the life of the process.
+
+        STATES_ALL = StaticPayload(get_all_states)
+
+        @app.get("/states/all")
+        def list_all_states(request: Request):
+            return STATES_ALL.response(request)
+
+    build() runs once, on construction. refresh() rebuilds (e.g. after
+    reloading a table).
+    """
+
+    __slots__ = ("_build", "body", "etag")
+
+    def __init__(self, build: Callable[[], Any]):
+        self._build = build
+        self.refresh()
+
+    def refresh(self):
+        self.body = dumps(self._build())
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+
+    def response(self, request: Optional[Request] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if request is not None and _etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag == etag or tag == "W/" + etag for tag in candidates)
@@ -0,0 +1,92 @@
+# ============================================================
+# TAXSKY 2025 - LOGGING SETUP
+# ============================================================
+# Structured logging for the Python tax API.
+#
+# - Modules log through logging.getLogger(__name__) with lazy
+#   %-style arguments (nothing is formatted unless the level is on)
+# - Per-request detail (calculator, validator, PDF fields, MongoDB)
+#   is DEBUG, so the default INFO level keeps hot paths silent
+# - Records go through a QueueHandler; a background QueueListener
+#   does the actual stdout I/O so request threads never block on it
+#
+# ENVIRONMENT:
+#   TAXSKY_LOG_LEVEL   root level (default INFO)
+#   TAXSKY_LOG_FORMAT  "text" (default) or "json" (one object per line;
+#                      extra={"fields": {...}} is merged into the object)
+#   TAXSKY_LOG_LEVELS  per-logger overrides, e.g.
+#                      "tax_engine.text_extractor=DEBUG,tax_generator=DEBUG"
+# ============================================================
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg (+ fields, exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _parse_overrides(spec: str):
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            yield name.strip(), level.strip().upper()
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> logging.Logger:
+    """
+    Install the queue-backed root handler (idempotent).
+
+    Args:
+        level: root level name, defaults to TAXSKY_LOG_LEVEL or INFO
+        fmt: "text" or "json", defaults to TAXSKY_LOG_FORMAT or text
+    """
+    global _listener
+
+    root = logging.getLogger()
+    level = (level or os.getenv("TAXSKY_LOG_LEVEL", "INFO")).upper()
+    root.setLevel(level)
+
+    for name, logger_level in _parse_overrides(os.getenv("TAXSKY_LOG_LEVELS", "")):
+        logging.getLogger(name).setLevel(logger_level)
+
+    if _listener is not None:
+        return root
+
+    fmt = (fmt or os.getenv("TAXSKY_LOG_FORMAT", "text")).lower()
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    return root
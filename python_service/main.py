@@ -1,6 +1,12 @@
 # ============================================================
 # TAXSKY 2025 - UNIFIED PYTHON TAX API v4.7
 # ============================================================
+# ✅ v4.8: orjson default responses; static metadata pre-serialized with ETag/304
+# ✅ v4.8: Lazy heavy imports + startup cost report (TAXSKY_LAZY_IMPORTS, see startup.py)
+# ✅ v4.8: GET /admin/profile sampling profiler (TAXSKY_ADMIN_TOKEN, see profiler.py)
+# ✅ v4.8: GET /metrics (Prometheus text format, see metrics.py)
+# ✅ v4.8: Server-Timing phase breakdown per request (TAXSKY_TIMING_SAMPLE_RATE)
+# ✅ v4.8: Structured logging (TAXSKY_LOG_LEVEL / TAXSKY_LOG_FORMAT) - hot paths log at DEBUG
 # ✅ v4.7: Added 5 more state PDF routers (IL, PA, NJ, GA, NC)
 # ✅ v4.7: CLEANED - Removed redundant TAX_VALUES (tax_engine is source of truth)
 # ✅ v4.6: Added user_data_router for direct React → Python data editing
@@ -15,8 +21,11 @@
 #
 # ============================================================
 
+import startup  # first: starts the boot clock
+
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any, List
 import uvicorn
@@ -25,6 +34,20 @@ import base64
 import traceback
 from datetime import datetime, date
 
+from logging_setup import setup_logging
+from request_timing import TimingMiddleware
+from json_responses import FastJSONResponse, StaticPayload
+import metrics
+
+# Before the imports below so module loggers are routed through the queue
+setup_logging()
+startup.mark("fastapi")
+
+# openai / pypdf / fitz / pymongo load on first use unless TAXSKY_LAZY_IMPORTS=0
+if not startup.LAZY_IMPORTS:
+    startup.preload()
+    startup.mark("preload")
+
 # ============================================================
 # IMPORTS - With graceful fallbacks
 # ============================================================
@@ -32,6 +55,7 @@ from datetime import datetime, date
 # Tax Engine (contains ALL tax values and calculations)
 try:
     from tax_engine import calculate_federal, calculate_state_tax
+    from tax_engine.calculator.tax_params import federal_params
     TAX_ENGINE_AVAILABLE = True
     print("✅ Tax engine loaded (v8.2 OBBBA)")
 except ImportError as e:
@@ -40,6 +64,49 @@ except ImportError as e:
     def calculate_federal(data): return {"error": "Tax engine not available"}
     def calculate_state_tax(state, data): return {"error": "Tax engine not available"}
 
+try:
+    from tax_engine.tax_sweep import sweep as sweep_tax, grid as sweep_grid
+    TAX_SWEEP_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Tax sweep not available: {e}")
+    TAX_SWEEP_AVAILABLE = False
+
+try:
+    from tax_engine.mongodb_client import get_session as get_session_from_db
+    SESSION_STORE_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Session store not available: {e}")
+    SESSION_STORE_AVAILABLE = False
+
+try:
+    from tax_engine.filing_status import optimize_filing_status
+    FILING_STATUS_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Filing status optimizer not available: {e}")
+    FILING_STATUS_AVAILABLE = False
+
+try:
+    from tax_engine.contributions import optimize_contributions
+    CONTRIBUTION_OPTIMIZER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Contribution optimizer not available: {e}")
+    CONTRIBUTION_OPTIMIZER_AVAILABLE = False
+
+try:
+    from tax_engine.multistate import calculate_multistate
+    MULTISTATE_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Multi-state engine not available: {e}")
+    MULTISTATE_AVAILABLE = False
+
+try:
+    from tax_engine.scenarios import run_scenarios
+    SCENARIOS_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Scenario engine not available: {e}")
+    SCENARIOS_AVAILABLE = False
+startup.mark("tax_engine")
+
 # RAG Knowledge Base
 try:
     from rag import answer_tax_question, load_federal_rag, load_state_rag, get_available_state_rags
@@ -52,6 +119,7 @@ except ImportError as e:
     def load_federal_rag(): return False
     def load_state_rag(s): return False
     def get_available_state_rags(): return []
+startup.mark("rag")
 
 # i18n - Internationalization
 try:
@@ -63,6 +131,7 @@ except ImportError:
     I18N_AVAILABLE = False
     def translate(key, lang="en"): return key
     def get_supported_languages(): return ["en", "es", "vi", "zh", "ko", "tl"]
+startup.mark("i18n")
 
 # OCR with GPT-4 Vision
 try:
@@ -72,6 +141,7 @@ try:
 except ImportError as e:
     print(f"⚠️ OCR not available: {e}")
     OCR_AVAILABLE = False
+startup.mark("ocr")
 
 # State Validation
 try:
@@ -98,6 +168,7 @@ except ImportError as e:
     def get_all_states(): return []
     def get_state_info(s): return {"state": s}
     def is_supported_state(s): return True
+startup.mark("state_router")
 
 # ============================================================
 # PDF ROUTERS - Federal
@@ -143,6 +214,7 @@ except ImportError as e:
     print(f"⚠️ Additional states router not available: {e}")
     ADDITIONAL_STATES_AVAILABLE = False
     additional_states_router = None
+startup.mark("pdf_routers")
 
 # ============================================================
 # VALIDATOR ROUTER
@@ -167,6 +239,19 @@ except ImportError as e:
     print(f"⚠️ User data router not available: {e}")
     USER_DATA_AVAILABLE = False
     user_data_router = None
+startup.mark("api_routers")
+
+# ============================================================
+# ADMIN: ON-DEMAND PROFILER
+# ============================================================
+try:
+    from profiler import profiler_router
+    PROFILER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Profiler not available: {e}")
+    PROFILER_AVAILABLE = False
+    profiler_router = None
+startup.mark("profiler")
 
 # ============================================================
 # HELPER FUNCTIONS (minimal - tax logic is in tax_engine)
@@ -183,7 +268,8 @@ def safe_get(obj, key, default=0):
 app = FastAPI(
     title="TaxSky 2025 Tax API",
     description="Tax calculations, RAG knowledge, GPT-4 Vision OCR, 7 State PDF Forms",
-    version="4.7.0"
+    version="4.7.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -192,8 +278,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Server-Timing header + per-request phase log (see request_timing.py)
+app.add_middleware(TimingMiddleware)
+
+# Request count + latency per route for GET /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ============================================================
 # REGISTER ALL ROUTERS
 # ============================================================
@@ -233,6 +326,11 @@ if USER_DATA_AVAILABLE and user_data_router:
     app.include_router(user_data_router)
     print("👤 Registered: /api/user/* endpoints")
 
+# Admin profiler (404 unless TAXSKY_ADMIN_TOKEN is set)
+if PROFILER_AVAILABLE and profiler_router:
+    app.include_router(profiler_router)
+    print("🔬 Registered: GET /admin/profile")
+
 # ============================================================
 # MODELS
 # ============================================================
@@ -336,18 +434,25 @@ def health_check():
             "validator": EXTRACTOR_AVAILABLE,
             "user_data": USER_DATA_AVAILABLE,
         },
+        "startup": startup.report(),
         "pdf_forms": {
             "federal": ["1040"],
             "states": ["CA-540", "NY-IT201", "IL-1040", "PA-40", "NJ-1040", "GA-500", "NC-D400"]
         }
     }
 
+# ============================================================
+# METRICS (Prometheus scrape target)
+# ============================================================
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # ============================================================
 # PDF FORM STATUS ENDPOINT
 # ============================================================
-@app.get("/forms/status")
-def get_form_status():
-    """Get status of all PDF form generators"""
+def _form_status():
+    """Status of all PDF form generators (fixed once routers are loaded)"""
     return {
         "federal": {
             "1040": {"available": FORM_1040_AVAILABLE, "endpoint": "POST /generate/1040"}
@@ -365,6 +470,13 @@ def get_form_status():
         "total_supported": 7
     }
 
+FORM_STATUS = StaticPayload(_form_status)
+
+@app.get("/forms/status")
+def get_form_status(request: Request):
+    """Get status of all PDF form generators"""
+    return FORM_STATUS.response(request)
+
 # ============================================================
 # TAX CALCULATION ENDPOINTS
 # ============================================================
@@ -385,8 +497,11 @@ def calculate_tax_endpoint(data: TaxInput, language: str = "en"):
         tax_data["qualifying_children_under_17"] = children
         tax_data["other_dependents"] = other
         
-        # Calculate federal tax (tax_engine has all correct 2025 values)
-        result = calculate_federal(tax_data)
+        # Calculate federal tax (tables for tax_data["tax_year"], default 2025)
+        try:
+            result = calculate_federal(tax_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Calculate state tax if specified
         state = tax_data.get("state")
@@ -396,7 +511,7 @@ def calculate_tax_endpoint(data: TaxInput, language: str = "en"):
         
         # CTC validation
         ctc = result.get("child_tax_credit", 0)
-        expected_ctc = children * 2000  # CTC is $2,000 per child in 2025
+        expected_ctc = children * federal_params(result.get("tax_year")).ctc_amount
         ctc_validation = {
             "children_count": children,
             "expected_ctc": expected_ctc,
@@ -411,10 +526,187 @@ def calculate_tax_endpoint(data: TaxInput, language: str = "en"):
             "dependent_status": dep_status
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+class SweepRequest(BaseModel):
+    profile: Optional[TaxInput] = None
+    variable: str = "wages"
+    start: float = 0
+    stop: float = 200000
+    step: float = 1000
+    state: Optional[str] = None
+
+@app.post("/calculate/sweep")
+def calculate_sweep_endpoint(req: SweepRequest):
+    """Tax, effective and marginal rate series with one input swept over start..stop"""
+    if not TAX_SWEEP_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Tax sweep not available")
+    
+    profile = req.profile or TaxInput()
+    try:
+        tax_data = profile.model_dump()
+    except AttributeError:
+        tax_data = profile.dict()
+    
+    children, other, _ = validate_dependents(tax_data)
+    tax_data["qualifying_children_under_17"] = children
+    tax_data["other_dependents"] = other
+    
+    try:
+        return sweep_tax(tax_data, req.variable, sweep_grid(req.start, req.stop, req.step), state=req.state)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class FilingStatusRequest(BaseModel):
+    profile: Optional[TaxInput] = None
+    user_id: Optional[str] = None
+    tax_year: int = 2025
+    state: Optional[str] = None
+    allocation: Optional[Dict[str, float]] = None
+    dependents_with: str = "taxpayer"
+    include_details: bool = False
+
+@app.post("/calculate/filing-status")
+def calculate_filing_status_endpoint(req: FilingStatusRequest):
+    """Every eligible filing status (MFJ, MFS, HOH, QSS) for one household, cheapest first"""
+    if not FILING_STATUS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Filing status optimizer not available")
+    
+    if req.user_id:
+        if not SESSION_STORE_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Session store not available")
+        session = get_session_from_db(req.user_id, req.tax_year)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+    else:
+        profile = req.profile or TaxInput()
+        try:
+            session = profile.model_dump()
+        except AttributeError:
+            session = profile.dict()
+        children, other, _ = validate_dependents(session)
+        session["qualifying_children_under_17"] = children
+        session["other_dependents"] = other
+    
+    try:
+        return optimize_filing_status(
+            session,
+            state=req.state,
+            tax_year=req.tax_year,
+            allocation=req.allocation,
+            dependents_with=req.dependents_with,
+            include_details=req.include_details,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class ContributionRequest(BaseModel):
+    profile: Optional[TaxInput] = None
+    accounts: List[str] = ["ira", "hsa"]
+    state: Optional[str] = None
+    budget: Optional[float] = None
+    target_refund: Optional[float] = None
+
+@app.post("/calculate/contributions")
+def calculate_contributions_endpoint(req: ContributionRequest):
+    """Best IRA / HSA / 401(k) amounts, optionally within a budget or toward a target refund"""
+    if not CONTRIBUTION_OPTIMIZER_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Contribution optimizer not available")
+    
+    profile = req.profile or TaxInput()
+    try:
+        tax_data = profile.model_dump()
+    except AttributeError:
+        tax_data = profile.dict()
+    
+    children, other, _ = validate_dependents(tax_data)
+    tax_data["qualifying_children_under_17"] = children
+    tax_data["other_dependents"] = other
+    
+    try:
+        return optimize_contributions(
+            tax_data, req.accounts, state=req.state, budget=req.budget, target_refund=req.target_refund
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class MultiStateRequest(BaseModel):
+    profile: Optional[TaxInput] = None
+    residency: List[Dict[str, Any]] = []
+    state_sources: List[Dict[str, Any]] = []
+    state_withholding_by_state: Optional[Dict[str, float]] = None
+    include_details: bool = False
+
+@app.post("/calculate/multistate")
+def calculate_multistate_endpoint(req: MultiStateRequest):
+    """Part-year / nonresident returns: federal once, income allocated to every state, other-state credits"""
+    if not MULTISTATE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Multi-state engine not available")
+    
+    profile = req.profile or TaxInput()
+    try:
+        tax_data = profile.model_dump()
+    except AttributeError:
+        tax_data = profile.dict()
+    
+    children, other, _ = validate_dependents(tax_data)
+    tax_data["qualifying_children_under_17"] = children
+    tax_data["other_dependents"] = other
+    tax_data["residency"] = req.residency
+    tax_data["state_sources"] = req.state_sources
+    if req.state_withholding_by_state:
+        tax_data["state_withholding_by_state"] = req.state_withholding_by_state
+    
+    try:
+        return calculate_multistate(tax_data, include_details=req.include_details)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class ScenarioRequest(BaseModel):
+    profile: Optional[TaxInput] = None
+    user_id: Optional[str] = None
+    tax_year: int = 2025
+    state: Optional[str] = None
+    variants: List[Dict[str, Any]] = []
+    include_details: bool = False
+
+@app.post("/calculate/scenarios")
+def calculate_scenarios_endpoint(req: ScenarioRequest):
+    """What-if variants of one base return, sharing its calculation; comparison matrix, base first"""
+    if not SCENARIOS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Scenario engine not available")
+    
+    if req.user_id:
+        if not SESSION_STORE_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Session store not available")
+        session = get_session_from_db(req.user_id, req.tax_year)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+    else:
+        profile = req.profile or TaxInput()
+        try:
+            session = profile.model_dump()
+        except AttributeError:
+            session = profile.dict()
+        children, other, _ = validate_dependents(session)
+        session["qualifying_children_under_17"] = children
+        session["other_dependents"] = other
+    
+    try:
+        return run_scenarios(
+            session,
+            req.variants,
+            state=req.state,
+            tax_year=req.tax_year,
+            include_details=req.include_details,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/calculate/state/{state_code}")
 def calculate_state_only(state_code: str, data: TaxInput, language: str = "en"):
     """Calculate state tax only"""
@@ -441,13 +733,17 @@ def calculate_state_only(state_code: str, data: TaxInput, language: str = "en"):
 def validate_state(state_code: str):
     return validate_state_selection(state_code.upper())
 
+# State metadata never changes at runtime - serialize once, answer repeats with 304
+STATES_SUPPORTED = StaticPayload(get_supported_states_list)
+STATES_ALL = StaticPayload(get_all_states)
+
 @app.get("/states/supported")
-def get_supported_states():
-    return get_supported_states_list()
+def get_supported_states(request: Request):
+    return STATES_SUPPORTED.response(request)
 
 @app.get("/states/all")
-def list_all_states():
-    return get_all_states()
+def list_all_states(request: Request):
+    return STATES_ALL.response(request)
 
 @app.get("/states/info/{state_code}")
 def state_info(state_code: str):
@@ -488,9 +784,11 @@ def load_state(state_code: str):
 def rag_status():
     return {"success": True, "federal_rag": True, "available_states": get_available_state_rags()}
 
+LANGUAGES = StaticPayload(lambda: {"success": True, "languages": get_supported_languages()})
+
 @app.get("/languages")
-def list_languages():
-    return {"success": True, "languages": get_supported_languages()}
+def list_languages(request: Request):
+    return LANGUAGES.response(request)
 
 # ============================================================
 # OCR ENDPOINTS
@@ -579,6 +877,9 @@ async def ocr_ssa(file: UploadFile = File(...)):
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+# All routes registered - log the startup cost breakdown
+startup.ready()
+
 # ============================================================
 # RUN SERVER
 # ============================================================
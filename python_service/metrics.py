@@ -0,0 +1,303 @@
+# ============================================================
+# TAXSKY 2025 - METRICS
+# ============================================================
+# Prometheus text-format metrics for GET /metrics.
+#
+# - Counter / Histogram keep one dict per thread ("shard"); the hot
+#   path only touches its own thread's dict, so there is no lock and
+#   no contention between the event loop and threadpool workers.
+#   Shards are summed when /metrics is scraped.
+# - Gauges that already live elsewhere (job queue, SingleFlight,
+#   Mongo pool) are read at scrape time through register_collector().
+# - MetricsMiddleware (pure ASGI) records request count and latency
+#   per route template (/api/user/{user_id}, not the raw path).
+#
+# Subsystem metrics defined here are updated by their owners:
+#   CALCULATOR_CALLS   tax_engine/state_router.py
+#   PDF_RENDERS/...    tax_generator/*_router.py
+#   OCR_CALLS/VISION   ocr.py
+#   RAG_ANSWERS        rag/rag_service.py
+#   CACHE_REQUESTS     rag/rag_service.py
+#   MONGO_POOL_EVENTS  tax_engine/mongodb_client.py
+# Collectors: job queue + validation single-flight (extractor_router),
+# Mongo pool gauges (mongodb_client), cache hit ratios (below).
+# ============================================================
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+METRICS_VERSION = "v1.0"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, type, help, [(labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+_registry: List["_Metric"] = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Per-thread sharded storage; subclasses define what a shard entry is."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()  # only taken once per thread, on first use
+        with _registry_lock:
+            _registry.append(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshots(self) -> List[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        # dict.copy() runs without releasing the GIL - a consistent view of each shard
+        return [s.copy() for s in shards]
+
+    def _label_dict(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labels, key))
+
+
+class Counter(_Metric):
+    """Monotonic counter: CALCULATOR_CALLS.inc("CA", "full")."""
+
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1):
+        shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        totals: Dict[tuple, float] = {}
+        for shard in self._snapshots():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect(self) -> Family:
+        return (self.name, self.kind, self.help,
+                [(self._label_dict(k), v) for k, v in sorted(self.values().items())])
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram: PDF_RENDER_SECONDS.observe(0.42, "1040")."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        shard = self._shard()
+        slot = shard.get(label_values)
+        if slot is None:
+            # [count per bucket..., +Inf, sum]
+            slot = shard[label_values] = [0] * (len(self.buckets) + 2)
+        slot[bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def time(self, *label_values: str) -> "_HistogramTimer":
+        return _HistogramTimer(self, label_values)
+
+    def collect(self) -> Family:
+        merged: Dict[tuple, List[float]] = {}
+        for shard in self._snapshots():
+            for key, slot in shard.items():
+                acc = merged.setdefault(key, [0] * len(slot))
+                for i, v in enumerate(slot):
+                    acc[i] += v
+
+        samples: List[Tuple[Dict[str, str], float]] = []
+        for key, slot in sorted(merged.items()):
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), slot[:-1]):
+                cumulative += count
+                samples.append(({**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(({**labels, "__suffix__": "_sum"}, slot[-1]))
+            samples.append(({**labels, "__suffix__": "_count"}, cumulative))
+        return (self.name, self.kind, self.help, samples)
+
+
+class _HistogramTimer:
+    __slots__ = ("_hist", "_labels", "_start")
+
+    def __init__(self, hist: Histogram, labels: tuple):
+        self._hist = hist
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._start, *self._labels)
+        return False
+
+
+def register_collector(fn: Callable[[], Iterable[Family]]):
+    """Add a scrape-time callback returning (name, type, help, samples) families."""
+    with _registry_lock:
+        _collectors.append(fn)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format 0.0.4."""
+    with _registry_lock:
+        metrics = list(_registry)
+        collectors = list(_collectors)
+
+    families: List[Family] = [m.collect() for m in metrics]
+    for collector in collectors:
+        try:
+            families.extend(list(collector()))
+        except Exception:
+            continue  # a broken collector must not take /metrics down
+
+    lines: List[str] = []
+    for name, kind, help, samples in families:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            suffix = labels.pop("__suffix__", "_bucket" if "le" in labels else "")
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def cache_hit_ratios() -> Iterable[Family]:
+    """taxsky_cache_hit_ratio{cache} derived from CACHE_REQUESTS."""
+    by_cache: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS.values().items():
+        hits_total = by_cache.setdefault(cache, [0, 0])
+        hits_total[1] += value
+        if result == "hit":
+            hits_total[0] += value
+    samples = [({"cache": c}, round(h / t, 4) if t else 0) for c, (h, t) in sorted(by_cache.items())]
+    yield ("taxsky_cache_hit_ratio", "gauge", "Cache hits / lookups since start", samples)
+
+
+# ============================================================
+# SERVICE METRICS
+# ============================================================
+
+HTTP_REQUESTS = Counter(
+    "taxsky_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "taxsky_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+
+CALCULATOR_CALLS = Counter(
+    "taxsky_calculator_calls_total", "State tax calculations by state and calculator path", ("state", "path"))
+
+PDF_RENDERS = Counter(
+    "taxsky_pdf_renders_total", "PDF form renders by form and result", ("form", "result"))
+PDF_RENDER_SECONDS = Histogram(
+    "taxsky_pdf_render_seconds", "PDF form render time (successful renders)", ("form",))
+
+OCR_CALLS = Counter(
+    "taxsky_ocr_calls_total", "OCR extractions by form type", ("form_type",))
+VISION_SECONDS = Histogram(
+    "taxsky_vision_request_seconds", "Vision model latency by call", ("call",))
+
+RAG_ANSWERS = Counter(
+    "taxsky_rag_answers_total", "RAG answers by source (direct, qa, state, federal, none)", ("source",))
+
+CACHE_REQUESTS = Counter(
+    "taxsky_cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+
+MONGO_POOL_EVENTS = Counter(
+    "taxsky_mongo_pool_events_total", "MongoDB connection pool events", ("event",))
+
+register_collector(cache_hit_ratios)
+
+
+def track_pdf_render(form: str):
+    """
+    Decorator for async PDF endpoints: PDF_RENDERS{form, result} and
+    PDF_RENDER_SECONDS{form}. functools.wraps keeps the signature FastAPI
+    reads for request parsing.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = await fn(*args, **kwargs)
+            except BaseException:
+                PDF_RENDERS.inc(form, "error")
+                raise
+            PDF_RENDERS.inc(form, "ok")
+            PDF_RENDER_SECONDS.observe(time.perf_counter() - start, form)
+            return response
+        return wrapper
+    return decorator
+
+
+# ============================================================
+# MIDDLEWARE
+# ============================================================
+
+class MetricsMiddleware:
+    """ASGI middleware: request count + latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - start, method, route)
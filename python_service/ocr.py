@@ -5,13 +5,35 @@
 import os
 import json
 import base64
-from openai import OpenAI
+import time
+import importlib.util
 from dotenv import load_dotenv
 
+try:
+    from startup import lazy
+except ImportError:
+    from importlib import import_module as lazy
+
+# openai is imported on the first OCR call; fail the import here (cheaply)
+# so main.py still reports OCR as unavailable when the SDK is missing
+if importlib.util.find_spec("openai") is None:
+    raise ImportError("openai is not installed")
+openai = lazy("openai")
+
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
+try:
+    from metrics import OCR_CALLS, VISION_SECONDS
+except ImportError:
+    OCR_CALLS = VISION_SECONDS = None
+
 load_dotenv()
 
 def get_client():
-    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # ============================================================
 # W-2: Wages (FIXED - Accurate Box 2 Reading)
@@ -602,63 +624,68 @@ def validate_w2_numbers(data: dict) -> dict:
 # ============================================================
 # EXTRACTION FUNCTIONS
 # ============================================================
+FORM_PROMPTS = {
+    'W-2': W2_PROMPT,
+    'W2': W2_PROMPT,
+    'W-2G': W2G_PROMPT,
+    'W2G': W2G_PROMPT,
+    '1099-NEC': NEC_PROMPT,
+    '1099NEC': NEC_PROMPT,
+    '1099-INT': INT_PROMPT,
+    '1099INT': INT_PROMPT,
+    '1099-DIV': DIV_PROMPT,
+    '1099DIV': DIV_PROMPT,
+    '1099-B': B_PROMPT,
+    '1099B': B_PROMPT,
+    '1099-R': R_PROMPT,
+    '1099R': R_PROMPT,
+    '1099-G': G_PROMPT,
+    '1099G': G_PROMPT,
+    '1099-MISC': MISC_PROMPT,
+    '1099MISC': MISC_PROMPT,
+    '1099-K': K_PROMPT,
+    '1099K': K_PROMPT,
+    'SSA-1099': SSA_PROMPT,
+    'SSA1099': SSA_PROMPT,
+    '1098': MORTGAGE_PROMPT,
+    '1098-T': T_PROMPT,
+    '1098T': T_PROMPT,
+    '1098-E': E_PROMPT,
+    '1098E': E_PROMPT,
+}
+
 def get_prompt_for_form(form_type):
     """Get the appropriate prompt for a form type."""
-    prompts = {
-        'W-2': W2_PROMPT,
-        'W2': W2_PROMPT,
-        'W-2G': W2G_PROMPT,
-        'W2G': W2G_PROMPT,
-        '1099-NEC': NEC_PROMPT,
-        '1099NEC': NEC_PROMPT,
-        '1099-INT': INT_PROMPT,
-        '1099INT': INT_PROMPT,
-        '1099-DIV': DIV_PROMPT,
-        '1099DIV': DIV_PROMPT,
-        '1099-B': B_PROMPT,
-        '1099B': B_PROMPT,
-        '1099-R': R_PROMPT,
-        '1099R': R_PROMPT,
-        '1099-G': G_PROMPT,
-        '1099G': G_PROMPT,
-        '1099-MISC': MISC_PROMPT,
-        '1099MISC': MISC_PROMPT,
-        '1099-K': K_PROMPT,
-        '1099K': K_PROMPT,
-        'SSA-1099': SSA_PROMPT,
-        'SSA1099': SSA_PROMPT,
-        '1098': MORTGAGE_PROMPT,
-        '1098-T': T_PROMPT,
-        '1098T': T_PROMPT,
-        '1098-E': E_PROMPT,
-        '1098E': E_PROMPT,
-    }
-    return prompts.get(form_type, W2_PROMPT)
+    return FORM_PROMPTS.get(form_type, W2_PROMPT)
 
 async def detect_form_type(base64_img):
     """Auto-detect the form type from an image."""
     client = get_client()
     
-    completion = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": AUTO_DETECT_PROMPT},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/png;base64,{base64_img}",
-                            "detail": "low"
+    start = time.perf_counter()
+    with span("vision_detect"):
+        completion = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": AUTO_DETECT_PROMPT},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/png;base64,{base64_img}",
+                                "detail": "low"
+                            }
                         }
-                    }
-                ]
-            }
-        ],
-        temperature=0.1,
-        max_tokens=50
-    )
+                    ]
+                }
+            ],
+            temperature=0.1,
+            max_tokens=50
+        )
+    if VISION_SECONDS is not None:
+        VISION_SECONDS.observe(time.perf_counter() - start, "detect")
     
     form_type = completion.choices[0].message.content.strip()
     return form_type
@@ -674,27 +701,33 @@ async def extract_form(base64_img, form_type=None):
     
     # Get the appropriate prompt
     prompt = get_prompt_for_form(form_type)
+    if OCR_CALLS is not None:
+        OCR_CALLS.inc(form_type if form_type in FORM_PROMPTS else "other")
     
-    completion = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/png;base64,{base64_img}",
-                            "detail": "high"
+    start = time.perf_counter()
+    with span("vision"):
+        completion = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/png;base64,{base64_img}",
+                                "detail": "high"
+                            }
                         }
-                    }
-                ]
-            }
-        ],
-        temperature=0.1,
-        max_tokens=2000
-    )
+                    ]
+                }
+            ],
+            temperature=0.1,
+            max_tokens=2000
+        )
+    if VISION_SECONDS is not None:
+        VISION_SECONDS.observe(time.perf_counter() - start, "extract")
     
     raw = completion.choices[0].message.content
     raw = raw.replace("```json", "").replace("```", "").strip()
@@ -0,0 +1,195 @@
+# ============================================================
+# TAXSKY 2025 - ON-DEMAND SAMPLING PROFILER
+# ============================================================
+# Profiles a live worker without restarting it.
+#
+#   GET /admin/profile?seconds=10&interval_ms=10
+#       X-Admin-Token: $TAXSKY_ADMIN_TOKEN
+#
+# A threadpool thread snapshots every thread's stack with
+# sys._current_frames() at a fixed interval and counts identical
+# stacks. The response is collapsed-stack text ("a;b;c 42"), which
+# flamegraph.pl, speedscope and inferno read directly.
+#
+# - Nothing runs until a profile is requested; the cost while
+#   sampling is one stack walk per thread per interval (default
+#   100 Hz) and is bounded by MAX_SECONDS / MIN_INTERVAL_MS
+# - One profile per process at a time (409 if one is running)
+# - Each uvicorn worker is its own process: the X-Profile-Pid header
+#   says which worker answered; repeat the call to sample others
+# - Disabled (404) unless TAXSKY_ADMIN_TOKEN is set
+#
+# ENVIRONMENT:
+#   TAXSKY_ADMIN_TOKEN  shared secret for /admin/* endpoints
+# ============================================================
+
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+PROFILER_VERSION = "v1.0"
+
+MAX_SECONDS = 60
+MIN_INTERVAL_MS = 1
+MAX_DEPTH = 128
+
+_SERVICE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+# Leaf frames that mean "thread is parked", not "thread is busy"
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for all threads in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval: float = 0.01, lines: bool = False,
+                include_idle: bool = False) -> Dict:
+        """
+        Sample for `seconds`, blocking the calling thread.
+
+        Returns:
+            {"stacks": Counter(collapsed stack -> samples), "samples": int,
+             "duration": float, "interval": float}
+
+        Raises:
+            RuntimeError: another profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("profile already running")
+        try:
+            return self._sample(seconds, interval, lines, include_idle)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float, lines: bool, include_idle: bool) -> Dict:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        labels: Dict = {}  # code object (+ line) -> frame label
+        samples = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = self._collapse(frame, lines, include_idle, labels)
+                if stack:
+                    stacks[f"{names.get(ident, ident)};{stack}"] += 1
+            samples += 1
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # fell behind - don't burst to catch up
+
+        return {"stacks": stacks, "samples": samples,
+                "duration": time.perf_counter() - start, "interval": interval}
+
+    @staticmethod
+    def _collapse(frame, lines: bool, include_idle: bool, labels: Dict) -> Optional[str]:
+        code = frame.f_code
+        if not include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+            return None
+
+        parts = []
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            code = frame.f_code
+            key = (code, frame.f_lineno) if lines else code
+            label = labels.get(key)
+            if label is None:
+                label = f"{_short_path(code.co_filename)}:{code.co_name}"
+                if lines:
+                    label += f":{frame.f_lineno}"
+                labels[key] = label
+            parts.append(label)
+            frame = frame.f_back
+            depth += 1
+        parts.reverse()
+        return ";".join(parts)
+
+
+def _short_path(filename: str) -> str:
+    """site-packages/pypdf/_writer.py -> pypdf/_writer.py; service files relative to python_service."""
+    marker = "site-packages" + os.sep
+    i = filename.rfind(marker)
+    if i >= 0:
+        return filename[i + len(marker):]
+    if filename.startswith(_SERVICE_DIR):
+        return filename[len(_SERVICE_DIR):]
+    return os.path.basename(filename)
+
+
+profiler = SamplingProfiler()
+
+
+# ============================================================
+# ADMIN ENDPOINT
+# ============================================================
+
+profiler_router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _require_admin(token: Optional[str]):
+    expected = os.getenv("TAXSKY_ADMIN_TOKEN", "")
+    if not expected:
+        raise HTTPException(404, "Not found")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(403, "Admin token required")
+
+
+@profiler_router.get("/profile", response_class=PlainTextResponse)
+async def profile_endpoint(
+    seconds: float = Query(10, gt=0, le=MAX_SECONDS),
+    interval_ms: float = Query(10, ge=MIN_INTERVAL_MS, le=1000),
+    lines: bool = False,
+    include_idle: bool = False,
+    x_admin_token: Optional[str] = Header(None),
+):
+    """Sample this worker for `seconds` and return collapsed stacks (most frequent first)."""
+    _require_admin(x_admin_token)
+
+    try:
+        result = await run_in_threadpool(
+            profiler.profile, seconds, interval_ms / 1000, lines, include_idle
+        )
+    except RuntimeError:
+        raise HTTPException(409, "A profile is already running in this worker")
+
+    body = "\n".join(f"{stack} {count}" for stack, count in result["stacks"].most_common())
+    return PlainTextResponse(
+        body + "\n" if body else "",
+        headers={
+            "X-Profile-Pid": str(os.getpid()),
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Duration": f"{result['duration']:.3f}",
+        },
+    )
@@ -10,6 +10,8 @@ from .rag_service import (
     get_available_states,
     get_ai_context,
     get_standard_deduction,
+    match_intent,
+    INTENT_RULES,
     TAX_VALUES_2025
 )
 
@@ -25,5 +27,7 @@ __all__ = [
     'get_available_state_rags',
     'get_ai_context',
     'get_standard_deduction',
+    'match_intent',
+    'INTENT_RULES',
     'TAX_VALUES_2025'
 ]
\ No newline at end of file
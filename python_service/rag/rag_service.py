@@ -15,9 +15,15 @@
 import os
 import re
 import json
+from collections import deque
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    from metrics import RAG_ANSWERS, CACHE_REQUESTS
+except ImportError:
+    RAG_ANSWERS = CACHE_REQUESTS = None
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -170,6 +176,9 @@ def load_state_rag(state_code: str) -> str:
     """Load state-specific tax rules document."""
     state_code = state_code.upper()
     
+    if CACHE_REQUESTS is not None:
+        CACHE_REQUESTS.inc("state_rag", "hit" if state_code in _state_rags else "miss")
+    
     if state_code not in _state_rags:
         rag_file = STATES_RAG_PATH / f"{state_code}.md"
         if rag_file.exists():
@@ -587,86 +596,136 @@ def get_standard_deduction(
 
 
 # ============================================================
-# MAIN ANSWER FUNCTION
+# DIRECT ANSWER RULES
+# ============================================================
+#
+# Each rule is plain data:
+#   intent   - name for logging/debugging
+#   priority - lower wins when several rules match (keep gaps of 10)
+#   match    - keyword groups; EVERY group needs at least one keyword
+#              found in the lowercased question (substring match)
+#   state    - optional state condition ("no_tax" = state has no income tax)
+#   answer   - str.format template (v = ANSWER_VALUES, state_name = state)
+#              or a callable(question_lower) -> Optional[str]
+#
+# All keywords are compiled into ONE Aho-Corasick automaton, so
+# intent resolution is a single pass over the question. To add an
+# intent, append a rule with the right priority - no code changes.
 # ============================================================
 
-def answer_tax_question(question: str, state_code: Optional[str] = None, language: str = "en") -> str:
-    """
-    Answer a tax question using RAG.
-    
-    Args:
-        question: User's question
-        state_code: Optional state code
-        language: Language code (en, vi, es)
-    
-    Returns:
-        Answer string
-    """
-    q = question.lower()
+# Derived values used by the answer templates
+ANSWER_VALUES = {
+    **TAX_VALUES_2025,
+    "ss_rate_pct": TAX_VALUES_2025["ss_rate"] * 100,
+    "salt_cap_mfs": TAX_VALUES_2025["salt_cap"] // 2,
+}
+
+
+def _answer_w2_box12(q: str) -> str:
+    """Answer W-2 Box 12 questions, explaining a specific code if mentioned."""
+    code_match = re.search(r'code\s*([a-z]{1,2})', q, re.IGNORECASE)
+    if code_match:
+        code = code_match.group(1).upper()
+        if code in W2_BOX_12_CODES:
+            return f"W-2 Box 12 Code {code}: {W2_BOX_12_CODES[code]}"
     
+    return """W-2 Box 12 Common Codes:
+• D: 401(k) contributions (pre-tax)
+• E: 403(b) contributions (pre-tax)
+• W: HSA contributions (employer)
+• DD: Health insurance cost (info only, not taxable)
+• AA: Roth 401(k) (after-tax)
+• C: Group term life insurance over $50k (taxable)
+
+Your 401(k) is Code D - this amount is ALREADY excluded from Box 1."""
+
+
+_K401 = ("401k", "401(k)")
+_W2 = ("w2", "w-2")
+
+INTENT_RULES: List[Dict] = [
     # ════════════════════════════════════════════════════════
-    # DIRECT ANSWERS (most common questions)
+    # NO-TAX STATES
     # ════════════════════════════════════════════════════════
-    
-    # No-tax states
-    if state_code and state_code.upper() in NO_TAX_STATES:
-        state_name = NO_TAX_STATES[state_code.upper()]
-        if any(kw in q for kw in ["income tax", "tax rate", "state tax"]):
-            return f"{state_name} has NO state income tax."
-        if "file" in q and "return" in q:
-            return f"No state tax return needed for {state_name}. You only file federal taxes."
+    {
+        "intent": "no_tax_state_income_tax",
+        "priority": 10,
+        "state": "no_tax",
+        "match": [("income tax", "tax rate", "state tax")],
+        "answer": "{state_name} has NO state income tax.",
+    },
+    {
+        "intent": "no_tax_state_filing",
+        "priority": 20,
+        "state": "no_tax",
+        "match": [("file",), ("return",)],
+        "answer": "No state tax return needed for {state_name}. You only file federal taxes.",
+    },
     
     # ════════════════════════════════════════════════════════
-    # 401(k) QUESTIONS
+    # 401(k)
     # ════════════════════════════════════════════════════════
-    if "401k" in q or "401(k)" in q:
-        if "limit" in q or "max" in q or "how much" in q:
-            return f"""2025 401(k) Contribution Limits:
-• Under 50: ${TAX_VALUES_2025['401k_limit']['under_50']:,}
-• 50 or older: ${TAX_VALUES_2025['401k_limit']['50_plus']:,}
-• Catch-up (50+): ${TAX_VALUES_2025['401k_limit']['catch_up']:,}
-
-Important: 401(k) has NO INCOME LIMIT for deduction - always tax-deductible regardless of how much you earn!"""
-        
-        if "deduct" in q or "tax" in q:
-            return f"""401(k) Tax Treatment:
+    {
+        "intent": "401k_limits",
+        "priority": 100,
+        "match": [_K401, ("limit", "max", "how much")],
+        "answer": """2025 401(k) Contribution Limits:
+• Under 50: ${v[401k_limit][under_50]:,}
+• 50 or older: ${v[401k_limit][50_plus]:,}
+• Catch-up (50+): ${v[401k_limit][catch_up]:,}
+
+Important: 401(k) has NO INCOME LIMIT for deduction - always tax-deductible regardless of how much you earn!""",
+    },
+    {
+        "intent": "401k_tax_treatment",
+        "priority": 110,
+        "match": [_K401, ("deduct", "tax")],
+        "answer": """401(k) Tax Treatment:
 • Contributions are ALWAYS tax-deductible (pre-tax)
 • NO income limit for 401(k) deduction (unlike IRA)
 • Your W-2 Box 1 is already reduced by your 401(k) amount
 • Box 12 Code D shows your 401(k) contribution
-• 2025 limit: ${TAX_VALUES_2025['401k_limit']['under_50']:,} (${TAX_VALUES_2025['401k_limit']['50_plus']:,} if 50+)"""
-        
-        if "box" in q or "w2" in q or "w-2" in q:
-            return """401(k) on W-2:
+• 2025 limit: ${v[401k_limit][under_50]:,} (${v[401k_limit][50_plus]:,} if 50+)""",
+    },
+    {
+        "intent": "401k_on_w2",
+        "priority": 120,
+        "match": [_K401, ("box", "w2", "w-2")],
+        "answer": """401(k) on W-2:
 • Box 12, Code D: Your 401(k) contribution amount
 • Box 1: Already EXCLUDES your 401(k) (lower than gross)
 • Box 3 & 5: INCLUDES your 401(k) (Social Security/Medicare still taxed)
-• Box 13: "Retirement plan" checkbox should be checked"""
-        
-        # General 401k
-        return f"""401(k) Overview:
-• 2025 Limit: ${TAX_VALUES_2025['401k_limit']['under_50']:,} (${TAX_VALUES_2025['401k_limit']['50_plus']:,} if 50+)
+• Box 13: "Retirement plan" checkbox should be checked""",
+    },
+    {
+        "intent": "401k_overview",
+        "priority": 190,
+        "match": [_K401],
+        "answer": """401(k) Overview:
+• 2025 Limit: ${v[401k_limit][under_50]:,} (${v[401k_limit][50_plus]:,} if 50+)
 • ALWAYS tax-deductible (no income limit!)
 • Employer match = FREE MONEY - always contribute enough to get full match
 • Shows on W-2 Box 12, Code D
-• Can have BOTH 401(k) AND IRA"""
+• Can have BOTH 401(k) AND IRA""",
+    },
     
     # ════════════════════════════════════════════════════════
-    # IRA QUESTIONS
+    # IRA
     # ════════════════════════════════════════════════════════
-    if "ira" in q:
-        if "roth" in q and "traditional" in q:
-            # Comparison question
-            return f"""Traditional IRA vs Roth IRA:
+    {
+        "intent": "ira_traditional_vs_roth",
+        "priority": 200,
+        "match": [("ira",), ("roth",), ("traditional",)],
+        "answer": """Traditional IRA vs Roth IRA:
 
 TRADITIONAL IRA:
-• Contribution: ${TAX_VALUES_2025['ira_limit']['under_50']:,} (${TAX_VALUES_2025['ira_limit']['50_plus']:,} if 50+)
+• Contribution: ${v[ira_limit][under_50]:,} (${v[ira_limit][50_plus]:,} if 50+)
 • Tax deduction: Maybe (depends on income & 401k status)
 • If you have 401(k) at work: Deduction limited if AGI > $79k (single) or $126k (MFJ)
 • Withdrawals: Taxed as ordinary income
 
 ROTH IRA:
-• Contribution: ${TAX_VALUES_2025['roth_ira_limit']['under_50']:,} (${TAX_VALUES_2025['roth_ira_limit']['50_plus']:,} if 50+)
+• Contribution: ${v[roth_ira_limit][under_50]:,} (${v[roth_ira_limit][50_plus]:,} if 50+)
 • Tax deduction: NEVER (you pay tax now)
 • Income limit: Cannot contribute if AGI > $165k (single) or $246k (MFJ)
 • Withdrawals: TAX-FREE! 🎉
@@ -674,11 +733,13 @@ ROTH IRA:
 WHICH IS BETTER?
 • Low income now → Traditional (get deduction)
 • High income now → Roth (tax-free growth)
-• Have 401(k) + income > $89k → Roth (can't deduct Traditional anyway)"""
-        
-        if "roth" in q:
-            if "limit" in q or "income" in q or "can i" in q:
-                return f"""Roth IRA Income Limits (2025):
+• Have 401(k) + income > $89k → Roth (can't deduct Traditional anyway)""",
+    },
+    {
+        "intent": "roth_ira_income_limits",
+        "priority": 210,
+        "match": [("ira",), ("roth",), ("limit", "income", "can i")],
+        "answer": """Roth IRA Income Limits (2025):
 
 Single/HOH:
 • Full contribution if AGI ≤ $150,000
@@ -690,20 +751,27 @@ Married Filing Jointly:
 • Partial if AGI $236,001 - $246,000
 • Cannot contribute if AGI > $246,000
 
-Contribution Limit: ${TAX_VALUES_2025['roth_ira_limit']['under_50']:,} (${TAX_VALUES_2025['roth_ira_limit']['50_plus']:,} if 50+)
+Contribution Limit: ${v[roth_ira_limit][under_50]:,} (${v[roth_ira_limit][50_plus]:,} if 50+)
 
-If income too high: Consider Backdoor Roth IRA strategy."""
-            
-            return f"""Roth IRA (2025):
-• Contribution: ${TAX_VALUES_2025['roth_ira_limit']['under_50']:,} (${TAX_VALUES_2025['roth_ira_limit']['50_plus']:,} if 50+)
+If income too high: Consider Backdoor Roth IRA strategy.""",
+    },
+    {
+        "intent": "roth_ira_overview",
+        "priority": 220,
+        "match": [("ira",), ("roth",)],
+        "answer": """Roth IRA (2025):
+• Contribution: ${v[roth_ira_limit][under_50]:,} (${v[roth_ira_limit][50_plus]:,} if 50+)
 • Tax deduction: NONE (contributions are after-tax)
 • Tax on growth: NONE! (tax-free growth)
 • Tax on withdrawals: NONE! (tax-free in retirement)
 • Income limit: $165k single / $246k MFJ
-• Best for: Higher income earners, those expecting higher tax rates in retirement"""
-        
-        if "deduct" in q or "can i" in q:
-            return f"""Can You Deduct Traditional IRA? (2025)
+• Best for: Higher income earners, those expecting higher tax rates in retirement""",
+    },
+    {
+        "intent": "ira_deductibility",
+        "priority": 230,
+        "match": [("ira",), ("deduct", "can i")],
+        "answer": """Can You Deduct Traditional IRA? (2025)
 
 IF YOU DON'T HAVE 401(K) AT WORK:
 ✅ Always fully deductible - no income limit!
@@ -719,58 +787,61 @@ Married Filing Jointly:
 • Partial if AGI $126,001 - $146,000
 • NO deduction if AGI > $146,000
 
-If you can't deduct: Consider Roth IRA instead!"""
-        
-        # General IRA
-        if "limit" in q or "max" in q:
-            return f"2025 IRA Contribution Limit: ${TAX_VALUES_2025['ira_limit']['under_50']:,} (under 50) or ${TAX_VALUES_2025['ira_limit']['50_plus']:,} (50+). This is the COMBINED limit for Traditional + Roth IRA."
-        
-        return f"""IRA Overview (2025):
-• Contribution Limit: ${TAX_VALUES_2025['ira_limit']['under_50']:,} (${TAX_VALUES_2025['ira_limit']['50_plus']:,} if 50+)
+If you can't deduct: Consider Roth IRA instead!""",
+    },
+    {
+        "intent": "ira_limits",
+        "priority": 240,
+        "match": [("ira",), ("limit", "max")],
+        "answer": "2025 IRA Contribution Limit: ${v[ira_limit][under_50]:,} (under 50) or ${v[ira_limit][50_plus]:,} (50+). This is the COMBINED limit for Traditional + Roth IRA.",
+    },
+    {
+        "intent": "ira_overview",
+        "priority": 290,
+        "match": [("ira",)],
+        "answer": """IRA Overview (2025):
+• Contribution Limit: ${v[ira_limit][under_50]:,} (${v[ira_limit][50_plus]:,} if 50+)
 • This limit is COMBINED for Traditional + Roth
 • Can have BOTH 401(k) AND IRA (separate limits)
 
 Traditional IRA: May be tax-deductible (depends on income & 401k)
-Roth IRA: No deduction, but TAX-FREE growth & withdrawals"""
+Roth IRA: No deduction, but TAX-FREE growth & withdrawals""",
+    },
     
     # ════════════════════════════════════════════════════════
-    # W-2 QUESTIONS
+    # W-2
     # ════════════════════════════════════════════════════════
-    if "w2" in q or "w-2" in q:
-        if "box 12" in q or "code d" in q or "code " in q:
-            # Extract code if mentioned
-            code_match = re.search(r'code\s*([a-z]{1,2})', q, re.IGNORECASE)
-            if code_match:
-                code = code_match.group(1).upper()
-                if code in W2_BOX_12_CODES:
-                    return f"W-2 Box 12 Code {code}: {W2_BOX_12_CODES[code]}"
-            
-            # List common codes
-            return """W-2 Box 12 Common Codes:
-• D: 401(k) contributions (pre-tax)
-• E: 403(b) contributions (pre-tax)
-• W: HSA contributions (employer)
-• DD: Health insurance cost (info only, not taxable)
-• AA: Roth 401(k) (after-tax)
-• C: Group term life insurance over $50k (taxable)
-
-Your 401(k) is Code D - this amount is ALREADY excluded from Box 1."""
-        
-        if "box 1" in q or "box1" in q:
-            return """W-2 Box 1 - Wages, Tips, Other Compensation:
+    {
+        "intent": "w2_box12",
+        "priority": 300,
+        "match": [_W2, ("box 12", "code d", "code ")],
+        "answer": _answer_w2_box12,
+    },
+    {
+        "intent": "w2_box1",
+        "priority": 310,
+        "match": [_W2, ("box 1", "box1")],
+        "answer": """W-2 Box 1 - Wages, Tips, Other Compensation:
 • This is your TAXABLE income for federal tax
 • EXCLUDES pre-tax deductions: 401(k), health insurance, HSA, FSA
 • Goes to Form 1040, Line 1a
-• Usually LOWER than your gross salary"""
-        
-        if "box 3" in q or "box3" in q:
-            return """W-2 Box 3 - Social Security Wages:
+• Usually LOWER than your gross salary""",
+    },
+    {
+        "intent": "w2_box3",
+        "priority": 320,
+        "match": [_W2, ("box 3", "box3")],
+        "answer": """W-2 Box 3 - Social Security Wages:
 • Usually HIGHER than Box 1
 • INCLUDES your 401(k) contribution
 • Social Security tax is calculated on this amount
-• 2025 max wage base: $176,100"""
-        
-        return """W-2 Key Boxes:
+• 2025 max wage base: $176,100""",
+    },
+    {
+        "intent": "w2_overview",
+        "priority": 390,
+        "match": [_W2],
+        "answer": """W-2 Key Boxes:
 • Box 1: Taxable wages (excludes 401k, health insurance)
 • Box 2: Federal tax withheld (goes to Form 1040 Line 25a)
 • Box 3: Social Security wages (includes 401k)
@@ -778,81 +849,269 @@ Your 401(k) is Code D - this amount is ALREADY excluded from Box 1."""
 • Box 5: Medicare wages (usually = Box 3)
 • Box 6: Medicare tax (should be ~1.45% of Box 5)
 • Box 12: Special items (D=401k, W=HSA, DD=health)
-• Box 13: Checkboxes (retirement plan = affects IRA deduction!)"""
+• Box 13: Checkboxes (retirement plan = affects IRA deduction!)""",
+    },
     
     # ════════════════════════════════════════════════════════
     # STANDARD DEDUCTION
     # ════════════════════════════════════════════════════════
-    if "standard deduction" in q:
-        if "single" in q:
-            return f"2025 Standard Deduction for Single: ${TAX_VALUES_2025['standard_deduction']['single']:,}"
-        if "married" in q and ("joint" in q or "mfj" in q):
-            return f"2025 Standard Deduction for Married Filing Jointly: ${TAX_VALUES_2025['standard_deduction']['married_filing_jointly']:,}"
-        if "head" in q or "hoh" in q:
-            return f"2025 Standard Deduction for Head of Household: ${TAX_VALUES_2025['standard_deduction']['head_of_household']:,}"
-        if "65" in q or "older" in q or "senior" in q:
-            return f"Additional Standard Deduction for 65+: Single/HOH +${TAX_VALUES_2025['additional_standard_deduction']['single_or_hoh']:,}, Married +${TAX_VALUES_2025['additional_standard_deduction']['married']:,} per person."
-        # General
-        return f"""2025 Standard Deductions:
-• Single: ${TAX_VALUES_2025['standard_deduction']['single']:,}
-• Married Filing Jointly: ${TAX_VALUES_2025['standard_deduction']['married_filing_jointly']:,}
-• Head of Household: ${TAX_VALUES_2025['standard_deduction']['head_of_household']:,}
-• Additional for 65+/Blind: Single/HOH +${TAX_VALUES_2025['additional_standard_deduction']['single_or_hoh']:,}, Married +${TAX_VALUES_2025['additional_standard_deduction']['married']:,}"""
+    {
+        "intent": "standard_deduction_single",
+        "priority": 400,
+        "match": [("standard deduction",), ("single",)],
+        "answer": "2025 Standard Deduction for Single: ${v[standard_deduction][single]:,}",
+    },
+    {
+        "intent": "standard_deduction_mfj",
+        "priority": 410,
+        "match": [("standard deduction",), ("married",), ("joint", "mfj")],
+        "answer": "2025 Standard Deduction for Married Filing Jointly: ${v[standard_deduction][married_filing_jointly]:,}",
+    },
+    {
+        "intent": "standard_deduction_hoh",
+        "priority": 420,
+        "match": [("standard deduction",), ("head", "hoh")],
+        "answer": "2025 Standard Deduction for Head of Household: ${v[standard_deduction][head_of_household]:,}",
+    },
+    {
+        "intent": "standard_deduction_senior",
+        "priority": 430,
+        "match": [("standard deduction",), ("65", "older", "senior")],
+        "answer": "Additional Standard Deduction for 65+: Single/HOH +${v[additional_standard_deduction][single_or_hoh]:,}, Married +${v[additional_standard_deduction][married]:,} per person.",
+    },
+    {
+        "intent": "standard_deduction_overview",
+        "priority": 490,
+        "match": [("standard deduction",)],
+        "answer": """2025 Standard Deductions:
+• Single: ${v[standard_deduction][single]:,}
+• Married Filing Jointly: ${v[standard_deduction][married_filing_jointly]:,}
+• Head of Household: ${v[standard_deduction][head_of_household]:,}
+• Additional for 65+/Blind: Single/HOH +${v[additional_standard_deduction][single_or_hoh]:,}, Married +${v[additional_standard_deduction][married]:,}""",
+    },
     
     # ════════════════════════════════════════════════════════
-    # CHILD TAX CREDIT
+    # CREDITS
     # ════════════════════════════════════════════════════════
-    if "child tax credit" in q or "ctc" in q:
-        return f"""2025 Child Tax Credit:
-• ${TAX_VALUES_2025['child_tax_credit']:,} per qualifying child under 17
-• Up to ${TAX_VALUES_2025['actc_max']:,} is refundable (ACTC)
+    {
+        "intent": "child_tax_credit",
+        "priority": 500,
+        "match": [("child tax credit", "ctc")],
+        "answer": """2025 Child Tax Credit:
+• ${v[child_tax_credit]:,} per qualifying child under 17
+• Up to ${v[actc_max]:,} is refundable (ACTC)
 • Phase-out: Single $200k, MFJ $400k
 
 Requirements:
 • Child must be under 17 at end of year
 • Must have valid SSN
 • Must live with you 6+ months
-• You must provide over half of support"""
-    
-    # Other Dependents Credit
-    if "other dependent" in q or "odc" in q or ("dependent" in q and "17" in q):
-        return f"2025 Credit for Other Dependents: ${TAX_VALUES_2025['other_dependents_credit']} per dependent age 17 or older. Non-refundable."
+• You must provide over half of support""",
+    },
+    {
+        "intent": "other_dependents_credit",
+        "priority": 510,
+        "match": [("other dependent", "odc")],
+        "answer": "2025 Credit for Other Dependents: ${v[other_dependents_credit]} per dependent age 17 or older. Non-refundable.",
+    },
+    {
+        "intent": "other_dependents_credit",
+        "priority": 511,
+        "match": [("dependent",), ("17",)],
+        "answer": "2025 Credit for Other Dependents: ${v[other_dependents_credit]} per dependent age 17 or older. Non-refundable.",
+    },
+    {
+        "intent": "eitc",
+        "priority": 520,
+        "match": [("eitc", "earned income")],
+        "answer": """2025 Earned Income Tax Credit (EITC):
+• 0 children: max ${v[eitc_max][0]:,}
+• 1 child: max ${v[eitc_max][1]:,}
+• 2 children: max ${v[eitc_max][2]:,}
+• 3+ children: max ${v[eitc_max][3]:,}
+
+Fully refundable credit for low-to-moderate income workers.""",
+    },
     
-    # EITC
-    if "eitc" in q or "earned income" in q:
-        return f"""2025 Earned Income Tax Credit (EITC):
-• 0 children: max ${TAX_VALUES_2025['eitc_max'][0]:,}
-• 1 child: max ${TAX_VALUES_2025['eitc_max'][1]:,}
-• 2 children: max ${TAX_VALUES_2025['eitc_max'][2]:,}
-• 3+ children: max ${TAX_VALUES_2025['eitc_max'][3]:,}
+    # ════════════════════════════════════════════════════════
+    # OTHER LIMITS
+    # ════════════════════════════════════════════════════════
+    {
+        "intent": "hsa_limits",
+        "priority": 600,
+        "match": [("hsa",)],
+        "answer": """2025 HSA Contribution Limits:
+• Self-only coverage: ${v[hsa_limit][self]:,}
+• Family coverage: ${v[hsa_limit][family]:,}
+• Catch-up (55+): +${v[hsa_limit][catch_up_55]:,}
+
+Triple tax benefit: Tax-deductible, tax-free growth, tax-free withdrawals for medical.
+
+⚠️ California: HSA is NOT deductible for CA state tax!""",
+    },
+    {
+        "intent": "student_loan_interest",
+        "priority": 610,
+        "match": [("student loan",)],
+        "answer": "2025 Student Loan Interest Deduction: Maximum ${v[student_loan_max]:,}. Phase-out: $80k-$95k single, $165k-$195k MFJ.",
+    },
+    {
+        "intent": "salt_cap",
+        "priority": 620,
+        "match": [("salt",)],
+        "answer": "2025 SALT Deduction: Capped at ${v[salt_cap]:,} (${v[salt_cap_mfs]:,} if MFS). Includes state income tax + property tax.",
+    },
+    {
+        "intent": "salt_cap",
+        "priority": 621,
+        "match": [("state",), ("local",), ("tax",)],
+        "answer": "2025 SALT Deduction: Capped at ${v[salt_cap]:,} (${v[salt_cap_mfs]:,} if MFS). Includes state income tax + property tax.",
+    },
+    {
+        "intent": "social_security_wage_base",
+        "priority": 630,
+        "match": [("social security",), ("max", "limit", "wage")],
+        "answer": """2025 Social Security:
+• Wage base (max taxed): ${v[ss_wage_base]:,}
+• Tax rate: {v[ss_rate_pct]}%
+• Max tax: ${v[ss_max_tax]:,.2f}""",
+    },
+]
 
-Fully refundable credit for low-to-moderate income workers."""
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick automaton over the rule keywords.
     
-    # HSA
-    if "hsa" in q:
-        return f"""2025 HSA Contribution Limits:
-• Self-only coverage: ${TAX_VALUES_2025['hsa_limit']['self']:,}
-• Family coverage: ${TAX_VALUES_2025['hsa_limit']['family']:,}
-• Catch-up (55+): +${TAX_VALUES_2025['hsa_limit']['catch_up_55']:,}
+    scan() walks the question once and returns a bitmask of every
+    rule keyword group that has at least one keyword in the text
+    (overlapping matches included, same as `kw in q`).
+    """
+    
+    def __init__(self, keyword_masks: Dict[str, int]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+        
+        for keyword, mask in keyword_masks.items():
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(0)
+                node = nxt
+            self._out[node] |= mask
+        
+        # Breadth-first failure links; output masks inherit along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+    
+    def scan(self, text: str) -> int:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        hits = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hits |= out[node]
+        return hits
+
+
+_compiled_rules: Optional[Tuple[_KeywordAutomaton, List[Tuple[int, Dict]]]] = None
+
+
+def compile_intent_rules(rules: List[Dict]) -> Tuple[_KeywordAutomaton, List[Tuple[int, Dict]]]:
+    """
+    Compile intent rules into one automaton plus (required_mask, rule)
+    pairs sorted by priority.
+    """
+    keyword_masks: Dict[str, int] = {}
+    compiled = []
+    bit = 0
+    
+    for rule in sorted(rules, key=lambda r: r["priority"]):
+        required = 0
+        for group in rule["match"]:
+            group_bit = 1 << bit
+            bit += 1
+            required |= group_bit
+            for keyword in group:
+                keyword = keyword.lower()
+                keyword_masks[keyword] = keyword_masks.get(keyword, 0) | group_bit
+        compiled.append((required, rule))
+    
+    return _KeywordAutomaton(keyword_masks), compiled
 
-Triple tax benefit: Tax-deductible, tax-free growth, tax-free withdrawals for medical.
 
-⚠️ California: HSA is NOT deductible for CA state tax!"""
+def match_intent(question: str, state_code: Optional[str] = None) -> Optional[Dict]:
+    """Return the highest-priority rule matching the question, or None."""
+    global _compiled_rules
     
-    # Student loan
-    if "student loan" in q:
-        return f"2025 Student Loan Interest Deduction: Maximum ${TAX_VALUES_2025['student_loan_max']:,}. Phase-out: $80k-$95k single, $165k-$195k MFJ."
+    if _compiled_rules is None:
+        _compiled_rules = compile_intent_rules(INTENT_RULES)
+    automaton, compiled = _compiled_rules
     
-    # SALT
-    if "salt" in q or ("state" in q and "local" in q and "tax" in q):
-        return f"2025 SALT Deduction: Capped at ${TAX_VALUES_2025['salt_cap']:,} (${TAX_VALUES_2025['salt_cap']//2:,} if MFS). Includes state income tax + property tax."
+    hits = automaton.scan(question.lower())
+    if not hits:
+        return None
     
-    # Social Security
-    if "social security" in q and ("max" in q or "limit" in q or "wage" in q):
-        return f"""2025 Social Security:
-• Wage base (max taxed): ${TAX_VALUES_2025['ss_wage_base']:,}
-• Tax rate: {TAX_VALUES_2025['ss_rate']*100}%
-• Max tax: ${TAX_VALUES_2025['ss_max_tax']:,.2f}"""
+    no_tax_state = bool(state_code) and state_code.upper() in NO_TAX_STATES
+    
+    for required, rule in compiled:
+        if hits & required != required:
+            continue
+        if rule.get("state") == "no_tax" and not no_tax_state:
+            continue
+        return rule
+    
+    return None
+
+
+# ============================================================
+# MAIN ANSWER FUNCTION
+# ============================================================
+
+def _count_answer(source: str):
+    if RAG_ANSWERS is not None:
+        RAG_ANSWERS.inc(source)
+
+
+def answer_tax_question(question: str, state_code: Optional[str] = None, language: str = "en") -> str:
+    """
+    Answer a tax question using RAG.
+    
+    Args:
+        question: User's question
+        state_code: Optional state code
+        language: Language code (en, vi, es)
+    
+    Returns:
+        Answer string
+    """
+    # ════════════════════════════════════════════════════════
+    # DIRECT ANSWERS (most common questions) - see INTENT_RULES
+    # ════════════════════════════════════════════════════════
+    rule = match_intent(question, state_code)
+    if rule:
+        _count_answer("direct")
+        answer = rule["answer"]
+        if callable(answer):
+            return answer(question.lower())
+        state_name = NO_TAX_STATES.get(state_code.upper(), state_code) if state_code else ""
+        return answer.format(v=ANSWER_VALUES, state_name=state_name)
     
     # ════════════════════════════════════════════════════════
     # SEARCH RAG DOCUMENTS
@@ -861,16 +1120,20 @@ Triple tax benefit: Tax-deductible, tax-free growth, tax-free withdrawals for me
     
     # Return Q&A answer if found
     if results.get("qa_answer"):
+        _count_answer("qa")
         return results["qa_answer"]
     
     # Return state results if state-specific question
     if state_code and results.get("state"):
+        _count_answer("state")
         return results["state"]
     
     # Return federal results
     if results.get("federal"):
+        _count_answer("federal")
         return results["federal"]
     
+    _count_answer("none")
     return "Please ask about 401(k), IRA, standard deductions, tax brackets, credits (CTC, EITC), W-2 boxes, or specific state rules."
 
 
@@ -0,0 +1,167 @@
+# ============================================================
+# TAXSKY 2025 - REQUEST TIMING
+# ============================================================
+# Per-request phase breakdown for the Python tax API.
+#
+# - TimingMiddleware (pure ASGI) starts a RequestTiming for sampled
+#   requests and stores it in a ContextVar, so it follows the request
+#   into run_in_threadpool / sync endpoints
+# - Code marks phases with `with span("mongo_read"): ...`; when the
+#   request is not sampled span() returns a shared no-op context
+#   manager (one ContextVar lookup, no allocation)
+# - Phase totals go out as a Server-Timing header and as structured
+#   log fields ("fields" on the record, picked up by the JSON format)
+#
+# Phases used in the service:
+#   mongo_read, build, rag_verify, calc, form1040, mongo_write   (validator)
+#   pdf_read, pdf_fill, pdf_write, pdf_appearance, pdf_save      (PDF routers)
+#   vision                                                       (OCR)
+#
+# ENVIRONMENT:
+#   TAXSKY_TIMING_SAMPLE_RATE  fraction of requests timed, 0..1 (default 1)
+#   TAXSKY_TIMING_SLOW_MS      requests at/above this log at INFO,
+#                              faster ones at DEBUG (default 1000)
+# ============================================================
+
+import logging
+import os
+import random
+import re
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TIMING_SAMPLE_RATE = float(os.getenv("TAXSKY_TIMING_SAMPLE_RATE", "1"))
+TIMING_SLOW_MS = float(os.getenv("TAXSKY_TIMING_SLOW_MS", "1000"))
+
+_current: ContextVar[Optional["RequestTiming"]] = ContextVar("taxsky_request_timing", default=None)
+_NOOP = nullcontext()
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class RequestTiming:
+    """Accumulated phase durations (seconds) for one request."""
+
+    __slots__ = ("start", "phases", "counts")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def header_value(self, total: float) -> str:
+        """Server-Timing value: `mongo_read;dur=12.3, ..., total;dur=45.6`."""
+        parts: List[str] = [
+            f"{_TOKEN_RE.sub('_', name)};dur={seconds * 1000:.1f}"
+            for name, seconds in self.phases.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def fields(self, total: float) -> Dict[str, float]:
+        out = {f"{name}_ms": round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        out["total_ms"] = round(total * 1000, 2)
+        return out
+
+
+class _Span:
+    __slots__ = ("_timing", "_name", "_start")
+
+    def __init__(self, timing: RequestTiming, name: str):
+        self._timing = timing
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timing.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+def span(name: str):
+    """
+    Time a phase of the current request.
+
+        with span("rag_verify"):
+            is_valid, errors = verify_with_rag(extracted)
+
+    Repeated spans with the same name are summed. Outside a sampled
+    request this is a no-op.
+    """
+    timing = _current.get()
+    if timing is None:
+        return _NOOP
+    return _Span(timing, name)
+
+
+def record(name: str, seconds: float):
+    """Add an already-measured duration to the current request, if sampled."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+# ============================================================
+# MIDDLEWARE
+# ============================================================
+
+class TimingMiddleware:
+    """
+    ASGI middleware: Server-Timing header + one structured log line per
+    sampled request. Unsampled requests pass straight through.
+    """
+
+    def __init__(self, app, sample_rate: float = TIMING_SAMPLE_RATE, slow_ms: float = TIMING_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or (
+            self.sample_rate < 1 and random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header_value(timing.elapsed()).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total = timing.elapsed()
+            level = logging.INFO if total * 1000 >= self.slow_ms else logging.DEBUG
+            if logger.isEnabledFor(level):
+                route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+                logger.log(
+                    level, "%s %s %d %.1fms", scope.get("method", ""), route, status, total * 1000,
+                    extra={"fields": {"method": scope.get("method", ""), "route": route,
+                                      "status": status, **timing.fields(total)}},
+                )
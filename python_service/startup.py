@@ -0,0 +1,148 @@
+# ============================================================
+# TAXSKY 2025 - STARTUP PROFILE + LAZY IMPORTS
+# ============================================================
+# Keeps heavy third-party packages off the worker boot path and
+# reports what boot actually cost.
+#
+# - lazy("pypdf") returns a module proxy; the real import happens on
+#   the first attribute access (first request that needs it), so
+#   routes register immediately while openai / pypdf / fitz / pymongo
+#   load on demand
+# - import_module(name) is importlib.import_module plus a timing
+#   entry in the report
+# - mark(label) in main.py closes a startup phase: wall time and
+#   number of modules loaded since the previous mark
+# - report() / log_report() give the per-phase and per-lazy-module
+#   breakdown (also under "startup" in GET /health)
+#
+# ENVIRONMENT:
+#   TAXSKY_LAZY_IMPORTS  "1" (default) defer heavy imports to first use;
+#                        "0" preload HEAVY_MODULES at boot (for preforked
+#                        workers that should pay the cost once, up front)
+# ============================================================
+
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LAZY_IMPORTS = os.getenv("TAXSKY_LAZY_IMPORTS", "1") != "0"
+
+# Third-party packages that dominate cold start
+HEAVY_MODULES = ("openai", "pypdf", "fitz", "pymongo")
+
+_t0 = time.perf_counter()
+_last_mark = _t0
+_last_count = len(sys.modules)
+_phases: List[Dict[str, Any]] = []
+_imports: Dict[str, Optional[float]] = {}  # name -> seconds (None = not loaded yet)
+_ready_at: Optional[float] = None
+_lock = threading.Lock()
+
+
+def _top_level(names) -> List[str]:
+    return sorted({n.split(".", 1)[0] for n in names if not n.startswith("_")})
+
+
+def mark(label: str):
+    """Close the startup phase that began at the previous mark."""
+    global _last_mark, _last_count
+    now = time.perf_counter()
+    modules = list(sys.modules)
+    _phases.append({
+        "phase": label,
+        "ms": round((now - _last_mark) * 1000, 1),
+        "modules": len(modules) - _last_count,
+        "packages": _top_level(modules[_last_count:])[:12],
+    })
+    _last_mark, _last_count = now, len(modules)
+
+
+def ready():
+    """Mark the app as ready to serve (end of boot)."""
+    global _ready_at
+    mark("app")
+    _ready_at = time.perf_counter()
+    log_report()
+
+
+def import_module(name: str):
+    """importlib.import_module, with first-import cost recorded in the report."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        if _imports.get(name) is None:
+            _imports[name] = time.perf_counter() - start
+    logger.info("Lazy import %s: %.0fms", name, (time.perf_counter() - start) * 1000)
+    return module
+
+
+class _LazyModule:
+    """Module proxy: imports on first attribute access."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        module = self._module
+        if module is None:
+            module = self._module = import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "deferred"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy(name: str):
+    """
+    Deferred import. With TAXSKY_LAZY_IMPORTS=0 this imports immediately
+    and returns the real module.
+    """
+    with _lock:
+        _imports.setdefault(name, None)
+    if not LAZY_IMPORTS:
+        return import_module(name)
+    return _LazyModule(name)
+
+
+def preload(names=HEAVY_MODULES):
+    """Import heavy modules now (eager mode); missing packages are skipped."""
+    for name in names:
+        try:
+            import_module(name)
+        except ImportError:
+            logger.debug("Preload skipped, not installed: %s", name)
+
+
+def report() -> Dict[str, Any]:
+    end = _ready_at or time.perf_counter()
+    with _lock:
+        deferred = {name: (round(s * 1000, 1) if s is not None else None) for name, s in _imports.items()}
+    return {
+        "lazy_imports": LAZY_IMPORTS,
+        "boot_ms": round((end - _t0) * 1000, 1),
+        "phases": list(_phases),
+        "deferred_imports_ms": deferred,  # null = not imported yet
+    }
+
+
+def log_report():
+    r = report()
+    lines = [f"Startup {r['boot_ms']:.0f}ms (lazy imports {'on' if r['lazy_imports'] else 'off'})"]
+    for p in sorted(r["phases"], key=lambda p: p["ms"], reverse=True):
+        lines.append(f"  {p['phase']:<18} {p['ms']:>8.1f}ms  {p['modules']:>4} modules  {', '.join(p['packages'])}")
+    for name, ms in r["deferred_imports_ms"].items():
+        lines.append(f"  {'lazy ' + name:<18} {'deferred' if ms is None else f'{ms:.1f}ms':>10}")
+    logger.info("\n".join(lines))
@@ -4,6 +4,8 @@
 
 from .tax_engine import calculate_tax
 from .state_router import calculate_state_tax, get_all_states
+from .multistate import calculate_multistate
+from .scenarios import run_scenarios
 
 # Import federal calculator
 try:
@@ -11,6 +13,20 @@ try:
 except ImportError:
     calculate_federal = None
 
+# Compact __slots__ result records
+try:
+    from .results import (
+        FederalResult,
+        StateResult,
+        StateRankRow,
+        TaxResult,
+        calculate_federal_record,
+        calculate_state_record,
+        calculate_tax_record,
+    )
+except ImportError as e:
+    print(f"⚠️ results import failed: {e}")
+
 # Import text extractor
 try:
     from .text_extractor import (
@@ -37,10 +53,19 @@ route_state_tax = calculate_state_tax
 
 __all__ = [
     "calculate_tax",
+    "calculate_multistate",
+    "run_scenarios",
     "calculate_federal", 
     "calculate_state_tax",
     "route_state_tax",
     "get_all_states",
+    "FederalResult",
+    "StateResult",
+    "StateRankRow",
+    "TaxResult",
+    "calculate_federal_record",
+    "calculate_state_record",
+    "calculate_tax_record",
     "process_session",
     "handle_extract_request",
     "TEXT_EXTRACTOR_AVAILABLE",
@@ -1,8 +1,16 @@
 # tax_engine/calculator/federal/calculator.py
 # ============================================================
-# FEDERAL TAX CALCULATOR 2025 v8.3 - FULL OBBB SUPPORT
+# FEDERAL TAX CALCULATOR 2025 v8.4 - FULL OBBB SUPPORT
 # ============================================================
 # 
+# v8.4 Changes:
+#   - ✅ NEW: tax_year input (default 2025) picks that year's tables
+#             from the parameter store (calculator/tax_params.py,
+#             tax_years/US_<year>.json); 2024 and 2026 supported
+#   - ✅ OBBB deductions only apply in the years they cover
+#   - ✅ calculate() split into STAGES over a CalcContext so what-if
+#             scenarios can re-run only the stages a change reaches
+#
 # v8.3 Fixes:
 #   - ✅ FIXED: Read taxpayer_w2_1_wages/withheld/tips from answers 
 #               when input_forms.w2 is empty (AI interview stores W-2 
@@ -35,191 +43,77 @@
 #
 # ============================================================
 
+import os
 import sys
 import json
+import logging
+import operator
 from datetime import date, datetime
 
-# ════════════════════════════════════════════════════════════
-# 2025 TAX CONSTANTS - OBBB UPDATED!
-# ════════════════════════════════════════════════════════════
+try:
+    from ..inputs import normalize_input
+    from ..tax_params import DEFAULT_TAX_YEAR, federal_params
+except ImportError:
+    # Run as a script: python calculator.py '<json>'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from inputs import normalize_input
+    from tax_params import DEFAULT_TAX_YEAR, federal_params
 
-# ✅ v8.0: OBBB Standard Deductions (Updated July 2025)
-STANDARD_DEDUCTIONS = {
-    'single': 15750,                    # Was $14,600 (2024)
-    'married_filing_jointly': 31500,    # Was $29,200 (2024)
-    'married_filing_separately': 15750, # Was $14,600 (2024)
-    'head_of_household': 23625,         # Was $21,900 (2024)
-    'qualifying_surviving_spouse': 31500,
-}
-
-# Additional Standard Deduction (65+ or blind)
-ADDITIONAL_STD_DED = {
-    'single': 1950,
-    'head_of_household': 1950,
-    'married_filing_jointly': 1550,
-    'married_filing_separately': 1550,
-    'qualifying_surviving_spouse': 1550,
-}
+logger = logging.getLogger(__name__)
 
 # ════════════════════════════════════════════════════════════
-# ✅ v8.0: OBBB DEDUCTION LIMITS (NEW!)
+# TAX CONSTANTS - per year in calculator/tax_years/US_<year>.json
 # ════════════════════════════════════════════════════════════
+# calculate() reads the tables for the return's tax_year through
+# federal_params(); the helpers below take tax_year for the same.
+# These names are the 2025 tables, kept for existing importers.
+_P2025 = federal_params(2025)
 
-# No Tax on Tips (OBBB)
-NO_TAX_ON_TIPS = {
-    'max_deduction': 25000,
-    'phaseout_single': 150000,
-    'phaseout_joint': 300000,
-    'years': [2025, 2026, 2027, 2028],
-}
-
-# No Tax on Overtime (OBBB)
-NO_TAX_ON_OVERTIME = {
-    'max_single': 12500,
-    'max_joint': 25000,
-    'phaseout_single': 150000,
-    'phaseout_joint': 300000,
-    'years': [2025, 2026, 2027, 2028],
-}
-
-# Car Loan Interest Deduction (OBBB)
-CAR_LOAN_INTEREST = {
-    'max_deduction': 10000,
-    'requirements': ['NEW vehicle', 'American-made', 'Loan after 12/31/2024'],
-    'years': [2025, 2026, 2027, 2028],
-}
-
-# Senior Deduction (OBBB) - NEW!
-SENIOR_BONUS = {
-    'amount_per_person': 6000,
-    'phaseout_single': 75000,
-    'phaseout_joint': 150000,
-    'phaseout_rate': 0.02,  # 2% reduction per $1,000 over threshold
-    'years': [2025, 2026, 2027, 2028],
-}
+# ✅ v8.0: OBBB Standard Deductions (2024: $14,600 / $29,200 / $21,900)
+STANDARD_DEDUCTIONS = _P2025.standard_deduction
+ADDITIONAL_STD_DED = _P2025.additional_std_ded
 
-# ════════════════════════════════════════════════════════════
-# TAX BRACKETS 2025
-# ════════════════════════════════════════════════════════════
-TAX_BRACKETS = {
-    'single': [
-        (11925, 0.10), (48475, 0.12), (103350, 0.22),
-        (197300, 0.24), (250525, 0.32), (626350, 0.35),
-        (float('inf'), 0.37)
-    ],
-    'married_filing_jointly': [
-        (23850, 0.10), (96950, 0.12), (206700, 0.22),
-        (394600, 0.24), (501050, 0.32), (751600, 0.35),
-        (float('inf'), 0.37)
-    ],
-    'married_filing_separately': [
-        (11925, 0.10), (48475, 0.12), (103350, 0.22),
-        (197300, 0.24), (250525, 0.32), (375800, 0.35),
-        (float('inf'), 0.37)
-    ],
-    'head_of_household': [
-        (17000, 0.10), (64850, 0.12), (103350, 0.22),
-        (197300, 0.24), (250500, 0.32), (626350, 0.35),
-        (float('inf'), 0.37)
-    ],
-    'qualifying_surviving_spouse': [
-        (23850, 0.10), (96950, 0.12), (206700, 0.22),
-        (394600, 0.24), (501050, 0.32), (751600, 0.35),
-        (float('inf'), 0.37)
-    ],
-}
-
-LTCG_BRACKETS = {
-    'single': [(47025, 0.0), (518900, 0.15), (float('inf'), 0.20)],
-    'married_filing_jointly': [(94050, 0.0), (583750, 0.15), (float('inf'), 0.20)],
-    'married_filing_separately': [(47025, 0.0), (291850, 0.15), (float('inf'), 0.20)],
-    'head_of_household': [(63000, 0.0), (551350, 0.15), (float('inf'), 0.20)],
-    'qualifying_surviving_spouse': [(94050, 0.0), (583750, 0.15), (float('inf'), 0.20)],
-}
-
-# Child Tax Credit (2025)
-CTC_AMOUNT = 2000
-CTC_REFUNDABLE_MAX = 1700
-CTC_OTHER_DEPENDENT = 500
-CTC_PHASE_OUT_SINGLE = 200000
-CTC_PHASE_OUT_MFJ = 400000
-CTC_REFUNDABILITY_THRESHOLD = 2500
-CTC_REFUNDABILITY_RATE = 0.15
-
-# EITC 2025
-EITC_2025 = {
-    'married_filing_jointly': {
-        0: {'max': 649, 'phase_in_end': 8260, 'phase_out_start': 17730, 'phase_out_end': 26214},
-        1: {'max': 4328, 'phase_in_end': 12730, 'phase_out_start': 30480, 'phase_out_end': 57554},
-        2: {'max': 7152, 'phase_in_end': 17880, 'phase_out_start': 30480, 'phase_out_end': 64430},
-        3: {'max': 8046, 'phase_in_end': 17880, 'phase_out_start': 30480, 'phase_out_end': 68675}
-    },
-    'single': {
-        0: {'max': 649, 'phase_in_end': 8260, 'phase_out_start': 10330, 'phase_out_end': 19104},
-        1: {'max': 4328, 'phase_in_end': 12730, 'phase_out_start': 23350, 'phase_out_end': 50434},
-        2: {'max': 7152, 'phase_in_end': 17880, 'phase_out_start': 23350, 'phase_out_end': 57310},
-        3: {'max': 8046, 'phase_in_end': 17880, 'phase_out_start': 23350, 'phase_out_end': 61555}
-    },
-    'investment_income_limit': 11600
-}
-
-SE_TAX_RATE = 0.153
-SE_INCOME_MULTIPLIER = 0.9235
-SS_WAGE_BASE_2025 = 176100
-
-# IRA Limits (2025)
-IRA_LIMIT = 7000
-IRA_CATCH_UP = 1000
-
-IRA_DEDUCTION_LIMITS = {
-    'single': {'full_deduction_under': 79000, 'phase_out_end': 89000},
-    'head_of_household': {'full_deduction_under': 79000, 'phase_out_end': 89000},
-    'married_filing_jointly': {'full_deduction_under': 126000, 'phase_out_end': 146000},
-    'married_filing_separately': {'full_deduction_under': 0, 'phase_out_end': 10000},
-    'qualifying_surviving_spouse': {'full_deduction_under': 126000, 'phase_out_end': 146000},
-}
-
-SPOUSE_IRA_LIMITS_MFJ = {
-    'full_deduction_under': 236000,
-    'phase_out_end': 246000,
-}
-
-# HSA Limits (2025)
-HSA_LIMIT_SELF = 4300
-HSA_LIMIT_FAMILY = 8550
-HSA_CATCH_UP = 1000
-
-STUDENT_LOAN_MAX = 2500
+# OBBB provisions (None in a year the provision doesn't cover)
+NO_TAX_ON_TIPS = _P2025.no_tax_on_tips
+NO_TAX_ON_OVERTIME = _P2025.no_tax_on_overtime
+CAR_LOAN_INTEREST = _P2025.car_loan_interest
+SENIOR_BONUS = _P2025.senior_bonus
+
+TAX_BRACKETS = _P2025.brackets
+LTCG_BRACKETS = _P2025.ltcg_brackets
+
+# Child Tax Credit
+CTC_AMOUNT = _P2025.ctc_amount
+CTC_REFUNDABLE_MAX = _P2025.ctc_refundable_max
+CTC_OTHER_DEPENDENT = _P2025.ctc_other_dependent
+CTC_PHASE_OUT_SINGLE = _P2025.ctc_phase_out_single
+CTC_PHASE_OUT_MFJ = _P2025.ctc_phase_out_mfj
+CTC_REFUNDABILITY_THRESHOLD = _P2025.ctc_refundability_threshold
+CTC_REFUNDABILITY_RATE = _P2025.ctc_refundability_rate
+
+EITC_2025 = _P2025.eitc
+
+SE_TAX_RATE = _P2025.se_tax_rate
+SE_INCOME_MULTIPLIER = _P2025.se_income_multiplier
+SS_WAGE_BASE_2025 = _P2025.ss_wage_base
+
+# IRA / HSA limits
+IRA_LIMIT = _P2025.ira_limit
+IRA_CATCH_UP = _P2025.ira_catch_up
+IRA_DEDUCTION_LIMITS = _P2025.ira_deduction_limits
+SPOUSE_IRA_LIMITS_MFJ = _P2025.spouse_ira_limits_mfj
+
+HSA_LIMIT_SELF = _P2025.hsa_limit_self
+HSA_LIMIT_FAMILY = _P2025.hsa_limit_family
+HSA_CATCH_UP = _P2025.hsa_catch_up
+
+STUDENT_LOAN_MAX = _P2025.student_loan_max
 
 
 # ════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
 # ════════════════════════════════════════════════════════════
 
-def get_val(data, *keys, default=0):
-    """Get value from data dict, trying multiple keys."""
-    for key in keys:
-        v = data.get(key)
-        if v is not None:
-            try:
-                return float(v) if v != '' else default
-            except (ValueError, TypeError):
-                return default
-    return default
-
-def get_bool(data, *keys, default=False):
-    """Get boolean from data."""
-    for key in keys:
-        v = data.get(key)
-        if v is not None:
-            if isinstance(v, bool):
-                return v
-            if isinstance(v, str):
-                return v.lower() in ('true', 'yes', '1', 'y')
-            if isinstance(v, (int, float)):
-                return bool(v)
-    return default
-
 def normalize_status(status):
     """Normalize filing status string."""
     if not status:
@@ -233,7 +127,7 @@ def normalize_status(status):
     }
     return aliases.get(s, s if s in STANDARD_DEDUCTIONS else 'single')
 
-def calculate_age(dob_string, tax_year=2025):
+def calculate_age(dob_string, tax_year=DEFAULT_TAX_YEAR):
     """Calculate age from DOB string as of Dec 31 of tax year."""
     if not dob_string:
         return 0
@@ -269,7 +163,7 @@ def calculate_age(dob_string, tax_year=2025):
         pass
     return 0
 
-def is_65_plus(dob_string, tax_year=2025):
+def is_65_plus(dob_string, tax_year=DEFAULT_TAX_YEAR):
     """Check if person is 65+ as of Dec 31 of tax year."""
     age = calculate_age(dob_string, tax_year)
     return age >= 65
@@ -279,7 +173,7 @@ def is_65_plus(dob_string, tax_year=2025):
 # ✅ v8.1: OBBB DEDUCTION CALCULATORS (FIXED!)
 # ════════════════════════════════════════════════════════════
 
-def calculate_tips_deduction(tips_received, agi, filing_status):
+def calculate_tips_deduction(tips_received, agi, filing_status, tax_year=DEFAULT_TAX_YEAR):
     """
     Calculate No Tax on Tips deduction (OBBB).
     Max $25,000, phases out above $150K single / $300K joint.
@@ -291,9 +185,17 @@ def calculate_tips_deduction(tips_received, agi, filing_status):
             'reason': 'No tips received'
         }
     
+    rules = federal_params(tax_year).no_tax_on_tips
+    if rules is None:
+        return {
+            'tips_received': tips_received,
+            'tips_deduction': 0,
+            'reason': f'No tips deduction for {tax_year}'
+        }
+    
     is_joint = filing_status in ['married_filing_jointly', 'qualifying_surviving_spouse']
-    phaseout = NO_TAX_ON_TIPS['phaseout_joint'] if is_joint else NO_TAX_ON_TIPS['phaseout_single']
-    max_deduction = NO_TAX_ON_TIPS['max_deduction']
+    phaseout = rules['phaseout_joint'] if is_joint else rules['phaseout_single']
+    max_deduction = rules['max_deduction']
     
     deduction = min(tips_received, max_deduction)
     
@@ -310,7 +212,7 @@ def calculate_tips_deduction(tips_received, agi, filing_status):
     }
 
 
-def calculate_overtime_deduction(overtime_pay, agi, filing_status):
+def calculate_overtime_deduction(overtime_pay, agi, filing_status, tax_year=DEFAULT_TAX_YEAR):
     """
     Calculate No Tax on Overtime deduction (OBBB).
     
@@ -327,9 +229,17 @@ def calculate_overtime_deduction(overtime_pay, agi, filing_status):
             'reason': 'No overtime pay'
         }
     
+    rules = federal_params(tax_year).no_tax_on_overtime
+    if rules is None:
+        return {
+            'overtime_pay': overtime_pay,
+            'overtime_deduction': 0,
+            'reason': f'No overtime deduction for {tax_year}'
+        }
+    
     is_joint = filing_status in ['married_filing_jointly', 'qualifying_surviving_spouse']
-    max_deduction = NO_TAX_ON_OVERTIME['max_joint'] if is_joint else NO_TAX_ON_OVERTIME['max_single']
-    phaseout = NO_TAX_ON_OVERTIME['phaseout_joint'] if is_joint else NO_TAX_ON_OVERTIME['phaseout_single']
+    max_deduction = rules['max_joint'] if is_joint else rules['max_single']
+    phaseout = rules['phaseout_joint'] if is_joint else rules['phaseout_single']
     
     # ✅ v8.2 FIX: Use FULL overtime pay (what appears on paycheck)
     deduction = min(overtime_pay, max_deduction)
@@ -347,7 +257,7 @@ def calculate_overtime_deduction(overtime_pay, agi, filing_status):
     }
 
 
-def calculate_car_loan_deduction(car_loan_interest, bought_new_car, car_is_american):
+def calculate_car_loan_deduction(car_loan_interest, bought_new_car, car_is_american, tax_year=DEFAULT_TAX_YEAR):
     """
     Calculate Car Loan Interest deduction (OBBB).
     Max $10,000 for NEW American-made vehicles only.
@@ -359,6 +269,14 @@ def calculate_car_loan_deduction(car_loan_interest, bought_new_car, car_is_ameri
             'reason': 'No car loan interest'
         }
     
+    rules = federal_params(tax_year).car_loan_interest
+    if rules is None:
+        return {
+            'car_loan_interest': car_loan_interest,
+            'car_loan_deduction': 0,
+            'reason': f'No car loan interest deduction for {tax_year}'
+        }
+    
     if not bought_new_car:
         return {
             'car_loan_interest': car_loan_interest,
@@ -373,7 +291,7 @@ def calculate_car_loan_deduction(car_loan_interest, bought_new_car, car_is_ameri
             'reason': 'Must be American-made vehicle'
         }
     
-    deduction = min(car_loan_interest, CAR_LOAN_INTEREST['max_deduction'])
+    deduction = min(car_loan_interest, rules['max_deduction'])
     
     return {
         'car_loan_interest': car_loan_interest,
@@ -382,7 +300,7 @@ def calculate_car_loan_deduction(car_loan_interest, bought_new_car, car_is_ameri
     }
 
 
-def calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status, tax_year=2025):
+def calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status, tax_year=DEFAULT_TAX_YEAR):
     """
     Calculate Senior Deduction (OBBB) - AUTO FROM DOB!
     $6,000 per eligible person (65+), phases out above $75K/$150K.
@@ -404,17 +322,27 @@ def calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status, tax
             'reason': 'No seniors (65+) in household'
         }
     
+    rules = federal_params(tax_year).senior_bonus
+    if rules is None:
+        return {
+            'taxpayer_65_plus': taxpayer_65_plus,
+            'spouse_65_plus': spouse_65_plus,
+            'eligible_count': eligible_count,
+            'senior_deduction': 0,
+            'reason': f'No senior deduction for {tax_year}'
+        }
+    
     # Calculate base deduction
-    base_deduction = eligible_count * SENIOR_BONUS['amount_per_person']
+    base_deduction = eligible_count * rules['amount_per_person']
     
     # Get phaseout threshold
-    phaseout = SENIOR_BONUS['phaseout_joint'] if is_joint else SENIOR_BONUS['phaseout_single']
+    phaseout = rules['phaseout_joint'] if is_joint else rules['phaseout_single']
     
     # Apply phaseout
     deduction = base_deduction
     if agi > phaseout:
         excess = agi - phaseout
-        reduction = (excess / 1000) * SENIOR_BONUS['phaseout_rate'] * base_deduction
+        reduction = (excess / 1000) * rules['phaseout_rate'] * base_deduction
         deduction = max(0, base_deduction - reduction)
     
     who = []
@@ -432,26 +360,26 @@ def calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status, tax
     }
 
 
-def calculate_all_obbb_deductions(data, agi, filing_status):
+def calculate_all_obbb_deductions(data, agi, filing_status, tax_year=DEFAULT_TAX_YEAR):
     """
     Calculate all OBBB deductions at once.
     Returns dict with tips, overtime, car loan, and senior deductions.
     """
-    # ✅ v8.1 FIX: Added 'taxpayer_w2_tips' to field lookup
-    tips = get_val(data, 'tips_received', 'tips', 'tip_income', 'taxpayer_w2_tips')
-    overtime = get_val(data, 'overtime_pay', 'overtime', 'overtime_income')
-    car_interest = get_val(data, 'car_loan_interest')
-    bought_car = get_bool(data, 'bought_new_car', 'new_car_purchase')
-    american_car = get_bool(data, 'car_is_american', 'american_made_car')
+    data = normalize_input(data)
+    tips = data.get('tips_received', 0)
+    overtime = data.get('overtime_pay', 0)
+    car_interest = data.get('car_loan_interest', 0)
+    bought_car = data.get('bought_new_car', False)
+    american_car = data.get('car_is_american', False)
     
     taxpayer_dob = data.get('taxpayer_dob', '')
     spouse_dob = data.get('spouse_dob', '')
     
     # Calculate each
-    tips_result = calculate_tips_deduction(tips, agi, filing_status)
-    overtime_result = calculate_overtime_deduction(overtime, agi, filing_status)
-    car_result = calculate_car_loan_deduction(car_interest, bought_car, american_car)
-    senior_result = calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status)
+    tips_result = calculate_tips_deduction(tips, agi, filing_status, tax_year)
+    overtime_result = calculate_overtime_deduction(overtime, agi, filing_status, tax_year)
+    car_result = calculate_car_loan_deduction(car_interest, bought_car, american_car, tax_year)
+    senior_result = calculate_senior_deduction(taxpayer_dob, spouse_dob, agi, filing_status, tax_year)
     
     total_obbb = (
         tips_result['tips_deduction'] +
@@ -473,7 +401,7 @@ def calculate_all_obbb_deductions(data, agi, filing_status):
 # IRA DEDUCTION CALCULATOR
 # ════════════════════════════════════════════════════════════
 
-def calculate_ira_deduction(contribution, magi, filing_status, has_retirement_plan, age):
+def calculate_ira_deduction(contribution, magi, filing_status, has_retirement_plan, age, tax_year=DEFAULT_TAX_YEAR):
     """Calculate how much of Traditional IRA contribution is deductible."""
     if contribution <= 0:
         return {
@@ -483,7 +411,8 @@ def calculate_ira_deduction(contribution, magi, filing_status, has_retirement_pl
             'reason': 'No IRA contribution'
         }
     
-    max_contribution = IRA_LIMIT + (IRA_CATCH_UP if age >= 50 else 0)
+    p = federal_params(tax_year)
+    max_contribution = p.ira_limit + (p.ira_catch_up if age >= 50 else 0)
     contribution = min(contribution, max_contribution)
     
     if not has_retirement_plan:
@@ -494,7 +423,7 @@ def calculate_ira_deduction(contribution, magi, filing_status, has_retirement_pl
             'reason': f'Fully deductible - no workplace retirement plan'
         }
     
-    limits = IRA_DEDUCTION_LIMITS.get(filing_status, IRA_DEDUCTION_LIMITS['single'])
+    limits = p.ira_deduction_limits.get(filing_status, p.ira_deduction_limits['single'])
     full_limit = limits['full_deduction_under']
     phase_out_end = limits['phase_out_end']
     
@@ -527,7 +456,8 @@ def calculate_ira_deduction(contribution, magi, filing_status, has_retirement_pl
     }
 
 
-def calculate_spouse_ira_deduction(contribution, magi, filing_status, spouse_has_retirement_plan, taxpayer_has_retirement_plan, age):
+def calculate_spouse_ira_deduction(contribution, magi, filing_status, spouse_has_retirement_plan, taxpayer_has_retirement_plan, age,
+                                   tax_year=DEFAULT_TAX_YEAR):
     """Calculate spouse's IRA deduction with special MFJ rules."""
     if contribution <= 0:
         return {
@@ -537,7 +467,8 @@ def calculate_spouse_ira_deduction(contribution, magi, filing_status, spouse_has
             'reason': 'No spouse IRA contribution'
         }
     
-    max_contribution = IRA_LIMIT + (IRA_CATCH_UP if age >= 50 else 0)
+    p = federal_params(tax_year)
+    max_contribution = p.ira_limit + (p.ira_catch_up if age >= 50 else 0)
     contribution = min(contribution, max_contribution)
     
     if not spouse_has_retirement_plan:
@@ -557,8 +488,8 @@ def calculate_spouse_ira_deduction(contribution, magi, filing_status, spouse_has
                 'reason': f'Fully deductible - neither spouse has workplace retirement plan'
             }
         
-        full_limit = SPOUSE_IRA_LIMITS_MFJ['full_deduction_under']
-        phase_out_end = SPOUSE_IRA_LIMITS_MFJ['phase_out_end']
+        full_limit = p.spouse_ira_limits_mfj['full_deduction_under']
+        phase_out_end = p.spouse_ira_limits_mfj['phase_out_end']
         
         if magi <= full_limit:
             return {
@@ -588,19 +519,20 @@ def calculate_spouse_ira_deduction(contribution, magi, filing_status, spouse_has
             'reason': f'Partial deduction - spouse no 401k, AGI ${magi:,.0f} in phase-out'
         }
     
-    return calculate_ira_deduction(contribution, magi, filing_status, spouse_has_retirement_plan, age)
+    return calculate_ira_deduction(contribution, magi, filing_status, spouse_has_retirement_plan, age, tax_year)
 
 
 # ════════════════════════════════════════════════════════════
 # CAPITAL GAINS TAX
 # ════════════════════════════════════════════════════════════
 
-def calculate_capital_gains_tax(preferential_income, ordinary_taxable, filing_status):
+def calculate_capital_gains_tax(preferential_income, ordinary_taxable, filing_status, tax_year=DEFAULT_TAX_YEAR):
     """Calculate tax on qualified dividends and long-term capital gains."""
     if preferential_income <= 0:
         return 0
     
-    brackets = LTCG_BRACKETS.get(filing_status, LTCG_BRACKETS['single'])
+    ltcg = federal_params(tax_year).ltcg_brackets
+    brackets = ltcg.get(filing_status, ltcg['single'])
     
     tax = 0
     remaining = preferential_income
@@ -628,12 +560,14 @@ def calculate_capital_gains_tax(preferential_income, ordinary_taxable, filing_st
 # CHILD TAX CREDIT
 # ════════════════════════════════════════════════════════════
 
-def calculate_child_tax_credit(qualifying_children, other_dependents, agi, earned_income, tax_liability, filing_status):
+def calculate_child_tax_credit(qualifying_children, other_dependents, agi, earned_income, tax_liability, filing_status,
+                               tax_year=DEFAULT_TAX_YEAR):
     """Calculate Child Tax Credit with refundable portion."""
-    phase_out = CTC_PHASE_OUT_MFJ if filing_status == 'married_filing_jointly' else CTC_PHASE_OUT_SINGLE
+    p = federal_params(tax_year)
+    phase_out = p.ctc_phase_out_mfj if filing_status == 'married_filing_jointly' else p.ctc_phase_out_single
     
-    gross_ctc = qualifying_children * CTC_AMOUNT
-    gross_odc = other_dependents * CTC_OTHER_DEPENDENT
+    gross_ctc = qualifying_children * p.ctc_amount
+    gross_odc = other_dependents * p.ctc_other_dependent
     
     total_credit = gross_ctc + gross_odc
     
@@ -647,10 +581,10 @@ def calculate_child_tax_credit(qualifying_children, other_dependents, agi, earne
     
     remaining_ctc = gross_ctc - ctc_nonrefundable
     
-    refundable_limit = qualifying_children * CTC_REFUNDABLE_MAX
+    refundable_limit = qualifying_children * p.ctc_refundable_max
     
-    if earned_income > CTC_REFUNDABILITY_THRESHOLD:
-        earnings_based = (earned_income - CTC_REFUNDABILITY_THRESHOLD) * CTC_REFUNDABILITY_RATE
+    if earned_income > p.ctc_refundability_threshold:
+        earnings_based = (earned_income - p.ctc_refundability_threshold) * p.ctc_refundability_rate
         ctc_refundable = min(remaining_ctc, earnings_based, refundable_limit)
     else:
         ctc_refundable = 0
@@ -671,10 +605,11 @@ def calculate_child_tax_credit(qualifying_children, other_dependents, agi, earne
 # EITC
 # ════════════════════════════════════════════════════════════
 
-def calculate_eitc(earned_income, agi, filing_status, qualifying_children):
+def calculate_eitc(earned_income, agi, filing_status, qualifying_children, tax_year=DEFAULT_TAX_YEAR):
     """Calculate Earned Income Tax Credit."""
+    eitc = federal_params(tax_year).eitc
     is_married = filing_status in ['married_filing_jointly', 'qualifying_surviving_spouse']
-    table = EITC_2025['married_filing_jointly'] if is_married else EITC_2025['single']
+    table = eitc['married_filing_jointly'] if is_married else eitc['single']
     
     children = min(3, max(0, qualifying_children))
     params = table.get(children, table[0])
@@ -739,7 +674,7 @@ def extract_from_session(session_data):
     if not answers and not totals and not input_forms:
         return session_data
     
-    print("📊 Converting MongoDB session to calculator format...")
+    logger.debug("Converting MongoDB session to calculator format")
     
     data = {}
     
@@ -750,14 +685,17 @@ def extract_from_session(session_data):
         'single'
     )
     
+    tax_year = int(session_data.get('taxYear') or session_data.get('tax_year') or DEFAULT_TAX_YEAR)
+    data['tax_year'] = tax_year
+    
     # Personal info
     taxpayer = session_data.get('taxpayer', {})
     spouse = session_data.get('spouse', {})
     
     data['taxpayer_dob'] = taxpayer.get('dob') or answers.get('taxpayer_dob', '')
     data['spouse_dob'] = spouse.get('dob') or answers.get('spouse_dob', '')
-    data['taxpayer_age'] = calculate_age(data['taxpayer_dob'])
-    data['spouse_age'] = calculate_age(data['spouse_dob'])
+    data['taxpayer_age'] = calculate_age(data['taxpayer_dob'], tax_year)
+    data['spouse_age'] = calculate_age(data['spouse_dob'], tax_year)
     
     # W-2 Income
     w2_list = input_forms.get('w2', [])
@@ -876,7 +814,7 @@ def extract_from_session(session_data):
             if dep_age is None:
                 dep_dob = answers.get(f'dependent_{i}_dob', '')
                 if dep_dob:
-                    dep_age = calculate_age(dep_dob)
+                    dep_age = calculate_age(dep_dob, tax_year)
             
             if dep_age is not None:
                 dep_age = int(dep_age)
@@ -895,262 +833,355 @@ def extract_from_session(session_data):
 
 
 # ════════════════════════════════════════════════════════════
-# MAIN CALCULATE FUNCTION
+# CALCULATION STAGES
 # ════════════════════════════════════════════════════════════
+# calculate() runs STAGES in order over one CalcContext. A stage reads
+# the input and what earlier stages left on the context and stores its
+# own values as plain attributes; federal_result() turns the finished
+# context into the result dict. Every stage sets all of its own values
+# and reads only earlier stages', so a copy of a finished context can
+# re-run any suffix of STAGES: what-if scenarios (tax_engine/
+# scenarios.py) resume from the first stage a change reaches instead
+# of recalculating the whole return.
+
+class CalcContext:
+    """Intermediate values of one federal calculation, filled in stage by stage."""
+
+    # Slots rather than an instance dict: a context holds ~60 values,
+    # past what CPython's shared-key instance dicts specialize for.
+    __slots__ = (
+        # setup
+        'fs', 'tax_year', 'p', 'taxpayer_age', 'spouse_age',
+        # income
+        'taxpayer_wages', 'spouse_wages', 'total_wages', 'tips_received', 'overtime_pay',
+        'interest_income', 'ordinary_dividends', 'qualified_dividends', 'short_term_gains',
+        'long_term_gains', 'net_capital_gain', 'capital_loss_deduction', 'taxable_ira',
+        'taxable_pension', 'social_security_benefits', 'net_self_employment', 'other_income',
+        'earned_income', 'se_tax', 'se_deduction', 'taxable_social_security', 'total_income',
+        # adjustments
+        'has_retirement_plan', 'spouse_has_retirement_plan', 'magi_for_ira', 'taxpayer_ira_result',
+        'spouse_ira_result', 'total_ira_deductible', 'hsa', 'student_loan', 'traditional_adjustments',
+        'total_adjustments', 'agi',
+        # deductions
+        'obbb_result', 'total_obbb_deduction', 'std_ded', 'taxable_income',
+        # tax
+        'ordinary_tax', 'preferential_tax', 'bracket_tax', 'total_tax_before_credits',
+        # credits
+        'qualifying_children', 'other_dependents', 'ctc_result', 'eitc_amount', 'eitc_validation',
+        'total_nonrefundable_credits', 'total_refundable_credits', 'tax_after_credits',
+        # payments
+        'taxpayer_fed_withheld', 'spouse_fed_withheld', 'total_withholding', 'taxpayer_state_withheld',
+        'spouse_state_withheld', 'total_state_withholding', 'estimated_payments', 'total_payments',
+        'balance',
+    )
 
-def calculate(raw_data):
-    """
-    Main federal tax calculation function.
-    Returns complete tax calculation results.
-    """
-    # Convert session format if needed
-    data = extract_from_session(raw_data)
-    
-    fs = normalize_status(data.get('filing_status', 'single'))
-    
-    # ═══════════════════════════════════════════════════════
-    # AGES - Auto from DOB
-    # ═══════════════════════════════════════════════════════
-    taxpayer_age = int(get_val(data, 'taxpayer_age'))
+    def copy(self):
+        """Copy of a finished context (every stage run)."""
+        ctx = CalcContext()
+        for name, value in zip(self.__slots__, _context_values(self)):
+            setattr(ctx, name, value)
+        return ctx
+
+
+_context_values = operator.attrgetter(*CalcContext.__slots__)
+
+
+def stage_setup(data, c):
+    """Filing status, tax year tables, ages (from DOB when not given)."""
+    c.fs = normalize_status(data.get('filing_status', 'single'))
+    c.tax_year = tax_year = data.get('tax_year') or DEFAULT_TAX_YEAR
+    c.p = federal_params(tax_year)
+
+    taxpayer_age = data.get('taxpayer_age', 0)
     if taxpayer_age == 0:
-        taxpayer_age = calculate_age(data.get('taxpayer_dob', ''))
-    
-    spouse_age = int(get_val(data, 'spouse_age'))
+        taxpayer_age = calculate_age(data.get('taxpayer_dob', ''), tax_year)
+
+    spouse_age = data.get('spouse_age', 0)
     if spouse_age == 0:
-        spouse_age = calculate_age(data.get('spouse_dob', ''))
-    
-    # ═══════════════════════════════════════════════════════
-    # INCOME
-    # ═══════════════════════════════════════════════════════
-    taxpayer_wages = get_val(data, 'taxpayer_wages', 'wages')
-    spouse_wages = get_val(data, 'spouse_wages')
-    total_wages = taxpayer_wages + spouse_wages
-    
-    # ✅ v8.1 FIX: Tips - added 'taxpayer_w2_tips' to field lookup
-    tips_received = get_val(data, 'tips_received', 'tips', 'tip_income', 'taxpayer_w2_tips')
-    overtime_pay = get_val(data, 'overtime_pay', 'overtime')
-    
-    interest_income = get_val(data, 'interest_income', 'interest')
-    ordinary_dividends = get_val(data, 'dividend_income', 'dividends', 'ordinary_dividends')
-    qualified_dividends = get_val(data, 'qualified_dividends')
-    
-    short_term_gains = get_val(data, 'short_term_gains', 'short_term_capital_gains')
-    long_term_gains = get_val(data, 'long_term_gains', 'long_term_capital_gains', 'capital_gains')
-    net_capital_gain = short_term_gains + long_term_gains
-    capital_loss_deduction = min(3000, abs(min(0, net_capital_gain)))
-    
-    gross_ira = get_val(data, 'ira_distributions', 'ira_distribution')
-    taxable_ira = get_val(data, 'taxable_ira', default=gross_ira)
-    
-    gross_pension = get_val(data, 'pension_income', 'pension', 'pensions')
-    taxable_pension = get_val(data, 'taxable_pension', default=gross_pension)
-    
-    social_security_benefits = get_val(data, 'social_security_benefits', 'social_security')
-    
-    gross_self_employment = get_val(data, 'self_employment_income', 'business_income', 'self_employment')
-    se_expenses = get_val(data, 'self_employment_expenses', 'business_expenses')
-    net_self_employment = max(0, gross_self_employment - se_expenses)
-    
-    other_income = get_val(data, 'other_income')
-    
+        spouse_age = calculate_age(data.get('spouse_dob', ''), tax_year)
+
+    c.taxpayer_age = taxpayer_age
+    c.spouse_age = spouse_age
+
+
+def stage_income(data, c):
+    """Income lines, SE tax, Social Security taxability, total income."""
+    p = c.p
+
+    c.taxpayer_wages = taxpayer_wages = data.get('taxpayer_wages', 0)
+    c.spouse_wages = spouse_wages = data.get('spouse_wages', 0)
+    c.total_wages = total_wages = taxpayer_wages + spouse_wages
+
+    c.tips_received = data.get('tips_received', 0)
+    c.overtime_pay = data.get('overtime_pay', 0)
+
+    c.interest_income = interest_income = data.get('interest_income', 0)
+    c.ordinary_dividends = ordinary_dividends = data.get('dividend_income', 0)
+    c.qualified_dividends = data.get('qualified_dividends', 0)
+
+    c.short_term_gains = short_term_gains = data.get('short_term_gains', 0)
+    c.long_term_gains = long_term_gains = data.get('long_term_gains', 0)
+    c.net_capital_gain = net_capital_gain = short_term_gains + long_term_gains
+    c.capital_loss_deduction = min(3000, abs(min(0, net_capital_gain)))
+
+    gross_ira = data.get('ira_distributions', 0)
+    c.taxable_ira = taxable_ira = data.get('taxable_ira', gross_ira)
+
+    gross_pension = data.get('pension_income', 0)
+    c.taxable_pension = taxable_pension = data.get('taxable_pension', gross_pension)
+
+    c.social_security_benefits = social_security_benefits = data.get('social_security_benefits', 0)
+
+    gross_self_employment = data.get('self_employment_income', 0)
+    se_expenses = data.get('self_employment_expenses', 0)
+    c.net_self_employment = net_self_employment = max(0, gross_self_employment - se_expenses)
+
+    c.other_income = other_income = data.get('other_income', 0)
+
     # Earned income
-    earned_income = total_wages + net_self_employment
-    
+    c.earned_income = total_wages + net_self_employment
+
     # Self-employment tax
     if net_self_employment > 0:
-        se_taxable = net_self_employment * SE_INCOME_MULTIPLIER
-        se_tax = se_taxable * SE_TAX_RATE
-        se_deduction = se_tax / 2
+        se_taxable = net_self_employment * p.se_income_multiplier
+        c.se_tax = se_tax = se_taxable * p.se_tax_rate
+        c.se_deduction = se_tax / 2
     else:
-        se_tax = 0
-        se_deduction = 0
-    
+        c.se_tax = 0
+        c.se_deduction = 0
+
     # Social Security taxability
-    provisional_income = (total_wages + interest_income + ordinary_dividends + 
-                          net_capital_gain + taxable_ira + taxable_pension + 
+    provisional_income = (total_wages + interest_income + ordinary_dividends +
+                          net_capital_gain + taxable_ira + taxable_pension +
                           net_self_employment + other_income)
-    taxable_social_security = calculate_ss_taxable(social_security_benefits, provisional_income, fs)
-    
+    c.taxable_social_security = taxable_social_security = calculate_ss_taxable(
+        social_security_benefits, provisional_income, c.fs)
+
     # Total income
-    total_income = (total_wages + interest_income + ordinary_dividends + 
-                    max(0, net_capital_gain) + taxable_ira + taxable_pension + 
-                    taxable_social_security + net_self_employment + other_income)
-    
-    # ═══════════════════════════════════════════════════════
-    # ADJUSTMENTS TO INCOME (Above-the-line)
-    # ═══════════════════════════════════════════════════════
-    
+    c.total_income = (total_wages + interest_income + ordinary_dividends +
+                      max(0, net_capital_gain) + taxable_ira + taxable_pension +
+                      taxable_social_security + net_self_employment + other_income)
+
+
+def stage_adjustments(data, c):
+    """Above-the-line adjustments (IRA, HSA, student loan) and AGI."""
+    fs, tax_year, p = c.fs, c.tax_year, c.p
+
     # IRA Deduction
-    has_retirement_plan = get_bool(data, 'has_retirement_plan', 'taxpayer_has_401k')
-    spouse_has_retirement_plan = get_bool(data, 'spouse_has_retirement_plan', 'spouse_has_401k')
-    
-    magi_for_ira = total_income - se_deduction
-    
-    taxpayer_ira = get_val(data, 'ira_contribution', 'taxpayer_ira', 'ira_contributions')
-    taxpayer_ira_result = calculate_ira_deduction(taxpayer_ira, magi_for_ira, fs, has_retirement_plan, taxpayer_age)
-    
-    spouse_ira = get_val(data, 'spouse_ira_contribution', 'spouse_ira')
-    spouse_ira_result = calculate_spouse_ira_deduction(spouse_ira, magi_for_ira, fs, spouse_has_retirement_plan, has_retirement_plan, spouse_age)
-    
-    total_ira_deductible = taxpayer_ira_result['deductible'] + spouse_ira_result['deductible']
-    
+    c.has_retirement_plan = has_retirement_plan = data.get('has_retirement_plan', False)
+    c.spouse_has_retirement_plan = spouse_has_retirement_plan = data.get('spouse_has_retirement_plan', False)
+
+    c.magi_for_ira = magi_for_ira = c.total_income - c.se_deduction
+
+    taxpayer_ira = data.get('ira_contribution', 0)
+    c.taxpayer_ira_result = taxpayer_ira_result = calculate_ira_deduction(
+        taxpayer_ira, magi_for_ira, fs, has_retirement_plan, c.taxpayer_age, tax_year)
+
+    spouse_ira = data.get('spouse_ira_contribution', 0)
+    c.spouse_ira_result = spouse_ira_result = calculate_spouse_ira_deduction(
+        spouse_ira, magi_for_ira, fs, spouse_has_retirement_plan, has_retirement_plan, c.spouse_age, tax_year)
+
+    c.total_ira_deductible = total_ira_deductible = taxpayer_ira_result['deductible'] + spouse_ira_result['deductible']
+
     # HSA
-    hsa = min(get_val(data, 'hsa_contribution', 'hsa', 'hsa_contributions'),
-              HSA_LIMIT_FAMILY if fs == 'married_filing_jointly' else HSA_LIMIT_SELF)
-    if taxpayer_age >= 55:
-        hsa = min(hsa + HSA_CATCH_UP, HSA_LIMIT_FAMILY + HSA_CATCH_UP if fs == 'married_filing_jointly' else HSA_LIMIT_SELF + HSA_CATCH_UP)
-    
+    hsa_limit = p.hsa_limit_family if fs == 'married_filing_jointly' else p.hsa_limit_self
+    hsa = min(data.get('hsa_contribution', 0), hsa_limit)
+    if c.taxpayer_age >= 55:
+        hsa = min(hsa + p.hsa_catch_up, hsa_limit + p.hsa_catch_up)
+    c.hsa = hsa
+
     # Student loan interest
-    student_loan = min(get_val(data, 'student_loan_interest', 'student_loan'), STUDENT_LOAN_MAX)
-    
+    c.student_loan = student_loan = min(data.get('student_loan_interest', 0), p.student_loan_max)
+
     # Total traditional adjustments (IRA, HSA, etc. - these reduce AGI)
-    traditional_adjustments = total_ira_deductible + hsa + student_loan + se_deduction + capital_loss_deduction
-    
+    c.traditional_adjustments = traditional_adjustments = (
+        total_ira_deductible + hsa + student_loan + c.se_deduction + c.capital_loss_deduction)
+
     # ═══════════════════════════════════════════════════════
     # AGI (Line 11) - Traditional adjustments ONLY
     # ✅ v8.1 FIX: OBBB is NOT included here! OBBB is below-the-line.
     # ═══════════════════════════════════════════════════════
-    total_adjustments = traditional_adjustments  # OBBB is NOT an adjustment to AGI!
-    agi = total_income - total_adjustments
-    
+    c.total_adjustments = traditional_adjustments  # OBBB is NOT an adjustment to AGI!
+    c.agi = c.total_income - traditional_adjustments
+
+
+def stage_deductions(data, c):
+    """OBBB deductions (below the line), standard deduction, taxable income."""
+    fs, p = c.fs, c.p
+
     # ═══════════════════════════════════════════════════════
     # ✅ v8.1 FIX: OBBB DEDUCTIONS - BELOW-THE-LINE!
     # These reduce TAXABLE INCOME, not AGI (per IRS Schedule 1-A)
     # ═══════════════════════════════════════════════════════
-    obbb_result = calculate_all_obbb_deductions(data, agi, fs)
-    total_obbb_deduction = obbb_result['total_obbb_deduction']
-    
+    c.obbb_result = obbb_result = calculate_all_obbb_deductions(data, c.agi, fs, c.tax_year)
+    c.total_obbb_deduction = total_obbb_deduction = obbb_result['total_obbb_deduction']
+
     # ═══════════════════════════════════════════════════════
     # STANDARD DEDUCTION (Line 12)
     # ═══════════════════════════════════════════════════════
-    std_ded = STANDARD_DEDUCTIONS.get(fs, 15750)
-    additional_amount = ADDITIONAL_STD_DED.get(fs, 1550)
+    std_ded = p.standard_deduction.get(fs, p.standard_deduction['single'])
+    additional_amount = p.additional_std_ded.get(fs, p.additional_std_ded['married_filing_jointly'])
     additional_count = 0
-    
+
     # 65+ additional deduction (from existing law - separate from OBBB senior deduction!)
-    if taxpayer_age >= 65:
+    if c.taxpayer_age >= 65:
         additional_count += 1
-    if spouse_age >= 65 and fs in ['married_filing_jointly', 'married_filing_separately', 'qualifying_surviving_spouse']:
+    if c.spouse_age >= 65 and fs in ['married_filing_jointly', 'married_filing_separately', 'qualifying_surviving_spouse']:
         additional_count += 1
-    
-    std_ded += (additional_amount * additional_count)
-    
+
+    c.std_ded = std_ded = std_ded + (additional_amount * additional_count)
+
     # ═══════════════════════════════════════════════════════
     # TAXABLE INCOME (Line 15)
     # ✅ v8.1 FIX: OBBB deductions subtracted HERE (below-the-line)
     # ═══════════════════════════════════════════════════════
-    taxable_income = max(0, agi - std_ded - total_obbb_deduction)
-    
-    # ═══════════════════════════════════════════════════════
-    # TAX CALCULATION (Line 16)
-    # ═══════════════════════════════════════════════════════
-    preferential_income = qualified_dividends + max(0, long_term_gains)
-    ordinary_taxable = max(0, taxable_income - preferential_income)
-    
-    brackets = TAX_BRACKETS.get(fs, TAX_BRACKETS['single'])
-    ordinary_tax = 0
-    prev = 0
-    for limit, rate in brackets:
-        if ordinary_taxable <= prev:
-            break
-        ordinary_tax += (min(ordinary_taxable, limit) - prev) * rate
-        prev = limit
-    
-    preferential_tax = calculate_capital_gains_tax(preferential_income, ordinary_taxable, fs)
-    
-    bracket_tax = round(ordinary_tax + preferential_tax, 2)
-    total_tax_before_credits = bracket_tax + se_tax
-    
-    # ═══════════════════════════════════════════════════════
-    # CREDITS
-    # ═══════════════════════════════════════════════════════
-    qualifying_children = int(get_val(data, 'qualifying_children_under_17', 'children_under_17', 'qualifying_children'))
-    other_dependents = int(get_val(data, 'other_dependents', 'dependents_over_17'))
-    
-    ctc_result = calculate_child_tax_credit(
+    c.taxable_income = max(0, c.agi - std_ded - total_obbb_deduction)
+
+
+def stage_tax(data, c):
+    """Tax on ordinary and preferential income (Line 16) plus SE tax."""
+    fs = c.fs
+
+    preferential_income = c.qualified_dividends + max(0, c.long_term_gains)
+    ordinary_taxable = max(0, c.taxable_income - preferential_income)
+
+    c.ordinary_tax = ordinary_tax = c.p.ordinary_tax(ordinary_taxable, fs)
+
+    c.preferential_tax = preferential_tax = calculate_capital_gains_tax(
+        preferential_income, ordinary_taxable, fs, c.tax_year)
+
+    c.bracket_tax = bracket_tax = round(ordinary_tax + preferential_tax, 2)
+    c.total_tax_before_credits = bracket_tax + c.se_tax
+
+
+def stage_credits(data, c):
+    """Child tax credit, other dependent credit, EITC."""
+    c.qualifying_children = qualifying_children = data.get('qualifying_children_under_17', 0)
+    c.other_dependents = other_dependents = data.get('other_dependents', 0)
+
+    c.ctc_result = ctc_result = calculate_child_tax_credit(
         qualifying_children=qualifying_children,
         other_dependents=other_dependents,
-        agi=agi,
-        earned_income=earned_income,
-        tax_liability=total_tax_before_credits,
-        filing_status=fs
+        agi=c.agi,
+        earned_income=c.earned_income,
+        tax_liability=c.total_tax_before_credits,
+        filing_status=c.fs,
+        tax_year=c.tax_year
     )
-    
-    eitc_amount, eitc_validation = calculate_eitc(earned_income, agi, fs, qualifying_children)
-    
-    total_nonrefundable_credits = ctc_result['ctc_nonrefundable'] + ctc_result['other_dependent_credit']
-    total_refundable_credits = ctc_result['ctc_refundable'] + eitc_amount
-    
-    tax_after_credits = max(0, total_tax_before_credits - total_nonrefundable_credits)
-    
-    # ═══════════════════════════════════════════════════════
-    # PAYMENTS & RESULT
-    # ═══════════════════════════════════════════════════════
-    taxpayer_fed_withheld = get_val(data, 'taxpayer_federal_withheld', 'federal_withheld')
-    spouse_fed_withheld = get_val(data, 'spouse_federal_withheld')
-    total_withholding = taxpayer_fed_withheld + spouse_fed_withheld
-    
-    taxpayer_state_withheld = get_val(data, 'taxpayer_state_withheld', 'state_withheld')
-    spouse_state_withheld = get_val(data, 'spouse_state_withheld')
-    total_state_withholding = taxpayer_state_withheld + spouse_state_withheld
-    
-    estimated_payments = get_val(data, 'estimated_payments', 'estimated_tax_payments')
-    
-    total_payments = total_withholding + estimated_payments + total_refundable_credits
-    
-    balance = total_payments - tax_after_credits
-    
-    # ═══════════════════════════════════════════════════════
-    # RETURN RESULT
-    # ═══════════════════════════════════════════════════════
+
+    eitc_amount, eitc_validation = calculate_eitc(c.earned_income, c.agi, c.fs, qualifying_children, c.tax_year)
+    c.eitc_amount = eitc_amount
+    c.eitc_validation = eitc_validation
+
+    c.total_nonrefundable_credits = total_nonrefundable_credits = (
+        ctc_result['ctc_nonrefundable'] + ctc_result['other_dependent_credit'])
+    c.total_refundable_credits = ctc_result['ctc_refundable'] + eitc_amount
+    c.tax_after_credits = max(0, c.total_tax_before_credits - total_nonrefundable_credits)
+
+
+def stage_payments(data, c):
+    """Withholding, estimated payments, refund / amount owed."""
+    c.taxpayer_fed_withheld = taxpayer_fed_withheld = data.get('taxpayer_federal_withheld', 0)
+    c.spouse_fed_withheld = spouse_fed_withheld = data.get('spouse_federal_withheld', 0)
+    c.total_withholding = total_withholding = taxpayer_fed_withheld + spouse_fed_withheld
+
+    c.taxpayer_state_withheld = taxpayer_state_withheld = data.get('taxpayer_state_withheld', 0)
+    c.spouse_state_withheld = spouse_state_withheld = data.get('spouse_state_withheld', 0)
+    c.total_state_withholding = taxpayer_state_withheld + spouse_state_withheld
+
+    c.estimated_payments = estimated_payments = data.get('estimated_payments', 0)
+
+    c.total_payments = total_payments = total_withholding + estimated_payments + c.total_refundable_credits
+    c.balance = total_payments - c.tax_after_credits
+
+
+# (name, stage), in calculation order
+STAGES = (
+    ('setup', stage_setup),
+    ('income', stage_income),
+    ('adjustments', stage_adjustments),
+    ('deductions', stage_deductions),
+    ('tax', stage_tax),
+    ('credits', stage_credits),
+    ('payments', stage_payments),
+)
+
+
+# ════════════════════════════════════════════════════════════
+# MAIN CALCULATE FUNCTION
+# ════════════════════════════════════════════════════════════
+
+def calculate(raw_data):
+    """
+    Main federal tax calculation function.
+    Returns complete tax calculation results for the input's tax_year
+    (default 2025; ValueError for a year without tables).
+    """
+    # Convert session format if needed, then resolve field aliases once
+    data = normalize_input(extract_from_session(raw_data))
+
+    c = CalcContext()
+    for _, stage in STAGES:
+        stage(data, c)
+    return federal_result(c)
+
+
+def federal_result(c):
+    """Result dict for a context that has been through every stage."""
+    obbb_result = c.obbb_result
+    taxpayer_ira_result = c.taxpayer_ira_result
+    spouse_ira_result = c.spouse_ira_result
+    ctc_result = c.ctc_result
+    balance = c.balance
+    agi = round(c.agi, 2)
     return {
         'success': True,
-        'tax_year': 2025,
-        'filing_status': fs,
-        
+        'tax_year': c.p.tax_year,
+        'filing_status': c.fs,
+
         # INCOME
-        'wages': round(total_wages, 2),
-        'taxpayer_wages': round(taxpayer_wages, 2),
-        'spouse_wages': round(spouse_wages, 2),
-        'interest_income': round(interest_income, 2),
-        'dividend_income': round(ordinary_dividends, 2),
-        'qualified_dividends': round(qualified_dividends, 2),
-        'capital_gains': round(net_capital_gain, 2),
-        'long_term_gains': round(long_term_gains, 2),
-        'short_term_gains': round(short_term_gains, 2),
-        'ira_distributions': round(taxable_ira, 2),
-        'pension_income': round(taxable_pension, 2),
-        'social_security_benefits': round(social_security_benefits, 2),
-        'taxable_social_security': round(taxable_social_security, 2),
-        'self_employment_income': round(net_self_employment, 2),
-        'other_income': round(other_income, 2),
-        
-        'total_income': round(total_income, 2),
-        'earned_income': round(earned_income, 2),
-        
+        'wages': round(c.total_wages, 2),
+        'taxpayer_wages': round(c.taxpayer_wages, 2),
+        'spouse_wages': round(c.spouse_wages, 2),
+        'interest_income': round(c.interest_income, 2),
+        'dividend_income': round(c.ordinary_dividends, 2),
+        'qualified_dividends': round(c.qualified_dividends, 2),
+        'capital_gains': round(c.net_capital_gain, 2),
+        'long_term_gains': round(c.long_term_gains, 2),
+        'short_term_gains': round(c.short_term_gains, 2),
+        'ira_distributions': round(c.taxable_ira, 2),
+        'pension_income': round(c.taxable_pension, 2),
+        'social_security_benefits': round(c.social_security_benefits, 2),
+        'taxable_social_security': round(c.taxable_social_security, 2),
+        'self_employment_income': round(c.net_self_employment, 2),
+        'other_income': round(c.other_income, 2),
+
+        'total_income': round(c.total_income, 2),
+        'earned_income': round(c.earned_income, 2),
+
         # ✅ v8.1: OBBB DEDUCTIONS (FIXED - below-the-line)
-        'tips_received': round(tips_received, 2),
+        'tips_received': round(c.tips_received, 2),
         'tips_deduction': round(obbb_result['tips']['tips_deduction'], 2),
         'tips_reason': obbb_result['tips']['reason'],
-        
-        'overtime_pay': round(overtime_pay, 2),
+
+        'overtime_pay': round(c.overtime_pay, 2),
         'overtime_deduction': round(obbb_result['overtime']['overtime_deduction'], 2),
         'overtime_reason': obbb_result['overtime']['reason'],
-        
+
         'car_loan_interest': round(obbb_result['car_loan']['car_loan_interest'], 2),
         'car_loan_deduction': round(obbb_result['car_loan']['car_loan_deduction'], 2),
         'car_loan_reason': obbb_result['car_loan']['reason'],
-        
+
         'taxpayer_65_plus': obbb_result['senior']['taxpayer_65_plus'],
         'spouse_65_plus': obbb_result['senior']['spouse_65_plus'],
         'senior_deduction': round(obbb_result['senior']['senior_deduction'], 2),
         'senior_reason': obbb_result['senior']['reason'],
-        
-        'total_obbb_deduction': round(total_obbb_deduction, 2),
-        
+
+        'total_obbb_deduction': round(c.total_obbb_deduction, 2),
+
         # ADJUSTMENTS (traditional only - OBBB is separate)
-        'adjustments': round(total_adjustments, 2),
-        'traditional_adjustments': round(traditional_adjustments, 2),
+        'adjustments': round(c.total_adjustments, 2),
+        'traditional_adjustments': round(c.traditional_adjustments, 2),
         'taxpayer_ira_contributed': round(taxpayer_ira_result['contributed'], 2),
         'taxpayer_ira_deductible': round(taxpayer_ira_result['deductible'], 2),
         'taxpayer_ira_non_deductible': round(taxpayer_ira_result['non_deductible'], 2),
@@ -1159,60 +1190,74 @@ def calculate(raw_data):
         'spouse_ira_deductible': round(spouse_ira_result['deductible'], 2),
         'spouse_ira_non_deductible': round(spouse_ira_result['non_deductible'], 2),
         'spouse_ira_reason': spouse_ira_result['reason'],
-        'ira_deduction': round(total_ira_deductible, 2),
-        'hsa_deduction': round(hsa, 2),
-        'student_loan_deduction': round(student_loan, 2),
-        'se_tax_deduction': round(se_deduction, 2),
-        'capital_loss_deduction': round(capital_loss_deduction, 2),
-        
+        'ira_deduction': round(c.total_ira_deductible, 2),
+        'hsa_deduction': round(c.hsa, 2),
+        'student_loan_deduction': round(c.student_loan, 2),
+        'se_tax_deduction': round(c.se_deduction, 2),
+        'capital_loss_deduction': round(c.capital_loss_deduction, 2),
+
         # AGI & DEDUCTIONS
-        'agi': round(agi, 2),
-        'federal_agi': round(agi, 2),
-        'magi_for_ira': round(magi_for_ira, 2),
-        'standard_deduction': round(std_ded, 2),
-        'taxable_income': round(taxable_income, 2),
-        
+        'agi': agi,
+        'federal_agi': agi,
+        'magi_for_ira': round(c.magi_for_ira, 2),
+        'standard_deduction': round(c.std_ded, 2),
+        'taxable_income': round(c.taxable_income, 2),
+
         # TAX
-        'ordinary_tax': round(ordinary_tax, 2),
-        'preferential_tax': round(preferential_tax, 2),
-        'bracket_tax': bracket_tax,
-        'self_employment_tax': round(se_tax, 2),
-        'tax_before_credits': round(total_tax_before_credits, 2),
-        
+        'ordinary_tax': round(c.ordinary_tax, 2),
+        'preferential_tax': round(c.preferential_tax, 2),
+        'bracket_tax': c.bracket_tax,
+        'self_employment_tax': round(c.se_tax, 2),
+        'tax_before_credits': round(c.total_tax_before_credits, 2),
+
         # CREDITS
         'child_tax_credit': round(ctc_result['total_ctc'], 2),
         'ctc_nonrefundable': round(ctc_result['ctc_nonrefundable'], 2),
         'ctc_refundable': round(ctc_result['ctc_refundable'], 2),
         'other_dependent_credit': round(ctc_result['other_dependent_credit'], 2),
-        'eitc': round(eitc_amount, 2),
-        'eitc_validation': eitc_validation,
-        'total_credits': round(total_nonrefundable_credits + total_refundable_credits, 2),
-        'tax_after_credits': round(tax_after_credits, 2),
-        
+        'eitc': round(c.eitc_amount, 2),
+        'eitc_validation': c.eitc_validation,
+        'total_credits': round(c.total_nonrefundable_credits + c.total_refundable_credits, 2),
+        'tax_after_credits': round(c.tax_after_credits, 2),
+
         # DEPENDENTS
-        'qualifying_children_under_17': qualifying_children,
-        'other_dependents': other_dependents,
-        
+        'qualifying_children_under_17': c.qualifying_children,
+        'other_dependents': c.other_dependents,
+
         # PAYMENTS
-        'withholding': round(total_withholding, 2),
-        'taxpayer_federal_withheld': round(taxpayer_fed_withheld, 2),
-        'spouse_federal_withheld': round(spouse_fed_withheld, 2),
-        'state_withholding': round(total_state_withholding, 2),
-        'taxpayer_state_withheld': round(taxpayer_state_withheld, 2),
-        'spouse_state_withheld': round(spouse_state_withheld, 2),
-        'estimated_payments': round(estimated_payments, 2),
-        'refundable_credits': round(total_refundable_credits, 2),
-        'total_payments': round(total_payments, 2),
-        
+        'withholding': round(c.total_withholding, 2),
+        'taxpayer_federal_withheld': round(c.taxpayer_fed_withheld, 2),
+        'spouse_federal_withheld': round(c.spouse_fed_withheld, 2),
+        'state_withholding': round(c.total_state_withholding, 2),
+        'taxpayer_state_withheld': round(c.taxpayer_state_withheld, 2),
+        'spouse_state_withheld': round(c.spouse_state_withheld, 2),
+        'estimated_payments': round(c.estimated_payments, 2),
+        'refundable_credits': round(c.total_refundable_credits, 2),
+        'total_payments': round(c.total_payments, 2),
+
         # RESULT
         'refund': round(max(0, balance), 2),
         'amount_owed': round(max(0, -balance), 2),
-        
+
         # DEBUG
-        '_taxpayer_age': taxpayer_age,
-        '_spouse_age': spouse_age,
-        '_has_retirement_plan': has_retirement_plan,
-        '_spouse_has_retirement_plan': spouse_has_retirement_plan,
+        '_taxpayer_age': c.taxpayer_age,
+        '_spouse_age': c.spouse_age,
+        '_has_retirement_plan': c.has_retirement_plan,
+        '_spouse_has_retirement_plan': c.spouse_has_retirement_plan,
+    }
+
+
+def federal_summary(c):
+    """The federal_result() fields a scenario summary reads, without building the rest."""
+    balance = c.balance
+    return {
+        'tax_year': c.p.tax_year,
+        'agi': round(c.agi, 2),
+        'taxable_income': round(c.taxable_income, 2),
+        'tax_after_credits': round(c.tax_after_credits, 2),
+        'refundable_credits': round(c.total_refundable_credits, 2),
+        'refund': round(max(0, balance), 2),
+        'amount_owed': round(max(0, -balance), 2),
     }
 
 
@@ -1251,6 +1296,10 @@ def main():
 
 __all__ = [
     'calculate', 
+    'federal_result',
+    'federal_summary',
+    'CalcContext',
+    'STAGES',
     'main', 
     'calculate_ira_deduction', 
     'calculate_spouse_ira_deduction', 
@@ -0,0 +1,204 @@
+# tax_engine/calculator/inputs.py
+# ============================================================
+# INPUT NORMALIZATION - canonical calculator input
+# ============================================================
+# Calculator input arrives in several dialects: flat TaxInput
+# ("wages", "tips"), the flattened Mongo session (extract_from_session),
+# extractor output (map_extracted_to_calculator) and the camelCase
+# frontend ("taxpayerWages"). Instead of every calculator resolving its
+# own aliases on every read, normalize_input() does one pass over the
+# input keys against a precompiled alias index and writes the canonical
+# key with a typed value (float / int / bool).
+#
+#   data = normalize_input(raw)
+#   wages = data.get("taxpayer_wages", 0)     # float, aliases resolved
+#
+# Rules:
+# - aliases are listed in priority order; the first one present wins
+# - None and "" count as absent
+# - numbers accept "1,234" / "$1,234"; a value that can't be converted
+#   drops the field (calculator default applies)
+# - keys holding None, "" or an unconvertible value are removed unless
+#   a typed value replaces them, so calculators never see them
+# - flags accept bools, numbers and "true"/"yes"/"1"/"y"
+#
+# All other keys pass through untouched, so state modules that read
+# their own form-specific fields keep working. The result is a
+# CanonicalInput (a dict); normalizing it again is a no-op.
+# ============================================================
+
+from typing import Any, Dict, Tuple
+
+# ============================================================
+# ALIAS TABLES (canonical -> aliases, highest priority first)
+# ============================================================
+
+FLOAT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    # Income
+    "taxpayer_wages": ("taxpayer_wages", "wages"),
+    "spouse_wages": ("spouse_wages",),
+    "tips_received": ("tips_received", "tips", "tip_income", "taxpayer_w2_tips"),
+    "overtime_pay": ("overtime_pay", "overtime", "overtime_income"),
+    "interest_income": ("interest_income", "interest"),
+    "dividend_income": ("dividend_income", "dividends", "ordinary_dividends"),
+    "qualified_dividends": ("qualified_dividends",),
+    "short_term_gains": ("short_term_gains", "short_term_capital_gains"),
+    "long_term_gains": ("long_term_gains", "long_term_capital_gains", "capital_gains"),
+    "ira_distributions": ("ira_distributions", "ira_distribution"),
+    "taxable_ira": ("taxable_ira",),
+    "pension_income": ("pension_income", "pension", "pensions"),
+    "taxable_pension": ("taxable_pension",),
+    "social_security_benefits": ("social_security_benefits", "social_security"),
+    "self_employment_income": ("self_employment_income", "business_income", "self_employment"),
+    "self_employment_expenses": ("self_employment_expenses", "business_expenses"),
+    "other_income": ("other_income",),
+    # Adjustments / deductions
+    "ira_contribution": ("ira_contribution", "taxpayer_ira", "ira_contributions"),
+    "spouse_ira_contribution": ("spouse_ira_contribution", "spouse_ira"),
+    "hsa_contribution": ("hsa_contribution", "hsa", "hsa_contributions"),
+    "student_loan_interest": ("student_loan_interest", "student_loan"),
+    "car_loan_interest": ("car_loan_interest",),
+    # Payments
+    "taxpayer_federal_withheld": ("taxpayer_federal_withheld", "federal_withheld"),
+    "spouse_federal_withheld": ("spouse_federal_withheld",),
+    "taxpayer_state_withheld": ("taxpayer_state_withheld", "state_withheld"),
+    "spouse_state_withheld": ("spouse_state_withheld",),
+    "estimated_payments": ("estimated_payments", "estimated_tax_payments"),
+    # CA Form 540 lines
+    "additional_tax": ("additional_tax", "line_34"),
+    "amt": ("amt", "alternative_minimum_tax"),
+    "other_taxes": ("other_taxes", "credit_recapture"),
+    "other_withholding": ("other_withholding", "form_592b", "form_593"),
+    "fytc": ("fytc", "foster_youth_credit"),
+}
+
+INT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "taxpayer_age": ("taxpayer_age",),
+    "spouse_age": ("spouse_age",),
+    "qualifying_children_under_17": ("qualifying_children_under_17", "children_under_17", "qualifying_children"),
+    "other_dependents": ("other_dependents", "dependents_over_17"),
+    "num_blind": ("num_blind", "blind"),
+    "num_senior": ("num_senior", "senior"),
+    "tax_year": ("tax_year",),
+}
+
+BOOL_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "has_retirement_plan": ("has_retirement_plan", "taxpayer_has_401k"),
+    "spouse_has_retirement_plan": ("spouse_has_retirement_plan", "spouse_has_401k"),
+    "bought_new_car": ("bought_new_car", "new_car_purchase"),
+    "car_is_american": ("car_is_american", "american_made_car"),
+}
+
+_TRUE_STRINGS = frozenset(("true", "yes", "1", "y"))
+
+
+# ============================================================
+# CONVERTERS (return _SKIP when the value doesn't count)
+# ============================================================
+
+_SKIP = object()
+_INVALID = object()
+
+
+def _to_float(v: Any):
+    if isinstance(v, str):
+        v = v.replace(",", "").replace("$", "").strip()
+        if not v:
+            return _SKIP
+    try:
+        return float(v)
+    except (ValueError, TypeError):
+        return _INVALID
+
+
+def _to_int(v: Any):
+    v = _to_float(v)
+    return v if v is _SKIP or v is _INVALID else int(v)
+
+
+def _to_bool(v: Any):
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, str):
+        v = v.strip().lower()
+        return v in _TRUE_STRINGS if v else _SKIP
+    if isinstance(v, (int, float)):
+        return bool(v)
+    return _SKIP  # not a flag: try the next alias
+
+
+# ============================================================
+# PRECOMPILED INDEX: input key -> (canonical, priority, converter)
+# ============================================================
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _build_index() -> Dict[str, Tuple[str, int, Any]]:
+    index: Dict[str, Tuple[str, int, Any]] = {}
+    for table, convert in ((FLOAT_FIELDS, _to_float), (INT_FIELDS, _to_int), (BOOL_FIELDS, _to_bool)):
+        for canonical, aliases in table.items():
+            for rank, alias in enumerate(aliases):
+                for key in (alias, _camel(alias)):
+                    if key in index and index[key][0] != canonical:
+                        raise ValueError(f"Input alias {key!r} maps to both {index[key][0]} and {canonical}")
+                    index.setdefault(key, (canonical, rank, convert))
+    return index
+
+
+ALIAS_INDEX = _build_index()
+
+
+# ============================================================
+# NORMALIZE
+# ============================================================
+
+class CanonicalInput(dict):
+    """Calculator input after normalize_input(): canonical keys hold typed values."""
+
+    __slots__ = ()
+
+
+def normalize_input(data: Dict[str, Any]) -> CanonicalInput:
+    """One pass over the input keys; returns a new CanonicalInput."""
+    if isinstance(data, CanonicalInput):
+        return data
+
+    index = ALIAS_INDEX
+    best: Dict[str, Tuple[int, Any]] = {}
+    unusable = []
+    for key, value in data.items():
+        entry = index.get(key)
+        if entry is None:
+            continue
+        canonical, rank, convert = entry
+        value = _SKIP if value is None else convert(value)
+        if value is _SKIP or value is _INVALID:
+            unusable.append(key)
+            if value is _SKIP:
+                continue
+        current = best.get(canonical)
+        if current is None or rank < current[0]:
+            best[canonical] = (rank, value)
+
+    out = CanonicalInput(data)
+    for key in unusable:
+        del out[key]
+    for canonical, (_, value) in best.items():
+        if value is _INVALID:
+            out.pop(canonical, None)
+        else:
+            out[canonical] = value
+    return out
+
+
+__all__ = [
+    "FLOAT_FIELDS",
+    "INT_FIELDS",
+    "BOOL_FIELDS",
+    "ALIAS_INDEX",
+    "CanonicalInput",
+    "normalize_input",
+]
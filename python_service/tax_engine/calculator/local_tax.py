@@ -0,0 +1,453 @@
+# tax_engine/calculator/local_tax.py
+# ============================================================
+# LOCAL INCOME TAX - cities, counties, school districts
+# ============================================================
+# Local jurisdictions (NYC / Yonkers, PA PSD codes, MD counties, OH
+# cities and school districts) are rows of one table instead of
+# constants in each state module. The source is
+# locals/jurisdictions.csv, one row per jurisdiction:
+#
+#   code              "<STATE>-<local code>": PA-510101 (PSD code),
+#                     MD-0300 (Form 502 subdivision), NY-NYC, OH-COLUMBUS
+#   kind              city / county / municipality / school_district
+#   resident_base     what residents are taxed on:
+#                       wages      W-2 wages
+#                       earned     wages + self-employment income
+#                       taxable    state taxable income
+#                       state_tax  state tax (a surcharge, e.g. Yonkers)
+#   resident_rate     flat rate on that base, or
+#   brackets          "upper:rate;...;:rate" on that base (NYC)
+#   nonresident_base  / nonresident_rate: tax on people who work there
+#   zips              "19101-19155;19019": ZIP codes in the jurisdiction
+#
+# The table is compiled into locals/jurisdictions.bin: fixed-width
+# records sorted by code, a sorted (zip, record) index, bracket rows
+# and a name blob. The file is mmap'ed read-only, so workers share the
+# page cache instead of each holding thousands of objects, and lookups
+# bisect over the records without parsing anything. It is rebuilt when
+# the CSV changes (CRC in the header); `python -m
+# tax_engine.calculator.local_tax build` builds it ahead of time.
+#
+#   lookup("510101", "PA").resident_rate        0.0379
+#   by_zip("10025")                             [NY-NYC]
+#   local_taxes("PA", data, bases)              [{"code": ..., "tax": ...}]
+#
+# Where someone lives in one jurisdiction and works in another, the
+# residence credits the work-place tax on the same earnings, up to its
+# own tax (PA Act 32, Ohio municipal credit), simplified to 100%.
+#
+# ENVIRONMENT:
+#   TAXSKY_LOCAL_TABLE   path of the compiled table (default: next to
+#                        the CSV); point it at a writable location when
+#                        the package directory is read-only
+# ============================================================
+
+import csv
+import io
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCALS_DIR = os.path.join(os.path.dirname(__file__), "locals")
+SOURCE_PATH = os.path.join(LOCALS_DIR, "jurisdictions.csv")
+TABLE_PATH = os.getenv("TAXSKY_LOCAL_TABLE") or os.path.join(LOCALS_DIR, "jurisdictions.bin")
+
+KINDS = ("city", "county", "municipality", "school_district")
+BASES = ("", "wages", "earned", "taxable", "state_tax")  # index 0: not taxed
+
+_MAGIC = b"LTAX"
+_VERSION = 1
+_RATE_SCALE = 1_000_000  # rates stored as millionths (0.03078 -> 30780)
+_CODE_WIDTH = 16
+
+# magic, version, source crc, records, bracket rows, zip entries, name bytes
+_HEADER = struct.Struct("<4sHIIIII")
+# code, state, kind, resident base, nonresident base, bracket count,
+# bracket start, resident rate, nonresident rate, name offset, name length
+_RECORD = struct.Struct(f"<{_CODE_WIDTH}s2sBBBBHIIIH")
+_BRACKET = struct.Struct("<dd")  # upper (inf = no limit), rate
+_ZIP = struct.Struct("<II")      # zip, record index
+
+
+# ============================================================
+# JURISDICTION
+# ============================================================
+
+class LocalJurisdiction:
+    """One decoded table row."""
+
+    __slots__ = ("code", "state", "name", "kind", "resident_base", "resident_rate",
+                 "nonresident_base", "nonresident_rate", "brackets")
+
+    def __init__(self, code, state, name, kind, resident_base, resident_rate,
+                 nonresident_base, nonresident_rate, brackets):
+        self.code = code
+        self.state = state
+        self.name = name
+        self.kind = kind
+        self.resident_base = resident_base
+        self.resident_rate = resident_rate
+        self.nonresident_base = nonresident_base
+        self.nonresident_rate = nonresident_rate
+        self.brackets = brackets
+
+    def __repr__(self) -> str:
+        return f"<LocalJurisdiction {self.code} {self.name}>"
+
+    def base(self, resident: bool = True) -> str:
+        return self.resident_base if resident else self.nonresident_base
+
+    def tax(self, bases: Dict[str, float], resident: bool = True) -> float:
+        """Tax for a resident (or a nonresident working here) given {base name: amount}."""
+        base = self.base(resident)
+        if not base:
+            return 0
+        amount = bases.get(base) or 0
+        if not resident:
+            return amount * self.nonresident_rate
+        if not self.brackets:
+            return amount * self.resident_rate
+        tax, prev = 0, 0
+        for limit, rate in self.brackets:
+            if amount <= prev:
+                break
+            tax += (min(amount, limit) - prev) * rate
+            prev = limit
+        return tax
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "code": self.code, "state": self.state, "name": self.name, "kind": self.kind,
+            "resident_base": self.resident_base or None, "resident_rate": self.resident_rate,
+            "nonresident_base": self.nonresident_base or None, "nonresident_rate": self.nonresident_rate,
+            "brackets": [[None if u == float("inf") else u, r] for u, r in self.brackets] or None,
+        }
+
+
+# ============================================================
+# BUILD (CSV -> compiled table)
+# ============================================================
+
+def _zips(text: str) -> List[int]:
+    out = []
+    for part in filter(None, (p.strip() for p in text.split(";"))):
+        lo, _, hi = part.partition("-")
+        out.extend(range(int(lo), int(hi or lo) + 1))
+    return out
+
+
+def _rate(text: str) -> int:
+    return round(float(text) * _RATE_SCALE) if text else 0
+
+
+def _brackets_of(text: str) -> List[Tuple[float, float]]:
+    rows = []
+    for part in filter(None, (p.strip() for p in text.split(";"))):
+        upper, _, rate = part.partition(":")
+        rows.append((float(upper) if upper else float("inf"), float(rate)))
+    return rows
+
+
+def build_table(source: bytes) -> bytes:
+    """Compile the CSV source into the binary table."""
+    rows = sorted(csv.DictReader(io.StringIO(source.decode("utf-8"))), key=lambda r: r["code"].strip().upper())
+    records, brackets, zips, names = [], [], [], bytearray()
+    seen = set()
+    for index, row in enumerate(rows):
+        code = row["code"].strip().upper()
+        state = row["state"].strip().upper()
+        if code in seen:
+            raise ValueError(f"Duplicate local jurisdiction {code}")
+        if not code.startswith(state + "-") or len(code) > _CODE_WIDTH:
+            raise ValueError(f"Local code {code!r} must be '{state}-...' and at most {_CODE_WIDTH} characters")
+        seen.add(code)
+        kind = row["kind"].strip()
+        res_base, nonres_base = row["resident_base"].strip(), row["nonresident_base"].strip()
+        if kind not in KINDS or res_base not in BASES or nonres_base not in BASES:
+            raise ValueError(f"{code}: unknown kind or base")
+        table = _brackets_of(row["brackets"])
+        name = row["name"].strip().encode("utf-8")
+        records.append(_RECORD.pack(
+            code.encode("ascii"), state.encode("ascii"), KINDS.index(kind),
+            BASES.index(res_base), BASES.index(nonres_base), len(table), len(brackets),
+            _rate(row["resident_rate"]), _rate(row["nonresident_rate"]), len(names), len(name),
+        ))
+        brackets.extend(_BRACKET.pack(u, r) for u, r in table)
+        zips.extend((z, index) for z in _zips(row["zips"]))
+        names += name
+    zips.sort()
+    header = _HEADER.pack(_MAGIC, _VERSION, zlib.crc32(source), len(records), len(brackets), len(zips), len(names))
+    return b"".join((header, *records, *brackets, *(_ZIP.pack(z, i) for z, i in zips), bytes(names)))
+
+
+def write_table(path: str = TABLE_PATH, source_path: str = SOURCE_PATH) -> str:
+    """Build the table from the CSV and write it atomically; returns the path."""
+    with open(source_path, "rb") as f:
+        data = build_table(f.read())
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+# ============================================================
+# READ (mmap'ed table)
+# ============================================================
+
+class LocalTable:
+    """Read-only view of the compiled table (an mmap, or bytes when it couldn't be written)."""
+
+    __slots__ = ("buf", "count", "_records", "_brackets", "_zips", "_zip_count", "_names")
+
+    def __init__(self, buf):
+        magic, version, _, count, n_brackets, n_zips, _ = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a local tax table (or an old version)")
+        self.buf = buf
+        self.count = count
+        self._records = _HEADER.size
+        self._brackets = self._records + count * _RECORD.size
+        self._zips = self._brackets + n_brackets * _BRACKET.size
+        self._zip_count = n_zips
+        self._names = self._zips + n_zips * _ZIP.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _code_at(self, i: int) -> bytes:
+        start = self._records + i * _RECORD.size
+        return self.buf[start:start + _CODE_WIDTH]
+
+    def _zip_at(self, i: int) -> int:
+        return _ZIP.unpack_from(self.buf, self._zips + i * _ZIP.size)[0]
+
+    def record(self, i: int) -> LocalJurisdiction:
+        (code, state, kind, res_base, nonres_base, n_brackets, first_bracket,
+         res_rate, nonres_rate, name_at, name_len) = _RECORD.unpack_from(self.buf, self._records + i * _RECORD.size)
+        name_at += self._names
+        brackets = tuple(_BRACKET.unpack_from(self.buf, self._brackets + (first_bracket + k) * _BRACKET.size)
+                         for k in range(n_brackets))
+        return LocalJurisdiction(
+            code.rstrip(b"\0").decode("ascii"), state.decode("ascii"),
+            bytes(self.buf[name_at:name_at + name_len]).decode("utf-8"), KINDS[kind],
+            BASES[res_base], res_rate / _RATE_SCALE, BASES[nonres_base], nonres_rate / _RATE_SCALE, brackets,
+        )
+
+    def find(self, code: str) -> Optional[LocalJurisdiction]:
+        key = code.encode("ascii", "replace").ljust(_CODE_WIDTH, b"\0")[:_CODE_WIDTH]
+        i = _search(self.count, self._code_at, key)
+        return self.record(i) if i < self.count and self._code_at(i) == key else None
+
+    def find_zip(self, zip_code: int) -> List[LocalJurisdiction]:
+        i = _search(self._zip_count, self._zip_at, zip_code)
+        out = []
+        while i < self._zip_count:
+            z, index = _ZIP.unpack_from(self.buf, self._zips + i * _ZIP.size)
+            if z != zip_code:
+                break
+            out.append(self.record(index))
+            i += 1
+        return out
+
+    def __iter__(self):
+        return (self.record(i) for i in range(self.count))
+
+
+def _search(count: int, key_at, key) -> int:
+    """First index whose key is >= key (bisect_left over an accessor)."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key_at(mid) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _open_table() -> LocalTable:
+    source = None
+    if os.path.exists(SOURCE_PATH):
+        with open(SOURCE_PATH, "rb") as f:
+            source = f.read()
+    crc = zlib.crc32(source) if source is not None else None
+
+    for attempt in range(2):
+        try:
+            with open(TABLE_PATH, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if crc is None or _HEADER.unpack_from(buf, 0)[2] == crc:
+                return LocalTable(buf)
+            buf.close()
+        except (OSError, ValueError, struct.error):
+            pass
+        if attempt or source is None:
+            break
+        try:
+            write_table(TABLE_PATH, SOURCE_PATH)
+            logger.info("Built local tax table %s", TABLE_PATH)
+        except OSError as e:
+            logger.warning("Local tax table not written (%s); keeping it in memory", e)
+            break
+
+    if source is None:
+        raise RuntimeError(f"No local tax table at {TABLE_PATH} and no source at {SOURCE_PATH}")
+    return LocalTable(build_table(source))
+
+
+_table: Optional[LocalTable] = None
+_table_lock = threading.Lock()
+
+
+def get_table() -> LocalTable:
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _open_table()
+    return _table
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+def lookup(code: str, state: Optional[str] = None) -> Optional[LocalJurisdiction]:
+    """Jurisdiction by table code ("PA-510101"), or by local code with its state ("510101", "PA")."""
+    code = str(code or "").upper().strip()
+    if state and not code.startswith(state.upper() + "-"):
+        code = f"{state.upper()}-{code}"
+    return get_table().find(code)
+
+
+def by_zip(zip_code: Any, state: Optional[str] = None) -> List[LocalJurisdiction]:
+    """Jurisdictions covering a ZIP code (ZIP+4 accepted), optionally one state's only."""
+    digits = str(zip_code or "").strip()[:5]
+    if len(digits) != 5 or not digits.isdigit():
+        return []
+    found = get_table().find_zip(int(digits))
+    return [j for j in found if not state or j.state == state.upper()]
+
+
+def _codes(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [c for c in (p.strip() for p in value.split(",")) if c]
+    return [str(c) for c in value if c]
+
+
+def _resolve(state: str, codes: Iterable[str], zip_code: Any, errors: List[Dict[str, Any]]) -> List[LocalJurisdiction]:
+    found: Dict[str, LocalJurisdiction] = {}
+    for code in codes:
+        j = lookup(code, state)
+        if j is None:
+            errors.append({"code": code, "error": f"Unknown {state} local jurisdiction"})
+        else:
+            found.setdefault(j.code, j)
+    if not found and zip_code:
+        by_kind: Dict[str, List[LocalJurisdiction]] = {}
+        for j in by_zip(zip_code, state):
+            by_kind.setdefault(j.kind, []).append(j)
+        for kind, matches in by_kind.items():
+            if len(matches) == 1:
+                found.setdefault(matches[0].code, matches[0])
+            else:
+                errors.append({"zip": str(zip_code), "error": f"ZIP spans several {kind} jurisdictions; "
+                                                               f"give local_jurisdiction ({', '.join(j.code for j in matches)})"})
+    return list(found.values())
+
+
+# ============================================================
+# CALCULATION
+# ============================================================
+
+def earnings(data: Dict[str, Any]) -> Tuple[float, float]:
+    """(wages, wages + self-employment income) from calculator input."""
+    wages = data.get("wages")
+    if wages is None:
+        wages = (data.get("taxpayer_wages") or 0) + (data.get("spouse_wages") or 0)
+    wages = float(wages or 0)
+    return wages, wages + float(data.get("self_employment_income") or 0)
+
+
+def local_taxes(state: str, data: Dict[str, Any], bases: Dict[str, float],
+                residence: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Local taxes for one state's return. Jurisdictions come from
+    data["local_jurisdiction"] (code or list of codes, PSD / county /
+    city) or else data["zip"], plus `residence` codes the state module
+    derives from its own flags (is_nyc, is_philadelphia);
+    data["work_jurisdiction"] / ["work_zip"] add the work-place tax.
+    bases: {"wages", "earned", "taxable", "state_tax"} amounts.
+
+    Entries carry the unrounded tax; lookup problems come back as
+    entries with an "error" and no tax rather than failing the return.
+    """
+    state = state.upper()
+    errors: List[Dict[str, Any]] = []
+    home = _resolve(state, [*residence, *_codes(data.get("local_jurisdiction"))], data.get("zip"), errors)
+    work = [j for j in _resolve(state, _codes(data.get("work_jurisdiction")), data.get("work_zip"), errors)
+            if j.code not in {h.code for h in home} and j.nonresident_base]
+
+    entries = []
+    for j, resident in [(j, True) for j in home] + [(j, False) for j in work]:
+        base = j.base(resident)
+        entries.append({
+            "code": j.code, "name": j.name, "kind": j.kind, "resident": resident,
+            "base": base or None, "base_amount": (bases.get(base) or 0) if base else 0,
+            "rate": None if resident and j.brackets else (j.resident_rate if resident else j.nonresident_rate),
+            "tax": j.tax(bases, resident), "credit": 0,
+        })
+
+    # Residence credits work-place tax on the same earnings, up to its own tax
+    paid_elsewhere = sum(e["tax"] for e in entries if not e["resident"])
+    for e in entries:
+        if paid_elsewhere <= 0:
+            break
+        if e["resident"] and e["base"] in ("wages", "earned"):
+            e["credit"] = min(e["tax"], paid_elsewhere)
+            e["tax"] -= e["credit"]
+            paid_elsewhere -= e["credit"]
+    if errors:
+        logger.info("%s local tax lookup: %s", state, errors)
+    return entries + [dict(e, tax=0) for e in errors]
+
+
+def summarize(entries: List[Dict[str, Any]], money) -> List[Dict[str, Any]]:
+    """Entries for a result dict, amounts rounded with the state module's money()."""
+    return [dict(e, **{k: money(e[k]) for k in ("base_amount", "tax", "credit") if k in e}) for e in entries]
+
+
+__all__ = [
+    "KINDS",
+    "BASES",
+    "SOURCE_PATH",
+    "TABLE_PATH",
+    "LocalJurisdiction",
+    "LocalTable",
+    "build_table",
+    "write_table",
+    "get_table",
+    "lookup",
+    "by_zip",
+    "earnings",
+    "local_taxes",
+    "summarize",
+]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        print(write_table())
+    else:
+        for j in get_table():
+            print(f"{j.code:16} {j.kind:16} {j.name}")
@@ -263,11 +263,11 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     line_7 = num_personal * PERSONAL_EXEMPTION
     
     # Line 8: Blind exemption
-    num_blind = int(safe_float(data.get("num_blind") or data.get("blind") or 0))
+    num_blind = data.get("num_blind", 0)
     line_8 = num_blind * PERSONAL_EXEMPTION
     
     # Line 9: Senior exemption (65+)
-    num_senior = int(safe_float(data.get("num_senior") or data.get("senior") or 0))
+    num_senior = data.get("num_senior", 0)
     line_9 = num_senior * PERSONAL_EXEMPTION
     
     # Line 10: Dependent exemption
@@ -362,7 +362,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     line_33 = max(0, line_31 - line_32)
     
     # Line 34: Additional tax (Schedule G-1, FTB 5870A) - usually $0
-    line_34 = safe_float(data.get("additional_tax") or data.get("line_34") or 0)
+    line_34 = data.get("additional_tax", 0.0)
     
     # Line 35: Total (Line 33 + Line 34)
     line_35 = line_33 + line_34
@@ -401,7 +401,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     # OTHER TAXES (Form 540, Lines 61-64)
     # ============================================================
     # Line 61: Alternative Minimum Tax
-    line_61 = safe_float(data.get("amt") or data.get("alternative_minimum_tax") or 0)
+    line_61 = data.get("amt", 0.0)
     
     # Line 62: BEHAVIORAL HEALTH SERVICES TAX
     # ⚠️ CRITICAL: Only applies to taxable income OVER $1,000,000!
@@ -411,7 +411,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
         line_62 = 0  # MUST be $0 for income under $1M!
     
     # Line 63: Other taxes (credit recapture, etc.)
-    line_63 = safe_float(data.get("other_taxes") or data.get("credit_recapture") or 0)
+    line_63 = data.get("other_taxes", 0.0)
     
     # Line 64: TOTAL TAX
     line_64 = line_48 + line_61 + line_62 + line_63
@@ -444,18 +444,12 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     # Line 72: Estimated tax payments
     line_72 = safe_float(
         data.get("estimated_payments") or
-        data.get("estimated_tax_payments") or
         data.get("ca_estimated_payments") or
         0
     )
     
     # Line 73: Other withholding (Form 592-B, 593)
-    line_73 = safe_float(
-        data.get("other_withholding") or
-        data.get("form_592b") or
-        data.get("form_593") or
-        0
-    )
+    line_73 = data.get("other_withholding", 0.0)
     
     # Line 74: Motion Picture Credit (refundable)
     line_74 = safe_float(data.get("motion_picture_credit") or 0)
@@ -470,8 +464,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     )
     
     num_children = int(safe_float(
-        data.get("qualifying_children_under_17") or 
-        data.get("children_under_17") or
+        data.get("qualifying_children_under_17") or
         data.get("num_children") or
         0
     ))
@@ -489,7 +482,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     line_76 = calculate_yctc(has_child_under_6, line_75)
     
     # Line 77: Foster Youth Tax Credit
-    line_77 = safe_float(data.get("fytc") or data.get("foster_youth_credit") or 0)
+    line_77 = data.get("fytc", 0.0)
     
     # Line 78: Total Payments
     line_78 = line_71 + line_72 + line_73 + line_74 + line_75 + line_76 + line_77
@@ -70,6 +70,8 @@ A: 10.9% state rate (over $25M income), plus 3.876% for NYC residents = 14.776%
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, Any
 
+from ..local_tax import earnings, local_taxes, lookup, summarize
+
 # ============================================================
 # STATE INFO
 # ============================================================
@@ -137,16 +139,15 @@ TAX_BRACKETS = {
     ]
 }
 
+# NYC and Yonkers come from the local tax table (calculator/local_tax.py)
+NYC = lookup("NY-NYC")
+YONKERS = lookup("NY-YONKERS")
+
 # NYC Tax Brackets (same for all filing statuses)
-NYC_TAX_BRACKETS = [
-    (12000, 0.03078),
-    (25000, 0.03762),
-    (50000, 0.03819),
-    (float('inf'), 0.03876)
-]
+NYC_TAX_BRACKETS = list(NYC.brackets)
 
 # Yonkers surcharge
-YONKERS_SURCHARGE_RATE = 0.1675  # 16.75% of NY state tax
+YONKERS_SURCHARGE_RATE = YONKERS.resident_rate  # 16.75% of NY state tax
 
 # Empire State Child Credit
 CHILD_CREDIT_MAX = 330
@@ -195,6 +196,8 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     Optional:
     - is_nyc: bool (NYC resident)
     - is_yonkers: bool (Yonkers resident)
+    - local_jurisdiction / zip: NY-NYC, NY-YONKERS (instead of the flags)
+    - work_jurisdiction: NY-YONKERS (nonresident earnings tax)
     - num_children: int
     """
     fs = normalize_filing_status(data.get("filing_status", "single"))
@@ -214,17 +217,15 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     # State tax from brackets
     state_tax = calculate_bracket_tax(taxable_income, TAX_BRACKETS.get(fs, TAX_BRACKETS["single"]))
     
-    # NYC tax (if NYC resident)
-    is_nyc = data.get("is_nyc", False)
-    nyc_tax = 0
-    if is_nyc:
-        nyc_tax = calculate_bracket_tax(taxable_income, NYC_TAX_BRACKETS)
-    
-    # Yonkers tax (if Yonkers resident)
-    is_yonkers = data.get("is_yonkers", False)
-    yonkers_tax = 0
-    if is_yonkers:
-        yonkers_tax = state_tax * YONKERS_SURCHARGE_RATE
+    # Local tax: NYC (brackets on NY taxable income), Yonkers (surcharge on state tax)
+    residence = [j.code for j, flag in ((NYC, "is_nyc"), (YONKERS, "is_yonkers")) if data.get(flag)]
+    wages, earned = earnings(data)
+    local = local_taxes(STATE_CODE, data, {"taxable": taxable_income, "state_tax": state_tax,
+                                           "wages": wages, "earned": earned}, residence)
+    is_nyc = any(e.get("code") == NYC.code and e["resident"] for e in local)
+    is_yonkers = any(e.get("code") == YONKERS.code and e["resident"] for e in local)
+    nyc_tax = money(sum(e["tax"] for e in local if e.get("code") == NYC.code))
+    yonkers_tax = sum(e["tax"] for e in local if e.get("code") == YONKERS.code)
     
     # Total tax
     total_tax = state_tax + nyc_tax + yonkers_tax
@@ -255,6 +256,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
         "state_tax": money(state_tax),
         "nyc_tax": money(nyc_tax),
         "yonkers_tax": money(yonkers_tax),
+        "local_taxes": summarize(local, money),
         "total_tax": money(total_tax),
         
         # Credits
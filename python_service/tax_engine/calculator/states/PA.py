@@ -75,6 +75,8 @@ A: Philadelphia has a 3.79% wage tax for residents (3.44% for non-residents work
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, Any
 
+from ..local_tax import local_taxes, lookup, summarize
+
 # ============================================================
 # STATE INFO
 # ============================================================
@@ -104,9 +106,11 @@ PERSONAL_EXEMPTION = 0
 LOCAL_EIT_MIN = 0.005  # 0.5%
 LOCAL_EIT_MAX = 0.031  # 3.1%
 
-# Philadelphia wage tax
-PHILADELPHIA_RESIDENT_RATE = 0.0379  # 3.79%
-PHILADELPHIA_NONRESIDENT_RATE = 0.0344  # 3.44%
+# Philadelphia wage tax; PSD codes and their EIT rates are in the
+# local tax table (calculator/local_tax.py)
+PHILADELPHIA = lookup("PA-510101")
+PHILADELPHIA_RESIDENT_RATE = PHILADELPHIA.resident_rate  # 3.79%
+PHILADELPHIA_NONRESIDENT_RATE = PHILADELPHIA.nonresident_rate  # 3.44%
 
 # Tax Forgiveness thresholds (2025)
 TAX_FORGIVENESS = {
@@ -153,6 +157,8 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     - social_security_benefits: float (exempt)
     - is_philadelphia: bool
     - local_eit_rate: float (0.005 to 0.031)
+    - local_jurisdiction / zip: PSD code ("510101" or "PA-510101")
+    - work_jurisdiction / work_zip: PSD code where the wages are earned
     - num_dependents: int (for tax forgiveness)
     """
     fs = normalize_filing_status(data.get("filing_status", "single"))
@@ -160,8 +166,8 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     # Get income components
     federal_agi = data.get("federal_agi") or data.get("agi") or 0
     wages = data.get("wages") or data.get("compensation") or 0
-    interest = data.get("interest_income") or data.get("interest") or 0
-    dividends = data.get("dividend_income") or data.get("dividends") or 0
+    interest = data.get("interest_income") or 0
+    dividends = data.get("dividend_income") or 0
     capital_gains = data.get("capital_gains") or data.get("net_gains") or 0
     self_employment = data.get("self_employment_income") or data.get("net_profits") or 0
     other_income = data.get("other_income") or 0
@@ -205,10 +211,16 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
     local_eit_rate = data.get("local_eit_rate", 0)
     
     local_tax = 0
-    if is_philadelphia:
-        local_tax = wages * PHILADELPHIA_RESIDENT_RATE
-    elif local_eit_rate > 0:
+    local = []
+    if local_eit_rate > 0 and not is_philadelphia:
         local_tax = wages * local_eit_rate
+    else:
+        local = local_taxes(STATE_CODE, data, {
+            "wages": wages, "earned": wages + self_employment,
+            "taxable": pa_taxable_income, "state_tax": max(0, state_tax - forgiveness_credit),
+        }, [PHILADELPHIA.code] if is_philadelphia else ())
+        local_tax = sum(e["tax"] for e in local)
+        is_philadelphia = any(e.get("code") == PHILADELPHIA.code and e["resident"] for e in local)
     
     # ===== TOTAL TAX =====
     total_state_tax = max(0, state_tax - forgiveness_credit)
@@ -250,6 +262,7 @@ def calculate(data: Dict[str, Any]) -> Dict[str, Any]:
         "local_tax": money(local_tax),
         "is_philadelphia": is_philadelphia,
         "local_eit_rate": local_eit_rate,
+        "local_taxes": summarize(local, money),
         
         # Total
         "total_tax": money(total_tax),
@@ -0,0 +1,245 @@
+# states/spec_engine.py
+# ============================================================
+# SPEC STATES - one engine for the data-only states
+# ============================================================
+# Most states apply a standard deduction, exemptions and a flat rate
+# or bracket table to federal AGI and differ only in the numbers.
+# Those states are described in specs/XX.json and compiled here once,
+# at import, into SpecState objects: per filing status a standard
+# deduction, personal exemption total and bracket table with the tax
+# below each bracket precomputed. States with rules of their own
+# (CA, NY, NJ, PA, IL, GA, NC) stay plug-in modules in this package.
+#
+# A SpecState has the same surface as a state module (STATE_CODE,
+# STATE_NAME, TAX_BRACKETS, ..., calculate(data), get_rag_context(),
+# answer_question(q)), and load_state(code) returns whichever a state
+# has, so state_router and state_registry treat both alike.
+#
+# Spec keys:
+#   state, name, full_name, tax_year, form, tax_type, notes
+#   rate                    flat states
+#   brackets                progressive: {filing status: [[upper, rate], ...]},
+#                           upper null = no limit
+#   standard_deduction      {filing status: amount}
+#   personal_exemption      per person (x2 for MFJ), or {filing status: total}
+#   dependent_exemption     per dependent
+#   federal_tax_deduction   {"max_share_of_agi": r}: federal tax paid is
+#                           deductible, up to r x federal AGI
+#   surtax                  {"threshold": t, "rate": r}: r on taxable income over t
+#   local_tax               true: county / city / school district tax from
+#                           the local tax table (calculator/local_tax.py)
+#                           when the input names a jurisdiction or ZIP
+# ============================================================
+
+import json
+import logging
+import os
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+from importlib import import_module
+from math import floor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..local_tax import earnings, local_taxes, summarize
+
+logger = logging.getLogger(__name__)
+
+SPEC_DIR = os.path.join(os.path.dirname(__file__), "specs")
+
+FILING_STATUSES = ("single", "married_filing_jointly", "married_filing_separately", "head_of_household")
+_SHORT_STATUS = {"s": "single", "mfj": "married_filing_jointly", "mfs": "married_filing_separately",
+                 "hoh": "head_of_household"}
+
+_CENT = Decimal("0.01")
+
+
+def money(amount) -> float:
+    """
+    Round half up to cents, as Decimal(str(amount)).quantize(...) does.
+    That only differs from round(x, 2) when x is the float nearest a
+    half cent ((2n + 1) / 200, which int division rounds exactly);
+    everything else skips the Decimal round trip.
+    """
+    x = float(amount)
+    if -1e12 < x < 1e12:
+        n = floor(x * 100)
+        if (2 * n + 1) / 200 != x:
+            return round(x, 2)
+    return float(Decimal(str(amount)).quantize(_CENT, rounding=ROUND_HALF_UP))
+
+
+def normalize_filing_status(status) -> str:
+    if not status: return "single"
+    s = str(status).lower().replace(" ", "_").replace("-", "_")
+    return _SHORT_STATUS.get(s, s if s in FILING_STATUSES else "single")
+
+
+def _rate_text(rate: float) -> str:
+    return f"{round(rate * 100, 4):g}"
+
+
+class SpecState:
+    """One state compiled from its spec; behaves like a states/XX.py module."""
+
+    HAS_INCOME_TAX = True
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.STATE_CODE = spec["state"]
+        self.STATE_NAME = spec["name"]
+        self.STATE_FULL_NAME = spec.get("full_name") or f"State of {spec['name']}"
+        self.TAX_YEAR = spec.get("tax_year", 2025)
+        self.TAX_TYPE = spec["tax_type"]
+        self.FORM = spec["form"]
+        self.NOTES = spec.get("notes", "")
+
+        self.STANDARD_DEDUCTION = {fs: spec["standard_deduction"][fs] for fs in FILING_STATUSES}
+        pe = spec.get("personal_exemption", 0)
+        self.PERSONAL_EXEMPTION = dict(pe) if isinstance(pe, dict) else pe
+        self.DEPENDENT_EXEMPTION = spec.get("dependent_exemption", 0)
+
+        if self.TAX_TYPE == "flat":
+            self.FLAT_TAX_RATE = spec["rate"]
+            self.TAX_BRACKETS = None
+        else:
+            self.FLAT_TAX_RATE = None
+            self.TAX_BRACKETS = {
+                fs: [(float("inf") if upper is None else upper, rate) for upper, rate in spec["brackets"][fs]]
+                for fs in FILING_STATUSES
+            }
+
+        fed = spec.get("federal_tax_deduction")
+        self.FEDERAL_TAX_DEDUCTION = fed["max_share_of_agi"] if fed else None
+        surtax = spec.get("surtax")
+        self.SURTAX = (surtax["threshold"], surtax["rate"]) if surtax else None
+        self.LOCAL_TAX = bool(spec.get("local_tax"))
+
+        # Per filing status: (standard deduction, personal exemptions, floors, (floor, rate, tax below))
+        self._by_status = {fs: self._compile(fs) for fs in FILING_STATUSES}
+
+    def _compile(self, fs: str) -> Tuple[float, float, Tuple[float, ...], Tuple[Tuple[float, float, float], ...]]:
+        pe = self.PERSONAL_EXEMPTION
+        if isinstance(pe, dict):
+            personal = pe[fs]
+        else:
+            personal = (2 if fs == "married_filing_jointly" else 1) * pe
+        if self.TAX_BRACKETS is None:
+            table = ((0, self.FLAT_TAX_RATE, 0),)
+        else:
+            rows: List[Tuple[float, float, float]] = []
+            tax, prev = 0, 0
+            for limit, rate in self.TAX_BRACKETS[fs]:
+                rows.append((prev, rate, tax))
+                if limit != float("inf"):
+                    tax += (limit - prev) * rate
+                prev = limit
+            table = tuple(rows)
+        return self.STANDARD_DEDUCTION[fs], personal, tuple(r[0] for r in table), table
+
+    def __repr__(self) -> str:
+        return f"<SpecState {self.STATE_CODE} {self.TAX_YEAR}>"
+
+    def tax_on(self, taxable_income: float, fs: str) -> float:
+        _, _, floors, table = self._by_status[fs]
+        if taxable_income <= 0:
+            return 0
+        start, rate, below = table[bisect_right(floors, taxable_income) - 1]
+        tax = below + (taxable_income - start) * rate
+        if self.SURTAX and taxable_income > self.SURTAX[0]:
+            tax += (taxable_income - self.SURTAX[0]) * self.SURTAX[1]
+        return tax
+
+    def calculate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        fs = normalize_filing_status(data.get("filing_status", "single"))
+        std_ded, personal, _, _ = self._by_status[fs]
+        federal_agi = float(data.get("federal_agi") or data.get("agi") or 0)
+        state_agi = federal_agi
+
+        if self.FEDERAL_TAX_DEDUCTION is not None:
+            federal_tax = float(data.get("federal_tax") or 0)
+            state_agi = max(0, state_agi - min(federal_tax, federal_agi * self.FEDERAL_TAX_DEDUCTION))
+
+        num_deps = int(data.get("num_dependents") or 0) + int(data.get("qualifying_children_under_17") or 0)
+        total_exemptions = personal + (num_deps * self.DEPENDENT_EXEMPTION)
+
+        taxable_income = max(0, state_agi - std_ded - total_exemptions)
+        state_tax = self.tax_on(taxable_income, fs)
+
+        local_tax, local = 0, None
+        if self.LOCAL_TAX:
+            wages, earned = earnings(data)
+            local = local_taxes(self.STATE_CODE, data, {"wages": wages, "earned": earned,
+                                                         "taxable": taxable_income, "state_tax": state_tax})
+            local_tax = sum(e["tax"] for e in local)
+
+        withholding = float(data.get("state_withholding") or 0)
+        balance = withholding - state_tax - local_tax
+
+        result = {
+            "state": self.STATE_CODE, "state_name": self.STATE_NAME, "filing_status": fs,
+            "form": self.FORM, "has_income_tax": True, "tax_type": self.TAX_TYPE,
+        }
+        if self.FLAT_TAX_RATE is not None:
+            result["tax_rate"] = self.FLAT_TAX_RATE
+        tax = money(state_tax)
+        result.update({
+            "federal_agi": money(federal_agi), "standard_deduction": money(std_ded),
+            "exemptions": money(total_exemptions), "taxable_income": money(taxable_income),
+            "base_tax": tax, "state_tax": tax, "total_tax": money(state_tax + local_tax) if local_tax else tax,
+            "withholding": money(withholding), "refund": money(max(0, balance)), "amount_owed": money(max(0, -balance)),
+            "effective_rate": round((state_tax / federal_agi * 100) if federal_agi > 0 else 0, 2),
+            "notes": self.NOTES,
+        })
+        if local is not None:
+            result["local_tax"] = money(local_tax)
+            result["local_taxes"] = summarize(local, money)
+        return result
+
+    def get_rag_context(self) -> str:
+        if self.FLAT_TAX_RATE is not None:
+            sd = self.STANDARD_DEDUCTION
+            return (f"{self.STATE_NAME} Tax {self.TAX_YEAR}: Flat {_rate_text(self.FLAT_TAX_RATE)}% rate. "
+                    f"Std ded: Single ${sd['single']:,}, MFJ ${sd['married_filing_jointly']:,}. {self.NOTES}")
+        return f"{self.STATE_NAME} Tax {self.TAX_YEAR}: Progressive tax. {self.NOTES}"
+
+    def answer_question(self, q) -> str:
+        if self.FLAT_TAX_RATE is not None:
+            return f"{self.STATE_NAME} has a flat {_rate_text(self.FLAT_TAX_RATE)}% income tax rate."
+        return f"{self.STATE_NAME} has progressive income tax."
+
+
+# ============================================================
+# COMPILE (once, at import)
+# ============================================================
+
+def _load_specs() -> Dict[str, SpecState]:
+    states: Dict[str, SpecState] = {}
+    for name in sorted(os.listdir(SPEC_DIR)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(SPEC_DIR, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = SpecState(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("State spec %s not loaded: %s", name, e)
+            continue
+        states[state.STATE_CODE] = state
+    return states
+
+
+SPEC_STATES: Dict[str, SpecState] = _load_specs()
+
+
+def load_state(state_code: str) -> Optional[Any]:
+    """Plug-in module states/XX.py if the state has one, else its compiled spec, else None."""
+    try:
+        module = import_module(f".{state_code}", __package__)
+        if hasattr(module, "calculate"):
+            return module
+    except ImportError:
+        pass
+    return SPEC_STATES.get(state_code)
+
+
+__all__ = ["SPEC_DIR", "SPEC_STATES", "SpecState", "load_state", "money", "normalize_filing_status"]
@@ -0,0 +1,247 @@
+# tax_engine/calculator/tax_params.py
+# ============================================================
+# TAX PARAMETER STORE - tables by (jurisdiction, tax year)
+# ============================================================
+# Year-specific amounts (brackets, standard deductions, credit and
+# contribution limits) live in tax_years/<JURISDICTION>_<YEAR>.json,
+# one file per jurisdiction and year:
+#
+#   US_2024.json  US_2025.json  US_2026.json    federal (FederalParams)
+#   CA_2024.json  CA_2025.json                  CA Form 540 values
+#
+# A year may start from another with "extends": <year>; its own keys
+# are merged over the base year's (nested objects key by key, lists
+# replaced whole), so a new year only lists what changed.
+#
+# Tables are compiled on first use and cached per (jurisdiction,
+# year), so returns for different years can be calculated side by
+# side and switching year is one dict lookup, not a rebuild:
+#
+#   federal_params(2024).standard_deduction["single"]     14600
+#   get_params("CA", 2025)["personal_exemption"]          153
+#   tax_years("US")                                       (2024, 2025, 2026)
+#
+# Federal tables compile to FederalParams (bracket floors and the tax
+# below each floor precomputed, like the state specs); other
+# jurisdictions to a read-only mapping of the file. Compiled tables
+# are read-only and shared between threads.
+# ============================================================
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TAX_YEARS_DIR = os.path.join(os.path.dirname(__file__), "tax_years")
+DEFAULT_TAX_YEAR = 2025
+
+FEDERAL = "US"
+
+
+# ============================================================
+# RAW TABLES
+# ============================================================
+
+def _scan() -> Dict[Tuple[str, int], str]:
+    files = {}
+    for name in sorted(os.listdir(TAX_YEARS_DIR)):
+        stem, ext = os.path.splitext(name)
+        jurisdiction, _, year = stem.partition("_")
+        if ext == ".json" and year.isdigit():
+            files[(jurisdiction.upper(), int(year))] = os.path.join(TAX_YEARS_DIR, name)
+    return files
+
+
+_FILES: Dict[Tuple[str, int], str] = _scan()
+
+
+def _merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            value = _merge(out[key], value)
+        out[key] = value
+    return out
+
+
+def _raw(jurisdiction: str, tax_year: int, seen: Tuple[int, ...] = ()) -> Dict[str, Any]:
+    path = _FILES.get((jurisdiction, tax_year))
+    if path is None:
+        available = [y for j, y in sorted(_FILES) if j == jurisdiction]
+        raise ValueError(f"No {jurisdiction} tax parameters for {tax_year}; available: {available}")
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    base_year = table.pop("extends", None)
+    if base_year is not None:
+        if base_year in seen:
+            raise ValueError(f"{jurisdiction} {tax_year}: circular 'extends'")
+        table = _merge(_raw(jurisdiction, base_year, seen + (tax_year,)), table)
+        table["tax_year"] = tax_year
+    return table
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# ============================================================
+# FEDERAL
+# ============================================================
+
+def _brackets(rows) -> Tuple[Tuple[float, float], ...]:
+    return tuple((float("inf") if upper is None else upper, rate) for upper, rate in rows)
+
+
+def _obbb(table: Dict[str, Any], key: str, tax_year: int) -> Optional[Mapping[str, Any]]:
+    """OBBB provision for tax_year, None when the year isn't one it covers."""
+    provision = table.get(key)
+    if provision is None or tax_year not in provision.get("years", ()):
+        return None
+    return _freeze(provision)
+
+
+class FederalParams:
+    """One tax year's federal tables, read-only. Names follow the old calculator.py constants."""
+
+    __slots__ = (
+        "tax_year", "notes",
+        "standard_deduction", "additional_std_ded", "brackets", "ltcg_brackets",
+        "ctc_amount", "ctc_refundable_max", "ctc_other_dependent", "ctc_phase_out_single",
+        "ctc_phase_out_mfj", "ctc_refundability_threshold", "ctc_refundability_rate",
+        "eitc", "se_tax_rate", "se_income_multiplier", "ss_wage_base",
+        "ira_limit", "ira_catch_up", "ira_deduction_limits", "spouse_ira_limits_mfj",
+        "hsa_limit_self", "hsa_limit_family", "hsa_catch_up", "k401_limit", "k401_catch_up", "student_loan_max",
+        "no_tax_on_tips", "no_tax_on_overtime", "car_loan_interest", "senior_bonus",
+        "_ordinary",
+    )
+
+    def __init__(self, table: Dict[str, Any]):
+        year = table["tax_year"]
+        ctc, se, ira, hsa = table["child_tax_credit"], table["self_employment"], table["ira"], table["hsa"]
+        k401 = table["k401"]
+        eitc = table["eitc"]
+        brackets = {fs: _brackets(rows) for fs, rows in table["brackets"].items()}
+        values = {
+            "tax_year": year,
+            "notes": table.get("notes", ""),
+            "standard_deduction": MappingProxyType(dict(table["standard_deduction"])),
+            "additional_std_ded": MappingProxyType(dict(table["additional_standard_deduction"])),
+            "brackets": MappingProxyType(brackets),
+            "ltcg_brackets": MappingProxyType({fs: _brackets(rows) for fs, rows in table["ltcg_brackets"].items()}),
+            "ctc_amount": ctc["amount"],
+            "ctc_refundable_max": ctc["refundable_max"],
+            "ctc_other_dependent": ctc["other_dependent"],
+            "ctc_phase_out_single": ctc["phase_out_single"],
+            "ctc_phase_out_mfj": ctc["phase_out_mfj"],
+            "ctc_refundability_threshold": ctc["refundability_threshold"],
+            "ctc_refundability_rate": ctc["refundability_rate"],
+            # children counts are JSON strings; the calculator looks them up by int
+            "eitc": MappingProxyType({
+                key: MappingProxyType({int(n): _freeze(p) for n, p in value.items()}) if isinstance(value, dict) else value
+                for key, value in eitc.items()
+            }),
+            "se_tax_rate": se["tax_rate"],
+            "se_income_multiplier": se["income_multiplier"],
+            "ss_wage_base": se["ss_wage_base"],
+            "ira_limit": ira["limit"],
+            "ira_catch_up": ira["catch_up"],
+            "ira_deduction_limits": _freeze(ira["deduction_limits"]),
+            "spouse_ira_limits_mfj": _freeze(ira["spouse_limits_mfj"]),
+            "hsa_limit_self": hsa["limit_self"],
+            "hsa_limit_family": hsa["limit_family"],
+            "hsa_catch_up": hsa["catch_up"],
+            "k401_limit": k401["limit"],
+            "k401_catch_up": k401["catch_up"],
+            "student_loan_max": table["student_loan_max"],
+            "no_tax_on_tips": _obbb(table, "no_tax_on_tips", year),
+            "no_tax_on_overtime": _obbb(table, "no_tax_on_overtime", year),
+            "car_loan_interest": _obbb(table, "car_loan_interest", year),
+            "senior_bonus": _obbb(table, "senior_bonus", year),
+            # Per filing status: (floors, ((floor, rate, tax below floor), ...))
+            "_ordinary": MappingProxyType({fs: _compile(rows) for fs, rows in brackets.items()}),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FederalParams is read-only")
+
+    def __repr__(self) -> str:
+        return f"FederalParams({self.tax_year})"
+
+    def ordinary_tax(self, taxable_income: float, filing_status: str) -> float:
+        """Regular tax on ordinary taxable income (unknown status: single brackets)."""
+        if taxable_income <= 0:
+            return 0
+        floors, rows = self._ordinary.get(filing_status) or self._ordinary["single"]
+        start, rate, below = rows[bisect_right(floors, taxable_income) - 1]
+        return below + (taxable_income - start) * rate
+
+
+def _compile(brackets: Tuple[Tuple[float, float], ...]):
+    rows, tax, prev = [], 0, 0
+    for limit, rate in brackets:
+        rows.append((prev, rate, tax))
+        if limit != float("inf"):
+            tax += (limit - prev) * rate
+        prev = limit
+    return tuple(r[0] for r in rows), tuple(rows)
+
+
+_COMPILERS = {FEDERAL: FederalParams}
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+_compiled: Dict[Tuple[str, int], Any] = {}
+_compile_lock = threading.Lock()
+
+
+def get_params(jurisdiction: str, tax_year: Optional[int] = None) -> Any:
+    """
+    Compiled table for (jurisdiction, tax_year), DEFAULT_TAX_YEAR if no
+    year is given. ValueError if the store has no table for it.
+    """
+    key = ((jurisdiction or FEDERAL).upper(), int(tax_year or DEFAULT_TAX_YEAR))
+    table = _compiled.get(key)
+    if table is None:
+        with _compile_lock:
+            table = _compiled.get(key)
+            if table is None:
+                raw = _raw(*key)
+                compiler = _COMPILERS.get(key[0], _freeze)
+                table = _compiled[key] = compiler(raw)
+                logger.debug("Compiled %s %s tax parameters", *key)
+    return table
+
+
+def federal_params(tax_year: Optional[int] = None) -> FederalParams:
+    return get_params(FEDERAL, tax_year)
+
+
+def tax_years(jurisdiction: str = FEDERAL) -> Tuple[int, ...]:
+    """Years the store has tables for."""
+    jurisdiction = jurisdiction.upper()
+    return tuple(y for j, y in sorted(_FILES) if j == jurisdiction)
+
+
+__all__ = [
+    "DEFAULT_TAX_YEAR",
+    "FEDERAL",
+    "TAX_YEARS_DIR",
+    "FederalParams",
+    "federal_params",
+    "get_params",
+    "tax_years",
+]
@@ -0,0 +1,341 @@
+# tax_engine/contributions.py
+# ============================================================
+# CONTRIBUTION OPTIMIZER - IRA / HSA / 401(k)
+# ============================================================
+# How much to put into each pre-tax account, without re-running the
+# calculator for every candidate amount.
+#
+# For each account, federal + state tax as a function of the amount
+# contributed is piecewise linear (bracket edges, the IRA deduction
+# phase-out, CTC / EITC phase-ins and phase-outs, taxable income
+# reaching zero). curves.sample_piecewise finds those segments with a
+# few dozen calculator runs per account; everything after that is
+# arithmetic on the segments:
+#
+#   best amount    smallest amount reaching the account's lowest tax
+#                  (past it, another dollar saves nothing)
+#   budget         dollars go to the highest savings rate first,
+#                  across accounts (greedy over each account's
+#                  concave savings envelope)
+#   target refund  same fill, stopping once the tax saved covers the
+#                  gap between the current and the target refund
+#
+# Each account is sampled on the profile as given, so interactions
+# between accounts (IRA + HSA both lowering AGI) aren't in the
+# per-account curves; the chosen allocation is run through the
+# calculator and the reported result is that exact run. A target
+# refund the run falls short of (two accounts crossing the same
+# bracket edge save less together than their curves say) raises the
+# savings needed by the shortfall and fills again, TOP_UP_ROUNDS
+# times at most.
+#
+# 401(k) deferrals come out of W-2 box 1 wages, which are taken to be
+# before the extra deferral. Limits are for the profile's tax_year.
+# ============================================================
+
+import heapq
+import logging
+from math import ceil, floor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .calculator.federal.calculator import (
+    calculate as calculate_federal,
+    calculate_age,
+    normalize_status,
+)
+from .calculator.inputs import CanonicalInput, normalize_input
+from .calculator.tax_params import DEFAULT_TAX_YEAR, federal_params
+from .curves import TaxCurve, sample_piecewise
+from .state_compare import run_state_calculator, state_tax_amount
+from .state_router import NO_TAX_STATES
+from .tax_sweep import _coarse, tax_function
+
+logger = logging.getLogger(__name__)
+
+# 2025 amounts; contribution_limit() uses the profile's year
+K401_LIMIT = federal_params(2025).k401_limit
+K401_CATCH_UP = federal_params(2025).k401_catch_up
+
+# account -> (input field, owner, reduces that field instead of setting it)
+ACCOUNTS = {
+    "ira": ("ira_contribution", "taxpayer", False),
+    "spouse_ira": ("spouse_ira_contribution", "spouse", False),
+    "hsa": ("hsa_contribution", "taxpayer", False),
+    "401k": ("taxpayer_wages", "taxpayer", True),
+    "spouse_401k": ("spouse_wages", "spouse", True),
+}
+
+MIN_RATE = 0.0001  # savings per dollar below this is treated as none
+TOP_UP_ROUNDS = 5
+
+
+# ============================================================
+# LIMITS
+# ============================================================
+
+def _age(data: Dict[str, Any], owner: str, tax_year: int) -> int:
+    return data.get(f"{owner}_age", 0) or calculate_age(data.get(f"{owner}_dob", ""), tax_year)
+
+
+def contribution_limit(account: str, data: Dict[str, Any]) -> float:
+    """Most the calculator lets the account take for this profile."""
+    field, owner, reduces = ACCOUNTS[account]
+    tax_year = data.get("tax_year") or DEFAULT_TAX_YEAR
+    p = federal_params(tax_year)
+    age = _age(data, owner, tax_year)
+    if account in ("ira", "spouse_ira"):
+        return p.ira_limit + (p.ira_catch_up if age >= 50 else 0)
+    if account == "hsa":
+        family = normalize_status(data.get("filing_status")) == "married_filing_jointly"
+        return (p.hsa_limit_family if family else p.hsa_limit_self) + (p.hsa_catch_up if age >= 55 else 0)
+    return min(p.k401_limit + (p.k401_catch_up if age >= 50 else 0), max(data.get(field, 0), 0))
+
+
+# ============================================================
+# TAX AS A FUNCTION OF ONE CONTRIBUTION
+# ============================================================
+
+class ContributionCurve:
+    """Federal / state tax and AGI vs amount contributed to one account."""
+
+    __slots__ = ("account", "field", "limit", "federal", "state", "agi")
+
+    def __init__(self, account: str, field: str, limit: float,
+                 knots: List[float], values: List[Tuple[float, float, float]]):
+        self.account = account
+        self.field = field
+        self.limit = limit
+        self.federal = TaxCurve("US", knots, [v[0] for v in values])
+        self.state = TaxCurve("", knots, [v[1] for v in values])
+        self.agi = TaxCurve("AGI", knots, [v[2] for v in values])
+
+    @property
+    def knots(self) -> List[float]:
+        return self.federal.knots
+
+    def total(self, x: float) -> float:
+        return self.federal(x) + self.state(x)
+
+    def segments(self) -> List[Dict[str, float]]:
+        knots = self.knots
+        out = []
+        for i in range(len(knots) - 1):
+            fed, st, agi = self.federal.slopes[i], self.state.slopes[i], self.agi.slopes[i]
+            out.append({
+                "from": knots[i],
+                "to": knots[i + 1],
+                "federal_rate": round(-fed * 100, 2),
+                "state_rate": round(-st * 100, 2),
+                "savings_rate": round(-(fed + st) * 100, 2),
+                "deductible_rate": round(-agi * 100, 2),
+            })
+        return out
+
+    def best_amount(self, tolerance: float = 1.0) -> float:
+        """Smallest knot within tolerance of the lowest total tax."""
+        totals = [self.total(x) for x in self.knots]
+        lowest = min(totals)
+        return next(x for x, t in zip(self.knots, totals) if t <= lowest + tolerance)
+
+    def envelope(self) -> List[Tuple[float, float, float]]:
+        """
+        Upper concave envelope of tax saved vs amount, as (from, to,
+        savings per dollar) with non-increasing rates: the order a
+        greedy fill may take the segments in.
+        """
+        base = self.total(self.knots[0])
+        points = [(x, base - self.total(x)) for x in self.knots]
+        hull: List[Tuple[float, float]] = []
+        for p in points:
+            while len(hull) >= 2 and _cross(hull[-2], hull[-1], p) >= 0:
+                hull.pop()
+            hull.append(p)
+        return [(a[0], b[0], (b[1] - a[1]) / (b[0] - a[0])) for a, b in zip(hull, hull[1:])]
+
+
+def _cross(o: Tuple[float, float], a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _contribute(base: CanonicalInput, account: str, amount: float) -> CanonicalInput:
+    field, _, reduces = ACCOUNTS[account]
+    data = CanonicalInput(base)
+    data[field] = base.get(field, 0) - amount if reduces else amount
+    if reduces:
+        data["wages"] = data.get("taxpayer_wages", 0) + data.get("spouse_wages", 0)
+    return data
+
+
+def contribution_curve(base: CanonicalInput, account: str, state: Optional[str],
+                       failures: Optional[Dict[str, str]] = None) -> ContributionCurve:
+    field, _, reduces = ACCOUNTS[account]
+    limit = contribution_limit(account, base)
+    f = tax_function(base, field, state, failures)
+    if reduces:
+        start = base.get(field, 0)
+        g = lambda x: f(start - x)
+    else:
+        g = f
+    if limit < 1:
+        return ContributionCurve(account, field, limit, [0.0], [g(0)])
+    knots, values = sample_piecewise(g, _coarse(0, int(floor(limit))))
+    return ContributionCurve(account, field, limit, knots, values)
+
+
+# ============================================================
+# ALLOCATION
+# ============================================================
+
+def allocate(curves: Sequence[ContributionCurve], budget: Optional[float] = None,
+             savings_needed: Optional[float] = None) -> Dict[str, float]:
+    """
+    Greedy fill over the accounts' envelopes, highest savings rate
+    first, until the budget is spent or savings_needed is reached
+    (neither: every account up to its best amount).
+    """
+    if budget is None and savings_needed is None:
+        return {c.account: c.best_amount() for c in curves}
+
+    heap = []
+    for n, c in enumerate(curves):
+        segs = [s for s in c.envelope() if s[2] > MIN_RATE]
+        if segs:
+            heap.append((-segs[0][2], n, 0, segs))
+    heapq.heapify(heap)
+
+    amounts = {c.account: 0.0 for c in curves}
+    left = float("inf") if budget is None else float(budget)
+    needed = float("inf") if savings_needed is None else float(savings_needed)
+    while heap and left > 0 and needed > 0:
+        neg_rate, n, i, segs = heapq.heappop(heap)
+        lo, hi, rate = segs[i]
+        take = min(hi - lo, left, needed / rate)
+        amounts[curves[n].account] += take
+        left -= take
+        needed -= take * rate
+        if take == hi - lo and i + 1 < len(segs):
+            heapq.heappush(heap, (-segs[i + 1][2], n, i + 1, segs))
+
+    # Whole dollars: down within a budget, up when chasing a target
+    rounding = floor if savings_needed is None else ceil
+    return {a: float(min(rounding(round(x, 6)), c.limit)) for c, (a, x) in zip(curves, amounts.items())}
+
+
+def _outcome(base: CanonicalInput, amounts: Dict[str, float], state: Optional[str]) -> Dict[str, float]:
+    """One full calculator run with the contributions applied."""
+    data = base
+    for account, amount in amounts.items():
+        data = _contribute(data, account, amount)
+    fed = calculate_federal(data)
+    fed_tax = fed.get("tax_after_credits", 0) - fed.get("refundable_credits", 0)
+    refund = fed.get("refund", 0) - fed.get("amount_owed", 0)
+    st_tax = 0.0
+    if state and state not in NO_TAX_STATES:
+        data["federal_agi"] = data["agi"] = fed.get("agi", 0)
+        st = run_state_calculator(state, data)
+        st_tax = state_tax_amount(st)
+        refund += st.get("refund", 0) - st.get("amount_owed", 0)
+    return {
+        "agi": fed.get("agi", 0),
+        "federal_tax": round(fed_tax, 2),
+        "state_tax": round(st_tax, 2),
+        "total_tax": round(fed_tax + st_tax, 2),
+        "net_refund": round(refund, 2),
+    }
+
+
+# ============================================================
+# OPTIMIZER
+# ============================================================
+
+def optimize_contributions(
+    profile: Dict[str, Any],
+    accounts: Sequence[str] = ("ira", "hsa"),
+    state: Optional[str] = None,
+    budget: Optional[float] = None,
+    target_refund: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Contribution per account for profile. Amounts already in the
+    profile's IRA / HSA fields are replaced, not added to.
+
+    budget         total dollars to spread over the accounts
+    target_refund  combined federal + state refund to reach (balance
+                   due as negative); the smallest contributions that
+                   get there, highest savings rate first
+    """
+    unknown = [a for a in accounts if a not in ACCOUNTS]
+    if unknown or not accounts:
+        raise ValueError(f"Unknown account(s) {unknown}; choose from {sorted(ACCOUNTS)}")
+    if budget is not None and budget < 0:
+        raise ValueError("budget must be >= 0")
+
+    base = CanonicalInput(normalize_input(profile))
+    for account in accounts:
+        field, _, reduces = ACCOUNTS[account]
+        if not reduces:
+            base[field] = 0.0
+    state = (state or base.get("state") or "").upper() or None
+
+    failures: Dict[str, str] = {}
+    curves = [contribution_curve(base, a, state, failures) for a in dict.fromkeys(accounts)]
+    if failures:
+        logger.warning("%s calculator error during contribution curves, generic fallback used: %s",
+                       state, failures[state])
+
+    baseline = _outcome(base, {}, state)
+    savings_needed = None
+    if target_refund is not None:
+        savings_needed = max(0.0, float(target_refund) - baseline["net_refund"])
+
+    amounts = allocate(curves, budget, savings_needed)
+    result = _outcome(base, amounts, state)
+    for _ in range(TOP_UP_ROUNDS if savings_needed is not None else 0):
+        shortfall = float(target_refund) - result["net_refund"]
+        if shortfall <= 0.005:
+            break
+        savings_needed += max(shortfall, 1.0)     # states round to whole dollars
+        more = allocate(curves, budget, savings_needed)
+        if more == amounts:
+            break
+        amounts = more
+        result = _outcome(base, amounts, state)
+    saved = round(baseline["total_tax"] - result["total_tax"], 2)
+
+    out = {
+        "state": state,
+        "filing_status": normalize_status(base.get("filing_status")),
+        "accounts": [
+            {
+                "account": c.account,
+                "field": c.field,
+                "limit": c.limit,
+                "best_amount": c.best_amount(),
+                "max_savings": round(c.total(0) - c.total(c.best_amount()), 2),
+                "amount": amounts[c.account],
+                "segments": c.segments(),
+            }
+            for c in curves
+        ],
+        "allocation": amounts,
+        "total_contribution": round(sum(amounts.values()), 2),
+        "baseline": baseline,
+        "result": result,
+        "savings": saved,
+    }
+    if target_refund is not None:
+        out["target_refund"] = target_refund
+        out["target_met"] = result["net_refund"] >= float(target_refund) - 0.005
+    return out
+
+
+__all__ = [
+    "ACCOUNTS",
+    "K401_LIMIT",
+    "K401_CATCH_UP",
+    "contribution_limit",
+    "ContributionCurve",
+    "contribution_curve",
+    "allocate",
+    "optimize_contributions",
+]
@@ -0,0 +1,173 @@
+# tax_engine/curves.py
+# ============================================================
+# PIECEWISE-LINEAR TAX CURVES
+# ============================================================
+# Tax as a function of one input (AGI, wages, an IRA contribution...)
+# is piecewise linear: brackets, phase-ins and phase-outs are straight
+# segments joined at breakpoints, plus the odd cliff where a credit
+# switches off. sample_piecewise() finds those breakpoints by running
+# the real calculator - a coarse pass, then bisection wherever the
+# calculator departs from a straight line - and TaxCurve evaluates
+# the result: value at any x by interpolation, marginal rate as the
+# slope of the segment x falls in.
+#
+# Accuracy: each interval is probed at 1/4, 1/2 and 3/4; a kink between
+# two probes shows there at 3/4 of its deviation or more, so bisection
+# accepts TOLERANCE ($0.60) at the probes. simplify() then merges knots
+# up to ROUNDING off the chord - the jitter of calculators that round
+# to whole dollars - so a bracket gets one segment with its true rate.
+# Interpolated values are within $2 of the calculator; callers that
+# need values but not rates pass rounding=0 and get within $1
+# (tests/test_state_compare.py, tests/test_tax_sweep.py).
+#
+# Used by state_compare (state tax vs AGI) and tax_sweep (federal +
+# state tax vs any one input).
+# ============================================================
+
+from bisect import bisect_right
+from typing import Callable, List, Optional, Sequence, Tuple
+
+MIN_SEGMENT = 50        # dollars of x; smallest interval split for a kink
+TOLERANCE = 0.6         # dollars of tax; max deviation accepted as linear
+ROUNDING = 1.0          # most whole-dollar rounding puts a value off the chord
+                        # of its rounded neighbours
+CLIFF = 2.0             # deviation inside MIN_SEGMENT beyond ROUNDING: a jump or
+                        # a sharp kink, bisected down to $1
+
+
+def sample_piecewise(
+    f: Callable[[int], Tuple[float, ...]],
+    coarse: Sequence[int],
+    min_segment: int = MIN_SEGMENT,
+    tolerance: float = TOLERANCE,
+    cliff: float = CLIFF,
+    rounding: float = ROUNDING,
+) -> Tuple[List[float], List[Tuple[float, ...]]]:
+    """
+    Breakpoints of f over [coarse[0], coarse[-1]].
+
+    f maps an integer x to a tuple of values (several series can share
+    one pass - e.g. federal tax, state tax, AGI); an interval is split
+    when any series is non-linear on it. Returns (knots, values), with
+    values[i] = f(knots[i]), simplified to max(tolerance, rounding).
+    """
+    memo = {}
+
+    def at(x: int) -> Tuple[float, ...]:
+        v = memo.get(x)
+        if v is None:
+            v = memo[x] = f(x)
+        return v
+
+    knots = [float(coarse[0])]
+    values = [at(coarse[0])]
+
+    def refine(a: int, fa: Tuple[float, ...], b: int, fb: Tuple[float, ...]):
+        width = b - a
+        if width > 1:
+            limit = tolerance if width > min_segment else cliff
+            m = (a + b) // 2
+            for x in ((a + m) // 2, m, (m + b) // 2):
+                fx = at(x)
+                t = (x - a) / width
+                if any(abs(vx - (va + (vb - va) * t)) > limit for vx, va, vb in zip(fx, fa, fb)):
+                    fm = at(m)
+                    refine(a, fa, m, fm)
+                    refine(m, fm, b, fb)
+                    return
+        knots.append(float(b))
+        values.append(fb)
+
+    for a, b in zip(coarse, coarse[1:]):
+        refine(a, at(a), b, at(b))
+    return simplify(knots, values, max(tolerance, rounding))
+
+
+def simplify(knots: List[float], values: List[Tuple[float, ...]],
+             tolerance: float = ROUNDING) -> Tuple[List[float], List[Tuple[float, ...]]]:
+    """
+    Drop knots that lie within tolerance of the chord around them.
+    Calculators that round to whole dollars turn one bracket into many
+    short segments with jittery slopes; merging them gives one segment
+    with the bracket's true rate.
+    """
+    n = len(knots)
+    if n <= 2:
+        return knots, values
+    keep = [0]
+    i = 0
+    while i < n - 1:
+        j = i + 1
+        while j + 1 < n and _within(knots, values, i, j + 1, tolerance):
+            j += 1
+        keep.append(j)
+        i = j
+    return [knots[k] for k in keep], [values[k] for k in keep]
+
+
+def _within(knots, values, i: int, j: int, tolerance: float) -> bool:
+    xi, xj = knots[i], knots[j]
+    vi, vj = values[i], values[j]
+    width = xj - xi
+    for k in range(i + 1, j):
+        t = (knots[k] - xi) / width
+        if any(abs(vk - (a + (b - a) * t)) > tolerance for vk, a, b in zip(values[k], vi, vj)):
+            return False
+    return True
+
+
+def locate(knots: Sequence[float], xs: Sequence[float], order: Optional[Sequence[int]] = None) -> List[int]:
+    """Segment index for each x (one sorted walk; order = indices of xs sorted by value)."""
+    if order is None:
+        order = sorted(range(len(xs)), key=xs.__getitem__)
+    last = len(knots) - 1
+    out = [0] * len(xs)
+    i = 0
+    for j in order:
+        x = xs[j]
+        while i < last and knots[i + 1] <= x:
+            i += 1
+        out[j] = i
+    return out
+
+
+class TaxCurve:
+    """Piecewise-linear function: knots, value at each knot, slope to the next."""
+
+    __slots__ = ("state", "knots", "values", "slopes")
+
+    def __init__(self, state: str, knots: List[float], values: List[float]):
+        self.state = state
+        self.knots = knots
+        self.values = values
+        slopes = [(values[i + 1] - values[i]) / (knots[i + 1] - knots[i]) for i in range(len(knots) - 1)]
+        # Past the last knot: continue the top segment (top bracket)
+        slopes.append(slopes[-1] if slopes else 0.0)
+        self.slopes = slopes
+
+    def __call__(self, x: float) -> float:
+        if x <= self.knots[0]:
+            return self.values[0]
+        i = bisect_right(self.knots, x) - 1
+        return self.values[i] + self.slopes[i] * (x - self.knots[i])
+
+    def evaluate(self, xs: Sequence[float], order: Optional[Sequence[int]] = None,
+                 segments: Optional[Sequence[int]] = None) -> List[float]:
+        """Value at each x. segments = locate(knots, xs), shareable by curves on the same knots."""
+        if segments is None:
+            segments = locate(self.knots, xs, order)
+        knots, values, slopes = self.knots, self.values, self.slopes
+        lo = knots[0]
+        return [values[0] if x <= lo else values[i] + slopes[i] * (x - knots[i])
+                for x, i in zip(xs, segments)]
+
+    def rates(self, xs: Sequence[float], order: Optional[Sequence[int]] = None,
+              segments: Optional[Sequence[int]] = None) -> List[float]:
+        """Slope (marginal rate) at each x: the segment to the right of a breakpoint."""
+        if segments is None:
+            segments = locate(self.knots, xs, order)
+        slopes = self.slopes
+        return [slopes[i] for i in segments]
+
+
+__all__ = ["MIN_SEGMENT", "TOLERANCE", "ROUNDING", "CLIFF", "sample_piecewise", "simplify", "locate", "TaxCurve"]
@@ -4,6 +4,14 @@ TAXSKY 2025 - EXTRACTOR ROUTER v4.0 (VALIDATOR MODE)
 ================================================================================
 File: python_tax_api/tax_engine/extractor_router.py
 
+v4.2 CHANGES:
+  ✅ ADDED: per-(user_id, tax_year) single-flight + debounce around validation
+  ✅ CHANGED: /session runs validation off the event loop
+
+v4.1 CHANGES:
+  ✅ CHANGED: webhook enqueues validation on a background job queue (202 + job_id)
+  ✅ ADDED: GET /jobs/{job_id} and /jobs/latest/{user_id} status endpoints
+
 v4.0 CHANGES:
   ✅ CHANGED: webhook now passes session data (not messages) to validator
   ✅ CHANGED: Uses validate_and_calculate() instead of text extraction
@@ -13,12 +21,17 @@ v4.0 CHANGES:
 """
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional, List
+import logging
 import os
 from pathlib import Path
 from datetime import datetime
 
-ROUTER_VERSION = "v4.0-VALIDATOR"
+ROUTER_VERSION = "v4.2-VALIDATOR-SINGLEFLIGHT"
+
+logger = logging.getLogger(__name__)
 
 # ============================================================
 # CONFIGURATION
@@ -50,6 +63,14 @@ except ImportError:
     except ImportError as e:
         print(f"⚠️ MongoDB client not available: {e}")
 
+# ============================================================
+# IMPORT REQUEST TIMING (Server-Timing phases; no-op outside the API)
+# ============================================================
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
 # ============================================================
 # IMPORT VALIDATOR (was text_extractor)
 # ============================================================
@@ -86,6 +107,42 @@ except ImportError as e:
         def validate_and_calculate(user_id, tax_year, session):
             return {"success": False, "error": "Validator not available"}
 
+# ============================================================
+# IMPORT JOB QUEUE
+# ============================================================
+try:
+    from .job_queue import job_queue, SingleFlight
+except ImportError:
+    from job_queue import job_queue, SingleFlight
+
+# Bursty /session + webhook calls for the same (user_id, tax_year) share
+# one validation run; results are reused for a few seconds afterwards.
+validation_flight = SingleFlight(keep=lambda r: bool(r and r.get("success")))
+
+
+def _queue_metrics():
+    """Scrape-time /metrics families for the job queue and validation single-flight."""
+    flight = validation_flight.stats()
+    queue = job_queue.stats()
+    shared = flight["joined"] + flight["reused"]
+    yield ("taxsky_validation_calls_total", "counter",
+           "Validation requests by outcome (executed, joined in-flight, reused recent)",
+           [({"how": how}, flight[how]) for how in ("executed", "joined", "reused")])
+    yield ("taxsky_validation_cache_hit_ratio", "gauge",
+           "Share of validation requests served without a new run",
+           [({}, round(shared / flight["calls"], 4) if flight["calls"] else 0)])
+    yield ("taxsky_jobs", "gauge", "Background jobs in history by status",
+           [({"status": status}, count) for status, count in queue["jobs"].items()])
+    yield ("taxsky_job_active_keys", "gauge", "(user, tax year) keys with a running job",
+           [({}, queue["active_keys"])])
+
+
+try:
+    from metrics import register_collector
+    register_collector(_queue_metrics)
+except ImportError:
+    pass
+
 # Try to import calculator
 CALCULATOR_AVAILABLE = False
 calculate_tax = None
@@ -106,6 +163,43 @@ except ImportError:
 router = APIRouter(prefix="/api/extract", tags=["extractor"])
 
 
+# ============================================================
+# SHARED PIPELINE
+# ============================================================
+
+def _fetch_and_validate(user_id: str, tax_year: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the session from MongoDB and run validate_and_calculate.
+    
+    Returns None if the session does not exist. Always called through
+    validation_flight so concurrent callers share one run.
+    """
+    with span("mongo_read"):
+        session = get_session_from_db(user_id, tax_year)
+    
+    if not session:
+        return None
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        w2s = session.get("input_forms", {}).get("w2", [])
+        logger.debug(
+            "Session found: user=%s w2s=%d answers=%d filing_status=%s wages=%s withheld=%s",
+            user_id, len(w2s), len(session.get("answers", {})), session.get("filing_status", "unknown"),
+            sum(w.get("box_1_wages", 0) or 0 for w in w2s),
+            sum(w.get("box_2_federal_withheld", 0) or 0 for w in w2s),
+        )
+    
+    return validate_and_calculate(user_id, tax_year, session)
+
+
+def _tax_year(data: Dict[str, Any]) -> int:
+    """tax_year from a request body as an int (job and flight keys are (user_id, int))."""
+    try:
+        return int(data.get("tax_year") or 2025)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid tax_year: {data.get('tax_year')!r}")
+
+
 # ============================================================
 # ENDPOINTS
 # ============================================================
@@ -115,10 +209,14 @@ async def extract_session(request: Request):
     """
     Validate tax data from a user's session.
     
+    Concurrent/repeated calls for the same user share one validation run
+    and reuse its result for a few seconds; pass "force": true to skip that.
+    
     POST /api/extract/session
     {
         "user_id": "user_123",
-        "tax_year": 2025
+        "tax_year": 2025,
+        "force": false
     }
     """
     if not VALIDATOR_AVAILABLE:
@@ -130,41 +228,31 @@ async def extract_session(request: Request):
     try:
         data = await request.json()
         user_id = data.get("user_id")
-        tax_year = data.get("tax_year", 2025)
+        tax_year = _tax_year(data)
         
         if not user_id:
             raise HTTPException(status_code=400, detail="user_id required")
         
-        print(f"\n{'='*50}")
-        print(f"📨 POST /api/extract/session")
-        print(f"   User: {user_id}")
-        print(f"   Year: {tax_year}")
+        logger.debug("POST /api/extract/session user=%s year=%s", user_id, tax_year)
         
-        # Get session from MongoDB
-        session = get_session_from_db(user_id, tax_year)
+        result, how = await run_in_threadpool(
+            validation_flight.do,
+            (user_id, tax_year),
+            lambda: _fetch_and_validate(user_id, tax_year),
+            bool(data.get("force", False)),
+        )
         
-        if not session:
-            print(f"   ❌ Session not found!")
+        if result is None:
             return {"success": False, "error": "Session not found for user"}
         
-        print(f"   ✅ Session found")
-        print(f"   📋 W-2s: {len(session.get('input_forms', {}).get('w2', []))}")
-        print(f"   📋 Answers: {len(session.get('answers', {}))}")
-        
-        # Validate with structured data
-        result = validate_and_calculate(user_id, tax_year, session)
-        
-        print(f"   📊 Result: success={result.get('success')}")
-        print(f"{'='*50}\n")
+        logger.debug("Validate result user=%s success=%s (%s)", user_id, result.get("success"), how)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Validate error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Validate error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -232,13 +320,10 @@ async def get_status(user_id: str, tax_year: int = 2025):
 @router.get("/json/{user_id}")
 async def get_json(user_id: str, tax_year: int = 2025):
     """Get the validated JSON data."""
-    print(f"\n📄 GET /api/extract/json/{user_id}")
     
     if MONGODB_AVAILABLE and get_session_from_db:
         session = get_session_from_db(user_id, tax_year)
         if session:
-            print(f"   ✅ Found in MongoDB")
-            
             return {
                 "success": True,
                 "user_id": user_id,
@@ -259,12 +344,67 @@ async def get_json(user_id: str, tax_year: int = 2025):
     raise HTTPException(status_code=404, detail=f"No data for {user_id}")
 
 
-@router.post("/webhook/interview-complete")
+def _run_interview_complete(user_id: str, tax_year: int) -> Dict[str, Any]:
+    """
+    Full interview-complete pipeline (runs on the job queue).
+    
+    Mongo fetch → validate_and_calculate (RAG verify, calculate,
+    Form 1040 build, Mongo save).
+    """
+    logger.debug("Job: interview complete user=%s year=%s", user_id, tax_year)
+    
+    # ✅ v4.0: Get FULL SESSION from MongoDB (not just messages!)
+    if not MONGODB_AVAILABLE or not get_session_from_db:
+        return {
+            "success": False,
+            "error": "MongoDB not available",
+            "user_id": user_id
+        }
+    
+    # Interview just completed - data is final, never reuse an older run.
+    # The fresh result refreshes the debounce cache for /session callers.
+    result, _ = validation_flight.do(
+        (user_id, tax_year),
+        lambda: _fetch_and_validate(user_id, tax_year),
+        force=True,
+    )
+    
+    if result is None:
+        return {
+            "success": False,
+            "error": "Session not found",
+            "user_id": user_id
+        }
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        tr = result.get("tax_result") or {}
+        logger.debug(
+            "Validation result user=%s success=%s rag_verified=%s agi=%.0f refund=%.0f owed=%.0f warnings=%s",
+            user_id, result.get("success"), result.get("rag_verified"),
+            tr.get("agi", 0), tr.get("refund", 0), tr.get("amount_owed", 0),
+            result.get("validation_errors", []),
+        )
+    
+    return {
+        "success": result.get("success", False),
+        "message": "Validation complete",
+        "user_id": user_id,
+        "tax_year": tax_year,
+        "rag_verified": result.get("rag_verified", False),
+        "extracted": result.get("extracted", {}),
+        "tax_result": result.get("tax_result", {}),
+        "errors": result.get("validation_errors", []),
+    }
+
+
+@router.post("/webhook/interview-complete", status_code=202)
 async def webhook_interview_complete(request: Request):
     """
     Webhook called by Node.js when user finishes the chat.
     
-    v4.0: Now validates structured data instead of parsing messages!
+    v4.1: Enqueues the validation pipeline and returns 202 immediately.
+    Poll GET /api/extract/jobs/{job_id} for the result. Duplicate webhooks
+    for the same (user_id, tax_year) are coalesced into one job.
     
     POST /api/extract/webhook/interview-complete
     {
@@ -279,101 +419,61 @@ async def webhook_interview_complete(request: Request):
     try:
         data = await request.json()
         user_id = data.get("user_id")
-        tax_year = data.get("tax_year", 2025)
+        tax_year = _tax_year(data)
         status = data.get("status", "complete")
         
-        print(f"\n{'='*60}")
-        print(f"🔔 WEBHOOK: Interview Complete")
-        print(f"   User: {user_id}")
-        print(f"   Year: {tax_year}")
-        print(f"   Status: {status}")
-        print(f"   Router: {ROUTER_VERSION}")
+        logger.debug("Webhook interview-complete user=%s year=%s status=%s", user_id, tax_year, status)
         
         if not user_id:
             raise HTTPException(status_code=400, detail="user_id required")
         
         if status != "complete":
-            return {
+            return JSONResponse(status_code=200, content={
                 "success": True,
                 "message": f"Status is '{status}', skipping validation",
                 "user_id": user_id
-            }
-        
-        # ✅ v4.0: Get FULL SESSION from MongoDB (not just messages!)
-        if not MONGODB_AVAILABLE or not get_session_from_db:
-            return {
-                "success": False,
-                "error": "MongoDB not available",
-                "user_id": user_id
-            }
-        
-        print(f"   📄 Fetching session from MongoDB...")
-        session = get_session_from_db(user_id, tax_year)
-        
-        if not session:
-            print(f"   ❌ Session not found!")
-            return {
-                "success": False,
-                "error": "Session not found",
-                "user_id": user_id
-            }
-        
-        # Log what we found
-        input_forms = session.get("input_forms", {})
-        w2s = input_forms.get("w2", [])
-        answers = session.get("answers", {})
-        
-        print(f"   ✅ Session found:")
-        print(f"      W-2s: {len(w2s)}")
-        print(f"      Answers: {len(answers)} fields")
-        print(f"      Filing Status: {session.get('filing_status', 'unknown')}")
+            })
         
-        if w2s:
-            total_wages = sum(w.get("box_1_wages", 0) or 0 for w in w2s)
-            total_withheld = sum(w.get("box_2_federal_withheld", 0) or 0 for w in w2s)
-            print(f"      Total Wages: ${total_wages:,}")
-            print(f"      Total Withheld: ${total_withheld:,}")
-        
-        # ✅ v4.0: Call validate_and_calculate with session data
-        print(f"\n   🔍 Starting validation...")
-        result = validate_and_calculate(user_id, tax_year, session)
-        
-        print(f"\n   📊 Validation Result:")
-        print(f"      Success: {result.get('success')}")
-        print(f"      RAG Verified: {result.get('rag_verified')}")
-        if result.get('tax_result'):
-            tr = result['tax_result']
-            print(f"      AGI: ${tr.get('agi', 0):,.0f}")
-            print(f"      Refund: ${tr.get('refund', 0):,.0f}")
-            print(f"      Owed: ${tr.get('amount_owed', 0):,.0f}")
-        
-        if result.get('validation_errors'):
-            print(f"      Warnings: {len(result['validation_errors'])}")
-            for err in result['validation_errors']:
-                print(f"         ⚠️ {err}")
-        
-        print(f"{'='*60}\n")
+        job, created = job_queue.submit(
+            user_id, tax_year,
+            lambda: _run_interview_complete(user_id, tax_year)
+        )
         
         return {
-            "success": result.get("success", False),
-            "message": "Validation complete",
+            "success": True,
+            "message": "Validation queued" if created else "Validation already queued",
             "user_id": user_id,
             "tax_year": tax_year,
-            "rag_verified": result.get("rag_verified", False),
-            "extracted": result.get("extracted", {}),
-            "tax_result": result.get("tax_result", {}),
-            "errors": result.get("validation_errors", []),
+            "job_id": job["job_id"],
+            "job_status": job["status"],
+            "status_url": f"{router.prefix}/jobs/{job['job_id']}",
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Webhook error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Webhook error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status (and result, once done) of a queued validation job."""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"success": True, **job}
+
+
+@router.get("/jobs/latest/{user_id}")
+async def get_latest_job(user_id: str, tax_year: int = 2025):
+    """Most recent validation job for a user."""
+    job = job_queue.latest(user_id, tax_year)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No jobs for {user_id}")
+    return {"success": True, **job}
+
+
 @router.get("/health")
 async def health():
     """Health check for validator service."""
@@ -384,6 +484,8 @@ async def health():
         "validator_available": VALIDATOR_AVAILABLE,
         "mongodb_available": MONGODB_AVAILABLE,
         "calculator_available": CALCULATOR_AVAILABLE,
+        "job_queue": job_queue.stats(),
+        "validation_flight": validation_flight.stats(),
         "node_api_url": NODE_API_URL,
         "data_dir": str(DATA_DIR),
         "data_dir_exists": DATA_DIR.exists() if DATA_DIR else False,
@@ -0,0 +1,382 @@
+# tax_engine/filing_status.py
+# ============================================================
+# FILING STATUS OPTIMIZER - MFJ vs MFS (and HOH / QSS)
+# ============================================================
+# Builds every return a household could file from one session or
+# profile, runs federal + state for all of them in one batch and
+# ranks the outcomes by total tax:
+#
+#   married    MFJ (one joint return)
+#              MFS (taxpayer's return + spouse's return)
+#              HOH + MFS, when the spouses lived apart for the last
+#              6 months and the HOH spouse keeps the dependents
+#   unmarried  single, HOH (with a dependent), QSS (spouse died in
+#              one of the two prior years, with a dependent child)
+#
+# Splitting a joint profile into two MFS returns:
+# - per-spouse fields the calculator tracks (wages, withholding, IRA,
+#   retirement plan, age / DOB) go to their owner
+# - jointly held amounts (interest, dividends, capital gains,
+#   estimated payments) are split evenly
+# - everything else (SE income, tips, pensions, deductions...) stays
+#   on the taxpayer's return, as do the dependents
+# Callers can override any share with allocation={field: spouse_share}
+# and dependents_with="spouse".
+#
+# A return shared by two variants (the MFS return of the spouse who
+# doesn't file HOH) is calculated once.
+#
+#   federal_tax = tax after credits - refundable credits
+#   state_tax   = state module total (state_router)
+#   total_tax   = federal_tax + state_tax, summed over the returns
+# ============================================================
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .calculator.federal.calculator import (
+    calculate as calculate_federal,
+    extract_from_session,
+    normalize_status,
+)
+from .calculator.inputs import FLOAT_FIELDS, CanonicalInput, normalize_input
+from .state_compare import state_tax_amount
+from .state_router import calculate_state_tax
+
+logger = logging.getLogger(__name__)
+
+SINGLE = "single"
+MFJ = "married_filing_jointly"
+MFS = "married_filing_separately"
+HOH = "head_of_household"
+QSS = "qualifying_surviving_spouse"
+
+LABELS = {
+    SINGLE: "Single",
+    MFJ: "Married Filing Jointly",
+    MFS: "Married Filing Separately",
+    HOH: "Head of Household",
+    QSS: "Qualifying Surviving Spouse",
+}
+
+# (taxpayer field, spouse field) pairs the calculator keeps per person
+SPOUSE_PAIRS = (
+    ("taxpayer_wages", "spouse_wages"),
+    ("taxpayer_federal_withheld", "spouse_federal_withheld"),
+    ("taxpayer_state_withheld", "spouse_state_withheld"),
+    ("ira_contribution", "spouse_ira_contribution"),
+    ("has_retirement_plan", "spouse_has_retirement_plan"),
+    ("taxpayer_age", "spouse_age"),
+    ("taxpayer_dob", "spouse_dob"),
+)
+_PAIRED = frozenset(f for pair in SPOUSE_PAIRS for f in pair)
+
+# Jointly held by default: spouse's share of each
+JOINT_SHARES = {
+    "interest_income": 0.5,
+    "dividend_income": 0.5,
+    "qualified_dividends": 0.5,
+    "short_term_gains": 0.5,
+    "long_term_gains": 0.5,
+    "estimated_payments": 0.5,
+}
+
+DEPENDENT_FIELDS = ("qualifying_children_under_17", "other_dependents")
+
+
+# ============================================================
+# HOUSEHOLD
+# ============================================================
+
+def _session_state(session: Dict[str, Any]) -> Optional[str]:
+    address = session.get("address") or {}
+    answers = session.get("answers") or {}
+    return session.get("state") or address.get("state") or answers.get("state") or None
+
+
+def _flag(data: Dict[str, Any], *keys: str) -> bool:
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, str):
+            value = value.strip().lower() in ("true", "yes", "1", "y")
+        if value:
+            return True
+    return False
+
+
+def _has_dependents(data: Dict[str, Any]) -> bool:
+    return any(data.get(f, 0) > 0 for f in DEPENDENT_FIELDS)
+
+
+def _spouse_death_year(data: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(data.get("spouse_death_year") or 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def eligible_statuses(data: Dict[str, Any], tax_year: int = 2025) -> Tuple[List[str], Dict[str, str]]:
+    """(statuses the household may file under, {status: why not} for the rest)."""
+    status = normalize_status(data.get("filing_status"))
+    death_year = _spouse_death_year(data)
+    married = status in (MFJ, MFS) or death_year == tax_year
+    has_deps = _has_dependents(data)
+
+    eligible: List[str] = []
+    ineligible: Dict[str, str] = {}
+    if married:
+        eligible += [MFJ, MFS]
+        ineligible[SINGLE] = "Married at the end of the year"
+        if not has_deps:
+            ineligible[HOH] = "No qualifying dependent"
+        elif not _flag(data, "lived_apart", "lived_apart_from_spouse"):
+            ineligible[HOH] = "Spouses did not live apart for the last 6 months of the year"
+        else:
+            eligible.append(HOH)
+        ineligible[QSS] = "Married at the end of the year"
+    else:
+        eligible.append(SINGLE)
+        ineligible[MFJ] = ineligible[MFS] = "Not married at the end of the year"
+        if has_deps:
+            eligible.append(HOH)
+        else:
+            ineligible[HOH] = "No qualifying dependent"
+        if death_year is None or not tax_year - 2 <= death_year < tax_year:
+            ineligible[QSS] = "Spouse did not die in one of the two prior years"
+        elif data.get("qualifying_children_under_17", 0) <= 0:
+            ineligible[QSS] = "No dependent child"
+        else:
+            eligible.append(QSS)
+    return eligible, ineligible
+
+
+# ============================================================
+# RETURNS
+# ============================================================
+
+def _zero(value: Any) -> Any:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return 0
+    return ""
+
+
+def split_returns(
+    data: CanonicalInput,
+    allocation: Optional[Dict[str, float]] = None,
+    dependents_with: str = "taxpayer",
+) -> Tuple[CanonicalInput, CanonicalInput]:
+    """The taxpayer's and the spouse's separate returns (filing status not set)."""
+    shares = dict(JOINT_SHARES)
+    shares.update(allocation or {})
+
+    mine = CanonicalInput(data)
+    theirs = CanonicalInput(data)
+    for tp_field, sp_field in SPOUSE_PAIRS:
+        tp_value = data.get(tp_field)
+        sp_value = data.get(sp_field)
+        if sp_value is not None:
+            theirs[tp_field] = sp_value
+            mine[sp_field] = theirs[sp_field] = _zero(sp_value)
+        elif tp_value is not None:
+            theirs[tp_field] = _zero(tp_value)
+
+    for field in FLOAT_FIELDS:
+        if field in _PAIRED:
+            continue
+        amount = data.get(field)
+        if not amount:
+            continue
+        share = min(max(float(shares.get(field, 0.0)), 0.0), 1.0)
+        theirs[field] = amount * share
+        mine[field] = amount - theirs[field]
+
+    other = mine if dependents_with == "spouse" else theirs
+    for field in DEPENDENT_FIELDS:
+        if field in data:
+            other[field] = 0
+    other["num_dependents"] = 0
+    other.pop("dependents", None)
+
+    # Raw keys state modules read directly; flat input's state_withholding
+    # without a per-spouse split is the taxpayer's
+    for ret in (mine, theirs):
+        ret["wages"] = ret.get("taxpayer_wages", 0)
+        ret["state_withholding"] = ret.get("taxpayer_state_withheld", 0)
+    if "taxpayer_state_withheld" not in data:
+        mine["state_withholding"] = data.get("state_withholding", 0)
+    return mine, theirs
+
+
+def _joint(data: CanonicalInput) -> CanonicalInput:
+    ret = CanonicalInput(data)
+    if not ret.get("state_withholding"):
+        ret["state_withholding"] = ret.get("taxpayer_state_withheld", 0) + ret.get("spouse_state_withheld", 0)
+    return ret
+
+
+def _with_status(data: CanonicalInput, status: str) -> CanonicalInput:
+    ret = CanonicalInput(data)
+    ret["filing_status"] = status
+    return ret
+
+
+def build_variants(
+    data: CanonicalInput,
+    statuses: List[str],
+    allocation: Optional[Dict[str, float]] = None,
+    dependents_with: str = "taxpayer",
+) -> List[Tuple[str, List[Tuple[str, str, CanonicalInput]]]]:
+    """[(status, [(filer, key, return data), ...]), ...]; key identifies a return across variants."""
+    variants = []
+    married = MFJ in statuses
+    if married:
+        mine, theirs = split_returns(data, allocation, dependents_with)
+        holder = "spouse" if dependents_with == "spouse" else "taxpayer"
+        other = "taxpayer" if holder == "spouse" else "spouse"
+        separate = {"taxpayer": mine, "spouse": theirs}
+    joint = _joint(data)
+
+    for status in statuses:
+        if status == MFJ:
+            returns = [("joint", MFJ, _with_status(joint, MFJ))]
+        elif status == MFS:
+            returns = [(who, f"{who}:{MFS}", _with_status(separate[who], MFS)) for who in ("taxpayer", "spouse")]
+        elif status == HOH and married:
+            returns = [
+                (holder, f"{holder}:{HOH}", _with_status(separate[holder], HOH)),
+                (other, f"{other}:{MFS}", _with_status(separate[other], MFS)),
+            ]
+        else:
+            returns = [("taxpayer", status, _with_status(joint, status))]
+        variants.append((status, returns))
+    return variants
+
+
+# ============================================================
+# BATCH EVALUATION
+# ============================================================
+
+def _summary(filer: str, federal: Dict[str, Any], state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    fed_tax = federal.get("tax_after_credits", 0) - federal.get("refundable_credits", 0)
+    st_tax = state_tax_amount(state) if state else 0.0
+    refund = federal.get("refund", 0) - federal.get("amount_owed", 0)
+    if state:
+        refund += state.get("refund", 0) - state.get("amount_owed", 0)
+    return {
+        "filer": filer,
+        "filing_status": federal.get("filing_status"),
+        "agi": federal.get("agi", 0),
+        "taxable_income": federal.get("taxable_income", 0),
+        "federal_tax": round(fed_tax, 2),
+        "state_tax": round(st_tax, 2),
+        "total_tax": round(fed_tax + st_tax, 2),
+        "net_refund": round(refund, 2),
+        "federal": federal,
+        "state": state,
+    }
+
+
+def evaluate_returns(returns: Dict[str, Tuple[str, CanonicalInput]], state: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Federal for every return, then state for every return; {key: summary}."""
+    federal = {key: calculate_federal(ret) for key, (_, ret) in returns.items()}
+    out = {}
+    for key, (filer, ret) in returns.items():
+        st = None
+        if state:
+            ret["federal_agi"] = ret["agi"] = federal[key].get("agi", 0)
+            try:
+                st = calculate_state_tax(state, ret)
+            except Exception as e:
+                logger.warning("%s state calculation failed for %s: %s", state, key, e)
+                st = {"state": state, "error": "State calculation failed"}
+        out[key] = _summary(filer, federal[key], st)
+    return out
+
+
+# ============================================================
+# OPTIMIZER
+# ============================================================
+
+def optimize_filing_status(
+    session: Dict[str, Any],
+    state: Optional[str] = None,
+    tax_year: int = 2025,
+    allocation: Optional[Dict[str, float]] = None,
+    dependents_with: str = "taxpayer",
+    include_details: bool = False,
+) -> Dict[str, Any]:
+    """
+    Every eligible filing status for the household in session (Mongo
+    session or flat calculator input), cheapest first. state defaults
+    to the session's state. include_details keeps the full federal /
+    state results on each return.
+    """
+    if dependents_with not in ("taxpayer", "spouse"):
+        raise ValueError("dependents_with must be 'taxpayer' or 'spouse'")
+    for field, share in (allocation or {}).items():
+        if field not in FLOAT_FIELDS or field in _PAIRED:
+            raise ValueError(f"Cannot allocate {field!r}; use an amount field without a spouse_ counterpart")
+        if not 0 <= share <= 1:
+            raise ValueError(f"Spouse share for {field!r} must be between 0 and 1")
+
+    data = normalize_input(extract_from_session(session))
+    data["tax_year"] = tax_year
+    state = (state or data.get("state") or _session_state(session) or "").upper() or None
+    current = normalize_status(data.get("filing_status"))
+
+    statuses, ineligible = eligible_statuses(data, tax_year)
+    variants = build_variants(data, statuses, allocation, dependents_with)
+
+    returns = {}
+    for _, rets in variants:
+        for filer, key, ret in rets:
+            returns.setdefault(key, (filer, ret))
+    results = evaluate_returns(returns, state)
+    logger.debug("Filing status options %s: %d returns for %d variants", statuses, len(returns), len(variants))
+
+    options = []
+    for status, rets in variants:
+        summaries = [results[key] for _, key, _ in rets]
+        if not include_details:
+            summaries = [{k: v for k, v in s.items() if k not in ("federal", "state")} for s in summaries]
+        options.append({
+            "filing_status": status,
+            "label": LABELS[status],
+            "federal_tax": round(sum(s["federal_tax"] for s in summaries), 2),
+            "state_tax": round(sum(s["state_tax"] for s in summaries), 2),
+            "total_tax": round(sum(s["total_tax"] for s in summaries), 2),
+            "net_refund": round(sum(s["net_refund"] for s in summaries), 2),
+            "returns": summaries,
+        })
+
+    options.sort(key=lambda o: (o["total_tax"], statuses.index(o["filing_status"])))
+    best = options[0]["total_tax"]
+    by_status = {o["filing_status"]: o for o in options}
+    baseline = by_status.get(current)
+    for rank, option in enumerate(options, 1):
+        option["rank"] = rank
+        option["delta_vs_best"] = round(option["total_tax"] - best, 2)
+        option["delta_vs_current"] = round(option["total_tax"] - baseline["total_tax"], 2) if baseline else None
+
+    return {
+        "tax_year": tax_year,
+        "state": state,
+        "current_status": current,
+        "recommended": options[0]["filing_status"],
+        "savings_vs_current": round(baseline["total_tax"] - best, 2) if baseline else None,
+        "options": options,
+        "ineligible": [{"filing_status": s, "label": LABELS[s], "reason": r} for s, r in ineligible.items()],
+    }
+
+
+__all__ = [
+    "SPOUSE_PAIRS",
+    "JOINT_SHARES",
+    "eligible_statuses",
+    "split_returns",
+    "build_variants",
+    "evaluate_returns",
+    "optimize_filing_status",
+]
@@ -0,0 +1,330 @@
+"""
+================================================================================
+TAXSKY 2025 - BACKGROUND JOB QUEUE v1.0
+================================================================================
+File: python_tax_api/tax_engine/job_queue.py
+
+In-process job queue for long-running validation work (Mongo fetch, RAG
+verification, calculation, Form 1040 build, Mongo save).
+
+  ✅ Jobs run on a small thread pool - webhook returns 202 immediately
+  ✅ Idempotent per (user_id, tax_year): a duplicate webhook while a job is
+     still QUEUED gets the same job_id back
+  ✅ Coalescing: duplicates while a job is RUNNING collapse into ONE
+     follow-up job that starts after the running one finishes
+  ✅ Bounded job history for the status endpoint
+  ✅ SingleFlight: concurrent identical calls share one computation, and
+     calls within a short debounce window reuse the last result
+
+CONFIG (environment):
+  TAXSKY_JOB_WORKERS                 - worker threads (default 2)
+  TAXSKY_JOB_HISTORY                 - finished jobs kept for status lookups (default 1000)
+  TAXSKY_VALIDATION_DEBOUNCE_SECONDS - SingleFlight reuse window (default 5)
+
+================================================================================
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+JOB_QUEUE_VERSION = "v1.0"
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("TAXSKY_JOB_WORKERS", "2"))
+JOB_HISTORY = int(os.getenv("TAXSKY_JOB_HISTORY", "1000"))
+VALIDATION_DEBOUNCE_SECONDS = float(os.getenv("TAXSKY_VALIDATION_DEBOUNCE_SECONDS", "5"))
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobQueue:
+    """
+    Thread-pool job queue keyed by (user_id, tax_year).
+
+    At most one job per key runs at a time and at most one more waits
+    behind it, so a burst of N webhooks for the same user costs at most
+    two pipeline runs.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._history = history
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # key -> {"running": job_id | None, "pending": job_id | None}
+        self._keys: Dict[Tuple[str, int], Dict[str, Optional[str]]] = {}
+        # job_id -> callable to execute
+        self._work: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="taxsky-job",
+            )
+        return self._executor
+
+    # ────────────────────────────────────────────────────────
+    # PUBLIC API
+    # ────────────────────────────────────────────────────────
+
+    def submit(self, user_id: str, tax_year: int, fn: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Enqueue fn for (user_id, tax_year).
+
+        Returns:
+            (job snapshot, created) - created is False when the request
+            was coalesced into an existing queued job.
+        """
+        key = (user_id, tax_year)
+
+        with self._lock:
+            slot = self._keys.setdefault(key, {"running": None, "pending": None})
+
+            # Already waiting to run - same job, same result
+            if slot["pending"]:
+                job = self._jobs[slot["pending"]]
+                job["coalesced"] += 1
+                return dict(job), False
+
+            job = self._new_job(user_id, tax_year)
+            self._work[job["job_id"]] = fn
+
+            if slot["running"]:
+                # Run once more after the current job (data may have changed)
+                slot["pending"] = job["job_id"]
+            else:
+                slot["running"] = job["job_id"]
+                self._start(job["job_id"])
+
+            return dict(job), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest(self, user_id: str, tax_year: int) -> Optional[Dict[str, Any]]:
+        """Most recent job for (user_id, tax_year), if still in history."""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job["user_id"] == user_id and job["tax_year"] == tax_year:
+                    return dict(job)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+            return {
+                "version": JOB_QUEUE_VERSION,
+                "workers": self._max_workers,
+                "jobs": counts,
+                "active_keys": sum(1 for s in self._keys.values() if s["running"]),
+            }
+
+    # ────────────────────────────────────────────────────────
+    # INTERNALS (caller holds self._lock)
+    # ────────────────────────────────────────────────────────
+
+    def _new_job(self, user_id: str, tax_year: int) -> Dict[str, Any]:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "tax_year": tax_year,
+            "status": QUEUED,
+            "coalesced": 0,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self._jobs[job["job_id"]] = job
+        self._trim()
+        return job
+
+    def _trim(self):
+        """Drop the oldest FINISHED jobs beyond the history limit."""
+        excess = len(self._jobs) - self._history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]["status"] in (DONE, FAILED):
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _start(self, job_id: str):
+        self._get_executor().submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = _now()
+            fn = self._work.pop(job_id)
+
+        try:
+            result = fn()
+            status, error = DONE, None
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = _now()
+
+            slot = self._keys[(job["user_id"], job["tax_year"])]
+            slot["running"] = slot["pending"]
+            slot["pending"] = None
+            if slot["running"]:
+                self._start(slot["running"])
+            else:
+                del self._keys[(job["user_id"], job["tax_year"])]
+
+
+# ============================================================
+# SINGLE-FLIGHT + DEBOUNCE
+# ============================================================
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key single-flight with a debounce window.
+
+    do(key, fn):
+      - if a call for key is in flight, wait for it and share its result
+      - if a call for key finished less than `window` seconds ago, reuse it
+      - otherwise run fn() in the calling thread
+
+    force=True skips both shortcuts (used when the caller knows the data
+    just changed); the fresh result still refreshes the debounce cache.
+
+    Only results for which keep(result) is true are reused after the call
+    finishes (errors and failed results are never cached).
+    """
+
+    def __init__(self, window: float = VALIDATION_DEBOUNCE_SECONDS,
+                 keep: Callable[[Any], bool] = lambda r: r is not None):
+        self.window = window
+        self._keep = keep
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, _Call] = {}
+        self._recent: Dict[Any, Tuple[float, Any]] = {}
+        self._stats = {"calls": 0, "executed": 0, "joined": 0, "reused": 0}
+
+    def do(self, key: Any, fn: Callable[[], Any], force: bool = False) -> Tuple[Any, str]:
+        """
+        Returns:
+            (result, how) - how is "executed", "joined" or "reused"
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+
+            if not force:
+                recent = self._recent.get(key)
+                if recent and time.monotonic() - recent[0] < self.window:
+                    self._stats["reused"] += 1
+                    return recent[1], "reused"
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader or force:
+                # force: never share a computation that started earlier -
+                # wait it out, then run fresh
+                while call is not None and force:
+                    self._lock.release()
+                    try:
+                        call.done.wait()
+                    finally:
+                        self._lock.acquire()
+                    call = self._calls.get(key)
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+                    self._stats["executed"] += 1
+                    leader = True
+            if not leader:
+                call.waiters += 1
+                self._stats["joined"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result, "joined"
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+
+        with self._lock:
+            del self._calls[key]
+            if call.error is None and self.window > 0 and self._keep(call.result):
+                self._recent[key] = (time.monotonic(), call.result)
+            else:
+                self._recent.pop(key, None)
+            if len(self._recent) > 1024:
+                self._expire()
+        call.done.set()
+
+        if call.error:
+            raise call.error
+        return call.result, "executed"
+
+    def forget(self, key: Any):
+        """Drop the cached result for key (next call recomputes)."""
+        with self._lock:
+            self._recent.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window_seconds": self.window,
+                "in_flight": len(self._calls),
+                "cached": len(self._recent),
+                **self._stats,
+            }
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.window
+        for key in [k for k, (t, _) in self._recent.items() if t < cutoff]:
+            del self._recent[key]
+
+
+# Shared queue for the service
+job_queue = JobQueue()
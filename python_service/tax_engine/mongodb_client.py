@@ -10,6 +10,12 @@ FIXES in v2.2:
   ✅ ADDED: PYMONGO_AVAILABLE constant for import checking
   ✅ FIXED: Use camelCase field names to match Mongoose schema
 
+v2.3:
+  ✅ ADDED: content fingerprint + skip-if-unchanged saves (diffed against the stored document)
+  ✅ ADDED: only changed subdocuments are written ($set on dotted paths)
+  ✅ ADDED: connection pool events + gauges on /metrics
+  ✅ ADDED: pymongo imported on first connection, not at module load
+
 HOW TO USE:
   Set MONGODB_URI environment variable before running!
   
@@ -25,22 +31,36 @@ HOW TO USE:
 """
 
 import os
-from typing import Optional, Dict, Any
+import hashlib
+import importlib.util
+import json
+import logging
+from typing import Optional, Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
 
 # ============================================================
 # CHECK IF PYMONGO IS AVAILABLE
 # ============================================================
+# find_spec only checks the package exists; the import itself is deferred
+# to the first connection (_import_pymongo) to keep it off worker boot
+PYMONGO_AVAILABLE = importlib.util.find_spec("pymongo") is not None
+if not PYMONGO_AVAILABLE:
+    print("⚠️ pymongo not installed - MongoDB features disabled")
+
 try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, ConfigurationError
-    PYMONGO_AVAILABLE = True
+    from startup import import_module
 except ImportError:
-    PYMONGO_AVAILABLE = False
-    MongoClient = None
-    ConnectionFailure = Exception
-    ServerSelectionTimeoutError = Exception
-    ConfigurationError = Exception
-    print("⚠️ pymongo not installed - MongoDB features disabled")
+    from importlib import import_module
+
+# Bound by _import_pymongo(). Until then the error names are empty tuples,
+# which match nothing in an except clause (no pymongo error can exist yet).
+MongoClient = None
+ConnectionFailure = ()
+ServerSelectionTimeoutError = ()
+ConfigurationError = ()
+_pool_listener_cls = None
+_pymongo_loaded = False
 
 # ============================================================
 # CONFIGURATION - LOCAL MONGODB DEFAULT
@@ -76,13 +96,89 @@ DATABASE_NAME = os.getenv("MONGODB_DATABASE", "ai_tax")
 COLLECTION_NAME = "taxsessions"
 
 # Global client (reused for connection pooling)
-_client: Optional[MongoClient] = None
+_client = None
 _db = None
 _connection_failed = False
 _connection_error = None
 
 
-def get_mongodb_client() -> Optional[MongoClient]:
+# ============================================================
+# CONNECTION POOL METRICS
+# ============================================================
+try:
+    from metrics import MONGO_POOL_EVENTS, register_collector
+except ImportError:
+    MONGO_POOL_EVENTS = None
+
+
+def _make_pool_listener(base):
+    """Listener class over pymongo.monitoring.ConnectionPoolListener (built after import)."""
+
+    class _PoolMetricsListener(base):
+        """Counts pool events into taxsky_mongo_pool_events_total{event}."""
+
+        def _inc(self, event: str):
+            if MONGO_POOL_EVENTS is not None:
+                MONGO_POOL_EVENTS.inc(event)
+
+        def pool_created(self, event): self._inc("pool_created")
+        def pool_ready(self, event): self._inc("pool_ready")
+        def pool_cleared(self, event): self._inc("pool_cleared")
+        def pool_closed(self, event): self._inc("pool_closed")
+        def connection_created(self, event): self._inc("connection_created")
+        def connection_ready(self, event): self._inc("connection_ready")
+        def connection_closed(self, event): self._inc("connection_closed")
+        def connection_check_out_started(self, event): self._inc("check_out_started")
+        def connection_check_out_failed(self, event): self._inc("check_out_failed")
+        def connection_checked_out(self, event): self._inc("checked_out")
+        def connection_checked_in(self, event): self._inc("checked_in")
+
+    return _PoolMetricsListener
+
+
+def _pool_metrics():
+    """Scrape-time gauges derived from the pool event counters."""
+    events = {key[0]: value for key, value in MONGO_POOL_EVENTS.values().items()}
+    max_size = _client.options.pool_options.max_pool_size if _client is not None else 0
+    yield ("taxsky_mongo_pool_connections", "gauge", "Open MongoDB connections",
+           [({}, events.get("connection_created", 0) - events.get("connection_closed", 0))])
+    yield ("taxsky_mongo_pool_in_use", "gauge", "MongoDB connections checked out",
+           [({}, events.get("checked_out", 0) - events.get("checked_in", 0))])
+    yield ("taxsky_mongo_pool_max_size", "gauge", "MongoDB maxPoolSize",
+           [({}, max_size)])
+
+
+if MONGO_POOL_EVENTS is not None:
+    register_collector(_pool_metrics)
+
+
+def _import_pymongo():
+    """Bind MongoClient, the error classes and the pool listener on first use."""
+    global MongoClient, ConnectionFailure, ServerSelectionTimeoutError, ConfigurationError
+    global _pool_listener_cls, _pymongo_loaded
+
+    if _pymongo_loaded:
+        return
+    try:
+        errors = import_module("pymongo.errors")
+        monitoring = import_module("pymongo.monitoring")
+    except ImportError:
+        if MongoClient is None:
+            raise
+        # A MongoClient stand-in was installed (benchmarks/load_test.py)
+        _pymongo_loaded = True
+        return
+
+    ConnectionFailure = errors.ConnectionFailure
+    ServerSelectionTimeoutError = errors.ServerSelectionTimeoutError
+    ConfigurationError = errors.ConfigurationError
+    _pool_listener_cls = _make_pool_listener(monitoring.ConnectionPoolListener)
+    if MongoClient is None:
+        MongoClient = import_module("pymongo").MongoClient
+    _pymongo_loaded = True
+
+
+def get_mongodb_client():
     """Get or create MongoDB client with connection pooling."""
     global _client, _connection_failed, _connection_error
     
@@ -94,44 +190,44 @@ def get_mongodb_client() -> Optional[MongoClient]:
         raise ConnectionError(f"MongoDB connection previously failed: {_connection_error}")
     
     if _client is None:
+        _import_pymongo()
         try:
             # Only show first 50 chars of URI (hide password)
             safe_uri = MONGODB_URI[:50] + "..." if len(MONGODB_URI) > 50 else MONGODB_URI
-            print(f"📡 Connecting to MongoDB: {safe_uri}")
+            logger.info("Connecting to MongoDB: %s", safe_uri)
             
             _client = MongoClient(
                 MONGODB_URI,
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=5000,
-                socketTimeoutMS=10000
+                socketTimeoutMS=10000,
+                event_listeners=[_pool_listener_cls()] if _pool_listener_cls else [],
             )
             
             # Test connection
             _client.admin.command('ping')
-            print(f"✅ Connected to database: {DATABASE_NAME}")
+            logger.info("Connected to database: %s", DATABASE_NAME)
             
         except ConfigurationError as e:
             _connection_failed = True
             _connection_error = str(e)
-            print(f"❌ MongoDB configuration error: {e}")
-            print("   This usually means the connection string is invalid or the cluster doesn't exist.")
+            logger.error("MongoDB configuration error: %s "
+                         "(connection string invalid or cluster doesn't exist)", e)
             _client = None
             raise
             
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             _connection_failed = True
             _connection_error = str(e)
-            print(f"❌ MongoDB connection failed: {e}")
-            print("   Make sure MongoDB is running locally!")
-            print("   Windows: net start MongoDB")
-            print("   Or start MongoDB Compass")
+            logger.error("MongoDB connection failed: %s "
+                         "(make sure MongoDB is running - Windows: net start MongoDB)", e)
             _client = None
             raise
             
         except Exception as e:
             _connection_failed = True
             _connection_error = str(e)
-            print(f"❌ MongoDB error: {e}")
+            logger.error("MongoDB error: %s", e)
             _client = None
             raise
     
@@ -180,14 +276,14 @@ def get_session(user_id: str, tax_year: int = 2025) -> Optional[Dict[str, Any]]:
         The session document or None if not found
     """
     if not PYMONGO_AVAILABLE:
-        print("⚠️ MongoDB not available - pymongo not installed")
+        logger.warning("MongoDB not available - pymongo not installed")
         return None
     
     try:
         collection = get_collection()
         
         if collection is None:
-            print("⚠️ Could not get MongoDB collection")
+            logger.warning("Could not get MongoDB collection")
             return None
         
         # ✅ CORRECT: Use camelCase field names!
@@ -199,27 +295,20 @@ def get_session(user_id: str, tax_year: int = 2025) -> Optional[Dict[str, Any]]:
         session = collection.find_one(query)
         
         if session:
-            print(f"✅ Found session: {user_id}, year={tax_year}")
-            print(f"   Messages: {len(session.get('messages', []))}")
-            print(f"   Status: {session.get('status', 'unknown')}")
+            logger.debug("Found session: %s year=%s status=%s", user_id, tax_year, session.get("status", "unknown"))
             return session
         else:
-            print(f"❌ Session not found: {user_id}")
-            # Debug: Show what's in the collection
-            count = collection.count_documents({})
-            print(f"   📊 Total documents in collection: {count}")
+            logger.info("Session not found: %s year=%s", user_id, tax_year)
             return None
             
     except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-        print(f"❌ MongoDB connection failed: {e}")
+        logger.error("MongoDB connection failed: %s", e)
         return None
     except ConfigurationError as e:
-        print(f"❌ MongoDB configuration error: {e}")
+        logger.error("MongoDB configuration error: %s", e)
         return None
-    except Exception as e:
-        print(f"❌ MongoDB error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("MongoDB error reading session %s", user_id)
         return None
 
 
@@ -236,7 +325,7 @@ def update_session(user_id: str, tax_year: int, update_data: Dict[str, Any]) ->
         True if successful, False otherwise
     """
     if not PYMONGO_AVAILABLE:
-        print("⚠️ MongoDB not available")
+        logger.warning("MongoDB not available")
         return False
     
     try:
@@ -257,17 +346,190 @@ def update_session(user_id: str, tax_year: int, update_data: Dict[str, Any]) ->
         )
         
         if result.modified_count > 0:
-            print(f"✅ Updated session: {user_id}")
+            logger.debug("Updated session: %s", user_id)
             return True
         else:
-            print(f"⚠️ No changes made to session: {user_id}")
+            logger.debug("No changes made to session: %s", user_id)
             return False
             
     except Exception as e:
-        print(f"❌ MongoDB update error: {e}")
+        logger.error("MongoDB update error: %s", e)
         return False
 
 
+# ============================================================
+# FINGERPRINTED / DIFFED UPDATES
+# ============================================================
+def compute_fingerprint(data: Dict[str, Any]) -> str:
+    """Stable SHA-256 of a document (key order independent)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _is_safe_key(key: Any) -> bool:
+    """Keys that can be addressed with a dotted $set path."""
+    return isinstance(key, str) and key != "" and "." not in key and not key.startswith("$")
+
+
+def diff_set_paths(old: Any, new: Dict[str, Any], prefix: str = "") -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Minimal $set / $unset for turning old into new.
+    
+    Nested dicts are walked key by key so only changed leaves are sent
+    (e.g. "taxCalculation.refund"). Lists and scalars are replaced whole.
+    
+    Returns:
+        (set_fields, unset_fields) keyed by dotted path
+    """
+    set_fields: Dict[str, Any] = {}
+    unset_fields: Dict[str, str] = {}
+    
+    if not isinstance(old, dict):
+        old = {}
+    
+    for key, value in new.items():
+        path = f"{prefix}{key}"
+        if key not in old:
+            set_fields[path] = value
+            continue
+        
+        current = old[key]
+        if (isinstance(value, dict) and isinstance(current, dict)
+                and value and all(_is_safe_key(k) for k in value)
+                and all(_is_safe_key(k) for k in current)):
+            sub_set, sub_unset = diff_set_paths(current, value, f"{path}.")
+            set_fields.update(sub_set)
+            unset_fields.update(sub_unset)
+        elif current != value:
+            set_fields[path] = value
+    
+    if prefix:
+        for key in old:
+            if key not in new:
+                unset_fields[f"{prefix}{key}"] = ""
+    
+    return set_fields, unset_fields
+
+
+def _split_volatile(update_data: Dict[str, Any], volatile_fields: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Separate volatile values (timestamps) from fingerprinted content.
+    
+    volatile_fields may be dotted paths into nested dicts
+    (e.g. "form1040._metadata.extracted_at"); only the dicts along those
+    paths are copied.
+    
+    Returns:
+        (content without volatile values, {dotted_path: value})
+    """
+    content = dict(update_data)
+    touch: Dict[str, Any] = {}
+    
+    for path in volatile_fields:
+        parts = path.split(".")
+        node = content
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                node = None
+                break
+            child = dict(child)
+            node[part] = child
+            node = child
+        if node is not None and parts[-1] in node:
+            touch[path] = node.pop(parts[-1])
+    
+    return content, touch
+
+
+def _merge_dotted(set_fields: Dict[str, Any], path: str, value: Any):
+    """
+    Add path=value to a $set, folding it into an ancestor path that is
+    already being set whole (Mongo rejects overlapping paths).
+    """
+    parts = path.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        ancestor = ".".join(parts[:i])
+        if ancestor in set_fields and isinstance(set_fields[ancestor], dict):
+            node = set_fields[ancestor] = dict(set_fields[ancestor])
+            for part in parts[i:-1]:
+                node[part] = dict(node.get(part) or {})
+                node = node[part]
+            node[parts[-1]] = value
+            return
+    set_fields[path] = value
+
+
+def update_session_if_changed(user_id: str, tax_year: int, update_data: Dict[str, Any],
+                              fingerprint_field: str,
+                              volatile_fields: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Write update_data only where it differs from the stored document.
+    
+    update_data (minus volatile_fields such as timestamps) is diffed
+    against the current values of its fields, so writes made by other
+    services (Node rewrites form1040, status, taxCalculation) are
+    overwritten when they differ. If nothing differs, only the volatile
+    fields are touched; otherwise only the changed dotted paths are sent.
+    The content fingerprint is stored in fingerprint_field with them.
+    
+    Returns:
+        {"success": bool, "action": "skipped" | "touched" | "updated" | "not_found" | "error",
+         "fields": number of paths written}
+    """
+    if not PYMONGO_AVAILABLE:
+        logger.warning("MongoDB not available")
+        return {"success": False, "action": "error", "fields": 0}
+    
+    content, touch = _split_volatile(update_data, volatile_fields)
+    fingerprint = compute_fingerprint(content)
+    
+    try:
+        collection = get_collection()
+        
+        if collection is None:
+            return {"success": False, "action": "error", "fields": 0}
+        
+        query = {"userId": user_id, "taxYear": tax_year}
+        projection = {k: 1 for k in content}
+        projection[fingerprint_field] = 1
+        existing = collection.find_one(query, projection)
+        
+        if existing is None:
+            logger.info("No session found to update: %s", user_id)
+            return {"success": False, "action": "not_found", "fields": 0}
+        
+        # Diff against what is stored now, not against our own last write
+        content[fingerprint_field] = fingerprint
+        set_fields, unset_fields = diff_set_paths(existing, content)
+        for path in touch:
+            unset_fields.pop(path, None)
+        
+        if not set_fields and not unset_fields:
+            if not touch:
+                logger.debug("Unchanged, skipped write: %s", user_id)
+                return {"success": True, "action": "skipped", "fields": 0}
+            collection.update_one(query, {"$set": touch})
+            logger.debug("Unchanged, touched %s: %s", ", ".join(touch), user_id)
+            return {"success": True, "action": "touched", "fields": len(touch)}
+        
+        for path, value in touch.items():
+            _merge_dotted(set_fields, path, value)
+        
+        update: Dict[str, Any] = {"$set": set_fields}
+        if unset_fields:
+            update["$unset"] = unset_fields
+        
+        collection.update_one(query, update)
+        written = len(set_fields) + len(unset_fields)
+        logger.debug("Updated session: %s (%d paths)", user_id, written)
+        return {"success": True, "action": "updated", "fields": written}
+        
+    except Exception as e:
+        logger.error("MongoDB update error: %s", e)
+        return {"success": False, "action": "error", "fields": 0}
+
+
 def get_all_sessions(tax_year: int = 2025, limit: int = 100) -> list:
     """
     Get all sessions for a tax year.
@@ -280,7 +542,7 @@ def get_all_sessions(tax_year: int = 2025, limit: int = 100) -> list:
         List of session documents
     """
     if not PYMONGO_AVAILABLE:
-        print("⚠️ MongoDB not available")
+        logger.warning("MongoDB not available")
         return []
     
     try:
@@ -293,12 +555,12 @@ def get_all_sessions(tax_year: int = 2025, limit: int = 100) -> list:
         query = {"taxYear": tax_year}
         
         sessions = list(collection.find(query).limit(limit))
-        print(f"📋 Found {len(sessions)} sessions for year {tax_year}")
+        logger.debug("Found %d sessions for year %s", len(sessions), tax_year)
         
         return sessions
         
     except Exception as e:
-        print(f"❌ MongoDB error: {e}")
+        logger.error("MongoDB error: %s", e)
         return []
 
 
@@ -317,15 +579,10 @@ def save_extraction_result(user_id: str, tax_year: int, extracted: Dict, tax_res
         True if successful
     """
     if not PYMONGO_AVAILABLE:
-        print("⚠️ MongoDB not available")
+        logger.warning("MongoDB not available")
         return False
     
     try:
-        collection = get_collection()
-        
-        if collection is None:
-            return False
-        
         from datetime import datetime
         
         update_data = {
@@ -336,21 +593,18 @@ def save_extraction_result(user_id: str, tax_year: int, extracted: Dict, tax_res
             "updatedAt": datetime.utcnow()
         }
         
-        # ✅ CORRECT: Use camelCase!
-        result = collection.update_one(
-            {"userId": user_id, "taxYear": tax_year},
-            {"$set": update_data}
+        result = update_session_if_changed(
+            user_id, tax_year, update_data,
+            fingerprint_field="extractionFingerprint",
+            volatile_fields=("updatedAt",),
         )
         
-        if result.modified_count > 0:
-            print(f"✅ Saved extraction to MongoDB: {user_id}")
-            return True
-        else:
-            print(f"⚠️ No session found to update: {user_id}")
-            return False
+        if result["success"]:
+            logger.debug("Saved extraction to MongoDB: %s (%s)", user_id, result["action"])
+        return result["success"]
             
     except Exception as e:
-        print(f"❌ MongoDB save error: {e}")
+        logger.error("MongoDB save error: %s", e)
         return False
 
 
@@ -405,7 +659,7 @@ def test_connection() -> Dict[str, Any]:
 def list_user_ids(limit: int = 10) -> list:
     """List all user IDs in the collection (for debugging)."""
     if not PYMONGO_AVAILABLE:
-        print("⚠️ MongoDB not available")
+        logger.warning("MongoDB not available")
         return []
     
     try:
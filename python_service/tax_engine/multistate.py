@@ -0,0 +1,339 @@
+# tax_engine/multistate.py
+# ============================================================
+# MULTI-STATE RETURNS - part-year residents and work states
+# ============================================================
+# One household, several states: moved during the year (part-year
+# resident returns) and / or earned income in a state it didn't live
+# in (nonresident returns). Federal is calculated once; AGI is then
+# allocated to each state and every state involved is evaluated once.
+#
+# Input (on the calculator input, next to the usual fields):
+#
+#   residency      [{"state": "CA", "end": "2025-06-30"},
+#                   {"state": "NY", "start": "2025-07-01"}]
+#                  periods in date order covering the tax year
+#                  (start defaults to Jan 1, end to Dec 31). AGI
+#                  accrues by days unless a period gives "income".
+#   state_sources  [{"state": "NJ", "amount": 30000}]
+#                  income earned in a state, optionally with start /
+#                  end; split over the residency periods it overlaps
+#   state_withholding_by_state  {"NY": 2500, "NJ": 1200}; without it
+#                  all state withholding goes to the year-end state
+#
+# Per state (income-percentage method, as on CA 540NR / NY IT-203):
+#
+#   state income   income while resident there + income sourced there
+#                  while living elsewhere
+#   tax            full-year resident tax on federal AGI (the state's
+#                  own calculator) x state income / AGI
+#   credit         the resident state credits tax paid to another state
+#                  on the same income: min(other state's tax on it,
+#                  own tax on it), capped at its tax
+#
+# State calculators take microseconds and hold the GIL, so they run
+# in one pass rather than on a thread pool.
+# ============================================================
+
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from .calculator.federal.calculator import calculate as calculate_federal
+from .calculator.inputs import CanonicalInput, normalize_input
+from .calculator.tax_params import DEFAULT_TAX_YEAR
+from .state_compare import state_tax_amount
+from .state_registry import ALL_STATE_CODES, get_state
+from .state_router import calculate_state_tax
+
+logger = logging.getLogger(__name__)
+
+RESIDENT = "resident"
+PART_YEAR = "part_year"
+NONRESIDENT = "nonresident"
+
+
+# ============================================================
+# INPUT
+# ============================================================
+
+def _state_code(value: Any) -> str:
+    code = str(value or "").upper().strip()
+    if code not in ALL_STATE_CODES:
+        raise ValueError(f"Unknown state {value!r}")
+    return code
+
+
+def _day(value: Any, default: date, tax_year: int) -> date:
+    if not value:
+        return default
+    try:
+        day = date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; use YYYY-MM-DD")
+    if day.year != tax_year:
+        raise ValueError(f"Date {value} is outside tax year {tax_year}")
+    return day
+
+
+def _amount(value: Any, what: str) -> float:
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what} must be a number")
+    if amount < 0:
+        raise ValueError(f"{what} must be >= 0")
+    return amount
+
+
+class Period:
+    """One stretch of the tax year: residency (with its income) or a state source."""
+
+    __slots__ = ("state", "start", "end", "income")
+
+    def __init__(self, state: str, start: date, end: date, income: Optional[float] = None):
+        self.state = state
+        self.start = start
+        self.end = end
+        self.income = income
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def overlap(self, other: "Period") -> int:
+        return max(0, (min(self.end, other.end) - max(self.start, other.start)).days + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "start": self.start.isoformat(), "end": self.end.isoformat(),
+                "days": self.days, "income": round(self.income or 0, 2)}
+
+
+def residency_periods(entries: List[Dict[str, Any]], tax_year: int, agi: float) -> List[Period]:
+    """Residency entries as Periods with income; must cover the tax year in order."""
+    if not entries:
+        raise ValueError("residency needs at least one period")
+    first, last = date(tax_year, 1, 1), date(tax_year, 12, 31)
+    periods = []
+    for e in entries:
+        start = _day(e.get("start"), first, tax_year)
+        end = _day(e.get("end"), last, tax_year)
+        if end < start:
+            raise ValueError(f"Residency period {start} - {end} ends before it starts")
+        income = e.get("income")
+        periods.append(Period(_state_code(e.get("state")), start, end,
+                              None if income is None else _amount(income, "Residency income")))
+
+    expected = first
+    for p in periods:
+        if p.start != expected:
+            raise ValueError(f"Residency periods must cover {tax_year} in order without gaps or overlaps "
+                             f"(expected a period starting {expected})")
+        expected = date.fromordinal(p.end.toordinal() + 1)
+    if periods[-1].end != last:
+        raise ValueError(f"Residency periods must run through {last}")
+
+    # Periods without an explicit amount share what's left by days
+    given = sum(p.income for p in periods if p.income is not None)
+    open_days = sum(p.days for p in periods if p.income is None)
+    rest = max(0.0, agi - given)
+    for p in periods:
+        if p.income is None:
+            p.income = rest * p.days / open_days if open_days else 0.0
+    return periods
+
+
+def source_periods(entries: List[Dict[str, Any]], tax_year: int) -> List[Period]:
+    first, last = date(tax_year, 1, 1), date(tax_year, 12, 31)
+    out = []
+    for e in entries or []:
+        start = _day(e.get("start"), first, tax_year)
+        end = _day(e.get("end"), last, tax_year)
+        if end < start:
+            raise ValueError(f"Source period {start} - {end} ends before it starts")
+        out.append(Period(_state_code(e.get("state")), start, end, _amount(e.get("amount", 0), "Source amount")))
+    return out
+
+
+# ============================================================
+# ALLOCATION
+# ============================================================
+
+class StateShare:
+    """Income one state may tax, and where the nonresident part came from."""
+
+    __slots__ = ("state", "resident_days", "resident_income", "nonresident_income", "sourced_while_in")
+
+    def __init__(self, state: str):
+        self.state = state
+        self.resident_days = 0
+        self.resident_income = 0.0
+        self.nonresident_income = 0.0
+        self.sourced_while_in: Dict[str, float] = {}  # resident state -> income sourced here meanwhile
+
+    @property
+    def income(self) -> float:
+        return self.resident_income + self.nonresident_income
+
+
+def allocate(residency: List[Period], sources: List[Period]) -> Dict[str, StateShare]:
+    """{state: StateShare} for every state lived in or sourced, residency states first."""
+    shares: Dict[str, StateShare] = {}
+    for p in residency:
+        share = shares.setdefault(p.state, StateShare(p.state))
+        share.resident_days += p.days
+        share.resident_income += p.income
+    for src in sources:
+        # A source spread evenly over its dates, split by where the household lived
+        for p in residency:
+            days = src.overlap(p)
+            if not days or p.state == src.state:
+                continue
+            amount = src.income * days / src.days
+            share = shares.setdefault(src.state, StateShare(src.state))
+            share.nonresident_income += amount
+            share.sourced_while_in[p.state] = share.sourced_while_in.get(p.state, 0.0) + amount
+    return shares
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+def _withholding(data: CanonicalInput, year_end_state: str) -> Dict[str, float]:
+    by_state = data.get("state_withholding_by_state")
+    if by_state:
+        return {_state_code(code): _amount(amount, f"{code} withholding") for code, amount in by_state.items()}
+    total = data.get("state_withholding") or (data.get("taxpayer_state_withheld", 0) + data.get("spouse_state_withheld", 0))
+    return {year_end_state: float(total or 0)}
+
+
+def calculate_multistate(tax_data: Dict[str, Any], include_details: bool = False) -> Dict[str, Any]:
+    """
+    Federal once, then every state in tax_data["residency"] /
+    ["state_sources"] with its share of AGI and other-state credits.
+    Same totals as calculate_tax (federal, total_refund, ...), with
+    "states" in place of the single "state".
+    """
+    data = normalize_input(tax_data)
+    tax_year = data.get("tax_year") or DEFAULT_TAX_YEAR
+    residency = data.get("residency")
+    if not residency:
+        state = data.get("state")
+        if not state:
+            raise ValueError("Need residency periods or a state")
+        residency = [{"state": state}]
+
+    federal = calculate_federal(data)
+    agi = federal.get("agi", 0)
+    periods = residency_periods(residency, tax_year, agi)
+    sources = source_periods(data.get("state_sources"), tax_year)
+    shares = allocate(periods, sources)
+    withheld = _withholding(data, periods[-1].state)
+    for code in withheld:
+        shares.setdefault(code, StateShare(code))
+
+    # Full-year resident tax per state, each calculator once
+    base = CanonicalInput(data)
+    base["federal_agi"] = base["agi"] = agi
+    base["state_withholding"] = 0
+    full_year: Dict[str, Dict[str, Any]] = {}
+    for code in shares:
+        try:
+            full_year[code] = calculate_state_tax(code, base)
+        except Exception as e:
+            logger.warning("%s state calculation failed in multi-state return: %s", code, e)
+            full_year[code] = {"state": code, "error": "State calculation failed"}
+
+    taxes: Dict[str, float] = {}
+    for code, share in shares.items():
+        result = full_year[code]
+        ratio = min(1.0, share.income / agi) if agi > 0 else 0.0
+        taxes[code] = 0.0 if "error" in result else state_tax_amount(result) * ratio
+
+    # Resident state credits tax paid to the source state on the same income
+    credits: Dict[str, List[Dict[str, float]]] = {code: [] for code in shares}
+    for code, share in shares.items():
+        if not share.nonresident_income or not taxes[code]:
+            continue
+        for home, amount in share.sourced_while_in.items():
+            home_share = shares[home]
+            if not taxes[home] or not home_share.income:
+                continue
+            paid = taxes[code] * amount / share.income
+            home_tax = taxes[home] * amount / home_share.income
+            credits[home].append({"state": code, "income": amount, "credit": min(paid, home_tax)})
+
+    year_days = date(tax_year, 12, 31).timetuple().tm_yday
+    states = []
+    for code, share in shares.items():
+        result = full_year[code]
+        tax_before = taxes[code]
+        credit = min(tax_before, sum(c["credit"] for c in credits[code]))
+        tax = tax_before - credit
+        paid_in = withheld.get(code, 0.0)
+        balance = paid_in - tax
+        params = get_state(code)
+        entry = {
+            "state": code,
+            "state_name": result.get("state_name") or (params.name if params else code),
+            "residency": (RESIDENT if share.resident_days == year_days
+                          else PART_YEAR if share.resident_days else NONRESIDENT),
+            "resident_days": share.resident_days,
+            "has_income_tax": bool(params and params.has_income_tax),
+            "resident_income": round(share.resident_income, 2),
+            "nonresident_income": round(share.nonresident_income, 2),
+            "state_income": round(share.income, 2),
+            "allocation_ratio": round(min(1.0, share.income / agi) if agi > 0 else 0.0, 6),
+            "full_year_tax": round(state_tax_amount(result), 2) if "error" not in result else None,
+            "tax_before_credits": round(tax_before, 2),
+            "other_state_credit": round(credit, 2),
+            "other_state_credits": [
+                {"state": c["state"], "income": round(c["income"], 2), "credit": round(c["credit"], 2)}
+                for c in credits[code]
+            ],
+            "state_tax": round(tax, 2),
+            "withholding": round(paid_in, 2),
+            "refund": round(max(0, balance), 2),
+            "amount_owed": round(max(0, -balance), 2),
+        }
+        if "error" in result:
+            entry["error"] = result["error"]
+        if result.get("requested_tax_year"):
+            entry["tax_year"] = result["tax_year"]
+            entry["warnings"] = result["warnings"]
+        if include_details:
+            entry["calculation"] = result
+        states.append(entry)
+
+    fed_tax = federal.get("tax_after_credits", 0) - federal.get("refundable_credits", 0)
+    state_total = sum(s["state_tax"] for s in states)
+    total_owed = federal.get("amount_owed", 0) + sum(s["amount_owed"] for s in states)
+    total_refund = federal.get("refund", 0) + sum(s["refund"] for s in states)
+    logger.debug("Multi-state return %s: %d periods, %d states", tax_year, len(periods), len(states))
+
+    return {
+        "tax_year": federal.get("tax_year", tax_year),
+        "federal": federal,
+        "residency": [p.to_dict() for p in periods],
+        "states": states,
+        "federal_tax": round(fed_tax, 2),
+        "total_state_tax": round(state_total, 2),
+        "total_other_state_credit": round(sum(s["other_state_credit"] for s in states), 2),
+        "total_tax": round(fed_tax + state_total, 2),
+        "total_amount_owed": round(total_owed, 2),
+        "total_refund": round(total_refund, 2),
+        "ready_to_file": not any("error" in s or "warnings" in s for s in states),
+    }
+
+
+__all__ = [
+    "RESIDENT",
+    "PART_YEAR",
+    "NONRESIDENT",
+    "Period",
+    "StateShare",
+    "residency_periods",
+    "source_periods",
+    "allocate",
+    "calculate_multistate",
+]
@@ -0,0 +1,212 @@
+# ============================================================
+# TAXSKY 2025 - COMPACT RESULT RECORDS
+# ============================================================
+# __slots__ records for calculator results, for code that keeps many
+# results alive (result caches, batch / compare runs, benchmarks).
+#
+#   FederalResult  - calculator/federal calculate() (~95 keys)
+#   StateResult    - state_router.calculate_state_tax() (common keys
+#                    as slots, form-specific lines in .extra)
+#   StateRankRow   - a state_compare.compare_states() row (the
+#                    ranked tables it caches)
+#   TaxResult      - tax_engine.calculate_tax() (federal + state, or
+#                    the multistate shape: residency + "states")
+#
+# A record drops the per-instance dict (and its hash table) and keeps
+# values in fixed slots; keys a calculator adds later land in .extra,
+# so nothing is lost. to_dict() rebuilds the plain dict only at the
+# API boundary and compares equal to what calculate() returned.
+#
+# Records also answer rec["agi"], rec.get("agi"), "agi" in rec, so
+# read-only code written against the dicts keeps working.
+# ============================================================
+
+from typing import Any, Dict, Iterator, Tuple
+
+from .calculator.federal.calculator import calculate as calculate_federal
+from .state_router import calculate_state_tax
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+class ResultRecord:
+    """Base: FIELDS become slots; unknown keys go to .extra (None when empty)."""
+
+    __slots__ = ("extra",)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResultRecord":
+        rec = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(rec, name, data.get(name, MISSING))
+        fields = cls._FIELD_SET
+        extra = {k: v for k, v in data.items() if k not in fields}
+        rec.extra = extra or None
+        return rec
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not MISSING:
+                out[name] = value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    # ── read-only dict compatibility ──────────────────────────
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            return default if value is MISSING else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __repr__(self) -> str:
+        shown = ", ".join(f"{k}={self.get(k)!r}" for k in self.FIELDS[:4] if k in self)
+        return f"{type(self).__name__}({shown}, ...)"
+
+
+class FederalResult(ResultRecord):
+    FIELDS = (
+        "success", "tax_year", "filing_status",
+        # income
+        "wages", "taxpayer_wages", "spouse_wages", "interest_income", "dividend_income",
+        "qualified_dividends", "capital_gains", "long_term_gains", "short_term_gains",
+        "ira_distributions", "pension_income", "social_security_benefits",
+        "taxable_social_security", "self_employment_income", "other_income",
+        "total_income", "earned_income",
+        # OBBB deductions
+        "tips_received", "tips_deduction", "tips_reason",
+        "overtime_pay", "overtime_deduction", "overtime_reason",
+        "car_loan_interest", "car_loan_deduction", "car_loan_reason",
+        "taxpayer_65_plus", "spouse_65_plus", "senior_deduction", "senior_reason",
+        "total_obbb_deduction",
+        # adjustments
+        "adjustments", "traditional_adjustments",
+        "taxpayer_ira_contributed", "taxpayer_ira_deductible", "taxpayer_ira_non_deductible",
+        "taxpayer_ira_reason",
+        "spouse_ira_contributed", "spouse_ira_deductible", "spouse_ira_non_deductible",
+        "spouse_ira_reason",
+        "ira_deduction", "hsa_deduction", "student_loan_deduction", "se_tax_deduction",
+        "capital_loss_deduction",
+        # AGI & deductions
+        "agi", "federal_agi", "magi_for_ira", "standard_deduction", "taxable_income",
+        # tax
+        "ordinary_tax", "preferential_tax", "bracket_tax", "self_employment_tax",
+        "tax_before_credits",
+        # credits
+        "child_tax_credit", "ctc_nonrefundable", "ctc_refundable", "other_dependent_credit",
+        "eitc", "eitc_validation", "total_credits", "tax_after_credits",
+        # dependents
+        "qualifying_children_under_17", "other_dependents",
+        # payments
+        "withholding", "taxpayer_federal_withheld", "spouse_federal_withheld",
+        "state_withholding", "taxpayer_state_withheld", "spouse_state_withheld",
+        "estimated_payments", "refundable_credits", "total_payments",
+        # result
+        "refund", "amount_owed",
+        # debug
+        "_taxpayer_age", "_spouse_age", "_has_retirement_plan", "_spouse_has_retirement_plan",
+    )
+    __slots__ = FIELDS
+
+
+class StateResult(ResultRecord):
+    # Keys most state modules return; CA line items, NYC/Yonkers tax,
+    # PA local EIT etc. stay in .extra
+    FIELDS = (
+        "state", "state_name", "filing_status", "has_income_tax", "tax_type",
+        "federal_agi", "standard_deduction", "exemptions", "taxable_income",
+        "base_tax", "tax_rate", "state_tax", "total_tax",
+        "withholding", "refund", "amount_owed", "effective_rate",
+        "form", "support_level", "notes", "error",
+    )
+    __slots__ = FIELDS
+
+
+class StateRankRow(ResultRecord):
+    FIELDS = ("state", "state_name", "has_income_tax", "tax_type", "state_tax", "effective_rate", "rank")
+    __slots__ = FIELDS
+
+
+class TaxResult(ResultRecord):
+    """
+    tax_engine.calculate_tax() result with federal, state and each of
+    a multistate return's "states" as records. Keys a single-state
+    result lacks (residency, states, ...) are MISSING and stay out of
+    to_dict().
+    """
+
+    FIELDS = (
+        "tax_year", "federal", "state",
+        # multistate (calculate_multistate)
+        "residency", "states", "federal_tax", "total_state_tax", "total_other_state_credit", "total_tax",
+        # totals
+        "total_amount_owed", "total_refund", "ready_to_file",
+    )
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaxResult":
+        rec = super().from_dict(data)
+        if isinstance(rec.federal, dict):
+            rec.federal = FederalResult.from_dict(rec.federal)
+        if isinstance(rec.state, dict):
+            rec.state = StateResult.from_dict(rec.state)
+        if isinstance(rec.states, list):
+            rec.states = [StateResult.from_dict(s) for s in rec.states]
+        return rec
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = super().to_dict()
+        for key in ("federal", "state"):
+            if isinstance(out.get(key), ResultRecord):
+                out[key] = out[key].to_dict()
+        if "states" in out:
+            out["states"] = [s.to_dict() if isinstance(s, ResultRecord) else s for s in out["states"]]
+        return out
+
+
+# ============================================================
+# RECORD-RETURNING ENTRY POINTS
+# ============================================================
+
+def calculate_federal_record(data: Dict[str, Any]) -> FederalResult:
+    return FederalResult.from_dict(calculate_federal(data))
+
+
+def calculate_state_record(state_code: str, data: Dict[str, Any]) -> StateResult:
+    return StateResult.from_dict(calculate_state_tax(state_code, data))
+
+
+def calculate_tax_record(tax_data: Dict[str, Any]) -> TaxResult:
+    from .tax_engine import calculate_tax   # tax_engine -> multistate -> state_compare imports this module
+    return TaxResult.from_dict(calculate_tax(tax_data))
@@ -0,0 +1,363 @@
+# tax_engine/scenarios.py
+# ============================================================
+# WHAT-IF SCENARIOS - one base return, many variants
+# ============================================================
+# A CPA's what-ifs (add a dependent, change the IRA contribution,
+# sell stock) differ from the base return in a few fields. Instead of
+# N full calculations, the variants reuse as much of the base as the
+# changed fields allow:
+#
+#   - the base runs the federal calculator's STAGES (setup, income,
+#     adjustments, deductions, tax, credits, payments;
+#     federal/calculator.py) once, keeping its finished context and
+#     the input keys each stage read. Its state calculation keeps its
+#     reads the same way
+#   - a variant copies the base's context and re-runs the stages from
+#     the first one that read a field it changes, on its own input. Adding a child leaves setup..tax to the base and runs
+#     credits and payments; a change that reaches setup runs them all.
+#     Without include_details a variant builds only the federal fields
+#     its summary reads (federal_summary)
+#   - a variant with the base's state that changes no field the state
+#     calculation read (AGI counts as the agi / federal_agi fields)
+#     takes the base's state result: a no-tax state never reads AGI
+#   - variants that make the same change share one outcome
+#
+# Stages and state modules are deterministic in what they read, so a
+# stage given the base's context and the base's values for every key
+# it read does what it did for the base; the results are the same as
+# calculate_tax's. Reads are only tracked on the base, so a variant
+# costs its own stages and nothing more.
+#
+# Variant: {"name": "Sell stock",
+#           "set": {"long_term_gains": 40000},      absolute values
+#           "add": {"qualifying_children_under_17": 1}}   increments
+# Keys are calculator input fields (any alias); None in "set" removes
+# a field.
+# ============================================================
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from .calculator.federal.calculator import STAGES, CalcContext, extract_from_session, federal_result, federal_summary
+from .calculator.inputs import ALIAS_INDEX, CanonicalInput, normalize_input
+from .state_compare import state_tax_amount
+from .state_router import calculate_state_tax
+
+logger = logging.getLogger(__name__)
+
+MAX_SCENARIOS = 100
+METRICS = ("agi", "taxable_income", "federal_tax", "state_tax", "total_tax", "net_refund", "effective_rate")
+
+_VARIANT_KEYS = frozenset(("name", "set", "add"))
+_ANY = "*"          # a reader saw the whole input (iterated or copied it)
+_MISSING = object()
+_AGI_KEYS = frozenset(("agi", "federal_agi"))     # what state calculations get from the federal result
+
+
+# ============================================================
+# READ TRACKING
+# ============================================================
+
+class _TrackedInput(CanonicalInput):
+    """CanonicalInput that notes the keys read from it in .reads."""
+
+    __slots__ = ("reads",)
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self.reads.add(key)
+        return dict.__contains__(self, key)
+
+    def _whole(self):
+        self.reads.add(_ANY)
+
+    def __iter__(self):
+        self._whole()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._whole()
+        return dict.keys(self)
+
+    def values(self):
+        self._whole()
+        return dict.values(self)
+
+    def items(self):
+        self._whole()
+        return dict.items(self)
+
+    def copy(self):
+        self._whole()
+        return CanonicalInput(dict.items(self))
+
+
+def _tracked(data: CanonicalInput) -> _TrackedInput:
+    out = _TrackedInput(data)
+    out.reads = set()
+    return out
+
+
+# ============================================================
+# VARIANTS
+# ============================================================
+
+def _canonical(key: str) -> str:
+    entry = ALIAS_INDEX.get(key)
+    return entry[0] if entry else key
+
+
+def _edits(base: CanonicalInput, variant: Dict[str, Any]) -> Dict[str, Any]:
+    """Input key -> new value (_MISSING: removed) for the variant's "set" and "add"."""
+    edits: Dict[str, Any] = {}
+    values = {}
+    for key, value in (variant.get("set") or {}).items():
+        if value is None:
+            edits[key] = edits[_canonical(key)] = _MISSING
+        else:
+            values[key] = value
+    edits.update(normalize_input(values))
+    for key, delta in (variant.get("add") or {}).items():
+        try:
+            delta = float(delta)
+        except (TypeError, ValueError):
+            raise ValueError(f"'add' needs a number for {key!r}")
+        canonical = _canonical(key)
+        current = edits.get(canonical, base.get(canonical))
+        current = 0 if current is _MISSING else current or 0
+        edits.update(normalize_input({key: current + delta}))
+    return edits
+
+
+def apply_variant(base: CanonicalInput, variant: Dict[str, Any]) -> CanonicalInput:
+    """base with the variant's "set" and "add" changes applied."""
+    data = CanonicalInput(base)
+    for key, value in _edits(base, variant).items():
+        if value is _MISSING:
+            data.pop(key, None)
+        else:
+            data[key] = value
+    return data
+
+
+# ============================================================
+# BASE RETURN
+# ============================================================
+
+class BaseReturn:
+    """
+    The base calculation: its finished context, the input keys each
+    stage read (None: the whole input), and the state result and its
+    reads. Variants that make the same change share one outcome
+    (outcomes).
+    """
+
+    __slots__ = ("data", "state", "context", "reads", "federal", "state_result", "state_reads", "outcomes")
+
+    def __init__(self, data: CanonicalInput, state: Optional[str]):
+        self.data = data
+        self.state = state
+        self.reads: List[Optional[frozenset]] = []
+        self.outcomes: Dict[tuple, Dict[str, Any]] = {}
+        self.context = ctx = CalcContext()
+        tracked = _TrackedInput(data)
+        for _, stage in STAGES:
+            tracked.reads = set()
+            stage(tracked, ctx)
+            self.reads.append(_read_set(tracked))
+        self.federal: Dict[str, Any] = federal_result(ctx)
+
+        self.state_result, self.state_reads = None, None
+        if state:
+            tracked = _tracked(_state_input(data, self.federal))
+            self.state_result = _state_tax(state, tracked)
+            self.state_reads = _read_set(tracked)
+
+    def first_reader(self, changed) -> int:
+        """First stage that read a changed key (len(STAGES): none)."""
+        for i in range(len(STAGES)):
+            reads = self.reads[i]
+            if reads is None or not changed.isdisjoint(reads):
+                return i
+        return len(STAGES)
+
+
+def _read_set(tracked: _TrackedInput) -> Optional[frozenset]:
+    return None if _ANY in tracked.reads else frozenset(tracked.reads)
+
+
+def _state_input(data: CanonicalInput, federal: Dict[str, Any]) -> CanonicalInput:
+    data = CanonicalInput(data)
+    data["federal_agi"] = data["agi"] = federal.get("agi", 0)
+    return data
+
+
+def _state_tax(state: str, data: CanonicalInput) -> Dict[str, Any]:
+    try:
+        return calculate_state_tax(state, data)
+    except Exception as e:
+        logger.warning("%s state calculation failed in scenario: %s", state, e)
+        return {"state": state, "error": "State calculation failed"}
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+
+def _summary(name: str, federal: Dict[str, Any], state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    fed_tax = federal.get("tax_after_credits", 0) - federal.get("refundable_credits", 0)
+    st_tax = state_tax_amount(state) if state and "error" not in state else 0.0
+    refund = federal.get("refund", 0) - federal.get("amount_owed", 0)
+    if state and "error" not in state:
+        refund += state.get("refund", 0) - state.get("amount_owed", 0)
+    agi = federal.get("agi", 0)
+    return {
+        "name": name,
+        "agi": agi,
+        "taxable_income": federal.get("taxable_income", 0),
+        "federal_tax": round(fed_tax, 2),
+        "state_tax": round(st_tax, 2),
+        "total_tax": round(fed_tax + st_tax, 2),
+        "net_refund": round(refund, 2),
+        "effective_rate": round((fed_tax + st_tax) / agi * 100, 2) if agi > 0 else 0,
+    }
+
+
+def _federal(base: BaseReturn, data: CanonicalInput, changed, details: bool) -> tuple:
+    """(federal result, names of the stages run) for a variant's input."""
+    i = base.first_reader(changed)
+    if i == len(STAGES):        # no federal stage read a changed field
+        return base.federal, []
+
+    ctx = base.context.copy()
+    for _, stage in STAGES[i:]:
+        stage(data, ctx)
+    return (federal_result(ctx) if details else federal_summary(ctx)), [name for name, _ in STAGES[i:]]
+
+
+def evaluate_variant(base: BaseReturn, variant: Dict[str, Any], details: bool = True) -> Dict[str, Any]:
+    """
+    Federal and state results for one variant, reusing what the base
+    computed. details=False: federal holds only the fields a summary
+    reads (federal_summary), which skips rounding the other ~60.
+    """
+    edits = _edits(base.data, variant)
+    changed = {k for k, v in edits.items() if base.data.get(k, _MISSING) != v}
+    if not changed:
+        return {"federal": base.federal, "state": base.state_result, "changed": [],
+                "stages_run": [], "state_reused": base.state_result is not None}
+
+    try:
+        memo = (details,) + tuple(sorted((k, edits[k]) for k in changed))
+        done = base.outcomes.get(memo)
+    except TypeError:           # unhashable value (a list of dependents)
+        memo = done = None
+    if done is not None:        # same change as an earlier variant
+        return dict(done, stages_run=[], state_reused=done["state"] is not None)
+
+    data = CanonicalInput(base.data)
+    for key in changed:
+        if edits[key] is _MISSING:
+            del data[key]
+        else:
+            data[key] = edits[key]
+
+    federal, stages_run = _federal(base, data, changed, details)
+
+    state = ((data.get("state") or "").upper() or None) if "state" in changed else base.state
+    state_changed = changed if federal.get("agi", 0) == base.federal.get("agi", 0) else changed | _AGI_KEYS
+    reused = (state is not None and state == base.state
+              and base.state_reads is not None and state_changed.isdisjoint(base.state_reads))
+    if reused:
+        state_result = base.state_result
+    else:
+        state_result = _state_tax(state, _state_input(data, federal)) if state else None
+
+    out = {
+        "federal": federal,
+        "state": state_result,
+        "changed": sorted(changed),
+        "stages_run": stages_run,
+        "state_reused": reused,
+    }
+    if memo is not None:
+        base.outcomes[memo] = out
+    return out
+
+
+def run_scenarios(
+    session: Dict[str, Any],
+    variants: Sequence[Dict[str, Any]],
+    state: Optional[str] = None,
+    tax_year: Optional[int] = None,
+    include_details: bool = False,
+) -> Dict[str, Any]:
+    """
+    Base return (Mongo session or flat calculator input) and every
+    variant, with a comparison matrix: one row per metric, one column
+    per scenario (base first), and the change from the base.
+    state defaults to the session's state.
+    """
+    if len(variants) > MAX_SCENARIOS:
+        raise ValueError(f"At most {MAX_SCENARIOS} variants per request")
+    for v in variants:
+        if (not isinstance(v, dict) or not v.keys() <= _VARIANT_KEYS
+                or not isinstance(v.get("set") or {}, dict) or not isinstance(v.get("add") or {}, dict)):
+            raise ValueError("Each variant is {'name': ..., 'set': {...}, 'add': {...}}")
+
+    data = normalize_input(extract_from_session(session))
+    if tax_year:
+        data["tax_year"] = tax_year
+    if data.get("residency") or data.get("state_sources"):
+        raise ValueError("Scenarios take a single-state return; use /calculate/multistate for residency")
+    address = session.get("address") or {}
+    state = (state or data.get("state") or address.get("state") or "").upper() or None
+    if state:
+        data["state"] = state
+
+    base = BaseReturn(data, state)
+    scenarios = [dict(_summary("base", base.federal, base.state_result), changed=[],
+                      stages_run=[name for name, _ in STAGES], state_reused=False)]
+    details = [(base.federal, base.state_result)]
+    for i, variant in enumerate(variants, 1):
+        out = evaluate_variant(base, variant, include_details)
+        summary = _summary(variant.get("name") or f"variant {i}", out["federal"], out["state"])
+        summary.update(changed=out["changed"], stages_run=out["stages_run"], state_reused=out["state_reused"])
+        scenarios.append(summary)
+        details.append((out["federal"], out["state"]))
+
+    first = scenarios[0]
+    for s, (federal, st) in zip(scenarios, details):
+        s["delta"] = {m: round(s[m] - first[m], 2) for m in METRICS}
+        if include_details:
+            s["federal"], s["state"] = federal, st
+
+    logger.debug("Scenarios: %d variants, %d federal stages run (%d for a full calculation)",
+                 len(variants), sum(len(s["stages_run"]) for s in scenarios[1:]), len(STAGES))
+    return {
+        "tax_year": base.federal.get("tax_year"),
+        "state": state,
+        "scenarios": scenarios,
+        "matrix": {
+            "columns": [s["name"] for s in scenarios],
+            "rows": {m: [s[m] for s in scenarios] for m in METRICS},
+            "delta": {m: [s["delta"][m] for s in scenarios] for m in METRICS},
+        },
+    }
+
+
+__all__ = [
+    "MAX_SCENARIOS",
+    "METRICS",
+    "BaseReturn",
+    "apply_variant",
+    "evaluate_variant",
+    "run_scenarios",
+]
@@ -0,0 +1,297 @@
+# tax_engine/state_compare.py
+# ============================================================
+# STATE COMPARISON ENGINE - all 50 states + DC
+# ============================================================
+# Ranks every state by tax for the same household, using the real
+# state calculators (states/XX.py, generic fallback for the rest)
+# rather than the simplified tables in additional_states_router.
+#
+# - compare_states(agi, ...)  one AGI, exact: every calculator runs
+#   once (~1ms for all states); ranked tables are LRU-cached, rows
+#   as StateRankRow records (results.py)
+# - compare_grid(agis, ...)   many AGIs: each state's calculator is
+#   compiled once per (filing status, dependents) into a TaxCurve -
+#   AGI knots + tax at each knot + slope to the next, i.e. the
+#   state's bracket array as the calculator actually behaves,
+#   credits and phase-outs included. A 1,000-point grid for all
+#   states is then one sorted walk per curve (a few ms)
+#
+# Curves come from curves.sample_piecewise over COARSE_KNOTS: knots
+# every MIN_SEGMENT ($50 AGI bucket) at most where the calculator
+# bends, $1 at cliffs. Only the taxes are used, not the slopes, so the
+# curves keep the knots whole-dollar rounding adds (rounding=0) and
+# interpolated taxes are within $1 of the calculator.
+#
+# Household assumed: all income is wages (AGI = wages), dependents
+# are qualifying children under 17, no state withholding.
+# ============================================================
+
+import logging
+import threading
+from collections import OrderedDict
+from math import floor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .calculator.inputs import normalize_input
+from .curves import TaxCurve, locate, sample_piecewise
+from .results import StateRankRow
+from .state_router import (
+    ALL_STATE_CODES,
+    NO_TAX_STATES,
+    STATE_MODULES,
+    calculate_generic_state,
+)
+from .state_registry import get_state
+
+try:
+    from metrics import CACHE_REQUESTS
+except ImportError:
+    CACHE_REQUESTS = None
+
+logger = logging.getLogger(__name__)
+
+# Coarse knots: dense where brackets are, sparse at the top
+COARSE_KNOTS = (
+    list(range(0, 200_000, 10_000))
+    + list(range(200_000, 1_000_000, 50_000))
+    + list(range(1_000_000, 5_000_000, 250_000))
+    + list(range(5_000_000, 30_000_001, 2_500_000))
+)
+MAX_DEPENDENTS = 10     # bounds the cache key space
+MAX_GRID_POINTS = 5000
+CURVE_CACHE_SIZE = 2048  # ~51 states x 40 (filing status, dependents) pairs
+TABLE_CACHE_SIZE = 512
+
+
+# ============================================================
+# ONE STATE, ONE AGI
+# ============================================================
+
+def household(agi: float, filing_status: str, num_dependents: int) -> Dict[str, Any]:
+    return normalize_input({
+        "filing_status": filing_status,
+        "federal_agi": agi,
+        "agi": agi,
+        "wages": agi,
+        "num_dependents": num_dependents,
+        "qualifying_children_under_17": num_dependents,
+        "state_withholding": 0,
+    })
+
+
+def run_state_calculator(state_code: str, data: Dict[str, Any], failures: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Same path as state_router.calculate_state_tax (module, else generic)
+    without the per-call warning log and calculator-call metrics, which
+    curve compilation would flood.
+    """
+    module = STATE_MODULES.get(state_code)
+    if module is not None and hasattr(module, "calculate"):
+        try:
+            return module.calculate(dict(data))
+        except Exception as e:
+            if failures is not None:
+                failures.setdefault(state_code, str(e))
+    return calculate_generic_state(state_code, data)
+
+
+def state_tax_amount(result: Dict[str, Any]) -> float:
+    tax = result.get("total_tax")
+    if tax is None:
+        tax = result.get("state_tax", 0)
+    return float(tax or 0)
+
+
+def _state_meta(state_code: str) -> Dict[str, Any]:
+    params = get_state(state_code)
+    if params is not None:
+        return {"state_name": params.name, "has_income_tax": params.has_income_tax, "tax_type": params.tax_type}
+    probe = run_state_calculator(state_code, household(50_000, "single", 0))
+    return {
+        "state_name": probe.get("state_name") or state_code,
+        "has_income_tax": True,
+        "tax_type": probe.get("tax_type") or "progressive",
+    }
+
+
+_META: Dict[str, Dict[str, Any]] = {}
+
+
+def state_meta(state_code: str) -> Dict[str, Any]:
+    meta = _META.get(state_code)
+    if meta is None:
+        meta = _META[state_code] = _state_meta(state_code)
+    return meta
+
+
+def _key(filing_status: str, num_dependents: int) -> Tuple[str, int]:
+    return (filing_status or "single").strip().lower(), max(0, min(int(num_dependents or 0), MAX_DEPENDENTS))
+
+
+# ============================================================
+# TAX CURVES
+# ============================================================
+
+def compile_curve(state_code: str, filing_status: str = "single", num_dependents: int = 0) -> TaxCurve:
+    state_code = state_code.upper()
+    if state_code in NO_TAX_STATES:
+        return TaxCurve(state_code, [0.0], [0.0])
+
+    fs, deps = _key(filing_status, num_dependents)
+    failures: Dict[str, str] = {}
+
+    def f(agi: int) -> Tuple[float]:
+        return (state_tax_amount(run_state_calculator(state_code, household(agi, fs, deps), failures)),)
+
+    knots, values = sample_piecewise(f, COARSE_KNOTS, rounding=0)
+    if failures:
+        logger.warning("%s calculator error while compiling curve, generic fallback used: %s",
+                       state_code, failures[state_code])
+    logger.debug("Compiled %s curve (%s, %d deps): %d knots", state_code, fs, deps, len(knots))
+    return TaxCurve(state_code, knots, [v[0] for v in values])
+
+
+class _LRU:
+    """Small thread-safe LRU with hit/miss metrics."""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        if CACHE_REQUESTS is not None:
+            CACHE_REQUESTS.inc(self.name, "hit" if value is not None else "miss")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_curves = _LRU("state_curve", CURVE_CACHE_SIZE)
+_tables = _LRU("state_compare", TABLE_CACHE_SIZE)
+
+
+def get_curve(state_code: str, filing_status: str = "single", num_dependents: int = 0) -> TaxCurve:
+    key = (state_code.upper(),) + _key(filing_status, num_dependents)
+    curve = _curves.get(key)
+    if curve is None:
+        curve = compile_curve(*key)
+        _curves.put(key, curve)
+    return curve
+
+
+def clear_cache():
+    _curves.clear()
+    _tables.clear()
+
+
+# ============================================================
+# RANKED TABLES
+# ============================================================
+
+def _row(state_code: str, tax: float, agi: float) -> Dict[str, Any]:
+    meta = state_meta(state_code)
+    return {
+        "state": state_code,
+        "state_name": meta["state_name"],
+        "has_income_tax": meta["has_income_tax"],
+        "tax_type": meta["tax_type"],
+        "state_tax": round(tax, 2),
+        "effective_rate": round(tax / agi * 100, 2) if agi > 0 else 0,
+    }
+
+
+def compare_states(federal_agi: float, filing_status: str = "single", num_dependents: int = 0) -> List[Dict[str, Any]]:
+    """
+    All states ranked by tax (lowest first) at one AGI, from the real
+    calculators. The table cache is keyed on the exact AGI (to the
+    cent), not a bucket: a repeat request for the same household hits,
+    a neighbouring AGI runs the calculators again.
+    """
+    fs, deps = _key(filing_status, num_dependents)
+    agi = round(float(federal_agi), 2)
+    key = (agi, fs, deps)
+    rows = _tables.get(key)
+    if rows is None:
+        data = household(agi, fs, deps)
+        rows = []
+        for code in ALL_STATE_CODES:
+            tax = 0.0 if code in NO_TAX_STATES else state_tax_amount(run_state_calculator(code, data))
+            rows.append(_row(code, tax, agi))
+        rows.sort(key=lambda r: (r["state_tax"], r["state"]))
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        rows = [StateRankRow.from_dict(r) for r in rows]
+        _tables.put(key, rows)
+    return [r.to_dict() for r in rows]
+
+
+def compare_grid(agis: Sequence[float], filing_status: str = "single", num_dependents: int = 0) -> Dict[str, Any]:
+    """
+    Every state's tax at every AGI in agis (from compiled curves).
+    States are ranked by total tax over the grid (effective_rate is
+    over the whole grid); "lowest" gives the cheapest state at each AGI.
+    """
+    if len(agis) > MAX_GRID_POINTS:
+        raise ValueError(f"At most {MAX_GRID_POINTS} AGI points per comparison")
+    fs, deps = _key(filing_status, num_dependents)
+    agis = [float(a) for a in agis]
+    order = sorted(range(len(agis)), key=agis.__getitem__)
+    agi_total = sum(a for a in agis if a > 0)
+
+    rows = []
+    for code in ALL_STATE_CODES:
+        curve = get_curve(code, fs, deps)
+        taxes = curve.evaluate(agis, segments=locate(curve.knots, agis, order))
+        meta = state_meta(code)
+        rows.append({
+            "state": code,
+            "state_name": meta["state_name"],
+            "has_income_tax": meta["has_income_tax"],
+            "tax_type": meta["tax_type"],
+            "state_tax": [floor(t * 100 + 0.5) / 100 for t in taxes],  # cents; round() is 4x slower
+            "total_tax": round(sum(taxes), 2),
+            "effective_rate": round(sum(taxes) / agi_total * 100, 2) if agi_total > 0 else 0,
+        })
+    rows.sort(key=lambda r: (r["total_tax"], r["state"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+
+    codes = [r["state"] for r in rows]
+    lowest = [codes[col.index(min(col))] for col in zip(*(r["state_tax"] for r in rows))]
+
+    return {
+        "agi": agis,
+        "filing_status": fs,
+        "num_dependents": deps,
+        "total_states": len(rows),
+        "lowest": lowest,
+        "comparison": rows,
+    }
+
+
+__all__ = [
+    "TaxCurve",
+    "household",
+    "run_state_calculator",
+    "state_tax_amount",
+    "compile_curve",
+    "get_curve",
+    "compare_states",
+    "compare_grid",
+    "clear_cache",
+]
@@ -0,0 +1,325 @@
+# tax_engine/state_registry.py
+# ============================================================
+# STATE PARAMETER REGISTRY - all 50 states + DC
+# ============================================================
+# One read-only table of state tax parameters, built once at import
+# and shared by state_router (TAX_STATES / NO_TAX_STATES and the
+# generic fallback), state_compare and the PDF routers
+# (tax_generator/additional_states_router), which used to keep
+# their own copies.
+#
+# Numbers - brackets, standard deductions, exemptions, flat rates,
+# surtaxes, the federal tax deduction - are read from the state
+# calculators (calculator/states: XX.py plug-ins and specs/XX.json),
+# so each has one source. What those don't carry (forms, websites,
+# notes, other flags) is in _META.
+#
+#   get_state("CA")          StateParams, one dict lookup
+#   get_state("CA", 2025)    same, explicit tax year
+#   states()                 {code: StateParams} in ALL_STATE_CODES order
+#
+# Brackets are compiled to (floor, rate, tax below floor), so
+# tax_on() is a bisect and one multiply. Personal exemptions are
+# stored as the total per filing status (both spouses for MFJ).
+# ============================================================
+
+import logging
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from .calculator.states.spec_engine import load_state
+
+logger = logging.getLogger(__name__)
+
+TAX_YEARS = (2025,)
+DEFAULT_TAX_YEAR = 2025
+
+FILING_STATUSES = ("single", "married_filing_jointly", "married_filing_separately", "head_of_household")
+_SHORT_STATUS = {"s": "single", "mfj": "married_filing_jointly", "mfs": "married_filing_separately",
+                 "hoh": "head_of_household"}
+# Joint-return parameters for these
+_JOINT_ALIASES = ("married", "qualifying_surviving_spouse", "qss", "qualifying_widow", "qualifying_widower")
+
+ALL_STATE_CODES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL",
+    "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME",
+    "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH",
+    "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI",
+    "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)
+
+# Extra per-state values passed through as StateParams.extras
+_EXTRAS = ("grocery_credit", "local_tax_rate", "nyc_rate_range", "child_deduction",
+           "personal_credit", "taxpayer_credit_rate")
+
+
+# ============================================================
+# WHAT THE STATE MODULES DON'T CARRY
+# ============================================================
+# Tax states: form, PDF form name ("pdf": generated by tax_generator),
+# flags, website, notes. No-tax states: name, notes.
+
+_META: Dict[str, Dict[str, Any]] = {
+    "AL": {"form": "40", "website": "https://revenue.alabama.gov", "notes": "UNIQUE: Allows federal income tax deduction"},
+    "AK": {"name": "Alaska", "notes": "No state income tax. Oil revenue funds state."},
+    "AZ": {"form": "140", "website": "https://azdor.gov", "notes": "Lowest flat tax rate in the nation (2.5%)"},
+    "AR": {"form": "AR1000F", "website": "https://www.dfa.arkansas.gov", "notes": "Top rate 4.4%"},
+    "CA": {"form": "540", "form_name": "California Resident Income Tax Return", "pdf": True, "website": "https://www.ftb.ca.gov", "notes": "Top rate 12.3% (+1% mental health tax over $1M = 13.3%)"},
+    "CO": {"form": "104", "uses_federal_taxable": True, "website": "https://tax.colorado.gov", "notes": "Uses federal taxable income as starting point"},
+    "CT": {"form": "CT-1040", "website": "https://portal.ct.gov/drs", "notes": "7 brackets, top rate 6.99%"},
+    "DE": {"form": "200-01", "website": "https://revenue.delaware.gov", "notes": "First $2K tax-free. No sales tax state."},
+    "DC": {"form": "D-40", "website": "https://otr.cfo.dc.gov", "notes": "7 brackets, top rate 10.75%"},
+    "FL": {"name": "Florida", "notes": "No state income tax (constitutional)."},
+    "GA": {"form": "500", "form_name": "Individual Income Tax Return", "pdf": True, "website": "https://dor.georgia.gov", "notes": "Switched to flat tax in 2024"},
+    "HI": {"form": "N-11", "website": "https://tax.hawaii.gov", "notes": "12 brackets, top rate 11% - among highest"},
+    "ID": {"form": "40", "grocery_credit": 120, "website": "https://tax.idaho.gov", "notes": "Grocery tax credit $120 per person"},
+    "IL": {"form": "IL-1040", "form_name": "Individual Income Tax Return", "pdf": True, "website": "https://tax.illinois.gov", "notes": "Retirement income is fully exempt"},
+    "IN": {"form": "IT-40", "has_local_tax": True, "website": "https://www.in.gov/dor", "notes": "County taxes add 0.5% to 3.38%"},
+    "IA": {"form": "IA-1040", "website": "https://tax.iowa.gov", "notes": "Retirement income is fully exempt"},
+    "KS": {"form": "K-40", "website": "https://www.ksrevenue.gov", "notes": "3 brackets, top rate 5.7%"},
+    "KY": {"form": "740", "website": "https://revenue.ky.gov", "notes": "Rate reduced to 4% in 2025"},
+    "LA": {"form": "IT-540", "website": "https://revenue.louisiana.gov", "notes": "Allows federal tax deduction (capped)"},
+    "ME": {"form": "1040ME", "website": "https://www.maine.gov/revenue", "notes": "3 brackets, top rate 7.15%"},
+    "MD": {"form": "502", "has_local_tax": True, "local_tax_rate": 0.032, "website": "https://www.marylandtaxes.gov", "notes": "8 brackets + mandatory county tax (~3.2%)"},
+    "MA": {"form": "1", "website": "https://www.mass.gov/dor", "notes": "4% surtax on income over $1M (9% top rate)"},
+    "MI": {"form": "MI-1040", "has_local_tax": True, "website": "https://www.michigan.gov/treasury", "notes": "Detroit adds 2.4% city tax"},
+    "MN": {"form": "M1", "website": "https://www.revenue.state.mn.us", "notes": "4 brackets, top rate 9.85% (high)"},
+    "MS": {"form": "80-105", "exempt_amount": 10000, "website": "https://www.dor.ms.gov", "notes": "First $10,000 of income is exempt"},
+    "MO": {"form": "MO-1040", "website": "https://dor.mo.gov", "notes": "7 brackets, top rate 4.8%"},
+    "MT": {"form": "2", "website": "https://mtrevenue.gov", "notes": "2 brackets, top rate 5.9%"},
+    "NE": {"form": "1040N", "website": "https://revenue.nebraska.gov", "notes": "4 brackets, top rate 5.84%"},
+    "NV": {"name": "Nevada", "notes": "No state income tax. Gaming revenue funds state."},
+    "NH": {"name": "New Hampshire", "notes": "No income tax. Interest/dividend tax ended 2025."},
+    "NJ": {"form": "NJ-1040", "form_name": "Resident Income Tax Return", "pdf": True, "website": "https://www.state.nj.us/treasury/taxation", "notes": "7 brackets, top rate 10.75%"},
+    "NM": {"form": "PIT-1", "website": "https://www.tax.newmexico.gov", "notes": "5 brackets, top rate 5.9%"},
+    "NY": {"form": "IT-201", "form_name": "Resident Income Tax Return", "pdf": True, "has_local_tax": True, "nyc_rate_range": "3.078% - 3.876%", "website": "https://www.tax.ny.gov", "notes": "9 brackets, top rate 10.9%. NYC adds 3.078%-3.876%."},
+    "NC": {"form": "D-400", "form_name": "Individual Income Tax Return", "pdf": True, "child_deduction": 2500, "website": "https://www.ncdor.gov", "notes": "Rate decreased to 4.5% in 2025"},
+    "ND": {"form": "ND-1", "uses_federal_taxable": True, "website": "https://www.tax.nd.gov", "notes": "2 brackets, very low rates (1.95-2.5%)"},
+    "OH": {"form": "IT-1040", "website": "https://tax.ohio.gov", "notes": "First $26,050 is tax-free"},
+    "OK": {"form": "511", "website": "https://oklahoma.gov/tax", "notes": "6 brackets, top rate 4.75%"},
+    "OR": {"form": "40", "personal_credit": 236, "website": "https://www.oregon.gov/dor", "notes": "4 brackets, top rate 9.9%. No sales tax!"},
+    "PA": {"form": "PA-40", "form_name": "Personal Income Tax Return", "pdf": True, "has_local_tax": True, "website": "https://www.revenue.pa.gov", "notes": "Lowest flat rate (3.07%). Local EIT taxes apply."},
+    "RI": {"form": "RI-1040", "website": "https://tax.ri.gov", "notes": "3 brackets, top rate 5.99%"},
+    "SC": {"form": "SC1040", "website": "https://dor.sc.gov", "notes": "First $3,460 tax-free, then 3%, then 6.4%"},
+    "SD": {"name": "South Dakota", "notes": "No state income tax."},
+    "TN": {"name": "Tennessee", "notes": "No income tax. Hall tax ended 2021."},
+    "TX": {"name": "Texas", "notes": "No state income tax (constitutional)."},
+    "UT": {"form": "TC-40", "uses_federal_taxable": True, "taxpayer_credit_rate": 0.06, "website": "https://tax.utah.gov", "notes": "Taxpayer credit = 6% of federal standard deduction"},
+    "VT": {"form": "IN-111", "website": "https://tax.vermont.gov", "notes": "4 brackets, top rate 8.75%"},
+    "VA": {"form": "760", "website": "https://www.tax.virginia.gov", "notes": "4 brackets, top rate 5.75%"},
+    "WA": {"name": "Washington", "notes": "No income tax. Capital gains tax 7% only."},
+    "WV": {"form": "IT-140", "website": "https://tax.wv.gov", "notes": "5 brackets, top rate 5.12%"},
+    "WI": {"form": "1", "website": "https://www.revenue.wi.gov", "notes": "4 brackets, top rate 7.65%"},
+    "WY": {"name": "Wyoming", "notes": "No state income tax."},
+}
+
+
+# ============================================================
+# PARAMETERS FOR ONE STATE AND YEAR
+# ============================================================
+
+def filing_status_key(filing_status: Optional[str]) -> str:
+    """Filing status as a key into the per-status tables (QSS uses the joint tables)."""
+    s = str(filing_status or "single").lower().strip().replace(" ", "_").replace("-", "_")
+    if s in _JOINT_ALIASES:
+        return "married_filing_jointly"
+    s = _SHORT_STATUS.get(s, s)
+    return s if s in FILING_STATUSES else "single"
+
+
+def _rate_display(rate: float) -> str:
+    return f"{round(rate * 100, 3):g}%"
+
+
+class StateParams:
+    """Tax parameters of one state for one tax year (read-only)."""
+
+    __slots__ = (
+        "code", "tax_year", "name", "full_name", "has_income_tax", "tax_type",
+        "form", "form_name", "pdf_supported", "flat_rate", "top_rate",
+        "brackets", "standard_deduction", "personal_exemption", "dependent_exemption",
+        "exempt_amount", "uses_federal_taxable", "allows_federal_deduction", "surtax",
+        "has_local_tax", "website", "notes", "extras", "_floors",
+    )
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+        floors = {fs: tuple(b[0] for b in table) for fs, table in (self.brackets or {}).items()}
+        object.__setattr__(self, "_floors", floors)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"StateParams is read-only ({self.code}.{name})")
+
+    def __repr__(self) -> str:
+        return f"StateParams({self.code}, {self.tax_year}, {self.tax_type})"
+
+    @property
+    def rate(self) -> float:
+        """Flat rate, else top marginal rate (surtax included)."""
+        return self.flat_rate if self.flat_rate is not None else (self.top_rate or 0.0)
+
+    @property
+    def rate_display(self) -> str:
+        return _rate_display(self.rate) if self.has_income_tax else "0%"
+
+    def standard_deduction_for(self, filing_status: Optional[str]) -> float:
+        if not self.has_income_tax:
+            return 0.0
+        return self.standard_deduction[filing_status_key(filing_status)]
+
+    def exemptions_for(self, filing_status: Optional[str], num_dependents: int = 0) -> float:
+        """Personal exemptions for the return plus dependent exemptions."""
+        if not self.has_income_tax:
+            return 0.0
+        return self.personal_exemption[filing_status_key(filing_status)] + \
+            max(0, int(num_dependents or 0)) * self.dependent_exemption
+
+    def tax_on(self, taxable_income: float, filing_status: Optional[str] = "single") -> float:
+        """Tax on state taxable income: brackets (or flat rate) plus any surtax."""
+        if not self.has_income_tax or taxable_income <= 0:
+            return 0.0
+        fs = filing_status_key(filing_status)
+        i = bisect_right(self._floors[fs], taxable_income) - 1
+        floor, rate, base = self.brackets[fs][i]
+        tax = base + (taxable_income - floor) * rate
+        if self.surtax and taxable_income > self.surtax[0]:
+            tax += (taxable_income - self.surtax[0]) * self.surtax[1]
+        return tax
+
+
+# ============================================================
+# BUILD (once, at import)
+# ============================================================
+
+def _module(code: str):
+    try:
+        return load_state(code)
+    except Exception as e:
+        logger.warning("State calculator %s failed to load, registry uses defaults: %s", code, e)
+        return None
+
+
+def _compile_brackets(brackets: Iterable[Tuple[float, float]]) -> Tuple[Tuple[float, float, float], ...]:
+    """[(upper, rate), ...] -> ((floor, rate, tax below floor), ...)."""
+    out = []
+    floor = base = 0.0
+    for upper, rate in brackets:
+        out.append((floor, float(rate), base))
+        base += (upper - floor) * rate
+        floor = float(upper)
+    return tuple(out)
+
+
+def _per_status(value: Any, joint_multiplier: int = 1) -> Mapping[str, float]:
+    """Scalar, per-status dict (long or short keys) or None -> {filing status: amount}."""
+    if isinstance(value, dict):
+        by_status = {_SHORT_STATUS.get(k, k): v for k, v in value.items()}
+        return MappingProxyType({fs: float(by_status.get(fs, by_status.get("single", 0)) or 0)
+                                 for fs in FILING_STATUSES})
+    amount = float(value or 0)
+    return MappingProxyType({fs: amount * (joint_multiplier if fs == "married_filing_jointly" else 1)
+                             for fs in FILING_STATUSES})
+
+
+def _no_tax_params(code: str, tax_year: int, meta: Dict[str, Any]) -> StateParams:
+    zero = _per_status(0)
+    return StateParams(
+        code=code, tax_year=tax_year, name=meta["name"], full_name=f"State of {meta['name']}",
+        has_income_tax=False, tax_type="none", pdf_supported=False,
+        flat_rate=0.0, top_rate=0.0, brackets=MappingProxyType({}),
+        standard_deduction=zero, personal_exemption=zero, dependent_exemption=0.0,
+        exempt_amount=0.0, uses_federal_taxable=False, allows_federal_deduction=False,
+        surtax=None, has_local_tax=False, website=meta.get("website", ""), notes=meta["notes"],
+        extras=MappingProxyType({}),
+    )
+
+
+def _tax_params(code: str, tax_year: int, meta: Dict[str, Any]) -> StateParams:
+    module = _module(code)
+    name = getattr(module, "STATE_NAME", None) or code
+    flat_rate = getattr(module, "FLAT_TAX_RATE", None)
+    tax_type = getattr(module, "TAX_TYPE", None) or ("flat" if flat_rate is not None else "progressive")
+
+    if flat_rate is not None:
+        brackets = {fs: ((0.0, float(flat_rate), 0.0),) for fs in FILING_STATUSES}
+    else:
+        table = getattr(module, "TAX_BRACKETS", None) or {}
+        brackets = {fs: _compile_brackets(table.get(fs) or table.get("single") or [(float("inf"), 0.0)])
+                    for fs in FILING_STATUSES}
+
+    surtax = getattr(module, "SURTAX", None)
+    if surtax:
+        surtax = (float(surtax[0]), float(surtax[1]))
+    elif getattr(module, "MENTAL_HEALTH_TAX_THRESHOLD", None):
+        surtax = (float(module.MENTAL_HEALTH_TAX_THRESHOLD), float(module.MENTAL_HEALTH_TAX_RATE))
+
+    top_rate = max(rate for table in brackets.values() for _, rate, _ in table) + (surtax[1] if surtax else 0.0)
+
+    return StateParams(
+        code=code,
+        tax_year=tax_year,
+        name=name,
+        full_name=getattr(module, "STATE_FULL_NAME", None) or f"State of {name}",
+        has_income_tax=True,
+        tax_type=tax_type,
+        form=meta["form"],
+        form_name=meta.get("form_name"),
+        pdf_supported=bool(meta.get("pdf")),
+        flat_rate=float(flat_rate) if flat_rate is not None else None,
+        top_rate=top_rate,
+        brackets=MappingProxyType(brackets),
+        standard_deduction=_per_status(getattr(module, "STANDARD_DEDUCTION", None)),
+        personal_exemption=_per_status(getattr(module, "PERSONAL_EXEMPTION", None), joint_multiplier=2),
+        dependent_exemption=float(getattr(module, "DEPENDENT_EXEMPTION", None) or 0),
+        exempt_amount=float(meta.get("exempt_amount", 0)),
+        uses_federal_taxable=bool(meta.get("uses_federal_taxable")),
+        allows_federal_deduction=getattr(module, "FEDERAL_TAX_DEDUCTION", None) is not None,
+        surtax=surtax,
+        has_local_tax=bool(meta.get("has_local_tax")),
+        website=meta.get("website", ""),
+        notes=meta.get("notes", ""),
+        extras=MappingProxyType({k: meta[k] for k in _EXTRAS if k in meta}),
+    )
+
+
+def _build(tax_year: int) -> Mapping[str, StateParams]:
+    table = {}
+    for code in ALL_STATE_CODES:
+        meta = _META[code]
+        table[code] = _tax_params(code, tax_year, meta) if "form" in meta else _no_tax_params(code, tax_year, meta)
+    return MappingProxyType(table)
+
+
+_REGISTRY: Mapping[int, Mapping[str, StateParams]] = MappingProxyType({year: _build(year) for year in TAX_YEARS})
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+def states(tax_year: Optional[int] = None) -> Mapping[str, StateParams]:
+    """All states + DC for tax_year (default DEFAULT_TAX_YEAR)."""
+    year = tax_year or DEFAULT_TAX_YEAR
+    table = _REGISTRY.get(year)
+    if table is None:
+        raise ValueError(f"No state parameters for tax year {year}; available: {list(TAX_YEARS)}")
+    return table
+
+
+def get_state(state_code: Optional[str], tax_year: Optional[int] = None) -> Optional[StateParams]:
+    """StateParams for a two-letter code, None if it isn't a state."""
+    return states(tax_year).get((state_code or "").upper().strip())
+
+
+__all__ = [
+    "TAX_YEARS",
+    "DEFAULT_TAX_YEAR",
+    "FILING_STATUSES",
+    "ALL_STATE_CODES",
+    "StateParams",
+    "filing_status_key",
+    "states",
+    "get_state",
+]
@@ -3,127 +3,74 @@
 # STATE TAX ROUTER - TaxSky 2025 v2.3 ALL 50 STATES
 # ============================================================
 # Routes tax calculations to the correct state module
+# ✅ v2.6: Results carry the tax_year of the state tables used, with a
+#          warning when the return is for a year the tables don't cover
+# ✅ v2.5: Data-only states compiled from calculator/states/specs
+# ✅ v2.4: State tables and generic fallback read state_registry
 # ✅ v2.3: Dynamic import of ALL state modules (AL, AR, AZ, CA, etc.)
 # ✅ v2.2: Added generic calculator fallback
 # ✅ v2.1: Fixed import path from 'states' to '.calculator.states'
 # Supports ALL 50 states + DC
 # ============================================================
 
+import logging
 from typing import Dict, Any, List, Optional
 
+logger = logging.getLogger(__name__)
+
+from .calculator.tax_params import federal_params
+from .calculator.inputs import normalize_input
+from .calculator.states.spec_engine import SpecState, load_state
+from .state_registry import (
+    ALL_STATE_CODES as REGISTRY_STATE_CODES,
+    DEFAULT_TAX_YEAR as STATE_DEFAULT_TAX_YEAR,
+    TAX_YEARS as STATE_TAX_YEARS,
+    StateParams,
+    filing_status_key,
+    get_state,
+    states as registry_states,
+)
+
+try:
+    from metrics import CALCULATOR_CALLS
+except ImportError:
+    CALCULATOR_CALLS = None
+
 # ============================================================
 # STATE CONFIGURATION
 # ============================================================
+# Views over state_registry (one table for every consumer), built once
+# in the shapes callers of this module expect.
+
+def _tax_state_info(p: StateParams) -> Dict[str, Any]:
+    info = {
+        "name": p.name,
+        "full_name": p.full_name,
+        "tax_type": p.tax_type,
+    }
+    if p.tax_type == "flat":
+        info.update(rate=p.flat_rate, rate_display=p.rate_display)
+    else:
+        info.update(top_rate=p.top_rate, top_rate_display=p.rate_display)
+    info.update(
+        form=p.form,
+        form_name=p.form_name,
+        supported=p.pdf_supported,
+        has_local=p.has_local_tax,
+        notes=p.notes,
+    )
+    return info
+
 
 # States with income tax (PDF generation available)
-TAX_STATES = {
-    "CA": {
-        "name": "California",
-        "full_name": "State of California",
-        "tax_type": "progressive",
-        "top_rate": 0.133,
-        "top_rate_display": "13.3%",
-        "form": "540",
-        "form_name": "California Resident Income Tax Return",
-        "supported": True,
-        "has_local": False,
-        "notes": "Highest state tax rate in the nation"
-    },
-    "NY": {
-        "name": "New York",
-        "full_name": "State of New York",
-        "tax_type": "progressive",
-        "top_rate": 0.109,
-        "top_rate_display": "10.9%",
-        "form": "IT-201",
-        "form_name": "Resident Income Tax Return",
-        "supported": True,
-        "has_local": True,
-        "notes": "NYC residents pay additional 3.078%-3.876%"
-    },
-    "IL": {
-        "name": "Illinois",
-        "full_name": "State of Illinois",
-        "tax_type": "flat",
-        "rate": 0.0495,
-        "rate_display": "4.95%",
-        "form": "IL-1040",
-        "form_name": "Individual Income Tax Return",
-        "supported": True,
-        "has_local": False,
-        "notes": "Flat tax, retirement income exempt"
-    },
-    "NJ": {
-        "name": "New Jersey",
-        "full_name": "State of New Jersey",
-        "tax_type": "progressive",
-        "top_rate": 0.1075,
-        "top_rate_display": "10.75%",
-        "form": "NJ-1040",
-        "form_name": "Resident Income Tax Return",
-        "supported": True,
-        "has_local": False,
-        "notes": "High tax state, millionaire's tax"
-    },
-    "PA": {
-        "name": "Pennsylvania",
-        "full_name": "Commonwealth of Pennsylvania",
-        "tax_type": "flat",
-        "rate": 0.0307,
-        "rate_display": "3.07%",
-        "form": "PA-40",
-        "form_name": "Personal Income Tax Return",
-        "supported": True,
-        "has_local": True,
-        "notes": "Lowest flat rate, local EIT applies"
-    },
-    "GA": {
-        "name": "Georgia",
-        "full_name": "State of Georgia",
-        "tax_type": "flat",
-        "rate": 0.0549,
-        "rate_display": "5.49%",
-        "form": "500",
-        "form_name": "Individual Income Tax Return",
-        "supported": True,
-        "has_local": False,
-        "notes": "Switched to flat tax in 2024"
-    },
-    "NC": {
-        "name": "North Carolina",
-        "full_name": "State of North Carolina",
-        "tax_type": "flat",
-        "rate": 0.045,
-        "rate_display": "4.5%",
-        "form": "D-400",
-        "form_name": "Individual Income Tax Return",
-        "supported": True,
-        "has_local": False,
-        "notes": "Rate decreased from 4.75% in 2024"
-    },
-}
+TAX_STATES = {code: _tax_state_info(p) for code, p in registry_states().items() if p.pdf_supported}
 
 # States without income tax
-NO_TAX_STATES = {
-    "AK": {"name": "Alaska", "notes": "No state income tax"},
-    "FL": {"name": "Florida", "notes": "No state income tax, constitutionally prohibited"},
-    "NV": {"name": "Nevada", "notes": "No state income tax"},
-    "NH": {"name": "New Hampshire", "notes": "No state income tax (interest/dividend tax ended 2025)"},
-    "SD": {"name": "South Dakota", "notes": "No state income tax"},
-    "TN": {"name": "Tennessee", "notes": "No state income tax (Hall tax ended 2021)"},
-    "TX": {"name": "Texas", "notes": "No state income tax, constitutionally prohibited"},
-    "WA": {"name": "Washington", "notes": "No income tax, but has capital gains tax"},
-    "WY": {"name": "Wyoming", "notes": "No state income tax"},
-}
+NO_TAX_STATES = {code: {"name": p.name, "notes": p.notes}
+                 for code, p in registry_states().items() if not p.has_income_tax}
 
 # All 50 states + DC for validation
-ALL_STATE_CODES = [
-    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL",
-    "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME",
-    "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH",
-    "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI",
-    "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY"
-]
+ALL_STATE_CODES = list(REGISTRY_STATE_CODES)
 
 # ============================================================
 # IMPORT STATE CALCULATORS - ALL 41 TAX STATES
@@ -139,26 +86,17 @@ TN = TX = UT = VA = VT = WA = WI = WV = WY = None
 STATES_PACKAGE_AVAILABLE = False
 LOADED_STATES = []
 
-# Import each state module
+# Import each state module (plug-in states/XX.py, else compiled specs/XX.json)
 def try_import_state(state_code):
-    """Try to import a state module"""
-    try:
-        module = __import__(f"tax_engine.calculator.states.{state_code}", fromlist=[state_code])
-        if hasattr(module, 'calculate'):
-            print(f"✅ {state_code}.py loaded")
-            return module
-    except ImportError:
-        pass
-    try:
-        # Try relative import
-        from importlib import import_module
-        module = import_module(f".calculator.states.{state_code}", "tax_engine")
-        if hasattr(module, 'calculate'):
-            print(f"✅ {state_code}.py loaded (relative)")
-            return module
-    except ImportError:
-        pass
-    return None
+    """Try to load a state calculator"""
+    state = load_state(state_code)
+    if state is None:
+        return None
+    if isinstance(state, SpecState):
+        print(f"✅ {state_code} spec loaded")
+    else:
+        print(f"✅ {state_code}.py loaded")
+    return state
 
 # Load all states
 AL = try_import_state("AL")
@@ -286,16 +224,17 @@ def validate_state_selection(state_code: str) -> Dict[str, Any]:
         }
     
     # Tax state - not yet supported
+    params = get_state(state_code)
     return {
         "valid": True,
         "state": state_code,
-        "state_name": state_code,  # We don't have full name
+        "state_name": params.name,
         "has_income_tax": True,
         "supported": False,
-        "tax_type": "unknown",
-        "rate": "varies",
-        "form": None,
-        "message": f"{state_code} is not yet fully supported. Tax calculation available, PDF generation coming soon."
+        "tax_type": params.tax_type,
+        "rate": params.rate_display,
+        "form": params.form,
+        "message": f"{params.name} is not yet fully supported. Tax calculation available, PDF generation coming soon."
     }
 
 
@@ -341,17 +280,28 @@ def get_state_info(state_code: str) -> Dict[str, Any]:
             "notes": info.get("notes")
         }
     
+    params = get_state(state_code)
     return {
         "state": state_code,
-        "name": state_code,
+        "name": params.name if params else state_code,
         "has_income_tax": True,
         "supported": False,
         "notes": "State not yet fully supported"
     }
 
 
+_all_states: Optional[List[Dict[str, Any]]] = None
+
+
 def get_all_states() -> List[Dict[str, Any]]:
-    """Get list of all states with support status"""
+    """Get list of all states with support status (built and sorted once)"""
+    global _all_states
+    if _all_states is None:
+        _all_states = _build_all_states()
+    return [dict(s) for s in _all_states]
+
+
+def _build_all_states() -> List[Dict[str, Any]]:
     states = []
     
     # Add tax states
@@ -420,11 +370,35 @@ def calculate_state_tax(state_code: str, data: Dict[str, Any]) -> Dict[str, Any]
     
     Returns:
         State tax calculation result
+
+    data is passed through normalize_input() first, so state modules
+    read canonical keys (calculator/inputs.py) without alias chains.
+
+    The result's tax_year is the year of the state tables used. State
+    tables exist for STATE_TAX_YEARS only; a return for another year is
+    calculated with the default year's tables and flagged with
+    requested_tax_year and a warning (no-tax states: any year).
     """
     state_code = state_code.upper()
-    
+    data = normalize_input(data)
+    result = _route_state(state_code, data)
+    
+    requested = data.get("tax_year") or STATE_DEFAULT_TAX_YEAR
+    # No-tax states have nothing year-specific
+    used = requested if requested in STATE_TAX_YEARS or state_code in NO_TAX_STATES else STATE_DEFAULT_TAX_YEAR
+    result["tax_year"] = used
+    if requested != used:
+        result["requested_tax_year"] = requested
+        result.setdefault("warnings", []).append(
+            f"{state_code} tax tables for {requested} are not available; calculated with {used} tables"
+        )
+    return result
+
+
+def _route_state(state_code: str, data: Dict[str, Any]) -> Dict[str, Any]:
     # No-tax states
     if state_code in NO_TAX_STATES:
+        _count_call(state_code, "none")
         info = NO_TAX_STATES[state_code]
         return {
             "state": state_code,
@@ -448,73 +422,35 @@ def calculate_state_tax(state_code: str, data: Dict[str, Any]) -> Dict[str, Any]
         try:
             result = module.calculate(data)
             result["support_level"] = "full"
+            _count_call(state_code, "full")
             return result
         except Exception as e:
-            print(f"⚠️ {state_code} calculator error: {e}")
+            logger.warning("%s calculator error, using generic fallback: %s", state_code, e)
             # Fall through to generic calculator
     
     # ============================================================
     # GENERIC CALCULATOR FALLBACK - ALL 41 TAX STATES
     # ============================================================
-    return calculate_generic_state(state_code, data)
+    result = calculate_generic_state(state_code, data)
+    _count_call(state_code, "generic" if result.get("supported", True) else "unsupported")
+    return result
+
+
+def _count_call(state_code: str, path: str):
+    """taxsky_calculator_calls_total{state, path}; unknown codes share one label."""
+    if CALCULATOR_CALLS is not None:
+        label = state_code if path != "unsupported" else "other"
+        CALCULATOR_CALLS.inc(label, path)
 
 
 def calculate_generic_state(state_code: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Generic state tax calculator for states without dedicated modules.
-    Supports flat tax and progressive tax states.
+    Generic state tax calculator for states without dedicated modules
+    (or whose module failed): state_registry brackets, standard
+    deduction and exemptions applied to federal AGI.
     """
-    # State tax info (flat tax rates and standard deductions)
-    GENERIC_STATE_INFO = {
-        # Flat tax states
-        "AZ": {"name": "Arizona", "type": "flat", "rate": 0.025, "std_single": 14600, "std_mfj": 29200},
-        "CO": {"name": "Colorado", "type": "flat", "rate": 0.044, "std_single": 0, "std_mfj": 0, "uses_federal_taxable": True},
-        "GA": {"name": "Georgia", "type": "flat", "rate": 0.0549, "std_single": 12000, "std_mfj": 24000},
-        "ID": {"name": "Idaho", "type": "flat", "rate": 0.058, "std_single": 14600, "std_mfj": 29200},
-        "IL": {"name": "Illinois", "type": "flat", "rate": 0.0495, "std_single": 0, "std_mfj": 0, "exemption": 2775},
-        "IN": {"name": "Indiana", "type": "flat", "rate": 0.0305, "std_single": 0, "std_mfj": 0, "exemption": 1000},
-        "IA": {"name": "Iowa", "type": "flat", "rate": 0.038, "std_single": 0, "std_mfj": 0},
-        "KY": {"name": "Kentucky", "type": "flat", "rate": 0.04, "std_single": 3160, "std_mfj": 6320},
-        "MA": {"name": "Massachusetts", "type": "flat", "rate": 0.05, "std_single": 0, "std_mfj": 0, "exemption": 4400},
-        "MI": {"name": "Michigan", "type": "flat", "rate": 0.0425, "std_single": 0, "std_mfj": 0, "exemption": 5600},
-        "MS": {"name": "Mississippi", "type": "flat", "rate": 0.047, "std_single": 2300, "std_mfj": 4600, "exempt_amount": 10000},
-        "NC": {"name": "North Carolina", "type": "flat", "rate": 0.045, "std_single": 13500, "std_mfj": 27000},
-        "PA": {"name": "Pennsylvania", "type": "flat", "rate": 0.0307, "std_single": 0, "std_mfj": 0},
-        "UT": {"name": "Utah", "type": "flat", "rate": 0.0465, "std_single": 0, "std_mfj": 0, "uses_federal_taxable": True},
-        
-        # Progressive tax states (simplified - using top marginal rate as approximation)
-        "AL": {"name": "Alabama", "type": "progressive", "top_rate": 0.05, "std_single": 2500, "std_mfj": 7500},
-        "AR": {"name": "Arkansas", "type": "progressive", "top_rate": 0.044, "std_single": 2340, "std_mfj": 4680},
-        "CA": {"name": "California", "type": "progressive", "top_rate": 0.123, "std_single": 5706, "std_mfj": 11412},
-        "CT": {"name": "Connecticut", "type": "progressive", "top_rate": 0.0699, "std_single": 0, "std_mfj": 0},
-        "DC": {"name": "Washington DC", "type": "progressive", "top_rate": 0.1075, "std_single": 14600, "std_mfj": 29200},
-        "DE": {"name": "Delaware", "type": "progressive", "top_rate": 0.066, "std_single": 3250, "std_mfj": 6500},
-        "HI": {"name": "Hawaii", "type": "progressive", "top_rate": 0.11, "std_single": 2200, "std_mfj": 4400},
-        "KS": {"name": "Kansas", "type": "progressive", "top_rate": 0.057, "std_single": 3500, "std_mfj": 8000},
-        "LA": {"name": "Louisiana", "type": "progressive", "top_rate": 0.0425, "std_single": 0, "std_mfj": 0},
-        "ME": {"name": "Maine", "type": "progressive", "top_rate": 0.0715, "std_single": 14600, "std_mfj": 29200},
-        "MD": {"name": "Maryland", "type": "progressive", "top_rate": 0.0575, "std_single": 2550, "std_mfj": 5100},
-        "MN": {"name": "Minnesota", "type": "progressive", "top_rate": 0.0985, "std_single": 14575, "std_mfj": 29150},
-        "MO": {"name": "Missouri", "type": "progressive", "top_rate": 0.048, "std_single": 14600, "std_mfj": 29200},
-        "MT": {"name": "Montana", "type": "progressive", "top_rate": 0.059, "std_single": 5540, "std_mfj": 11080},
-        "NE": {"name": "Nebraska", "type": "progressive", "top_rate": 0.0584, "std_single": 7900, "std_mfj": 15800},
-        "NJ": {"name": "New Jersey", "type": "progressive", "top_rate": 0.1075, "std_single": 0, "std_mfj": 0},
-        "NM": {"name": "New Mexico", "type": "progressive", "top_rate": 0.059, "std_single": 14600, "std_mfj": 29200},
-        "NY": {"name": "New York", "type": "progressive", "top_rate": 0.109, "std_single": 8000, "std_mfj": 16050},
-        "ND": {"name": "North Dakota", "type": "progressive", "top_rate": 0.025, "std_single": 14600, "std_mfj": 29200},
-        "OH": {"name": "Ohio", "type": "progressive", "top_rate": 0.035, "std_single": 0, "std_mfj": 0, "exempt_amount": 26050},
-        "OK": {"name": "Oklahoma", "type": "progressive", "top_rate": 0.0475, "std_single": 6350, "std_mfj": 12700},
-        "OR": {"name": "Oregon", "type": "progressive", "top_rate": 0.099, "std_single": 2745, "std_mfj": 5495},
-        "RI": {"name": "Rhode Island", "type": "progressive", "top_rate": 0.0599, "std_single": 10550, "std_mfj": 21150},
-        "SC": {"name": "South Carolina", "type": "progressive", "top_rate": 0.064, "std_single": 14600, "std_mfj": 29200},
-        "VT": {"name": "Vermont", "type": "progressive", "top_rate": 0.0875, "std_single": 7000, "std_mfj": 14000},
-        "VA": {"name": "Virginia", "type": "progressive", "top_rate": 0.0575, "std_single": 8500, "std_mfj": 17000},
-        "WV": {"name": "West Virginia", "type": "progressive", "top_rate": 0.05, "std_single": 0, "std_mfj": 0},
-        "WI": {"name": "Wisconsin", "type": "progressive", "top_rate": 0.0765, "std_single": 13230, "std_mfj": 24470},
-    }
-    
-    info = GENERIC_STATE_INFO.get(state_code)
-    if not info:
+    params = get_state(state_code)
+    if params is None or not params.has_income_tax:
         return {
             "state": state_code,
             "supported": False,
@@ -524,46 +460,25 @@ def calculate_generic_state(state_code: str, data: Dict[str, Any]) -> Dict[str,
     
     # Extract data
     filing_status = (data.get("filing_status") or "single").lower().replace(" ", "_").replace("-", "_")
-    is_mfj = filing_status in ["married_filing_jointly", "mfj", "qualifying_surviving_spouse"]
+    fs = filing_status_key(filing_status)
     
     federal_agi = float(data.get("federal_agi") or data.get("agi") or 0)
-    wages = float(data.get("wages") or federal_agi)
     withholding = float(data.get("state_withholding") or data.get("withholding") or 0)
     num_deps = int(data.get("num_dependents") or 0)
     
-    # Standard deduction
-    std_ded = info.get("std_mfj", 0) if is_mfj else info.get("std_single", 0)
-    
-    # Exemptions
-    exemption = info.get("exemption", 0)
-    if exemption > 0:
-        num_exemptions = 2 if is_mfj else 1
-        total_exemption = (num_exemptions + num_deps) * exemption
-    else:
-        total_exemption = 0
-    
-    # Exempt amount (like Ohio's first $26,050)
-    exempt_amount = info.get("exempt_amount", 0)
+    std_ded = params.standard_deduction_for(fs)
+    total_exemption = params.exemptions_for(fs, num_deps)
     
-    # State AGI (some states use federal taxable income)
-    if info.get("uses_federal_taxable"):
-        # For CO, UT - use federal taxable (AGI - std deduction)
-        state_agi = max(0, federal_agi - 14600)  # Approximate federal std ded
+    # State AGI (some states start from federal taxable income)
+    if params.uses_federal_taxable:
+        federal_std = federal_params(data.get("tax_year")).standard_deduction
+        state_agi = max(0, federal_agi - federal_std.get(fs, 0))
     else:
         state_agi = federal_agi
     
-    # Taxable income
-    taxable_income = max(0, state_agi - std_ded - total_exemption - exempt_amount)
-    
-    # Calculate tax
-    if info["type"] == "flat":
-        rate = info["rate"]
-        state_tax = round(taxable_income * rate, 2)
-    else:
-        # Progressive - use simplified effective rate (about 70% of top rate for most incomes)
-        top_rate = info.get("top_rate", 0.05)
-        effective_rate = top_rate * 0.7  # Approximation
-        state_tax = round(taxable_income * effective_rate, 2)
+    # Taxable income (exempt_amount: e.g. Mississippi's first $10,000)
+    taxable_income = max(0, state_agi - std_ded - total_exemption - params.exempt_amount)
+    state_tax = round(params.tax_on(taxable_income, fs), 2)
     
     # Refund or owed
     if withholding > state_tax:
@@ -577,11 +492,11 @@ def calculate_generic_state(state_code: str, data: Dict[str, Any]) -> Dict[str,
     
     return {
         "state": state_code,
-        "state_name": info["name"],
+        "state_name": params.name,
         "filing_status": filing_status,
         "has_income_tax": True,
         "support_level": "generic",
-        "tax_type": info["type"],
+        "tax_type": params.tax_type,
         
         # Key fields for Dashboard
         "federal_agi": federal_agi,
@@ -597,7 +512,7 @@ def calculate_generic_state(state_code: str, data: Dict[str, Any]) -> Dict[str,
         "amount_owed": amount_owed,
         "effective_rate": effective_rate,
         
-        "notes": f"{info['name']} - {'Flat' if info['type'] == 'flat' else 'Progressive'} tax state"
+        "notes": f"{params.name} - {'Flat' if params.tax_type == 'flat' else 'Progressive'} tax state"
     }
 
 
@@ -4,6 +4,7 @@
 # Single source of truth:
 #   - Federal tax → calculator/federal
 #   - State tax   → state_router → states/XX.py
+#   - Part-year / multi-state → multistate (same routers)
 # NO fallback state math here
 # ============================================================
 
@@ -19,6 +20,8 @@ from .calculator.federal.calculator import calculate as calculate_federal
 # IMPORT STATE ROUTER (ONLY ENTRY POINT)
 # ============================================================
 from .state_router import calculate_state_tax as route_state_tax
+from .calculator.inputs import normalize_input
+from .multistate import calculate_multistate
 
 # ============================================================
 # PUBLIC API: GET ALL STATES (UI USE)
@@ -39,8 +42,16 @@ def calculate_tax(tax_data: Dict[str, Any]) -> Dict[str, Any]:
     - wages
     OPTIONAL:
     - state (e.g. "CA")
+    - residency / state_sources: moved or worked across state lines;
+      returns calculate_multistate's result ("states" list, no "state")
     """
 
+    # Resolve field aliases once for federal + state
+    tax_data = normalize_input(tax_data)
+
+    if tax_data.get("residency") or tax_data.get("state_sources"):
+        return calculate_multistate(tax_data)
+
     # =========================
     # 1️⃣ FEDERAL CALCULATION
     # =========================
@@ -124,6 +135,10 @@ def _ready_to_file(federal: Dict[str, Any], state: Dict[str, Any]) -> bool:
     if state and "error" in state:
         return False
 
+    # State calculated with another year's tables
+    if state and state.get("requested_tax_year"):
+        return False
+
     return True
 
 # ============================================================
@@ -0,0 +1,164 @@
+# tax_engine/tax_sweep.py
+# ============================================================
+# TAX SWEEP - tax, effective and marginal rate across one input
+# ============================================================
+# Holds a return profile fixed and sweeps one input (wages, SE
+# income, an IRA contribution, ...) over a grid - the chart a CPA
+# would otherwise build from hundreds of /calculate calls.
+#
+# Federal and state tax are sampled together in one pass over the
+# variable (curves.sample_piecewise), so both calculators run only at
+# the breakpoints the pass needs, not at every grid point. Marginal
+# rates are the slopes of the segments between breakpoints, not
+# finite differences between neighbouring grid points, so they are
+# exact inside a bracket and don't depend on the grid step. Tax values
+# are within $2 of the calculator (curves.py).
+#
+#   federal_tax = tax after credits - refundable credits (EITC,
+#                 refundable CTC); negative = net credit
+#   state_tax   = state module total (states/XX.py or generic)
+#   effective_rate = total tax / AGI
+#   marginal_rate  = d(total tax) / d(variable), in percent
+# ============================================================
+
+import logging
+from math import ceil, floor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .calculator.federal.calculator import calculate as calculate_federal
+from .calculator.inputs import ALIAS_INDEX, FLOAT_FIELDS, CanonicalInput, normalize_input
+from .curves import TaxCurve, locate, sample_piecewise
+from .state_compare import run_state_calculator, state_tax_amount
+from .state_router import NO_TAX_STATES
+
+logger = logging.getLogger(__name__)
+
+MAX_POINTS = 2000
+COARSE_INTERVALS = 32
+BREAKPOINT_MIN_CHANGE = 0.1  # percentage points of marginal rate
+
+# Raw keys some state modules read directly; kept in step with the swept wages
+_WAGE_FIELDS = ("taxpayer_wages", "spouse_wages")
+
+
+def grid(start: float, stop: float, step: float) -> List[float]:
+    """start, start + step, ... <= stop (at most MAX_POINTS values)."""
+    if step <= 0 or stop < start:
+        raise ValueError("Need start <= stop and step > 0")
+    points = int((stop - start) // step) + 1
+    if points > MAX_POINTS:
+        raise ValueError(f"At most {MAX_POINTS} points per sweep")
+    return [start + i * step for i in range(points)]
+
+
+def sweep_field(variable: str) -> str:
+    """Canonical input field for a sweep variable name (any alias, snake or camel)."""
+    entry = ALIAS_INDEX.get(variable)
+    if entry is None or entry[0] not in FLOAT_FIELDS:
+        raise ValueError(f"Cannot sweep {variable!r}; use an amount field such as wages, "
+                         "self_employment_income or ira_contribution")
+    return entry[0]
+
+
+def tax_function(base: CanonicalInput, field: str, state: Optional[str],
+                 failures: Optional[Dict[str, str]] = None) -> Callable[[float], Tuple[float, float, float]]:
+    """f(x) = (federal tax, state tax, AGI) for base with field set to x."""
+    with_state = bool(state) and state not in NO_TAX_STATES
+
+    def f(x: float) -> Tuple[float, float, float]:
+        data = CanonicalInput(base)
+        data[field] = float(x)
+        if field in _WAGE_FIELDS:
+            data["wages"] = data.get("taxpayer_wages", 0) + data.get("spouse_wages", 0)
+        fed = calculate_federal(data)
+        agi = fed.get("agi", 0)
+        fed_tax = fed.get("tax_after_credits", 0) - fed.get("refundable_credits", 0)
+        st = 0.0
+        if with_state:
+            data["federal_agi"] = data["agi"] = agi
+            st = state_tax_amount(run_state_calculator(state, data, failures))
+        return fed_tax, st, agi
+
+    return f
+
+
+def _coarse(lo: int, hi: int) -> List[int]:
+    if hi <= lo:
+        hi = lo + 1
+    knots = sorted({lo + (hi - lo) * i // COARSE_INTERVALS for i in range(COARSE_INTERVALS + 1)})
+    return knots
+
+
+def sweep(
+    profile: Dict[str, Any],
+    variable: str = "wages",
+    xs: Optional[Sequence[float]] = None,
+    state: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Federal + state tax series for profile with `variable` set to each
+    value in xs (default: 0..200,000 step 1,000). state defaults to
+    profile["state"].
+    """
+    field = sweep_field(variable)
+    xs = [float(x) for x in (xs if xs is not None else grid(0, 200_000, 1_000))]
+    if not xs:
+        raise ValueError("Empty sweep grid")
+    if len(xs) > MAX_POINTS:
+        raise ValueError(f"At most {MAX_POINTS} points per sweep")
+
+    base = normalize_input(profile)
+    state = (state or base.get("state") or "").upper() or None
+    failures: Dict[str, str] = {}
+    f = tax_function(base, field, state, failures)
+
+    knots, values = sample_piecewise(f, _coarse(int(floor(min(xs))), int(ceil(max(xs)))))
+    if failures:
+        logger.warning("%s calculator error during sweep, generic fallback used: %s", state, failures[state])
+    logger.debug("Sweep %s over %d points: %d breakpoints", field, len(xs), len(knots))
+
+    federal = TaxCurve("US", knots, [v[0] for v in values])
+    state_curve = TaxCurve(state or "", knots, [v[1] for v in values])
+    agi_curve = TaxCurve("AGI", knots, [v[2] for v in values])
+
+    segments = locate(knots, xs)
+    fed_tax = federal.evaluate(xs, segments=segments)
+    st_tax = state_curve.evaluate(xs, segments=segments)
+    agi = agi_curve.evaluate(xs, segments=segments)
+    fed_rate = federal.rates(xs, segments=segments)
+    st_rate = state_curve.rates(xs, segments=segments)
+    total = [a + b for a, b in zip(fed_tax, st_tax)]
+
+    return {
+        "variable": variable,
+        "field": field,
+        "state": state,
+        "filing_status": base.get("filing_status", "single"),
+        "x": xs,
+        "federal_tax": [round(t, 2) for t in fed_tax],
+        "state_tax": [round(t, 2) for t in st_tax],
+        "total_tax": [round(t, 2) for t in total],
+        "effective_rate": [round(t / a * 100, 2) if a > 0 else 0 for t, a in zip(total, agi)],
+        "federal_marginal_rate": [round(r * 100, 2) for r in fed_rate],
+        "state_marginal_rate": [round(r * 100, 2) for r in st_rate],
+        "marginal_rate": [round((a + b) * 100, 2) for a, b in zip(fed_rate, st_rate)],
+        "breakpoints": _breakpoints(knots, federal.slopes, state_curve.slopes, min(xs), max(xs)),
+    }
+
+
+def _breakpoints(knots: List[float], fed_slopes: List[float], st_slopes: List[float],
+                 lo: float, hi: float) -> List[Dict[str, float]]:
+    """Where the combined marginal rate changes inside [lo, hi] (for chart markers)."""
+    out = []
+    prev = None
+    for x, a, b in zip(knots, fed_slopes, st_slopes):
+        if x > hi:
+            break
+        rate = round((a + b) * 100, 2)
+        if prev is not None and x > lo and abs(rate - prev) >= BREAKPOINT_MIN_CHANGE:
+            out.append({"x": x, "marginal_rate": rate})
+        prev = rate
+    return out
+
+
+__all__ = ["MAX_POINTS", "grid", "sweep_field", "tax_function", "sweep"]
@@ -31,11 +31,14 @@ WHY THIS CHANGE (v20.1):
 
 import re
 import json
+import logging
 import os
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Tuple, Optional
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # ============================================================
 # IMPORT CALCULATOR
 # ============================================================
@@ -67,18 +70,32 @@ except ImportError:
 MONGODB_SAVE_AVAILABLE = False
 update_session_in_db = None
 
+update_session_if_changed = None
+
 try:
-    from .mongodb_client import update_session
+    from .mongodb_client import update_session, update_session_if_changed
     update_session_in_db = update_session
     MONGODB_SAVE_AVAILABLE = True
 except ImportError:
     try:
-        from mongodb_client import update_session
+        from mongodb_client import update_session, update_session_if_changed
         update_session_in_db = update_session
         MONGODB_SAVE_AVAILABLE = True
     except ImportError:
         print("⚠️ mongodb_client.update_session not available")
 
+# ============================================================
+# IMPORT REQUEST TIMING (Server-Timing phases; no-op outside the API)
+# ============================================================
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
+# Timestamps that change on every run - excluded from the content
+# fingerprint so an unchanged validation only touches these fields
+VALIDATION_VOLATILE_FIELDS = ("validatedAt", "form1040._metadata.extracted_at")
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -190,10 +207,10 @@ def build_from_structured_data(session: Dict) -> Dict[str, Any]:
     taxpayer_tips = taxpayer_tips_w2 if taxpayer_tips_w2 > 0 else taxpayer_tips_ans
     
     # Log where we got the data from
-    print(f"   📊 W-2 Data Sources:")
-    print(f"      input_forms.w2: wages=${taxpayer_wages_w2:,.0f}, fed=${taxpayer_fed_w2:,.0f}")
-    print(f"      answers: wages=${taxpayer_wages_ans:,.0f}, fed=${taxpayer_fed_ans:,.0f}")
-    print(f"      USING: wages=${taxpayer_wages:,.0f}, fed=${taxpayer_fed:,.0f}")
+    logger.debug(
+        "W-2 sources: input_forms.w2 wages=%.0f fed=%.0f | answers wages=%.0f fed=%.0f | using wages=%.0f fed=%.0f",
+        taxpayer_wages_w2, taxpayer_fed_w2, taxpayer_wages_ans, taxpayer_fed_ans, taxpayer_wages, taxpayer_fed,
+    )
     
     # ═══════════════════════════════════════════════════════════
     # Check for 401(k) from W-2 box 13 or answers
@@ -400,10 +417,10 @@ def compare_calculations(node_totals: Dict, python_result: Dict) -> List[str]:
         # Allow $1 rounding difference
         if abs(node_val - python_val) > 1:
             warnings.append(f"{label} mismatch: Node=${node_val:,.0f} vs Python=${python_val:,.0f}")
-            print(f"   ⚠️ {label}: Node=${node_val:,.0f} vs Python=${python_val:,.0f}")
+            logger.debug("%s mismatch: node=%.0f python=%.0f", label, node_val, python_val)
     
     if not warnings:
-        print(f"   ✅ Node.js and Python calculations match!")
+        logger.debug("Node.js and Python calculations match")
     
     return warnings
 
@@ -415,6 +432,8 @@ def compare_calculations(node_totals: Dict, python_result: Dict) -> List[str]:
 def map_extracted_to_calculator(extracted: Dict) -> Dict:
     """
     Map extracted/validated data to calculator input format.
+    Emits canonical field names (calculator/inputs.py); aliases are
+    resolved there, not here.
     """
     return {
         # Filing info
@@ -452,19 +471,17 @@ def map_extracted_to_calculator(extracted: Dict) -> Dict:
         "long_term_gains": extracted.get("long_term_gains", 0) or 0,
         "short_term_gains": extracted.get("short_term_gains", 0) or 0,
         "pension_income": extracted.get("pension_income", 0) or 0,
-        "social_security": extracted.get("social_security", 0) or 0,
+        "social_security_benefits": extracted.get("social_security", 0) or 0,
         "self_employment_income": extracted.get("self_employment_income", 0) or 0,
         "unemployment_income": extracted.get("unemployment_income", 0) or 0,
         "rental_income": extracted.get("rental_income", 0) or 0,
         
         # Adjustments - IRA
-        "ira_contributions": extracted.get("taxpayer_ira", 0) or 0,
-        "taxpayer_ira": extracted.get("taxpayer_ira", 0) or 0,
-        "spouse_ira": extracted.get("spouse_ira", 0) or 0,
+        "ira_contribution": extracted.get("taxpayer_ira", 0) or 0,
+        "spouse_ira_contribution": extracted.get("spouse_ira", 0) or 0,
         
         # Other Adjustments
-        "hsa_contributions": extracted.get("hsa", 0) or 0,
-        "hsa": extracted.get("hsa", 0) or 0,
+        "hsa_contribution": extracted.get("hsa", 0) or 0,
         "student_loan_interest": extracted.get("student_loan_interest", 0) or 0,
         
         # Dependents
@@ -557,9 +574,14 @@ def build_form_1040(extracted: Dict, tax_result: Dict, tax_year: int = 2025) ->
 def save_validation_results(user_id: str, tax_year: int, extracted: Dict, 
                            tax_result: Dict, form1040: Dict, 
                            is_valid: bool, all_warnings: List[str]) -> bool:
-    """Save validation results back to MongoDB."""
-    if not MONGODB_SAVE_AVAILABLE or not update_session_in_db:
-        print("   ⚠️ Cannot save to MongoDB - mongodb_client not available")
+    """
+    Save validation results back to MongoDB.
+    
+    Skips the write (only touches timestamps) when the results are
+    identical to the last save; otherwise sends only changed paths.
+    """
+    if not MONGODB_SAVE_AVAILABLE or not update_session_if_changed:
+        logger.warning("Cannot save validation results - mongodb_client not available")
         return False
     
     try:
@@ -594,19 +616,25 @@ def save_validation_results(user_id: str, tax_year: int, extracted: Dict,
             "validatorVersion": EXTRACTOR_VERSION,
         }
         
-        success = update_session_in_db(user_id, tax_year, update_data)
+        result = update_session_if_changed(
+            user_id, tax_year, update_data,
+            fingerprint_field="validationFingerprint",
+            volatile_fields=VALIDATION_VOLATILE_FIELDS,
+        )
+        success = result["success"]
         
         if success:
-            print(f"   ✅ Validation results saved to MongoDB!")
-            print(f"      AGI: ${tax_result.get('agi', 0):,.0f}")
-            print(f"      Tax: ${tax_result.get('tax_after_credits', 0):,.0f}")
-            print(f"      Refund: ${tax_result.get('refund', 0):,.0f}")
-            print(f"      Owed: ${tax_result.get('amount_owed', 0):,.0f}")
+            logger.debug(
+                "Validation results %s for %s (%d paths): agi=%.0f tax=%.0f refund=%.0f owed=%.0f",
+                result["action"], user_id, result["fields"],
+                tax_result.get("agi", 0), tax_result.get("tax_after_credits", 0),
+                tax_result.get("refund", 0), tax_result.get("amount_owed", 0),
+            )
         
         return success
         
     except Exception as e:
-        print(f"   ❌ Save to MongoDB failed: {e}")
+        logger.error("Save validation results to MongoDB failed: %s", e)
         return False
 
 
@@ -628,41 +656,39 @@ def validate_and_calculate(user_id: str, tax_year: int, session: Dict) -> Dict[s
     Returns:
         Result dict with validation status, extracted data, tax calculation
     """
-    print(f"\n{'='*60}")
-    print(f"🔍 TAXSKY PYTHON VALIDATOR {EXTRACTOR_VERSION}")
-    print(f"{'='*60}")
-    print(f"👤 User: {user_id}")
-    print(f"📅 Tax Year: {tax_year}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug("Validator %s: user=%s year=%s", EXTRACTOR_VERSION, user_id, tax_year)
     
     # 1. Read STRUCTURED data from MongoDB (NOT messages!)
     answers = session.get("answers", {})
     input_forms = session.get("input_forms", {})
     totals = session.get("totals", {})
     
-    print(f"\n📋 Data from MongoDB:")
-    print(f"   Answers: {len(answers)} fields")
-    print(f"   W-2s: {len(input_forms.get('w2', []))}")
-    print(f"   Filing Status: {session.get('filing_status', 'unknown')}")
+    if debug:
+        logger.debug(
+            "Session data: answers=%d w2s=%d filing_status=%s",
+            len(answers), len(input_forms.get("w2", [])), session.get("filing_status", "unknown"),
+        )
     
     # 2. Build extracted data from structured fields
-    extracted = build_from_structured_data(session)
-    
-    print(f"\n📊 Extracted Data:")
-    print(f"   Filing Status: {extracted.get('filing_status')}")
-    print(f"   State: {extracted.get('state')}")
-    print(f"   Taxpayer Wages: ${extracted.get('taxpayer_wages', 0):,}")
-    print(f"   Spouse Wages: ${extracted.get('spouse_wages', 0):,}")
-    print(f"   Total Wages: ${extracted.get('total_wages', 0):,}")
-    print(f"   Federal Withheld: ${extracted.get('total_federal_withheld', 0):,}")
-    print(f"   Has 401(k): {extracted.get('has_retirement_plan')}")
-    print(f"   Taxpayer IRA: ${extracted.get('taxpayer_ira', 0):,}")
-    print(f"   Children under 17: {extracted.get('qualifying_children_under_17', 0)}")
+    with span("build"):
+        extracted = build_from_structured_data(session)
+    
+    if debug:
+        logger.debug(
+            "Extracted: filing_status=%s state=%s taxpayer_wages=%s spouse_wages=%s total_wages=%s "
+            "federal_withheld=%s has_401k=%s taxpayer_ira=%s children_under_17=%s",
+            extracted.get("filing_status"), extracted.get("state"),
+            extracted.get("taxpayer_wages", 0), extracted.get("spouse_wages", 0),
+            extracted.get("total_wages", 0), extracted.get("total_federal_withheld", 0),
+            extracted.get("has_retirement_plan"), extracted.get("taxpayer_ira", 0),
+            extracted.get("qualifying_children_under_17", 0),
+        )
     
     # 3. RAG Validation (IRS rules)
-    is_valid, rag_errors = verify_with_rag(extracted)
-    print(f"\n📋 RAG Validation: {'✅ PASSED' if is_valid else '⚠️ WARNINGS'}")
-    for err in rag_errors:
-        print(f"   ⚠️ {err}")
+    with span("rag_verify"):
+        is_valid, rag_errors = verify_with_rag(extracted)
+    logger.debug("RAG validation: %s %s", "passed" if is_valid else "warnings", rag_errors)
     
     # 4. Map to calculator input
     calc_input = map_extracted_to_calculator(extracted)
@@ -670,34 +696,31 @@ def validate_and_calculate(user_id: str, tax_year: int, session: Dict) -> Dict[s
     # 5. Calculate with Python
     tax_result = {}
     if CALCULATOR_AVAILABLE and calculate_tax:
-        print(f"\n📤 Sending to Calculator...")
-        tax_result = calculate_tax(calc_input)
-        print(f"\n📊 Python Tax Calculation:")
-        print(f"   Total Wages: ${tax_result.get('wages', 0):,.0f}")
-        print(f"   AGI: ${tax_result.get('agi', 0):,.0f}")
-        print(f"   Taxable Income: ${tax_result.get('taxable_income', 0):,.0f}")
-        print(f"   Tax: ${tax_result.get('tax_after_credits', 0):,.0f}")
-        print(f"   Withholding: ${tax_result.get('withholding', 0):,.0f}")
-        print(f"   Refund: ${tax_result.get('refund', 0):,.0f}")
-        print(f"   Owed: ${tax_result.get('amount_owed', 0):,.0f}")
+        with span("calc"):
+            tax_result = calculate_tax(calc_input)
+        if debug:
+            logger.debug(
+                "Python calculation: wages=%.0f agi=%.0f taxable=%.0f tax=%.0f withholding=%.0f refund=%.0f owed=%.0f",
+                tax_result.get("wages", 0), tax_result.get("agi", 0), tax_result.get("taxable_income", 0),
+                tax_result.get("tax_after_credits", 0), tax_result.get("withholding", 0),
+                tax_result.get("refund", 0), tax_result.get("amount_owed", 0),
+            )
     else:
-        print(f"\n⚠️ Calculator not available!")
+        logger.warning("Calculator not available - skipping calculation for %s", user_id)
     
     # 6. Compare Node.js vs Python
-    print(f"\n🔄 Comparing Node.js vs Python:")
     comparison_warnings = compare_calculations(totals, tax_result)
     all_warnings = rag_errors + comparison_warnings
     
     # 7. Build Form 1040 JSON
-    form1040 = build_form_1040(extracted, tax_result, tax_year)
+    with span("form1040"):
+        form1040 = build_form_1040(extracted, tax_result, tax_year)
     
     # 8. Save to MongoDB
-    print(f"\n💾 Saving validation results to MongoDB...")
-    save_validation_results(user_id, tax_year, extracted, tax_result, form1040, is_valid, all_warnings)
+    with span("mongo_write"):
+        save_validation_results(user_id, tax_year, extracted, tax_result, form1040, is_valid, all_warnings)
     
-    print(f"\n{'='*60}")
-    print(f"✅ VALIDATION COMPLETE")
-    print(f"{'='*60}\n")
+    logger.debug("Validation complete: user=%s warnings=%d", user_id, len(all_warnings))
     
     return {
         "success": True,
@@ -32,8 +32,14 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import importlib.util
 import os
 
+try:
+    from json_responses import StaticPayload
+except ImportError:
+    StaticPayload = None
+
 # ============================================================
 # ROUTER
 # ============================================================
@@ -46,12 +52,10 @@ MONGODB_AVAILABLE = False
 _db = None
 _collection = None
 
-try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure
-    PYMONGO_AVAILABLE = True
-except ImportError:
-    PYMONGO_AVAILABLE = False
+# pymongo itself is imported on the first get_collection() call
+PYMONGO_AVAILABLE = importlib.util.find_spec("pymongo") is not None
+MongoClient = None
+if not PYMONGO_AVAILABLE:
     print("⚠️ pymongo not installed")
 
 # Try to load .env
@@ -71,13 +75,15 @@ COLLECTION_NAME = "taxsessions"
 
 def get_collection():
     """Get MongoDB collection with connection caching."""
-    global _db, _collection
+    global _db, _collection, MongoClient
     
     if not PYMONGO_AVAILABLE:
         raise HTTPException(status_code=503, detail="MongoDB not available")
     
     if _collection is None:
         try:
+            if MongoClient is None:
+                from pymongo import MongoClient
             client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
             client.admin.command('ping')
             _db = client[DATABASE_NAME]
@@ -951,9 +957,7 @@ async def update_dependent_info(user_id: str, dep_index: int, request: Request,
 # ============================================================
 # ✅ v2.1: GET FIELD LABELS
 # ============================================================
-@router.get("/form1040/labels")
-async def get_field_labels():
-    """Get human-readable labels for form fields."""
+def _field_labels():
     return {
         "success": True,
         "labels": FIELD_LABELS,
@@ -963,6 +967,18 @@ async def get_field_labels():
     }
 
 
+# Static for the life of the process - serialized once, repeats get 304
+_FIELD_LABELS_PAYLOAD = StaticPayload(_field_labels) if StaticPayload else None
+
+
+@router.get("/form1040/labels")
+async def get_field_labels(request: Request):
+    """Get human-readable labels for form fields."""
+    if _FIELD_LABELS_PAYLOAD is None:
+        return _field_labels()
+    return _FIELD_LABELS_PAYLOAD.response(request)
+
+
 # ============================================================
 # HEALTH CHECK
 # ============================================================
@@ -18,6 +18,7 @@ Endpoints:
   GET  /generate/states/supported → List all supported states
   GET  /generate/states/calculate/{state_code} → Quick calculation
   GET  /generate/states/compare  → Compare all states
+  GET  /generate/states/compare/grid → Compare all states over an AGI range
 =============================================================
 """
 
@@ -25,15 +26,22 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
+import importlib.util
 import tempfile
 import os
 
+from tax_engine.state_registry import states as registry_states
+
+# Forms here are JSON for now; pypdf is only checked for, not imported
+HAS_PYPDF = importlib.util.find_spec("pypdf") is not None
+
+# State comparison runs the real state calculators (tax_engine)
 try:
-    from pypdf import PdfReader, PdfWriter
-    from pypdf.generic import NameObject, BooleanObject
-    HAS_PYPDF = True
+    from tax_engine import state_compare
+    COMPARE_ENGINE_AVAILABLE = True
 except ImportError:
-    HAS_PYPDF = False
+    state_compare = None
+    COMPARE_ENGINE_AVAILABLE = False
 
 # Router
 additional_states_router = APIRouter(prefix="/generate", tags=["State Tax Forms"])
@@ -43,438 +51,16 @@ TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
 
 # =============================================================
-# NO-TAX STATES (9 states)
+# STATE TABLES - tax_engine.state_registry
 # =============================================================
-NO_TAX_STATES = {
-    "AK": {"name": "Alaska", "notes": "No state income tax. Oil revenue funds state."},
-    "FL": {"name": "Florida", "notes": "No state income tax (constitutional)."},
-    "NV": {"name": "Nevada", "notes": "No state income tax. Gaming revenue funds state."},
-    "NH": {"name": "New Hampshire", "notes": "No income tax. Interest/dividend tax ended 2025."},
-    "SD": {"name": "South Dakota", "notes": "No state income tax."},
-    "TN": {"name": "Tennessee", "notes": "No income tax. Hall tax ended 2021."},
-    "TX": {"name": "Texas", "notes": "No state income tax (constitutional)."},
-    "WA": {"name": "Washington", "notes": "No income tax. Capital gains tax 7% only."},
-    "WY": {"name": "Wyoming", "notes": "No state income tax."}
-}
-
+# One registry for the router, the generic fallback, these forms and
+# the compare endpoint. STATE_TAX_INFO maps code -> StateParams
+# (brackets, deductions, exemptions, form, flags) for the 41 tax
+# states + DC; NO_TAX_STATES maps code -> {name, notes}.
+NO_TAX_STATES = {code: {"name": p.name, "notes": p.notes}
+                 for code, p in registry_states().items() if not p.has_income_tax}
 
-# =============================================================
-# TAX CONSTANTS - ALL 41 TAX STATES
-# =============================================================
-STATE_TAX_INFO = {
-    # =========================================================
-    # FLAT TAX STATES (14 states)
-    # =========================================================
-    "AZ": {
-        "name": "Arizona", "form": "140", "tax_type": "flat", "rate": 0.025,
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 0, "dependent_exemption": 100,
-        "website": "https://azdor.gov",
-        "notes": "Lowest flat tax rate in the nation (2.5%)"
-    },
-    "CO": {
-        "name": "Colorado", "form": "104", "tax_type": "flat", "rate": 0.044,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "uses_federal_taxable": True,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://tax.colorado.gov",
-        "notes": "Uses federal taxable income as starting point"
-    },
-    "GA": {
-        "name": "Georgia", "form": "500", "tax_type": "flat", "rate": 0.0549,
-        "std_ded_single": 12000, "std_ded_married": 24000,
-        "personal_exemption": 2700, "dependent_exemption": 3000,
-        "website": "https://dor.georgia.gov",
-        "notes": "Switched to flat tax in 2024"
-    },
-    "ID": {
-        "name": "Idaho", "form": "40", "tax_type": "flat", "rate": 0.058,
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "grocery_credit": 120,
-        "website": "https://tax.idaho.gov",
-        "notes": "Grocery tax credit $120 per person"
-    },
-    "IL": {
-        "name": "Illinois", "form": "IL-1040", "tax_type": "flat", "rate": 0.0495,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 2775, "dependent_exemption": 2775,
-        "website": "https://tax.illinois.gov",
-        "notes": "Retirement income is fully exempt"
-    },
-    "IN": {
-        "name": "Indiana", "form": "IT-40", "tax_type": "flat", "rate": 0.0305,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 1000, "dependent_exemption": 1000,
-        "has_local_tax": True,
-        "website": "https://www.in.gov/dor",
-        "notes": "County taxes add 0.5% to 3.38%"
-    },
-    "IA": {
-        "name": "Iowa", "form": "IA-1040", "tax_type": "flat", "rate": 0.038,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 40, "dependent_exemption": 40,
-        "website": "https://tax.iowa.gov",
-        "notes": "Retirement income is fully exempt"
-    },
-    "KY": {
-        "name": "Kentucky", "form": "740", "tax_type": "flat", "rate": 0.04,
-        "std_ded_single": 3160, "std_ded_married": 6320,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://revenue.ky.gov",
-        "notes": "Rate reduced to 4% in 2025"
-    },
-    "MA": {
-        "name": "Massachusetts", "form": "1", "tax_type": "flat", "rate": 0.05,
-        "surtax_rate": 0.04, "surtax_threshold": 1000000,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 4400, "personal_exemption_married": 8800,
-        "dependent_exemption": 1000,
-        "website": "https://www.mass.gov/dor",
-        "notes": "4% surtax on income over $1M (9% top rate)"
-    },
-    "MI": {
-        "name": "Michigan", "form": "MI-1040", "tax_type": "flat", "rate": 0.0425,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 5600, "dependent_exemption": 5600,
-        "has_local_tax": True,
-        "website": "https://www.michigan.gov/treasury",
-        "notes": "Detroit adds 2.4% city tax"
-    },
-    "MS": {
-        "name": "Mississippi", "form": "80-105", "tax_type": "flat", "rate": 0.047,
-        "exempt_amount": 10000,
-        "std_ded_single": 2300, "std_ded_married": 4600,
-        "personal_exemption": 6000, "personal_exemption_married": 12000,
-        "dependent_exemption": 1500,
-        "website": "https://www.dor.ms.gov",
-        "notes": "First $10,000 of income is exempt"
-    },
-    "NC": {
-        "name": "North Carolina", "form": "D-400", "tax_type": "flat", "rate": 0.045,
-        "std_ded_single": 13500, "std_ded_married": 27000,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "child_deduction": 2500,
-        "website": "https://www.ncdor.gov",
-        "notes": "Rate decreased to 4.5% in 2025"
-    },
-    "PA": {
-        "name": "Pennsylvania", "form": "PA-40", "tax_type": "flat", "rate": 0.0307,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "has_local_tax": True,
-        "website": "https://www.revenue.pa.gov",
-        "notes": "Lowest flat rate (3.07%). Local EIT taxes apply."
-    },
-    "UT": {
-        "name": "Utah", "form": "TC-40", "tax_type": "flat", "rate": 0.0465,
-        "std_ded_single": 0, "std_ded_married": 0,
-        "uses_federal_taxable": True,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "taxpayer_credit_rate": 0.06,
-        "website": "https://tax.utah.gov",
-        "notes": "Taxpayer credit = 6% of federal standard deduction"
-    },
-    
-    # =========================================================
-    # PROGRESSIVE TAX STATES (27 states)
-    # =========================================================
-    "AL": {
-        "name": "Alabama", "form": "40", "tax_type": "progressive",
-        "brackets": [(0, 500, 0.02), (500, 3000, 0.04), (3000, 999999999, 0.05)],
-        "brackets_mfj": [(0, 1000, 0.02), (1000, 6000, 0.04), (6000, 999999999, 0.05)],
-        "std_ded_single": 2500, "std_ded_married": 7500,
-        "personal_exemption": 1500, "personal_exemption_married": 3000,
-        "dependent_exemption": 1000,
-        "allows_federal_deduction": True,
-        "website": "https://revenue.alabama.gov",
-        "notes": "UNIQUE: Allows federal income tax deduction"
-    },
-    "AR": {
-        "name": "Arkansas", "form": "AR1000F", "tax_type": "progressive",
-        "brackets": [(0, 5100, 0.02), (5100, 10200, 0.04), (10200, 999999999, 0.044)],
-        "std_ded_single": 2340, "std_ded_married": 4680,
-        "personal_exemption": 29, "dependent_exemption": 29,
-        "website": "https://www.dfa.arkansas.gov",
-        "notes": "Top rate 4.4%"
-    },
-    "CA": {
-        "name": "California", "form": "540", "tax_type": "progressive",
-        "brackets": [
-            (0, 10412, 0.01), (10412, 24684, 0.02), (24684, 38959, 0.04),
-            (38959, 54081, 0.06), (54081, 68350, 0.08), (68350, 349137, 0.093),
-            (349137, 418961, 0.103), (418961, 698271, 0.113), (698271, 999999999, 0.123)
-        ],
-        "mental_health_threshold": 1000000, "mental_health_rate": 0.01,
-        "std_ded_single": 5706, "std_ded_married": 11412,
-        "personal_exemption": 153, "dependent_exemption": 475,
-        "website": "https://www.ftb.ca.gov",
-        "notes": "Top rate 12.3% (+1% mental health tax over $1M = 13.3%)"
-    },
-    "CT": {
-        "name": "Connecticut", "form": "CT-1040", "tax_type": "progressive",
-        "brackets": [
-            (0, 10000, 0.02), (10000, 50000, 0.045), (50000, 100000, 0.055),
-            (100000, 200000, 0.06), (200000, 250000, 0.065), (250000, 500000, 0.069),
-            (500000, 999999999, 0.0699)
-        ],
-        "brackets_mfj": [
-            (0, 20000, 0.02), (20000, 100000, 0.045), (100000, 200000, 0.055),
-            (200000, 400000, 0.06), (400000, 500000, 0.065), (500000, 1000000, 0.069),
-            (1000000, 999999999, 0.0699)
-        ],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 15000, "personal_exemption_married": 24000,
-        "dependent_exemption": 0,
-        "website": "https://portal.ct.gov/drs",
-        "notes": "7 brackets, top rate 6.99%"
-    },
-    "DC": {
-        "name": "Washington DC", "form": "D-40", "tax_type": "progressive",
-        "brackets": [
-            (0, 10000, 0.04), (10000, 40000, 0.06), (40000, 60000, 0.065),
-            (60000, 250000, 0.085), (250000, 500000, 0.0925), (500000, 1000000, 0.0975),
-            (1000000, 999999999, 0.1075)
-        ],
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 4150, "dependent_exemption": 4150,
-        "website": "https://otr.cfo.dc.gov",
-        "notes": "7 brackets, top rate 10.75%"
-    },
-    "DE": {
-        "name": "Delaware", "form": "200-01", "tax_type": "progressive",
-        "brackets": [
-            (0, 2000, 0.0), (2000, 5000, 0.022), (5000, 10000, 0.039),
-            (10000, 20000, 0.048), (20000, 25000, 0.052), (25000, 60000, 0.0555),
-            (60000, 999999999, 0.066)
-        ],
-        "std_ded_single": 3250, "std_ded_married": 6500,
-        "personal_exemption": 110, "dependent_exemption": 110,
-        "website": "https://revenue.delaware.gov",
-        "notes": "First $2K tax-free. No sales tax state."
-    },
-    "HI": {
-        "name": "Hawaii", "form": "N-11", "tax_type": "progressive",
-        "brackets": [
-            (0, 2400, 0.014), (2400, 4800, 0.032), (4800, 9600, 0.055),
-            (9600, 14400, 0.064), (14400, 19200, 0.068), (19200, 24000, 0.072),
-            (24000, 36000, 0.076), (36000, 48000, 0.079), (48000, 150000, 0.0825),
-            (150000, 175000, 0.09), (175000, 200000, 0.10), (200000, 999999999, 0.11)
-        ],
-        "std_ded_single": 2200, "std_ded_married": 4400,
-        "personal_exemption": 1144, "dependent_exemption": 1144,
-        "website": "https://tax.hawaii.gov",
-        "notes": "12 brackets, top rate 11% - among highest"
-    },
-    "KS": {
-        "name": "Kansas", "form": "K-40", "tax_type": "progressive",
-        "brackets": [(0, 15000, 0.031), (15000, 30000, 0.0525), (30000, 999999999, 0.057)],
-        "brackets_mfj": [(0, 30000, 0.031), (30000, 60000, 0.0525), (60000, 999999999, 0.057)],
-        "std_ded_single": 3500, "std_ded_married": 8000,
-        "personal_exemption": 2250, "dependent_exemption": 2250,
-        "website": "https://www.ksrevenue.gov",
-        "notes": "3 brackets, top rate 5.7%"
-    },
-    "LA": {
-        "name": "Louisiana", "form": "IT-540", "tax_type": "progressive",
-        "brackets": [(0, 12500, 0.0185), (12500, 50000, 0.035), (50000, 999999999, 0.0425)],
-        "brackets_mfj": [(0, 25000, 0.0185), (25000, 100000, 0.035), (100000, 999999999, 0.0425)],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 4500, "personal_exemption_married": 9000,
-        "dependent_exemption": 1000,
-        "allows_federal_deduction": True,
-        "website": "https://revenue.louisiana.gov",
-        "notes": "Allows federal tax deduction (capped)"
-    },
-    "ME": {
-        "name": "Maine", "form": "1040ME", "tax_type": "progressive",
-        "brackets": [(0, 24500, 0.058), (24500, 58050, 0.0675), (58050, 999999999, 0.0715)],
-        "brackets_mfj": [(0, 49050, 0.058), (49050, 116100, 0.0675), (116100, 999999999, 0.0715)],
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 5000, "dependent_exemption": 5000,
-        "website": "https://www.maine.gov/revenue",
-        "notes": "3 brackets, top rate 7.15%"
-    },
-    "MD": {
-        "name": "Maryland", "form": "502", "tax_type": "progressive",
-        "brackets": [
-            (0, 1000, 0.02), (1000, 2000, 0.03), (2000, 3000, 0.04),
-            (3000, 100000, 0.0475), (100000, 125000, 0.05), (125000, 150000, 0.0525),
-            (150000, 250000, 0.055), (250000, 999999999, 0.0575)
-        ],
-        "std_ded_single": 2550, "std_ded_married": 5100,
-        "personal_exemption": 3200, "dependent_exemption": 3200,
-        "has_local_tax": True, "local_tax_rate": 0.032,
-        "website": "https://www.marylandtaxes.gov",
-        "notes": "8 brackets + mandatory county tax (~3.2%)"
-    },
-    "MN": {
-        "name": "Minnesota", "form": "M1", "tax_type": "progressive",
-        "brackets": [(0, 31690, 0.0535), (31690, 104090, 0.068), (104090, 193240, 0.0785), (193240, 999999999, 0.0985)],
-        "brackets_mfj": [(0, 46330, 0.0535), (46330, 184040, 0.068), (184040, 321450, 0.0785), (321450, 999999999, 0.0985)],
-        "std_ded_single": 14575, "std_ded_married": 29150,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://www.revenue.state.mn.us",
-        "notes": "4 brackets, top rate 9.85% (high)"
-    },
-    "MO": {
-        "name": "Missouri", "form": "MO-1040", "tax_type": "progressive",
-        "brackets": [
-            (0, 1207, 0.02), (1207, 2414, 0.025), (2414, 3621, 0.03),
-            (3621, 4828, 0.035), (4828, 6035, 0.04), (6035, 7242, 0.045),
-            (7242, 999999999, 0.048)
-        ],
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://dor.mo.gov",
-        "notes": "7 brackets, top rate 4.8%"
-    },
-    "MT": {
-        "name": "Montana", "form": "2", "tax_type": "progressive",
-        "brackets": [(0, 20500, 0.047), (20500, 999999999, 0.059)],
-        "brackets_mfj": [(0, 41000, 0.047), (41000, 999999999, 0.059)],
-        "std_ded_single": 5540, "std_ded_married": 11080,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://mtrevenue.gov",
-        "notes": "2 brackets, top rate 5.9%"
-    },
-    "ND": {
-        "name": "North Dakota", "form": "ND-1", "tax_type": "progressive",
-        "brackets": [(0, 44725, 0.0195), (44725, 999999999, 0.025)],
-        "brackets_mfj": [(0, 74750, 0.0195), (74750, 999999999, 0.025)],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "uses_federal_taxable": True,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://www.tax.nd.gov",
-        "notes": "2 brackets, very low rates (1.95-2.5%)"
-    },
-    "NE": {
-        "name": "Nebraska", "form": "1040N", "tax_type": "progressive",
-        "brackets": [(0, 3700, 0.0246), (3700, 22170, 0.0351), (22170, 35730, 0.0501), (35730, 999999999, 0.0584)],
-        "brackets_mfj": [(0, 7390, 0.0246), (7390, 44350, 0.0351), (44350, 71460, 0.0501), (71460, 999999999, 0.0584)],
-        "std_ded_single": 7900, "std_ded_married": 15800,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://revenue.nebraska.gov",
-        "notes": "4 brackets, top rate 5.84%"
-    },
-    "NJ": {
-        "name": "New Jersey", "form": "NJ-1040", "tax_type": "progressive",
-        "brackets": [
-            (0, 20000, 0.014), (20000, 35000, 0.0175), (35000, 40000, 0.035),
-            (40000, 75000, 0.05525), (75000, 500000, 0.0637), (500000, 1000000, 0.0897),
-            (1000000, 999999999, 0.1075)
-        ],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 1000, "dependent_exemption": 1500,
-        "website": "https://www.state.nj.us/treasury/taxation",
-        "notes": "7 brackets, top rate 10.75%"
-    },
-    "NM": {
-        "name": "New Mexico", "form": "PIT-1", "tax_type": "progressive",
-        "brackets": [(0, 5500, 0.017), (5500, 11000, 0.032), (11000, 16000, 0.047), (16000, 210000, 0.049), (210000, 999999999, 0.059)],
-        "brackets_mfj": [(0, 8000, 0.017), (8000, 16000, 0.032), (16000, 24000, 0.047), (24000, 315000, 0.049), (315000, 999999999, 0.059)],
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "website": "https://www.tax.newmexico.gov",
-        "notes": "5 brackets, top rate 5.9%"
-    },
-    "NY": {
-        "name": "New York", "form": "IT-201", "tax_type": "progressive",
-        "brackets": [
-            (0, 8500, 0.04), (8500, 11700, 0.045), (11700, 13900, 0.0525),
-            (13900, 80650, 0.055), (80650, 215400, 0.06), (215400, 1077550, 0.0685),
-            (1077550, 5000000, 0.0965), (5000000, 25000000, 0.103), (25000000, 999999999, 0.109)
-        ],
-        "brackets_mfj": [
-            (0, 17150, 0.04), (17150, 23600, 0.045), (23600, 27900, 0.0525),
-            (27900, 161550, 0.055), (161550, 323200, 0.06), (323200, 2155350, 0.0685),
-            (2155350, 5000000, 0.0965), (5000000, 25000000, 0.103), (25000000, 999999999, 0.109)
-        ],
-        "std_ded_single": 8000, "std_ded_married": 16050,
-        "personal_exemption": 0, "dependent_exemption": 1000,
-        "has_local_tax": True, "nyc_rate_range": "3.078% - 3.876%",
-        "website": "https://www.tax.ny.gov",
-        "notes": "9 brackets, top rate 10.9%. NYC adds 3.078%-3.876%."
-    },
-    "OH": {
-        "name": "Ohio", "form": "IT-1040", "tax_type": "progressive",
-        "brackets": [(0, 26050, 0.0), (26050, 100000, 0.028), (100000, 999999999, 0.035)],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 2400, "dependent_exemption": 2500,
-        "website": "https://tax.ohio.gov",
-        "notes": "First $26,050 is tax-free"
-    },
-    "OK": {
-        "name": "Oklahoma", "form": "511", "tax_type": "progressive",
-        "brackets": [(0, 1000, 0.0025), (1000, 2500, 0.0075), (2500, 3750, 0.0175), (3750, 4900, 0.0275), (4900, 7200, 0.0375), (7200, 999999999, 0.0475)],
-        "brackets_mfj": [(0, 2000, 0.0025), (2000, 5000, 0.0075), (5000, 7500, 0.0175), (7500, 9800, 0.0275), (9800, 12200, 0.0375), (12200, 999999999, 0.0475)],
-        "std_ded_single": 6350, "std_ded_married": 12700,
-        "personal_exemption": 1000, "dependent_exemption": 1000,
-        "website": "https://oklahoma.gov/tax",
-        "notes": "6 brackets, top rate 4.75%"
-    },
-    "OR": {
-        "name": "Oregon", "form": "40", "tax_type": "progressive",
-        "brackets": [(0, 4300, 0.0475), (4300, 10750, 0.0675), (10750, 125000, 0.0875), (125000, 999999999, 0.099)],
-        "brackets_mfj": [(0, 8600, 0.0475), (8600, 21500, 0.0675), (21500, 250000, 0.0875), (250000, 999999999, 0.099)],
-        "std_ded_single": 2745, "std_ded_married": 5495,
-        "personal_exemption": 0, "dependent_exemption": 0,
-        "personal_credit": 236,
-        "allows_federal_deduction": True,
-        "website": "https://www.oregon.gov/dor",
-        "notes": "4 brackets, top rate 9.9%. No sales tax!"
-    },
-    "RI": {
-        "name": "Rhode Island", "form": "RI-1040", "tax_type": "progressive",
-        "brackets": [(0, 73450, 0.0375), (73450, 166950, 0.0475), (166950, 999999999, 0.0599)],
-        "std_ded_single": 10550, "std_ded_married": 21150,
-        "personal_exemption": 4850, "dependent_exemption": 4850,
-        "website": "https://tax.ri.gov",
-        "notes": "3 brackets, top rate 5.99%"
-    },
-    "SC": {
-        "name": "South Carolina", "form": "SC1040", "tax_type": "progressive",
-        "brackets": [(0, 3460, 0.0), (3460, 17330, 0.03), (17330, 999999999, 0.064)],
-        "std_ded_single": 14600, "std_ded_married": 29200,
-        "personal_exemption": 4830, "dependent_exemption": 4830,
-        "website": "https://dor.sc.gov",
-        "notes": "First $3,460 tax-free, then 3%, then 6.4%"
-    },
-    "VA": {
-        "name": "Virginia", "form": "760", "tax_type": "progressive",
-        "brackets": [(0, 3000, 0.02), (3000, 5000, 0.03), (5000, 17000, 0.05), (17000, 999999999, 0.0575)],
-        "std_ded_single": 8500, "std_ded_married": 17000,
-        "personal_exemption": 930, "dependent_exemption": 930,
-        "website": "https://www.tax.virginia.gov",
-        "notes": "4 brackets, top rate 5.75%"
-    },
-    "VT": {
-        "name": "Vermont", "form": "IN-111", "tax_type": "progressive",
-        "brackets": [(0, 45400, 0.0335), (45400, 110450, 0.066), (110450, 229550, 0.076), (229550, 999999999, 0.0875)],
-        "brackets_mfj": [(0, 75850, 0.0335), (75850, 183400, 0.066), (183400, 279450, 0.076), (279450, 999999999, 0.0875)],
-        "std_ded_single": 7000, "std_ded_married": 14050,
-        "personal_exemption": 4850, "dependent_exemption": 4850,
-        "website": "https://tax.vermont.gov",
-        "notes": "4 brackets, top rate 8.75%"
-    },
-    "WI": {
-        "name": "Wisconsin", "form": "1", "tax_type": "progressive",
-        "brackets": [(0, 14320, 0.035), (14320, 28640, 0.044), (28640, 315310, 0.053), (315310, 999999999, 0.0765)],
-        "brackets_mfj": [(0, 19090, 0.035), (19090, 38190, 0.044), (38190, 420420, 0.053), (420420, 999999999, 0.0765)],
-        "std_ded_single": 13230, "std_ded_married": 24470,
-        "personal_exemption": 700, "dependent_exemption": 700,
-        "website": "https://www.revenue.wi.gov",
-        "notes": "4 brackets, top rate 7.65%"
-    },
-    "WV": {
-        "name": "West Virginia", "form": "IT-140", "tax_type": "progressive",
-        "brackets": [(0, 10000, 0.0236), (10000, 25000, 0.0315), (25000, 40000, 0.0354), (40000, 60000, 0.0472), (60000, 999999999, 0.0512)],
-        "std_ded_single": 0, "std_ded_married": 0,
-        "personal_exemption": 2000, "dependent_exemption": 2000,
-        "website": "https://tax.wv.gov",
-        "notes": "5 brackets, top rate 5.12%"
-    }
-}
+STATE_TAX_INFO = {code: p for code, p in registry_states().items() if p.has_income_tax}
 
 
 # =============================================================
@@ -551,43 +137,12 @@ def fmt_money(value) -> str:
 # =============================================================
 # TAX CALCULATION FUNCTIONS
 # =============================================================
-def calculate_progressive_tax(taxable_income: float, brackets: list) -> float:
-    """Calculate progressive tax using brackets"""
-    if taxable_income <= 0:
-        return 0
-    tax = 0
-    for low, high, rate in brackets:
-        if taxable_income <= low:
-            break
-        bracket_income = min(taxable_income, high) - low
-        if bracket_income > 0:
-            tax += bracket_income * rate
-    return round(tax, 2)
-
-
 def calculate_state_tax(state_code: str, taxable_income: float, filing_status: str = "single") -> float:
-    """Calculate tax for any supported state"""
+    """Calculate tax for any supported state (brackets or flat rate, plus MA / CA surtax)"""
     info = STATE_TAX_INFO.get(state_code.upper())
     if not info:
         return 0
-    
-    if info["tax_type"] == "flat":
-        tax = taxable_income * info["rate"] if taxable_income > 0 else 0
-        # MA surtax
-        if info.get("surtax_rate") and taxable_income > info.get("surtax_threshold", 0):
-            tax += (taxable_income - info["surtax_threshold"]) * info["surtax_rate"]
-        return round(tax, 2)
-    else:
-        # Progressive
-        if filing_status in ["married_filing_jointly", "married"] and info.get("brackets_mfj"):
-            brackets = info["brackets_mfj"]
-        else:
-            brackets = info["brackets"]
-        tax = calculate_progressive_tax(taxable_income, brackets)
-        # CA mental health tax
-        if info.get("mental_health_threshold") and taxable_income > info["mental_health_threshold"]:
-            tax += (taxable_income - info["mental_health_threshold"]) * info.get("mental_health_rate", 0.01)
-        return round(tax, 2)
+    return round(info.tax_on(taxable_income, filing_status), 2)
 
 
 def get_exemptions(state_code: str, filing_status: str, num_dependents: int) -> float:
@@ -595,14 +150,7 @@ def get_exemptions(state_code: str, filing_status: str, num_dependents: int) ->
     info = STATE_TAX_INFO.get(state_code.upper())
     if not info:
         return 0
-    
-    if filing_status in ["married_filing_jointly", "married"]:
-        personal_ex = info.get("personal_exemption_married", info.get("personal_exemption", 0) * 2)
-    else:
-        personal_ex = info.get("personal_exemption", 0)
-    
-    dependent_ex = info.get("dependent_exemption", 0) * num_dependents
-    return personal_ex + dependent_ex
+    return info.exemptions_for(filing_status, num_dependents)
 
 
 def get_standard_deduction(state_code: str, filing_status: str) -> float:
@@ -610,9 +158,7 @@ def get_standard_deduction(state_code: str, filing_status: str) -> float:
     info = STATE_TAX_INFO.get(state_code.upper())
     if not info:
         return 0
-    if filing_status in ["married_filing_jointly", "married"]:
-        return info.get("std_ded_married", info.get("std_ded_single", 0))
-    return info.get("std_ded_single", 0)
+    return info.standard_deduction_for(filing_status)
 
 
 # =============================================================
@@ -868,13 +414,13 @@ async def generate_state_form_handler(state_code: str, data: StateFormRequest):
     state_agi = state.get("state_agi") or federal_agi
     
     # Federal tax deduction
-    if info.get("allows_federal_deduction") and federal_tax > 0:
+    if info.allows_federal_deduction and federal_tax > 0:
         fed_ded = min(federal_tax, state_agi * 0.5)
         state_agi = max(0, state_agi - fed_ded)
     
     std_ded = state.get("standard_deduction") or get_standard_deduction(state_code, filing_status)
     exemptions = state.get("exemptions") or get_exemptions(state_code, filing_status, num_deps)
-    exempt_amount = info.get("exempt_amount", 0)
+    exempt_amount = info.exempt_amount
     
     taxable_income = state.get("taxable_income") or max(0, state_agi - std_ded - exemptions - exempt_amount)
     state_tax = state.get("state_tax") or calculate_state_tax(state_code, taxable_income, filing_status)
@@ -895,10 +441,10 @@ async def generate_state_form_handler(state_code: str, data: StateFormRequest):
     
     return {
         "state": state_code,
-        "state_name": info["name"],
-        "form": info["form"],
-        "tax_type": info["tax_type"],
-        "tax_rate": f"{info['rate']*100:.2f}%" if info["tax_type"] == "flat" else "Progressive",
+        "state_name": info.name,
+        "form": info.form,
+        "tax_type": info.tax_type,
+        "tax_rate": f"{info.flat_rate*100:.2f}%" if info.tax_type == "flat" else "Progressive",
         "filing_status": filing_status,
         
         "federal_agi": round(federal_agi, 2),
@@ -919,8 +465,8 @@ async def generate_state_form_handler(state_code: str, data: StateFormRequest):
         "amount_owed": round(amount_owed, 2),
         
         "effective_rate": round((state_tax / federal_agi * 100) if federal_agi > 0 else 0, 2),
-        "website": info.get("website", ""),
-        "notes": info.get("notes", "")
+        "website": info.website,
+        "notes": info.notes
     }
 
 
@@ -932,9 +478,9 @@ async def get_supported_states():
     """Get list of all 50 supported states"""
     tax_states = []
     for code, info in STATE_TAX_INFO.items():
-        state_info = {"code": code, "name": info["name"], "form": info["form"], "tax_type": info["tax_type"]}
-        if info["tax_type"] == "flat":
-            state_info["rate"] = f"{info['rate']*100:.2f}%"
+        state_info = {"code": code, "name": info.name, "form": info.form, "tax_type": info.tax_type}
+        if info.tax_type == "flat":
+            state_info["rate"] = f"{info.flat_rate*100:.2f}%"
         tax_states.append(state_info)
     
     no_tax_list = [{"code": k, "name": v["name"]} for k, v in NO_TAX_STATES.items()]
@@ -976,22 +522,22 @@ async def quick_calculate(
         raise HTTPException(404, f"State {state_code} not supported")
     
     state_agi = federal_agi
-    if info.get("allows_federal_deduction") and federal_tax > 0:
+    if info.allows_federal_deduction and federal_tax > 0:
         state_agi = max(0, state_agi - min(federal_tax, state_agi * 0.5))
     
     std_ded = get_standard_deduction(state_code, filing_status)
     exemptions = get_exemptions(state_code, filing_status, num_dependents)
-    exempt_amount = info.get("exempt_amount", 0)
+    exempt_amount = info.exempt_amount
     
     taxable_income = max(0, state_agi - std_ded - exemptions - exempt_amount)
     state_tax = calculate_state_tax(state_code, taxable_income, filing_status)
     
     return {
         "state": state_code,
-        "state_name": info["name"],
-        "form": info["form"],
-        "tax_type": info["tax_type"],
-        "tax_rate": f"{info['rate']*100:.2f}%" if info["tax_type"] == "flat" else "Progressive",
+        "state_name": info.name,
+        "form": info.form,
+        "tax_type": info.tax_type,
+        "tax_rate": f"{info.flat_rate*100:.2f}%" if info.tax_type == "flat" else "Progressive",
         "has_income_tax": True,
         "federal_agi": federal_agi,
         "state_agi": state_agi,
@@ -1013,22 +559,35 @@ async def compare_states(
     num_dependents: int = 0
 ):
     """Compare tax across all 50 states"""
+    if COMPARE_ENGINE_AVAILABLE:
+        results = state_compare.compare_states(federal_agi, filing_status, num_dependents)
+        return {
+            "federal_agi": federal_agi,
+            "filing_status": filing_status,
+            "num_dependents": num_dependents,
+            "total_states": len(results),
+            "lowest_tax": results[0],
+            "highest_tax": results[-1],
+            "comparison": results
+        }
+    
+    # Fallback: simplified tables in this module
     results = []
     
     for code, info in STATE_TAX_INFO.items():
         state_agi = federal_agi
         std_ded = get_standard_deduction(code, filing_status)
         exemptions = get_exemptions(code, filing_status, num_dependents)
-        exempt_amount = info.get("exempt_amount", 0)
+        exempt_amount = info.exempt_amount
         
         taxable_income = max(0, state_agi - std_ded - exemptions - exempt_amount)
         state_tax = calculate_state_tax(code, taxable_income, filing_status)
         
         results.append({
             "state": code,
-            "state_name": info["name"],
+            "state_name": info.name,
             "has_income_tax": True,
-            "tax_type": info["tax_type"],
+            "tax_type": info.tax_type,
             "state_tax": round(state_tax, 2),
             "effective_rate": round((state_tax / federal_agi * 100) if federal_agi > 0 else 0, 2)
         })
@@ -1036,7 +595,7 @@ async def compare_states(
     for code, info in NO_TAX_STATES.items():
         results.append({
             "state": code,
-            "state_name": info["name"],
+            "state_name": info.name,
             "has_income_tax": False,
             "tax_type": "none",
             "state_tax": 0,
@@ -1053,4 +612,28 @@ async def compare_states(
         "lowest_tax": results[0],
         "highest_tax": results[-1],
         "comparison": results
-    }
\ No newline at end of file
+    }
+
+
+@additional_states_router.get("/states/compare/grid")
+def compare_states_grid(
+    start: float = 0,
+    stop: float = 200000,
+    step: float = 1000,
+    filing_status: str = "single",
+    num_dependents: int = 0
+):
+    """
+    Compare tax across all 50 states for every AGI in range(start, stop, step).
+    Sync on purpose: the first request per (filing status, dependents)
+    compiles the state curves (~0.4s CPU) and runs in the threadpool.
+    """
+    if not COMPARE_ENGINE_AVAILABLE:
+        raise HTTPException(503, "State comparison engine not available")
+    if step <= 0 or stop <= start:
+        raise HTTPException(400, "Need start < stop and step > 0")
+    points = int((stop - start) // step) + 1
+    if points > state_compare.MAX_GRID_POINTS:
+        raise HTTPException(400, f"At most {state_compare.MAX_GRID_POINTS} AGI points")
+    agis = [start + i * step for i in range(points) if start + i * step <= stop]
+    return state_compare.compare_grid(agis, filing_status, num_dependents)
@@ -15,11 +15,36 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-from pypdf import PdfReader, PdfWriter
+import importlib.util
+import logging
 import tempfile
 import os
 
 form_1040_router = APIRouter(prefix="/generate", tags=["Form 1040"])
+logger = logging.getLogger(__name__)
+
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
+try:
+    from startup import lazy
+except ImportError:
+    from importlib import import_module as lazy
+
+# pypdf is imported on the first render; fail the import here (cheaply)
+# so main.py still reports the router as unavailable when it is missing
+if importlib.util.find_spec("pypdf") is None:
+    raise ImportError("pypdf is not installed")
+pypdf = lazy("pypdf")
+fitz = lazy("fitz")
+
+try:
+    from metrics import track_pdf_render
+except ImportError:
+    def track_pdf_render(form):
+        return lambda fn: fn
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
 
@@ -259,6 +284,7 @@ def fmt_money(val) -> str:
 # MAIN ENDPOINT - FILL PDF FORM FIELDS
 # ============================================================
 @form_1040_router.post("/1040")
+@track_pdf_render("1040")
 async def generate_1040(data: Request1040):
     """Generate Form 1040 by filling actual PDF form fields"""
     try:
@@ -269,14 +295,13 @@ async def generate_1040(data: Request1040):
         if not os.path.exists(template_path):
             raise HTTPException(404, "Form 1040 template not found")
         
-        print(f"\n{'='*60}")
-        print("FORM 1040 GENERATION - v16.0 (FILLABLE FIELDS)")
-        print(f"{'='*60}")
-        print(f"Template: {template_path}")
+        logger.debug("FORM 1040 GENERATION - v16.0 (FILLABLE FIELDS)")
+        logger.debug("Template: %s", template_path)
         
         # Read PDF and create writer with proper cloning for XFA forms
-        reader = PdfReader(template_path)
-        writer = PdfWriter(clone_from=reader)  # This preserves XFA/AcroForm properly
+        with span("pdf_read"):
+            reader = pypdf.PdfReader(template_path)
+            writer = pypdf.PdfWriter(clone_from=reader)  # This preserves XFA/AcroForm properly
         
         # Prepare field values
         personal = data.personal or PersonalInfo()
@@ -290,15 +315,15 @@ async def generate_1040(data: Request1040):
         # === PERSONAL INFO ===
         if personal.first_name:
             field_values[FIELD_MAP["first_name"]] = personal.first_name.upper()
-            print(f"  ✅ First Name: {personal.first_name.upper()}")
+            logger.debug("✅ First Name: %s", personal.first_name.upper())
         
         if personal.last_name:
             field_values[FIELD_MAP["last_name"]] = personal.last_name.upper()
-            print(f"  ✅ Last Name: {personal.last_name.upper()}")
+            logger.debug("✅ Last Name: %s", personal.last_name.upper())
         
         if personal.ssn:
             field_values[FIELD_MAP["ssn"]] = mask_ssn(personal.ssn, show_ssn)
-            print(f"  ✅ SSN: {mask_ssn(personal.ssn, show_ssn)}")
+            logger.debug("✅ SSN: %s", mask_ssn(personal.ssn, show_ssn))
         
         # === SPOUSE (for MFJ) ===
         if personal.filing_status == "married_filing_jointly":
@@ -312,7 +337,7 @@ async def generate_1040(data: Request1040):
         # === ADDRESS ===
         if personal.address:
             field_values[FIELD_MAP["address"]] = personal.address.upper()
-            print(f"  ✅ Address: {personal.address.upper()}")
+            logger.debug("✅ Address: %s", personal.address.upper())
         
         if personal.apt:
             field_values[FIELD_MAP["apt"]] = personal.apt
@@ -325,7 +350,7 @@ async def generate_1040(data: Request1040):
         
         if personal.zip:
             field_values[FIELD_MAP["zip"]] = personal.zip
-            print(f"  ✅ City/State/ZIP: {personal.city}, {personal.state} {personal.zip}")
+            logger.debug("✅ City/State/ZIP: %s, %s %s", personal.city, personal.state, personal.zip)
         
         # === FILING STATUS (checkboxes use /1 for checked) ===
         status_checkbox = {
@@ -338,14 +363,14 @@ async def generate_1040(data: Request1040):
         checkbox_key = status_checkbox.get(personal.filing_status, "single_check")
         if checkbox_key in FIELD_MAP:
             field_values[FIELD_MAP[checkbox_key]] = "/1"
-            print(f"  ✅ Filing Status: {personal.filing_status}")
+            logger.debug("✅ Filing Status: %s", personal.filing_status)
         
         # === DIGITAL ASSETS (default No) ===
         field_values[FIELD_MAP["digital_no"]] = "/1"
         
         # === DEPENDENTS ===
         if dependents and len(dependents) > 0:
-            print(f"\n  === DEPENDENTS ({len(dependents)} total) ===")
+            logger.debug("=== DEPENDENTS (%s total) ===", len(dependents))
             
             # Helper to calculate age from date of birth
             def calculate_age(dob_str):
@@ -403,16 +428,16 @@ async def generate_1040(data: Request1040):
                 # Child Tax Credit: child under 17 at end of tax year
                 if age is not None and age < 17 and relationship in ['child', 'stepchild', 'foster_child', 'grandchild', 'sibling']:
                     field_values[FIELD_MAP[f"{prefix}_child_tax_credit"]] = "/1"
-                    print(f"  ✅ Dependent {dep_num}: {first_name} {last_name} (Age {age}) - Child Tax Credit")
+                    logger.debug("✅ Dependent %s: %s %s (Age %s) - Child Tax Credit", dep_num, first_name, last_name, age)
                 else:
                     # Credit for other dependents (age 17+ or other relationship)
                     field_values[FIELD_MAP[f"{prefix}_other_credit"]] = "/1"
-                    print(f"  ✅ Dependent {dep_num}: {first_name} {last_name} (Age {age or 'N/A'}) - Other Dependent Credit")
+                    logger.debug("✅ Dependent %s: %s %s (Age %s) - Other Dependent Credit", dep_num, first_name, last_name, age or 'N/A')
             
             # If more than 4 dependents, check the "more than 4" box
             if len(dependents) > 4:
                 field_values[FIELD_MAP["more_than_4_dependents"]] = "/1"
-                print(f"  ⚠️ More than 4 dependents - additional schedule required")
+                logger.debug("⚠️ More than 4 dependents - additional schedule required")
         
         # === INCOME DATA ===
         income = form1040.get("income", {})
@@ -427,34 +452,34 @@ async def generate_1040(data: Request1040):
         if wages:
             field_values[FIELD_MAP["line_1a"]] = fmt_money(wages)
             field_values[FIELD_MAP["line_1z"]] = fmt_money(wages)
-            print(f"  ✅ Line 1a/1z (Wages): {fmt_money(wages)}")
+            logger.debug("✅ Line 1a/1z (Wages): %s", fmt_money(wages))
         
         # Line 9 - Total income
         if income.get("line_9_total_income"):
             field_values[FIELD_MAP["line_9"]] = fmt_money(income["line_9_total_income"])
-            print(f"  ✅ Line 9 (Total Income): {fmt_money(income['line_9_total_income'])}")
+            logger.debug("✅ Line 9 (Total Income): %s", fmt_money(income['line_9_total_income']))
         
         # Line 11 - AGI
         if adj.get("line_11_agi"):
             field_values[FIELD_MAP["line_11"]] = fmt_money(adj["line_11_agi"])
-            print(f"  ✅ Line 11 (AGI): {fmt_money(adj['line_11_agi'])}")
+            logger.debug("✅ Line 11 (AGI): %s", fmt_money(adj['line_11_agi']))
         
         # === PAGE 2 ===
         # Line 11b - AGI repeated at top of page 2
         if adj.get("line_11_agi"):
             field_values[FIELD_MAP["line_11b"]] = fmt_money(adj["line_11_agi"])
-            print(f"  ✅ Line 11b (AGI on Page 2): {fmt_money(adj['line_11_agi'])}")
+            logger.debug("✅ Line 11b (AGI on Page 2): %s", fmt_money(adj['line_11_agi']))
         
         # Line 12e - Standard deduction
         if ded.get("line_12_deduction"):
             field_values[FIELD_MAP["line_12e"]] = fmt_money(ded["line_12_deduction"])
-            print(f"  ✅ Line 12e (Deduction): {fmt_money(ded['line_12_deduction'])}")
+            logger.debug("✅ Line 12e (Deduction): %s", fmt_money(ded['line_12_deduction']))
         
         # Line 14 - Total deductions (usually same as 12e for standard deduction)
         total_deductions = ded.get("line_14_total_deductions") or ded.get("line_12_deduction", 0)
         if total_deductions:
             field_values[FIELD_MAP["line_14"]] = fmt_money(total_deductions)
-            print(f"  ✅ Line 14 (Total Deductions): {fmt_money(total_deductions)}")
+            logger.debug("✅ Line 14 (Total Deductions): %s", fmt_money(total_deductions))
         
         # Line 15 - Taxable income
         # Check tax_and_credits first (where frontend sends it), then deductions, then calculate
@@ -463,12 +488,12 @@ async def generate_1040(data: Request1040):
             # Calculate: AGI - Total Deductions
             taxable = max(0, adj["line_11_agi"] - total_deductions)
         field_values[FIELD_MAP["line_15"]] = fmt_money(taxable)
-        print(f"  ✅ Line 15 (Taxable): {fmt_money(taxable)}")
+        logger.debug("✅ Line 15 (Taxable): %s", fmt_money(taxable))
         
         # Line 16 - Tax
         line_16 = tax.get("line_16_tax", 0)
         field_values[FIELD_MAP["line_16"]] = fmt_money(line_16)
-        print(f"  ✅ Line 16 (Tax): {fmt_money(line_16)}")
+        logger.debug("✅ Line 16 (Tax): %s", fmt_money(line_16))
         
         # Line 17 - Schedule 2, line 3 (usually 0)
         line_17 = tax.get("line_17_schedule_2", 0)
@@ -477,7 +502,7 @@ async def generate_1040(data: Request1040):
         # Line 18 - Add lines 16 and 17
         line_18 = tax.get("line_18_total") or (line_16 + line_17)
         field_values[FIELD_MAP["line_18"]] = fmt_money(line_18)
-        print(f"  ✅ Line 18 (Total): {fmt_money(line_18)}")
+        logger.debug("✅ Line 18 (Total): %s", fmt_money(line_18))
         
         # Line 19 - Child tax credit
         line_19 = tax.get("line_19_child_credit", 0)
@@ -494,7 +519,7 @@ async def generate_1040(data: Request1040):
         # Line 22 - Subtract line 21 from line 18
         line_22 = tax.get("line_22_tax_after_credits") or max(0, line_18 - line_21)
         field_values[FIELD_MAP["line_22"]] = fmt_money(line_22)
-        print(f"  ✅ Line 22 (Tax After Credits): {fmt_money(line_22)}")
+        logger.debug("✅ Line 22 (Tax After Credits): %s", fmt_money(line_22))
         
         # Line 23 - Other taxes from Schedule 2 (usually 0)
         line_23 = tax.get("line_23_other_taxes", 0)
@@ -503,13 +528,13 @@ async def generate_1040(data: Request1040):
         # Line 24 - Total tax
         line_24 = tax.get("line_24_total_tax") or (line_22 + line_23)
         field_values[FIELD_MAP["line_24"]] = fmt_money(line_24)
-        print(f"  ✅ Line 24 (Total Tax): {fmt_money(line_24)}")
+        logger.debug("✅ Line 24 (Total Tax): %s", fmt_money(line_24))
         
         # === PAYMENTS SECTION ===
         # Line 25a - W-2 withholding
         line_25a = pay.get("line_25a_w2_withholding") or pay.get("line_25d_total_withholding", 0)
         field_values[FIELD_MAP["line_25a"]] = fmt_money(line_25a)
-        print(f"  ✅ Line 25a (W-2 Withholding): {fmt_money(line_25a)}")
+        logger.debug("✅ Line 25a (W-2 Withholding): %s", fmt_money(line_25a))
         
         # Line 25b - 1099 withholding
         line_25b = pay.get("line_25b_1099_withholding", 0)
@@ -522,7 +547,7 @@ async def generate_1040(data: Request1040):
         # Line 25d - Total withholding
         line_25d = pay.get("line_25d_total_withholding") or (line_25a + line_25b + line_25c)
         field_values[FIELD_MAP["line_25d"]] = fmt_money(line_25d)
-        print(f"  ✅ Line 25d (Total Withholding): {fmt_money(line_25d)}")
+        logger.debug("✅ Line 25d (Total Withholding): %s", fmt_money(line_25d))
         
         # Line 26 - Estimated payments
         line_26 = pay.get("line_26_estimated_payments", 0)
@@ -551,7 +576,7 @@ async def generate_1040(data: Request1040):
         # Line 33 - Total payments
         line_33 = pay.get("line_33_total_payments") or (line_25d + line_26 + line_32)
         field_values[FIELD_MAP["line_33"]] = fmt_money(line_33)
-        print(f"  ✅ Line 33 (Total Payments): {fmt_money(line_33)}")
+        logger.debug("✅ Line 33 (Total Payments): %s", fmt_money(line_33))
         
         # === REFUND OR AMOUNT OWED ===
         refund = ref_owe.get("line_35_refund", 0)
@@ -571,18 +596,19 @@ async def generate_1040(data: Request1040):
         # Line 35a - Refund amount
         field_values[FIELD_MAP["line_35a"]] = fmt_money(line_34)
         if line_34 > 0:
-            print(f"  ✅ Line 34/35a (REFUND): ${line_34:,.0f}")
+            logger.debug("✅ Line 34/35a (REFUND): $%.0f", line_34)
         
         # Line 37 - Amount owed
         field_values[FIELD_MAP["line_37"]] = fmt_money(owed)
         if owed > 0:
-            print(f"  ✅ Line 37 (OWED): ${owed:,.0f}")
+            logger.debug("✅ Line 37 (OWED): $%.0f", owed)
         
         # === FILL ALL FIELDS ===
-        print(f"\n  Filling {len(field_values)} form fields...")
-        writer.update_page_form_field_values(writer.pages[0], field_values, auto_regenerate=False)
-        if len(reader.pages) > 1:
-            writer.update_page_form_field_values(writer.pages[1], field_values, auto_regenerate=False)
+        logger.debug("Filling %s form fields...", len(field_values))
+        with span("pdf_fill"):
+            writer.update_page_form_field_values(writer.pages[0], field_values, auto_regenerate=False)
+            if len(reader.pages) > 1:
+                writer.update_page_form_field_values(writer.pages[1], field_values, auto_regenerate=False)
         
         # Set NeedAppearances flag
         writer.set_need_appearances_writer(True)
@@ -590,21 +616,22 @@ async def generate_1040(data: Request1040):
         # Save intermediate PDF
         suffix = "_1040_OFFICIAL" if show_ssn else "_1040_PREVIEW"
         temp_pdf = tempfile.mktemp(suffix=f"_temp.pdf")
-        with open(temp_pdf, "wb") as f:
+        with span("pdf_write"), open(temp_pdf, "wb") as f:
             writer.write(f)
         
         # === POST-PROCESS WITH PYMUPDF TO REGENERATE APPEARANCES ===
         # This is required for XFA forms to display values properly
-        import fitz
-        doc = fitz.open(temp_pdf)
-        for page in doc:
-            for widget in page.widgets():
-                if widget.field_value:
-                    widget.update()  # Regenerate appearance stream
+        with span("pdf_appearance"):
+            doc = fitz.open(temp_pdf)
+            for page in doc:
+                for widget in page.widgets():
+                    if widget.field_value:
+                        widget.update()  # Regenerate appearance stream
         
         out = tempfile.mktemp(suffix=f"{suffix}.pdf")
-        doc.save(out, garbage=4, deflate=True)
-        doc.close()
+        with span("pdf_save"):
+            doc.save(out, garbage=4, deflate=True)
+            doc.close()
         
         # Clean up temp file
         try:
@@ -612,7 +639,7 @@ async def generate_1040(data: Request1040):
         except:
             pass
         
-        print(f"\n  ✅ Generated: {out}")
+        logger.debug("✅ Generated: %s", out)
         
         return FileResponse(
             out,
@@ -623,8 +650,7 @@ async def generate_1040(data: Request1040):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Form 1040 generation failed")
         raise HTTPException(500, str(e))
 
 
@@ -16,12 +16,39 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
-from pypdf import PdfReader, PdfWriter
-from pypdf.generic import NameObject, BooleanObject, IndirectObject
+import importlib.util
+import logging
 import tempfile
 import os
 
 form_ca540_router = APIRouter(prefix="/generate", tags=["CA Form 540"])
+logger = logging.getLogger(__name__)
+
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
+try:
+    from startup import lazy
+except ImportError:
+    from importlib import import_module as lazy
+
+# pypdf is imported on the first render; fail the import here (cheaply)
+# so main.py still reports the router as unavailable when it is missing
+if importlib.util.find_spec("pypdf") is None:
+    raise ImportError("pypdf is not installed")
+pypdf = lazy("pypdf")
+pdf_generic = lazy("pypdf.generic")
+
+try:
+    from metrics import track_pdf_render
+except ImportError:
+    def track_pdf_render(form):
+        return lambda fn: fn
+
+from tax_engine.calculator.tax_params import DEFAULT_TAX_YEAR, get_params, tax_years
+
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 STATE_TEMPLATES_DIR = os.path.join(TEMPLATES_DIR, "state")
 
@@ -195,21 +222,9 @@ FIELD_IDS = {
     "line115": "5007",
 }
 
-# Tax year specific values
-TAX_YEAR_VALUES = {
-    2024: {
-        "personal_exemption": 149,
-        "dependent_exemption": 461,
-        "std_ded_single": 5540,
-        "std_ded_mfj": 11080,
-    },
-    2025: {
-        "personal_exemption": 153,
-        "dependent_exemption": 475,
-        "std_ded_single": 5706,
-        "std_ded_mfj": 11412,
-    }
-}
+# Tax year specific values (exemption credits, standard deduction) come
+# from the tax parameter store: tax_engine/calculator/tax_years/CA_<year>.json
+CA_TAX_YEARS = tax_years("CA")
 
 
 # =============================================================
@@ -240,11 +255,11 @@ def set_need_appearances(writer):
         if "/AcroForm" not in writer._root_object:
             return
         acro_form = writer._root_object["/AcroForm"]
-        if isinstance(acro_form, IndirectObject):
+        if isinstance(acro_form, pdf_generic.IndirectObject):
             acro_form = acro_form.get_object()
-        acro_form[NameObject("/NeedAppearances")] = BooleanObject(True)
+        acro_form[pdf_generic.NameObject("/NeedAppearances")] = pdf_generic.BooleanObject(True)
     except Exception as e:
-        print(f"  ⚠️ NeedAppearances: {e}")
+        logger.warning("⚠️ NeedAppearances: %s", e)
 
 
 def detect_field_prefix(pdf_fields: dict) -> str:
@@ -267,14 +282,15 @@ def get_field_name(key: str, prefix: str) -> str:
 # POST /generate/ca540
 # =============================================================
 @form_ca540_router.post("/ca540")
+@track_pdf_render("ca540")
 async def generate_form_ca540(data: RequestCA540):
     try:
-        print(f"\n🌴 === GENERATING CA FORM 540 v4.1 (FIXED) ===")
+        logger.debug("🌴 === GENERATING CA FORM 540 v4.1 (FIXED) ===")
         
         tax_year = data.tax_year or 2025
         show_full_ssn = data.is_official_submission or (not data.mask_ssn)
-        print(f"  📅 Tax Year: {tax_year}")
-        print(f"  🔒 SSN Mode: {'FULL' if show_full_ssn else 'MASKED'}")
+        logger.debug("📅 Tax Year: %s", tax_year)
+        logger.debug("🔒 SSN Mode: %s", 'FULL' if show_full_ssn else 'MASKED')
         
         # Find template - try year-specific first
         template_candidates = [
@@ -295,22 +311,23 @@ async def generate_form_ca540(data: RequestCA540):
         if not template_path:
             raise HTTPException(500, f"CA 540 template not found. Tried: {template_candidates[:3]}")
         
-        print(f"  📄 Template: {template_path}")
+        logger.debug("📄 Template: %s", template_path)
         
         # Load PDF
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        writer.clone_reader_document_root(reader)
+        with span("pdf_read"):
+            reader = pypdf.PdfReader(template_path)
+            writer = pypdf.PdfWriter()
+            writer.clone_reader_document_root(reader)
         
         pdf_fields = reader.get_fields() or {}
-        print(f"  📋 PDF has {len(pdf_fields)} form fields")
+        logger.debug("📋 PDF has %s form fields", len(pdf_fields))
         
         # Detect field naming convention
         field_prefix = detect_field_prefix(pdf_fields)
-        print(f"  🔧 Field prefix: '{field_prefix}' ({'2025' if 'form' in field_prefix else '2024'} format)")
+        logger.debug("🔧 Field prefix: '%s' (%s format)", field_prefix, '2025' if 'form' in field_prefix else '2024')
         
         # Get tax year values
-        year_vals = TAX_YEAR_VALUES.get(tax_year, TAX_YEAR_VALUES[2025])
+        year_vals = get_params("CA", tax_year if tax_year in CA_TAX_YEARS else DEFAULT_TAX_YEAR)
         
         # Extract request data
         personal = data.personal.model_dump() if data.personal else {}
@@ -318,12 +335,12 @@ async def generate_form_ca540(data: RequestCA540):
         state = data.state.model_dump() if data.state else {}
         dependents = [d.model_dump() for d in data.dependents] if data.dependents else []
         
-        print(f"\n  📥 DATA RECEIVED:")
-        print(f"     Name: {personal.get('first_name')} {personal.get('last_name')}")
-        print(f"     Federal AGI: ${federal.get('agi', 0):,.0f}")
-        print(f"     CA AGI: ${state.get('ca_agi', 0):,.0f}")
-        print(f"     Withholding: ${state.get('withholding', 0):,.0f}")
-        print(f"     Estimated Payments: ${state.get('estimated_payments', 0):,.0f}")
+        logger.debug("📥 DATA RECEIVED:")
+        logger.debug("Name: %s %s", personal.get('first_name'), personal.get('last_name'))
+        logger.debug("Federal AGI: $%.0f", federal.get('agi', 0))
+        logger.debug("CA AGI: $%.0f", state.get('ca_agi', 0))
+        logger.debug("Withholding: $%.0f", state.get('withholding', 0))
+        logger.debug("Estimated Payments: $%.0f", state.get('estimated_payments', 0))
         
         # Build values dict
         values = {}
@@ -360,7 +377,7 @@ async def generate_form_ca540(data: RequestCA540):
         set_field("page3Name", full_name)
         set_field("page3Ssn", ssn_display)
         
-        print(f"  👤 {full_name}, SSN: {ssn_display}")
+        logger.debug("👤 %s, SSN: %s", full_name, ssn_display)
         
         # ═══════════════════════════════════════════════════════
         # FILING STATUS
@@ -405,7 +422,7 @@ async def generate_form_ca540(data: RequestCA540):
             set_field("line10Amount", str(dep_exemption))
         set_field("line11", str(total_exemption))
         
-        print(f"  📝 Exemptions: {ex_count}×${year_vals['personal_exemption']} + {num_deps}×${year_vals['dependent_exemption']} = ${total_exemption}")
+        logger.debug("📝 Exemptions: %s×$%s + %s×$%s = $%s", ex_count, year_vals['personal_exemption'], num_deps, year_vals['dependent_exemption'], total_exemption)
         
         # ═══════════════════════════════════════════════════════
         # INCOME
@@ -415,7 +432,8 @@ async def generate_form_ca540(data: RequestCA540):
         ca_agi = state.get("ca_agi", 0) or federal_agi
         
         # Standard deduction
-        default_std = year_vals["std_ded_mfj"] if filing_status == "married_filing_jointly" else year_vals["std_ded_single"]
+        std_by_status = year_vals["standard_deduction"]
+        default_std = std_by_status.get(filing_status, std_by_status["single"])
         ca_std_ded = state.get("standard_deduction", 0) or default_std
         
         # Taxable income
@@ -430,7 +448,7 @@ async def generate_form_ca540(data: RequestCA540):
         set_field("line18", fmt_money(ca_std_ded))
         set_field("line19", fmt_money(ca_taxable))
         
-        print(f"  💵 CA AGI: ${ca_agi:,.0f}, Deduction: ${ca_std_ded:,.0f}, Taxable: ${ca_taxable:,.0f}")
+        logger.debug("💵 CA AGI: $%.0f, Deduction: $%.0f, Taxable: $%.0f", ca_agi, ca_std_ded, ca_taxable)
         
         # ═══════════════════════════════════════════════════════
         # TAX CALCULATION (FIXED in v4.1)
@@ -478,9 +496,9 @@ async def generate_form_ca540(data: RequestCA540):
         line64_total_tax = line48_value + line61_amt + line62_bhs + line63_other
         set_field("line64", fmt_money(line64_total_tax))
         
-        print(f"  📊 Tax: ${base_tax:,.0f}, After Exemptions: ${tax_after_ex:,.0f}")
-        print(f"  📊 Line 48: ${line48_value:,.0f}, BHS Tax (Line 62): ${line62_bhs:,.0f}")
-        print(f"  📊 Total Tax (Line 64): ${line64_total_tax:,.0f}")
+        logger.debug("📊 Tax: $%.0f, After Exemptions: $%.0f", base_tax, tax_after_ex)
+        logger.debug("📊 Line 48: $%.0f, BHS Tax (Line 62): $%.0f", line48_value, line62_bhs)
+        logger.debug("📊 Total Tax (Line 64): $%.0f", line64_total_tax)
         
         # ═══════════════════════════════════════════════════════
         # PAYMENTS (Lines 71-78) - FIXED in v4.1
@@ -511,8 +529,8 @@ async def generate_form_ca540(data: RequestCA540):
         set_field("line93", fmt_money(total_payments))
         set_field("line95", fmt_money(total_payments))
         
-        print(f"  💳 Withholding: ${withholding:,.0f}, Est. Payments: ${estimated_payments:,.0f}")
-        print(f"  💳 Total Payments (Line 78): ${total_payments:,.0f}")
+        logger.debug("💳 Withholding: $%.0f, Est. Payments: $%.0f", withholding, estimated_payments)
+        logger.debug("💳 Total Payments (Line 78): $%.0f", total_payments)
         
         # ═══════════════════════════════════════════════════════
         # REFUND / OWED - FIXED in v4.1
@@ -531,34 +549,35 @@ async def generate_form_ca540(data: RequestCA540):
             set_field("line97", fmt_money(refund))
             set_field("line99", fmt_money(refund))
             set_field("line115", fmt_money(refund))
-            print(f"  💰 REFUND: ${refund:,.0f}")
+            logger.debug("💰 REFUND: $%.0f", refund)
         elif amount_owed > 0:
             set_field("line100", fmt_money(amount_owed))
             set_field("line111", fmt_money(amount_owed))
-            print(f"  💸 OWED: ${amount_owed:,.0f}")
+            logger.debug("💸 OWED: $%.0f", amount_owed)
         else:
-            print(f"  ⚖️ BALANCED: No refund or amount owed")
+            logger.debug("⚖️ BALANCED: No refund or amount owed")
         
         # ═══════════════════════════════════════════════════════
         # FILL PDF
         # ═══════════════════════════════════════════════════════
-        print(f"\n  📝 Filling {len(values)} fields...")
+        logger.debug("📝 Filling %s fields...", len(values))
         
-        for page in writer.pages:
-            try:
-                writer.update_page_form_field_values(page, values, auto_regenerate=False)
-            except Exception as e:
-                print(f"  ⚠️ Fill error: {e}")
+        with span("pdf_fill"):
+            for page in writer.pages:
+                try:
+                    writer.update_page_form_field_values(page, values, auto_regenerate=False)
+                except Exception as e:
+                    logger.warning("⚠️ Fill error: %s", e)
         
         set_need_appearances(writer)
         
         # Save
         suffix = "_CA540_OFFICIAL" if show_full_ssn else "_CA540_PREVIEW"
         output_path = tempfile.mktemp(suffix=f"{suffix}.pdf")
-        with open(output_path, "wb") as f:
+        with span("pdf_write"), open(output_path, "wb") as f:
             writer.write(f)
         
-        print(f"  ✅ Saved: {output_path}")
+        logger.debug("✅ Saved: %s", output_path)
         
         return FileResponse(
             path=output_path,
@@ -569,8 +588,7 @@ async def generate_form_ca540(data: RequestCA540):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("CA Form 540 generation failed")
         raise HTTPException(500, str(e))
 
 
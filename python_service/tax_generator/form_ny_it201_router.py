@@ -18,13 +18,37 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
-from pypdf import PdfReader, PdfWriter
-from pypdf.generic import NameObject, BooleanObject
+import importlib.util
+import logging
 import tempfile
 import os
 
 # Router
 form_ny_it201_router = APIRouter(prefix="/generate", tags=["NY Form IT-201"])
+logger = logging.getLogger(__name__)
+
+try:
+    from request_timing import span
+except ImportError:
+    from contextlib import nullcontext as span
+
+try:
+    from startup import lazy
+except ImportError:
+    from importlib import import_module as lazy
+
+# pypdf is imported on the first render; fail the import here (cheaply)
+# so main.py still reports the router as unavailable when it is missing
+if importlib.util.find_spec("pypdf") is None:
+    raise ImportError("pypdf is not installed")
+pypdf = lazy("pypdf")
+pdf_generic = lazy("pypdf.generic")
+
+try:
+    from metrics import track_pdf_render
+except ImportError:
+    def track_pdf_render(form):
+        return lambda fn: fn
 
 # Template path
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
@@ -373,23 +397,24 @@ def fmt_money(value) -> str:
     return str(int(round(value)))
 
 
-def set_need_appearances(writer: PdfWriter):
+def set_need_appearances(writer: "pypdf.PdfWriter"):
     """Set NeedAppearances flag for PDF form"""
     try:
         if "/AcroForm" in writer._root_object:
-            writer._root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
+            writer._root_object["/AcroForm"][pdf_generic.NameObject("/NeedAppearances")] = pdf_generic.BooleanObject(True)
         else:
-            writer._root_object[NameObject("/AcroForm")] = {
-                NameObject("/NeedAppearances"): BooleanObject(True)
+            writer._root_object[pdf_generic.NameObject("/AcroForm")] = {
+                pdf_generic.NameObject("/NeedAppearances"): pdf_generic.BooleanObject(True)
             }
     except Exception as e:
-        print(f"  ⚠️ Could not set NeedAppearances: {e}")
+        logger.warning("⚠️ Could not set NeedAppearances: %s", e)
 
 
 # =============================================================
 # MAIN ENDPOINT
 # =============================================================
 @form_ny_it201_router.post("/ny-it201")
+@track_pdf_render("ny-it201")
 async def generate_ny_it201(data: RequestNY_IT201):
     """Generate NY Form IT-201 PDF"""
     try:
@@ -405,13 +430,11 @@ async def generate_ny_it201(data: RequestNY_IT201):
             else:
                 raise HTTPException(404, f"NY IT-201 template not found in {TEMPLATES_DIR}")
         
-        print(f"\n{'='*60}")
-        print(f"NY IT-201 GENERATOR v2.0")
-        print(f"{'='*60}")
+        logger.debug("NY IT-201 GENERATOR v2.0")
         
         show_full_ssn = data.is_official_submission or not data.mask_ssn
         mode = "OFFICIAL (Full SSN)" if show_full_ssn else "PREVIEW (Masked SSN)"
-        print(f"  Mode: {mode}")
+        logger.debug("Mode: %s", mode)
         
         # Get data sections
         personal = data.personal.model_dump() if data.personal else {}
@@ -420,14 +443,15 @@ async def generate_ny_it201(data: RequestNY_IT201):
         dependents = [d.model_dump() for d in data.dependents] if data.dependents else []
         
         # Open template
-        reader = PdfReader(template_path)
-        writer = PdfWriter()
-        for page in reader.pages:
-            writer.add_page(page)
+        with span("pdf_read"):
+            reader = pypdf.PdfReader(template_path)
+            writer = pypdf.PdfWriter()
+            for page in reader.pages:
+                writer.add_page(page)
         
         fields = reader.get_fields() or {}
         field_names = set(fields.keys())
-        print(f"  Template has {len(field_names)} fillable fields")
+        logger.debug("Template has %s fillable fields", len(field_names))
         
         # Track filled fields
         filled_values = {}
@@ -445,14 +469,14 @@ async def generate_ny_it201(data: RequestNY_IT201):
         first_name = personal.get("first_name", "").upper()
         last_name = personal.get("last_name", "").upper()
         
-        print(f"\n  👤 Taxpayer: {first_name} {last_name}")
+        logger.debug("👤 Taxpayer: %s %s", first_name, last_name)
         set_field("firstName", first_name)
         set_field("middleInitial", personal.get("middle_initial", "").upper())
         set_field("lastName", last_name)
         set_field("dob", personal.get("dob", ""))
         
         # Mailing address
-        print(f"\n  🏠 Address:")
+        logger.debug("🏠 Address:")
         set_field("mailAddress", personal.get("mail_address", "").upper())
         set_field("mailApt", personal.get("mail_apt", ""))
         set_field("mailCity", personal.get("mail_city", "").upper())
@@ -474,7 +498,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
         # ═══════════════════════════════════════════════════════
         filing_status = federal.get("filing_status", "single")
         status_value = FILING_STATUS_VALUES.get(filing_status, "/1 Single")
-        print(f"\n  📋 Filing Status: {filing_status}")
+        logger.debug("📋 Filing Status: %s", filing_status)
         filled_values["Filing_status"] = status_value
         
         # ═══════════════════════════════════════════════════════
@@ -486,7 +510,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
             spouse_ssn_raw = personal.get("spouse_ssn", "")
             spouse_ssn_display = mask_ssn(spouse_ssn_raw, show_full=show_full_ssn)
             
-            print(f"\n  👫 Spouse: {spouse_first} {spouse_last}, SSN: {spouse_ssn_display}")
+            logger.debug("👫 Spouse: %s %s, SSN: %s", spouse_first, spouse_last, spouse_ssn_display)
             set_field("spouseFirstName", spouse_first)
             set_field("spouseMiddleInitial", personal.get("spouse_middle_initial", "").upper())
             set_field("spouseLastName", spouse_last)
@@ -501,7 +525,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
         
         if is_nyc:
             nyc_months = personal.get("nyc_months", 12)
-            print(f"\n  🗽 NYC Resident: {nyc_months} months")
+            logger.debug("🗽 NYC Resident: %s months", nyc_months)
             filled_values["E1"] = "/yes"
             set_field("nycMonths", str(nyc_months))
             if filing_status == "married_filing_jointly":
@@ -510,7 +534,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
             filled_values["E1"] = "/no"
         
         if is_yonkers:
-            print(f"\n  🏙️ Yonkers Resident")
+            logger.debug("🏙️ Yonkers Resident")
             filled_values["yonkers_freeze_credit"] = "/yes"
             set_field("yonkersMonths", str(personal.get("yonkers_months", 12)))
         
@@ -519,7 +543,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
         # ═══════════════════════════════════════════════════════
         num_deps = len(dependents)
         if num_deps > 0:
-            print(f"\n  👶 Dependents: {num_deps}")
+            logger.debug("👶 Dependents: %s", num_deps)
         
         for i, dep in enumerate(dependents[:7]):
             idx = i + 1
@@ -534,7 +558,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
             set_field(f"dep{idx}Relationship", dep.get("relationship", "").upper())
             set_field(f"dep{idx}Ssn", dep_ssn_display)
             set_field(f"dep{idx}Dob", dep.get("dob", ""))
-            print(f"    Dep{idx}: {dep_first} {dep_last}, SSN: {dep_ssn_display}")
+            logger.debug("Dep%s: %s %s, SSN: %s", idx, dep_first, dep_last, dep_ssn_display)
         
         # ═══════════════════════════════════════════════════════
         # PAGE 2: INCOME (Lines 1-19)
@@ -549,9 +573,9 @@ async def generate_ny_it201(data: RequestNY_IT201):
         other = federal.get("other_income", 0)
         federal_agi = federal.get("agi", 0)
         
-        print(f"\n  💵 Income:")
-        print(f"     Wages: ${wages:,.0f}")
-        print(f"     Federal AGI: ${federal_agi:,.0f}")
+        logger.debug("💵 Income:")
+        logger.debug("Wages: $%.0f", wages)
+        logger.debug("Federal AGI: $%.0f", federal_agi)
         
         set_field("line1", fmt_money(wages))
         set_field("line2", fmt_money(interest))
@@ -580,10 +604,10 @@ async def generate_ny_it201(data: RequestNY_IT201):
             deduction = max(std_ded, itemized) if itemized > 0 else std_ded
             taxable_income = max(0, ny_agi - deduction)
         
-        print(f"\n  📝 NY Adjustments:")
-        print(f"     NY AGI: ${ny_agi:,.0f}")
-        print(f"     Standard Deduction: ${std_ded:,.0f}")
-        print(f"     Taxable Income: ${taxable_income:,.0f}")
+        logger.debug("📝 NY Adjustments:")
+        logger.debug("NY AGI: $%.0f", ny_agi)
+        logger.debug("Standard Deduction: $%.0f", std_ded)
+        logger.debug("Taxable Income: $%.0f", taxable_income)
         
         set_field("line24", fmt_money(federal_agi + ny_additions))
         set_field("line27", fmt_money(ss))  # SS subtraction
@@ -611,12 +635,12 @@ async def generate_ny_it201(data: RequestNY_IT201):
         household_credit = state.get("household_credit", 0)
         total_tax = state.get("total_tax", state_tax + nyc_tax + yonkers_tax)
         
-        print(f"\n  📊 Tax Calculation:")
-        print(f"     NY State Tax: ${state_tax:,.2f}")
+        logger.debug("📊 Tax Calculation:")
+        logger.debug("NY State Tax: $%.2f", state_tax)
         if nyc_tax > 0:
-            print(f"     NYC Tax: ${nyc_tax:,.2f}")
+            logger.debug("NYC Tax: $%.2f", nyc_tax)
         if yonkers_tax > 0:
-            print(f"     Yonkers Tax: ${yonkers_tax:,.2f}")
+            logger.debug("Yonkers Tax: $%.2f", yonkers_tax)
         
         set_field("line38", fmt_money(taxable_income))
         set_field("line39", fmt_money(state_tax))
@@ -653,13 +677,13 @@ async def generate_ny_it201(data: RequestNY_IT201):
         
         total_payments = withholding + nyc_withholding + yonkers_withholding + estimated + child_credit + eic
         
-        print(f"\n  💳 Payments:")
-        print(f"     Withholding: ${withholding:,.0f}")
+        logger.debug("💳 Payments:")
+        logger.debug("Withholding: $%.0f", withholding)
         if child_credit > 0:
-            print(f"     Child Credit: ${child_credit:,.0f}")
+            logger.debug("Child Credit: $%.0f", child_credit)
         if eic > 0:
-            print(f"     EIC: ${eic:,.0f}")
-        print(f"     Total: ${total_payments:,.0f}")
+            logger.debug("EIC: $%.0f", eic)
+        logger.debug("Total: $%.0f", total_payments)
         
         set_field("line62", fmt_money(total_tax))
         set_field("line63", fmt_money(child_credit))
@@ -684,38 +708,39 @@ async def generate_ny_it201(data: RequestNY_IT201):
                 amount_owed = tax_after_credits - total_payments
         
         if refund > 0:
-            print(f"\n  💰 REFUND: ${refund:,.2f}")
+            logger.debug("💰 REFUND: $%.2f", refund)
             set_field("line77", fmt_money(refund))
             set_field("line78", fmt_money(refund))
             set_field("line78b", fmt_money(refund))
         elif amount_owed > 0:
-            print(f"\n  💸 AMOUNT OWED: ${amount_owed:,.2f}")
+            logger.debug("💸 AMOUNT OWED: $%.2f", amount_owed)
             set_field("line80", fmt_money(amount_owed))
         
         # ═══════════════════════════════════════════════════════
         # FILL ALL FIELDS
         # ═══════════════════════════════════════════════════════
-        print(f"\n  Filling {len(filled_values)} form fields...")
-        
-        for page_num in range(len(writer.pages)):
-            try:
-                writer.update_page_form_field_values(
-                    writer.pages[page_num], 
-                    filled_values, 
-                    auto_regenerate=False
-                )
-            except Exception as e:
-                print(f"  ⚠️ Error on page {page_num+1}: {e}")
+        logger.debug("Filling %s form fields...", len(filled_values))
+        
+        with span("pdf_fill"):
+            for page_num in range(len(writer.pages)):
+                try:
+                    writer.update_page_form_field_values(
+                        writer.pages[page_num], 
+                        filled_values, 
+                        auto_regenerate=False
+                    )
+                except Exception as e:
+                    logger.warning("⚠️ Error on page %s: %s", page_num + 1, e)
         
         set_need_appearances(writer)
         
         # Save
         suffix = "_IT201_OFFICIAL" if show_full_ssn else "_IT201_PREVIEW"
         output_path = tempfile.mktemp(suffix=f"{suffix}.pdf")
-        with open(output_path, "wb") as f:
+        with span("pdf_write"), open(output_path, "wb") as f:
             writer.write(f)
         
-        print(f"\n  ✅ NY IT-201 saved: {output_path}")
+        logger.debug("✅ NY IT-201 saved: %s", output_path)
         
         return FileResponse(
             path=output_path,
@@ -726,8 +751,7 @@ async def generate_ny_it201(data: RequestNY_IT201):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("NY IT-201 generation failed")
         raise HTTPException(500, str(e))
 
 
@@ -0,0 +1,8 @@
+# ============================================================
+# TEST SETUP - run from python_service/: python -m pytest -q
+# ============================================================
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
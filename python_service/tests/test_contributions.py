@@ -0,0 +1,202 @@
+# ============================================================
+# CONTRIBUTION OPTIMIZER - limits, curves, greedy allocation
+# ============================================================
+
+import pytest
+
+from tax_engine.calculator.federal.calculator import calculate
+from tax_engine.calculator.tax_params import federal_params
+from tax_engine.contributions import (
+    ContributionCurve,
+    allocate,
+    contribution_limit,
+    optimize_contributions,
+)
+from tax_engine.state_compare import state_tax_amount
+from tax_engine.state_router import calculate_state_tax
+
+P = federal_params(2025)
+
+
+# ============================================================
+# LIMITS
+# ============================================================
+
+@pytest.mark.parametrize("age, catch_up", [(49, 0), (50, P.ira_catch_up), (70, P.ira_catch_up)])
+def test_ira_catch_up_from_50(age, catch_up):
+    assert contribution_limit("ira", {"taxpayer_age": age}) == P.ira_limit + catch_up
+    assert contribution_limit("spouse_ira", {"taxpayer_age": 30, "spouse_age": age}) == P.ira_limit + catch_up
+
+
+def test_age_comes_from_dob_when_not_given():
+    assert contribution_limit("ira", {"taxpayer_dob": "1960-03-01"}) == P.ira_limit + P.ira_catch_up
+    assert contribution_limit("ira", {"taxpayer_dob": "1990-03-01"}) == P.ira_limit
+
+
+@pytest.mark.parametrize("status, age, limit", [
+    ("single", 40, P.hsa_limit_self),
+    ("married_filing_jointly", 40, P.hsa_limit_family),
+    ("married_filing_separately", 40, P.hsa_limit_self),
+    ("single", 54, P.hsa_limit_self),
+    ("single", 55, P.hsa_limit_self + P.hsa_catch_up),
+    ("married_filing_jointly", 60, P.hsa_limit_family + P.hsa_catch_up),
+])
+def test_hsa_family_coverage_and_catch_up_from_55(status, age, limit):
+    assert contribution_limit("hsa", {"filing_status": status, "taxpayer_age": age}) == limit
+
+
+def test_401k_is_capped_by_wages():
+    assert contribution_limit("401k", {"taxpayer_wages": 150000, "taxpayer_age": 40}) == P.k401_limit
+    assert contribution_limit("401k", {"taxpayer_wages": 150000, "taxpayer_age": 50}) == P.k401_limit + P.k401_catch_up
+    assert contribution_limit("401k", {"taxpayer_wages": 9000, "taxpayer_age": 50}) == 9000
+    assert contribution_limit("spouse_401k", {"taxpayer_wages": 90000, "spouse_wages": 0}) == 0
+
+
+# ============================================================
+# CURVES (synthetic: tax falls at known rates)
+# ============================================================
+
+def _curve(account, rates, limit=None):
+    """Curve whose total tax falls at rate r over each (width, r), split 3:1 federal / state."""
+    knots, values, x, tax = [0.0], [(1000.0, 300.0, 50000.0)], 0.0, 1300.0
+    for width, rate in rates:
+        x += width
+        tax -= width * rate
+        knots.append(x)
+        values.append((tax * 0.75 + 25.0, tax * 0.25 - 25.0, 50000.0 - x))
+    return ContributionCurve(account, account, x if limit is None else limit, knots, values)
+
+
+def test_envelope_is_the_concave_hull_of_tax_saved():
+    # saved: 0, 100 (phase-in), 400, 800, 800; collinear knots merge
+    c = _curve("ira", [(1000, 0.10), (1000, 0.30), (2000, 0.20), (1000, 0.0)])
+    env = [(lo, hi, round(rate, 9)) for lo, hi, rate in c.envelope()]
+    assert env == [(0, 4000, 0.2), (4000, 5000, 0.0)]
+    base = c.total(0)
+    for x in c.knots:
+        assert 0.2 * min(x, 4000) >= base - c.total(x) - 1e-9
+
+
+def test_best_amount_is_the_smallest_lowest_tax():
+    c = _curve("hsa", [(1500, 0.22), (2000, 0.12), (800, 0.0)])
+    assert c.best_amount() == 3500
+    assert c.best_amount(tolerance=0.12 * 2000 + 1) == 1500
+    assert c.total(3500) == pytest.approx(1300 - 1500 * 0.22 - 2000 * 0.12)
+    segs = c.segments()
+    assert [s["savings_rate"] for s in segs] == [22.0, 12.0, 0.0]
+    assert [s["deductible_rate"] for s in segs] == [100.0, 100.0, 100.0]
+
+
+# ============================================================
+# GREEDY ALLOCATION
+# ============================================================
+
+def _accounts():
+    return [_curve("ira", [(2000, 0.30), (3000, 0.10)]), _curve("hsa", [(4000, 0.20)])]
+
+
+def test_no_budget_or_target_takes_each_best_amount():
+    assert allocate(_accounts()) == {"ira": 5000.0, "hsa": 4000.0}
+
+
+@pytest.mark.parametrize("budget, want", [
+    (0, {"ira": 0.0, "hsa": 0.0}),
+    (1500, {"ira": 1500.0, "hsa": 0.0}),
+    (3000, {"ira": 2000.0, "hsa": 1000.0}),
+    (3000.9, {"ira": 2000.0, "hsa": 1000.0}),     # whole dollars, rounded down
+    (7000, {"ira": 3000.0, "hsa": 4000.0}),
+    (50000, {"ira": 5000.0, "hsa": 4000.0}),
+])
+def test_budget_goes_to_the_highest_rate_first(budget, want):
+    assert allocate(_accounts(), budget=budget) == want
+
+
+@pytest.mark.parametrize("needed, want", [
+    (300, {"ira": 1000.0, "hsa": 0.0}),
+    (700, {"ira": 2000.0, "hsa": 500.0}),
+    (700.1, {"ira": 2000.0, "hsa": 501.0}),       # rounded up to reach the target
+    (10**6, {"ira": 5000.0, "hsa": 4000.0}),
+])
+def test_target_stops_once_savings_are_covered(needed, want):
+    assert allocate(_accounts(), savings_needed=needed) == want
+
+
+def test_rounding_up_never_passes_the_limit():
+    curves = [_curve("hsa", [(4000, 0.20)], limit=3999.5)]
+    assert allocate(curves, savings_needed=800) == {"hsa": 3999.5}
+
+
+# ============================================================
+# OPTIMIZER VS THE CALCULATOR
+# ============================================================
+
+PROFILES = [
+    ({"filing_status": "single", "wages": 60000, "taxpayer_age": 40, "federal_withheld": 7000}, "KS"),
+    ({"filing_status": "single", "wages": 48000, "taxpayer_age": 40, "federal_withheld": 4000}, "CA"),
+    ({"filing_status": "head_of_household", "wages": 38000, "qualifying_children_under_17": 2,
+      "taxpayer_age": 35}, "NY"),
+    ({"filing_status": "married_filing_jointly", "wages": 120000, "taxpayer_age": 56,
+      "federal_withheld": 12000}, "KS"),
+]
+
+
+def _direct(profile, state, ira, hsa):
+    """(total tax, net refund) from calculate + calculate_state_tax."""
+    data = dict(profile, ira_contribution=ira, hsa_contribution=hsa)
+    fed = calculate(data)
+    tax = fed["tax_after_credits"] - fed["refundable_credits"]
+    refund = fed["refund"] - fed["amount_owed"]
+    st = calculate_state_tax(state, dict(data, agi=fed["agi"], federal_agi=fed["agi"]))
+    return tax + state_tax_amount(st), refund + st.get("refund", 0) - st.get("amount_owed", 0)
+
+
+def _grid(limits, step=500):
+    ira = [float(a) for a in range(0, int(limits["ira"]) + 1, step)]
+    hsa = sorted({float(a) for a in range(0, int(limits["hsa"]) + 1, step)} | {limits["hsa"]})
+    return [(i, h) for i in ira for h in hsa]
+
+
+@pytest.mark.parametrize("profile, state", PROFILES)
+def test_budget_allocation_beats_a_brute_force_grid(profile, state):
+    budget = 5000
+    out = optimize_contributions(dict(profile), ("ira", "hsa"), state, budget=budget)
+    amounts = out["allocation"]
+    assert sum(amounts.values()) <= budget
+    total, refund = _direct(profile, state, amounts["ira"], amounts["hsa"])
+    assert out["result"]["total_tax"] == pytest.approx(total, abs=0.01)
+    assert out["result"]["net_refund"] == pytest.approx(refund, abs=0.01)
+
+    limits = {a["account"]: a["limit"] for a in out["accounts"]}
+    best = min(_direct(profile, state, i, h)[0] for i, h in _grid(limits) if i + h <= budget)
+    assert total <= best + 0.01
+
+
+@pytest.mark.parametrize("profile, state", PROFILES)
+def test_target_refund_is_met_with_no_more_than_a_grid_needs(profile, state):
+    baseline = _direct(profile, state, 0, 0)[1]
+    target = baseline + 600
+    out = optimize_contributions(dict(profile), ("ira", "hsa"), state, target_refund=target)
+    amounts = out["allocation"]
+    assert out["target_met"] and out["result"]["net_refund"] >= target - 0.005
+    assert _direct(profile, state, amounts["ira"], amounts["hsa"])[1] >= target - 0.005
+
+    limits = {a["account"]: a["limit"] for a in out["accounts"]}
+    reaching = [i + h for i, h in _grid(limits, 250) if _direct(profile, state, i, h)[1] >= target - 0.005]
+    assert sum(amounts.values()) <= min(reaching)
+
+
+def test_unreachable_target_is_reported():
+    profile, state = PROFILES[0]
+    out = optimize_contributions(dict(profile), ("ira", "hsa"), state, target_refund=10**6)
+    assert out["target_met"] is False
+    assert out["allocation"] == {a["account"]: a["best_amount"] for a in out["accounts"]}
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"accounts": ("roth",)}, "Unknown account"),
+    ({"accounts": ()}, "Unknown account"),
+    ({"budget": -1}, "budget"),
+])
+def test_bad_arguments_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        optimize_contributions({"filing_status": "single", "wages": 50000}, **kwargs)
@@ -0,0 +1,193 @@
+# ============================================================
+# FILING STATUS OPTIMIZER - eligibility, MFS split, ranking
+# ============================================================
+
+import pytest
+
+from tax_engine.calculator.federal.calculator import calculate
+from tax_engine.calculator.inputs import normalize_input
+from tax_engine.filing_status import (
+    HOH,
+    MFJ,
+    MFS,
+    QSS,
+    SINGLE,
+    build_variants,
+    eligible_statuses,
+    optimize_filing_status,
+    split_returns,
+)
+from tax_engine.state_compare import state_tax_amount
+from tax_engine.state_router import calculate_state_tax
+
+COUPLE = {
+    "filing_status": MFJ, "tax_year": 2025,
+    "taxpayer_wages": 95000, "spouse_wages": 38000,
+    "taxpayer_federal_withheld": 11000, "spouse_federal_withheld": 3500,
+    "taxpayer_state_withheld": 4000, "spouse_state_withheld": 1500,
+    "ira_contribution": 3000, "spouse_ira_contribution": 1000,
+    "taxpayer_age": 45, "spouse_age": 43,
+    "interest_income": 2400, "long_term_gains": 9000, "estimated_payments": 1000,
+    "qualifying_children_under_17": 2, "num_dependents": 2,
+}
+
+
+# ============================================================
+# ELIGIBILITY
+# ============================================================
+
+def test_married_without_dependents_files_jointly_or_separately():
+    eligible, ineligible = eligible_statuses({"filing_status": MFJ})
+    assert eligible == [MFJ, MFS]
+    assert ineligible[HOH] == "No qualifying dependent"
+    assert set(ineligible) == {SINGLE, HOH, QSS}
+
+
+def test_married_hoh_needs_a_dependent_and_living_apart():
+    together = {"filing_status": MFS, "qualifying_children_under_17": 1}
+    eligible, ineligible = eligible_statuses(together)
+    assert HOH not in eligible and "live apart" in ineligible[HOH]
+    for flag in (True, "yes", "Y", 1):
+        eligible, _ = eligible_statuses(dict(together, lived_apart_from_spouse=flag))
+        assert eligible == [MFJ, MFS, HOH]
+    assert HOH not in eligible_statuses(dict(together, lived_apart="no"))[0]
+
+
+def test_unmarried_hoh_needs_a_dependent():
+    assert eligible_statuses({"filing_status": SINGLE})[0] == [SINGLE]
+    assert eligible_statuses({"filing_status": SINGLE, "other_dependents": 1})[0] == [SINGLE, HOH]
+
+
+@pytest.mark.parametrize("death_year, children, eligible, reason", [
+    (2024, 1, True, None),
+    (2023, 1, True, None),
+    (2022, 1, False, "two prior years"),
+    (2024, 0, False, "No dependent child"),
+    (None, 1, False, "two prior years"),
+])
+def test_qss_rules(death_year, children, eligible, reason):
+    data = {"filing_status": SINGLE, "spouse_death_year": death_year,
+            "qualifying_children_under_17": children, "other_dependents": 1}
+    statuses, ineligible = eligible_statuses(data, 2025)
+    assert (QSS in statuses) == eligible
+    if reason:
+        assert reason in ineligible[QSS]
+
+
+def test_spouse_died_this_year_still_files_married():
+    statuses, _ = eligible_statuses({"filing_status": SINGLE, "spouse_death_year": "2025"}, 2025)
+    assert statuses == [MFJ, MFS]
+
+
+# ============================================================
+# SPLITTING A JOINT PROFILE
+# ============================================================
+
+def test_split_moves_per_spouse_fields_and_halves_joint_ones():
+    mine, theirs = split_returns(normalize_input(COUPLE))
+    assert mine["taxpayer_wages"] == 95000 and mine["spouse_wages"] == 0
+    assert theirs["taxpayer_wages"] == 38000 and theirs["spouse_wages"] == 0
+    assert theirs["taxpayer_federal_withheld"] == 3500 and theirs["ira_contribution"] == 1000
+    assert theirs["taxpayer_age"] == 43 and theirs["spouse_age"] == 0
+    for field, total in (("interest_income", 2400), ("long_term_gains", 9000), ("estimated_payments", 1000)):
+        assert mine[field] == theirs[field] == total / 2
+    # raw keys state modules read
+    assert (mine["wages"], mine["state_withholding"]) == (95000, 4000)
+    assert (theirs["wages"], theirs["state_withholding"]) == (38000, 1500)
+
+
+def test_split_allocation_overrides_joint_shares():
+    mine, theirs = split_returns(normalize_input(COUPLE), {"interest_income": 1.0, "long_term_gains": 0.25})
+    assert (mine["interest_income"], theirs["interest_income"]) == (0, 2400)
+    assert (mine["long_term_gains"], theirs["long_term_gains"]) == (6750, 2250)
+
+
+def test_dependents_stay_with_one_spouse():
+    data = normalize_input(dict(COUPLE, dependents=[{"age": 4}, {"age": 9}]))
+    mine, theirs = split_returns(data)
+    assert mine["qualifying_children_under_17"] == 2 and mine["dependents"]
+    assert theirs["qualifying_children_under_17"] == 0 and theirs["num_dependents"] == 0
+    assert "dependents" not in theirs
+    mine, theirs = split_returns(data, dependents_with="spouse")
+    assert theirs["qualifying_children_under_17"] == 2 and theirs["dependents"]
+    assert mine["qualifying_children_under_17"] == 0 and "dependents" not in mine
+
+
+# ============================================================
+# VARIANTS AND RANKING
+# ============================================================
+
+def test_hoh_reuses_the_other_spouses_mfs_return():
+    data = normalize_input(COUPLE)
+    variants = dict(build_variants(data, [MFJ, MFS, HOH]))
+    assert [key for _, key, _ in variants[MFJ]] == [MFJ]
+    assert [key for _, key, _ in variants[MFS]] == [f"taxpayer:{MFS}", f"spouse:{MFS}"]
+    assert [key for _, key, _ in variants[HOH]] == [f"taxpayer:{HOH}", f"spouse:{MFS}"]
+    assert [ret["filing_status"] for _, _, ret in variants[HOH]] == [HOH, MFS]
+    # dependents with the spouse: the spouse files HOH
+    variants = dict(build_variants(data, [MFJ, MFS, HOH], dependents_with="spouse"))
+    assert [key for _, key, _ in variants[HOH]] == [f"spouse:{HOH}", f"taxpayer:{MFS}"]
+
+
+def test_shared_return_is_calculated_once():
+    out = optimize_filing_status(dict(COUPLE, lived_apart=True), "KS", include_details=True)
+    options = {o["filing_status"]: o for o in out["options"]}
+    assert set(options) == {MFJ, MFS, HOH}
+    assert options[HOH]["returns"][1] is options[MFS]["returns"][1]
+
+
+@pytest.mark.parametrize("state", ["CA", "KS", None])
+def test_options_are_ranked_with_deltas(state):
+    out = optimize_filing_status(dict(COUPLE, lived_apart=True), state)
+    options = out["options"]
+    totals = [o["total_tax"] for o in options]
+    assert totals == sorted(totals)
+    assert [o["rank"] for o in options] == [1, 2, 3]
+    assert out["recommended"] == options[0]["filing_status"] and out["current_status"] == MFJ
+    current = next(o for o in options if o["filing_status"] == MFJ)
+    for o in options:
+        assert o["delta_vs_best"] == round(o["total_tax"] - totals[0], 2)
+        assert o["delta_vs_current"] == round(o["total_tax"] - current["total_tax"], 2)
+        assert o["total_tax"] == round(sum(r["total_tax"] for r in o["returns"]), 2)
+        assert "federal" not in o["returns"][0]
+    assert out["savings_vs_current"] == round(current["total_tax"] - totals[0], 2)
+    assert [i["filing_status"] for i in out["ineligible"]] == [SINGLE, QSS]
+
+
+def _direct_total(ret, state):
+    federal = calculate(ret)
+    total = federal["tax_after_credits"] - federal["refundable_credits"]
+    if state:
+        total += state_tax_amount(calculate_state_tax(state, dict(ret, agi=federal["agi"], federal_agi=federal["agi"])))
+    return total
+
+
+@pytest.mark.parametrize("state", ["CA", "KS", "NY"])
+def test_mfj_and_mfs_match_direct_calculations(state):
+    out = optimize_filing_status(dict(COUPLE), state)
+    options = {o["filing_status"]: o for o in out["options"]}
+
+    joint = dict(COUPLE, wages=133000, state_withholding=5500)
+    assert options[MFJ]["total_tax"] == pytest.approx(_direct_total(joint, state), abs=0.01)
+
+    taxpayer = {"filing_status": MFS, "taxpayer_wages": 95000, "wages": 95000, "taxpayer_federal_withheld": 11000,
+                "state_withholding": 4000, "ira_contribution": 3000, "taxpayer_age": 45,
+                "interest_income": 1200, "long_term_gains": 4500, "estimated_payments": 500,
+                "qualifying_children_under_17": 2, "num_dependents": 2}
+    spouse = {"filing_status": MFS, "taxpayer_wages": 38000, "wages": 38000, "taxpayer_federal_withheld": 3500,
+              "state_withholding": 1500, "ira_contribution": 1000, "taxpayer_age": 43,
+              "interest_income": 1200, "long_term_gains": 4500, "estimated_payments": 500}
+    expected = _direct_total(taxpayer, state) + _direct_total(spouse, state)
+    assert options[MFS]["total_tax"] == pytest.approx(expected, abs=0.02)
+    assert options[MFJ]["total_tax"] != options[MFS]["total_tax"]
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"dependents_with": "kids"}, "dependents_with"),
+    ({"allocation": {"taxpayer_wages": 0.5}}, "Cannot allocate"),
+    ({"allocation": {"filing_status": 0.5}}, "Cannot allocate"),
+    ({"allocation": {"interest_income": 1.5}}, "between 0 and 1"),
+])
+def test_bad_options_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        optimize_filing_status(dict(COUPLE), "KS", **kwargs)
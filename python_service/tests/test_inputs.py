@@ -0,0 +1,87 @@
+# ============================================================
+# INPUT NORMALIZATION - aliases, conversion, absent values
+# ============================================================
+
+import pytest
+
+from tax_engine.calculator.federal.calculator import calculate
+from tax_engine.calculator.inputs import ALIAS_INDEX, CanonicalInput, normalize_input
+
+
+def test_first_alias_in_priority_order_wins():
+    out = normalize_input({"wages": 1000, "taxpayer_wages": 2000})
+    assert out["taxpayer_wages"] == 2000.0
+    out = normalize_input({"tip_income": 9, "tips": 5})
+    assert out["tips_received"] == 5.0
+    # a lower-priority alias fills in when the higher one is absent
+    assert normalize_input({"wages": 1000})["taxpayer_wages"] == 1000.0
+
+
+def test_camel_case_keys_resolve():
+    out = normalize_input({"taxpayerWages": "1000", "hasRetirementPlan": "yes", "qualifyingChildren": 2})
+    assert out["taxpayer_wages"] == 1000.0
+    assert out["has_retirement_plan"] is True
+    assert out["qualifying_children_under_17"] == 2
+
+
+@pytest.mark.parametrize("raw, key, want", [
+    ("$1,234", "taxpayer_wages", 1234.0),
+    ("1,234.50", "interest_income", 1234.5),
+    ("2.0", "qualifying_children_under_17", 2),
+    (3, "taxpayer_age", 3),
+    ("Y", "bought_new_car", True),
+    ("no", "bought_new_car", False),
+    (0, "has_retirement_plan", False),
+])
+def test_values_are_typed(raw, key, want):
+    value = normalize_input({key: raw})[key]
+    assert value == want and type(value) is type(want)
+
+
+@pytest.mark.parametrize("raw", [None, "", "  ", "lots", [1, 2]])
+def test_unusable_values_are_removed(raw):
+    out = normalize_input({"wages": raw, "spouse_wages": raw, "taxable_ira": raw, "filing_status": "single"})
+    assert out == {"filing_status": "single"}
+
+
+@pytest.mark.parametrize("raw", [None, "", " ", [1, 2]])
+def test_unusable_flags_are_removed(raw):
+    assert normalize_input({"has_retirement_plan": raw, "spouse_has_401k": raw}) == {}
+
+
+def test_unusable_value_gives_way_to_an_alias():
+    out = normalize_input({"taxpayer_wages": "", "wages": 500, "spouse_wages": None})
+    assert out["taxpayer_wages"] == 500.0
+    assert "spouse_wages" not in out
+
+
+@pytest.mark.parametrize("raw", [
+    {"wages": 50000, "spouse_wages": None},
+    {"taxpayer_wages": ""},
+    {"wages": 50000, "taxable_ira": ""},
+    {"wages": "50,000", "federal_withheld": "n/a"},
+])
+def test_calculator_takes_its_defaults_for_unusable_values(raw):
+    clean = {k: v for k, v in raw.items() if normalize_input({k: v})}
+    assert calculate(raw) == calculate(clean)
+
+
+def test_other_keys_pass_through():
+    out = normalize_input({"filing_status": "single", "ca_renters_credit": True, "dependents": [{"age": 3}]})
+    assert out == {"filing_status": "single", "ca_renters_credit": True, "dependents": [{"age": 3}]}
+
+
+def test_normalizing_twice_changes_nothing():
+    raw = {"wages": "$80,000", "taxpayerAge": "41", "tips": "", "spouse_wages": None, "interest": "x",
+           "has_retirement_plan": "true", "state": "CA", "other_income": 12}
+    once = normalize_input(raw)
+    assert isinstance(once, CanonicalInput)
+    assert normalize_input(once) is once
+    assert normalize_input(dict(once)) == once
+    assert raw["tips"] == ""        # the input is not modified
+
+
+def test_every_alias_resolves_to_one_canonical_field():
+    for key, (canonical, rank, _) in ALIAS_INDEX.items():
+        assert canonical in normalize_input({key: 1}), key
+        assert rank >= 0
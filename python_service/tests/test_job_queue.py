@@ -0,0 +1,88 @@
+# ============================================================
+# JobQueue - per-(user_id, tax_year) idempotency and coalescing
+# ============================================================
+
+import threading
+import time
+
+from tax_engine.job_queue import DONE, FAILED, JobQueue
+
+
+def _wait(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.005)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_and_keeps_result():
+    queue = JobQueue(max_workers=1)
+    job, created = queue.submit("u1", 2025, lambda: {"ok": True})
+    assert created
+    done = _wait(queue, job["job_id"])
+    assert done["status"] == DONE
+    assert done["result"] == {"ok": True}
+    assert queue.latest("u1", 2025)["job_id"] == job["job_id"]
+
+
+def test_failed_job_records_error():
+    queue = JobQueue(max_workers=1)
+
+    def boom():
+        raise RuntimeError("mongo down")
+
+    job, _ = queue.submit("u1", 2025, boom)
+    done = _wait(queue, job["job_id"])
+    assert done["status"] == FAILED
+    assert done["error"] == "mongo down"
+
+
+def test_burst_while_running_coalesces_into_one_follow_up():
+    queue = JobQueue(max_workers=2)
+    release = threading.Event()
+    started = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return {"run": len(runs)}
+
+    first, created = queue.submit("u1", 2025, work)
+    assert created
+    assert started.wait(5)
+
+    follow_ups = [queue.submit("u1", 2025, work) for _ in range(5)]
+    assert follow_ups[0][1] is True
+    assert all(not created for _, created in follow_ups[1:])
+    assert len({job["job_id"] for job, _ in follow_ups}) == 1
+
+    release.set()
+    _wait(queue, first["job_id"])
+    last = _wait(queue, follow_ups[0][0]["job_id"])
+    assert last["coalesced"] == 4
+    assert len(runs) == 2
+
+
+def test_keys_are_independent():
+    queue = JobQueue(max_workers=2)
+    a, _ = queue.submit("u1", 2025, lambda: {"year": 2025})
+    b, created = queue.submit("u1", 2024, lambda: {"year": 2024})
+    assert created and a["job_id"] != b["job_id"]
+    assert _wait(queue, b["job_id"])["result"] == {"year": 2024}
+    assert queue.latest("u1", 2024)["job_id"] == b["job_id"]
+
+
+def test_history_drops_oldest_finished_jobs():
+    queue = JobQueue(max_workers=1, history=3)
+    ids = []
+    for i in range(6):
+        job, _ = queue.submit(f"u{i}", 2025, lambda: {})
+        _wait(queue, job["job_id"])
+        ids.append(job["job_id"])
+    assert queue.get(ids[0]) is None
+    assert queue.get(ids[-1]) is not None
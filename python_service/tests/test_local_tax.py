@@ -0,0 +1,85 @@
+# ============================================================
+# LOCAL TAX TABLE - compiled table, lookups, residence credit
+# ============================================================
+
+import csv
+import io
+
+import pytest
+
+from tax_engine.calculator import local_tax
+from tax_engine.calculator.local_tax import (
+    LocalTable,
+    build_table,
+    by_zip,
+    local_taxes,
+    lookup,
+)
+
+
+def _source():
+    with open(local_tax.SOURCE_PATH, "rb") as f:
+        return f.read()
+
+
+def test_compiled_table_round_trips_every_csv_row():
+    table = LocalTable(build_table(_source()))
+    rows = list(csv.DictReader(io.StringIO(_source().decode("utf-8"))))
+    assert len(table) == len(rows)
+    for row in rows:
+        j = table.find(row["code"])
+        assert j is not None, row["code"]
+        assert (j.state, j.name, j.kind) == (row["state"], row["name"], row["kind"])
+        assert j.resident_base == row["resident_base"]
+        if row["resident_rate"]:
+            assert j.resident_rate == pytest.approx(float(row["resident_rate"]))
+    assert [j.code for j in table] == sorted(j.code for j in table)
+
+
+def test_bad_table_bytes_are_rejected():
+    with pytest.raises(ValueError):
+        LocalTable(b"NOPE" + bytes(64))
+
+
+def test_stale_table_is_rebuilt(tmp_path, monkeypatch):
+    path = tmp_path / "jurisdictions.bin"
+    path.write_bytes(build_table(b"code,state,name,kind,resident_base,resident_rate,"
+                                 b"nonresident_base,nonresident_rate,brackets,zips\n"))
+    monkeypatch.setattr(local_tax, "TABLE_PATH", str(path))
+    table = local_tax._open_table()
+    assert table.find("PA-510101") is not None
+    assert path.read_bytes() == build_table(_source())
+
+
+def test_lookup_by_code_and_local_code():
+    assert lookup("PA-510101").name == "Philadelphia"
+    assert lookup("510101", "PA").code == "PA-510101"
+    assert lookup("nyc", "NY").code == "NY-NYC"
+    assert lookup("999999", "PA") is None
+
+
+def test_by_zip():
+    assert [j.code for j in by_zip("10025")] == ["NY-NYC"]
+    assert [j.code for j in by_zip("19103-1234")] == ["PA-510101"]
+    assert by_zip("19103", "NJ") == []
+    assert by_zip("abc") == []
+
+
+def test_nyc_brackets():
+    nyc = lookup("NY-NYC")
+    assert nyc.tax({"taxable": 12000}) == pytest.approx(12000 * 0.03078)
+    assert nyc.tax({"taxable": 30000}) == pytest.approx(12000 * 0.03078 + 13000 * 0.03762 + 5000 * 0.03819)
+
+
+def test_residence_credits_work_place_tax():
+    bases = {"wages": 80000, "earned": 80000}
+    entries = local_taxes("OH", {"local_jurisdiction": "OH-CINCINNATI", "work_jurisdiction": "OH-CLEVELAND"}, bases)
+    home, work = entries
+    assert work["code"] == "OH-CLEVELAND" and work["tax"] == pytest.approx(2000)
+    assert home["credit"] == pytest.approx(80000 * 0.018)
+    assert home["tax"] == 0
+
+
+def test_unknown_jurisdiction_is_an_entry_not_an_error():
+    entries = local_taxes("MD", {"local_jurisdiction": "MD-9999"}, {"taxable": 50000})
+    assert entries == [{"code": "MD-9999", "error": "Unknown MD local jurisdiction", "tax": 0}]
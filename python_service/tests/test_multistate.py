@@ -0,0 +1,110 @@
+# ============================================================
+# MULTI-STATE - residency periods, allocation, other-state credits
+# ============================================================
+
+from datetime import date
+
+import pytest
+
+from tax_engine import calculate_tax
+from tax_engine.multistate import (
+    NONRESIDENT,
+    PART_YEAR,
+    RESIDENT,
+    Period,
+    allocate,
+    calculate_multistate,
+    residency_periods,
+    source_periods,
+)
+from tax_engine.state_compare import state_tax_amount
+
+BASE = {"filing_status": "single", "wages": 120000, "federal_withheld": 15000}
+
+
+def test_residency_income_accrues_by_days():
+    periods = residency_periods([{"state": "CA", "end": "2025-06-30"}, {"state": "NY", "start": "2025-07-01"}],
+                                2025, 365000)
+    assert [p.state for p in periods] == ["CA", "NY"]
+    assert periods[0].days == 181 and periods[1].days == 184
+    assert periods[0].income == pytest.approx(181000)
+    assert sum(p.income for p in periods) == pytest.approx(365000)
+
+
+def test_explicit_period_income_leaves_the_rest_to_the_others():
+    periods = residency_periods([{"state": "CA", "end": "2025-03-31", "income": 10000},
+                                 {"state": "TX", "start": "2025-04-01"}], 2025, 100000)
+    assert periods[0].income == 10000
+    assert periods[1].income == pytest.approx(90000)
+
+
+@pytest.mark.parametrize("entries", [
+    [],
+    [{"state": "CA", "end": "2025-06-30"}],                                 # doesn't reach Dec 31
+    [{"state": "CA", "end": "2025-06-30"}, {"state": "NY", "start": "2025-07-05"}],   # gap
+    [{"state": "CA", "end": "2025-06-30"}, {"state": "NY", "start": "2025-06-01"}],   # overlap
+    [{"state": "ZZ"}],
+    [{"state": "CA", "end": "2024-12-31"}],
+])
+def test_invalid_residency_is_rejected(entries):
+    with pytest.raises(ValueError):
+        residency_periods(entries, 2025, 50000)
+
+
+def test_allocate_splits_sources_over_residency():
+    residency = [Period("NY", date(2025, 1, 1), date(2025, 6, 30), 50000),
+                 Period("PA", date(2025, 7, 1), date(2025, 12, 31), 50000)]
+    sources = source_periods([{"state": "NJ", "amount": 36500}], 2025)
+    shares = allocate(residency, sources)
+    assert list(shares) == ["NY", "PA", "NJ"]
+    nj = shares["NJ"]
+    assert nj.resident_days == 0
+    assert nj.nonresident_income == pytest.approx(36500)
+    assert nj.sourced_while_in["NY"] == pytest.approx(18100)
+    assert nj.sourced_while_in["PA"] == pytest.approx(18400)
+
+
+def test_source_in_own_residency_state_is_not_nonresident_income():
+    residency = [Period("NJ", date(2025, 1, 1), date(2025, 12, 31), 80000)]
+    shares = allocate(residency, source_periods([{"state": "NJ", "amount": 30000}], 2025))
+    assert shares["NJ"].nonresident_income == 0
+
+
+def test_single_full_year_state_matches_calculate_tax():
+    multi = calculate_multistate(dict(BASE, residency=[{"state": "KS"}], state_withholding=4000))
+    single = calculate_tax(dict(BASE, state="KS", state_withholding=4000))
+    (ks,) = multi["states"]
+    assert ks["residency"] == RESIDENT
+    assert ks["state_tax"] == pytest.approx(state_tax_amount(single["state"]), abs=0.01)
+    assert multi["total_refund"] == single["total_refund"]
+    assert multi["total_amount_owed"] == single["total_amount_owed"]
+
+
+def test_part_year_move_and_nonresident_credit():
+    result = calculate_multistate(dict(
+        BASE,
+        residency=[{"state": "PA", "end": "2025-04-30"}, {"state": "NY", "start": "2025-05-01"}],
+        state_sources=[{"state": "NJ", "amount": 20000}],
+        state_withholding_by_state={"NY": 3000, "NJ": 500},
+    ))
+    states = {s["state"]: s for s in result["states"]}
+    assert set(states) == {"PA", "NY", "NJ"}
+    assert states["PA"]["residency"] == PART_YEAR and states["NY"]["residency"] == PART_YEAR
+    assert states["NJ"]["residency"] == NONRESIDENT
+    assert states["NJ"]["state_income"] == pytest.approx(20000, abs=0.01)
+
+    # Resident states credit the NJ tax on the income sourced there, never more than their own tax
+    credited = sum(s["other_state_credit"] for s in result["states"])
+    assert 0 < credited <= states["NJ"]["state_tax"] + 0.01
+    for s in result["states"]:
+        assert s["other_state_credit"] <= s["tax_before_credits"] + 0.01
+        assert s["state_tax"] == pytest.approx(s["tax_before_credits"] - s["other_state_credit"], abs=0.01)
+
+    assert states["NY"]["withholding"] == 3000 and states["PA"]["withholding"] == 0
+    assert result["total_tax"] == pytest.approx(result["federal_tax"] + result["total_state_tax"], abs=0.01)
+
+
+def test_calculate_tax_routes_residency_to_multistate():
+    result = calculate_tax(dict(BASE, residency=[{"state": "CA", "end": "2025-06-30"},
+                                                {"state": "TX", "start": "2025-07-01"}]))
+    assert "states" in result and "state" not in result
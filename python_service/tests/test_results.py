@@ -0,0 +1,87 @@
+# ============================================================
+# RESULT RECORDS - round trips and dict compatibility
+# ============================================================
+
+import pytest
+
+from tax_engine import calculate_state_tax, calculate_tax
+from tax_engine.calculator.federal.calculator import calculate as calculate_federal
+from tax_engine.results import (
+    MISSING,
+    FederalResult,
+    StateRankRow,
+    StateResult,
+    TaxResult,
+    calculate_tax_record,
+)
+from tax_engine.state_compare import clear_cache, compare_states
+
+BASE = {"filing_status": "married_filing_jointly", "wages": 140000, "federal_withheld": 15000,
+        "state_withholding": 5000, "qualifying_children_under_17": 2, "long_term_gains": 6000}
+MOVED = dict(BASE, residency=[{"state": "CA", "end": "2025-04-30"}, {"state": "NY", "start": "2025-05-01"}])
+
+
+def _same(a, b):
+    # equal, top-level keys in the calculator's order
+    assert a == b
+    assert list(a) == list(b)
+
+
+@pytest.mark.parametrize("state", [None, "CA", "NY", "PA", "TX", "KS"])
+def test_single_state_result_round_trips(state):
+    result = calculate_tax(dict(BASE, state=state) if state else dict(BASE))
+    rec = TaxResult.from_dict(result)
+    assert isinstance(rec.federal, FederalResult)
+    assert (rec.state is None) == (state is None)
+    assert rec.states is MISSING and "states" not in rec
+    _same(rec.to_dict(), result)
+
+
+def test_multistate_result_round_trips():
+    result = calculate_tax(dict(MOVED))
+    assert "state" not in result
+    rec = TaxResult.from_dict(result)
+    assert [s.state for s in rec.states] == ["CA", "NY"]
+    assert all(isinstance(s, StateResult) for s in rec.states)
+    assert rec["total_tax"] == result["total_tax"] and "state" not in rec
+    out = rec.to_dict()
+    _same(out, result)
+    assert out["states"] == result["states"]
+
+
+def test_unknown_keys_survive_in_extra():
+    result = dict(calculate_tax(dict(BASE, state="CA")), audit_id="a-1")
+    result["federal"] = dict(result["federal"], new_line=12.5)
+    rec = TaxResult.from_dict(result)
+    assert rec.extra == {"audit_id": "a-1"}
+    assert rec.federal.extra == {"new_line": 12.5} and rec.federal["new_line"] == 12.5
+    assert rec.state.extra       # CA's form lines
+    _same(rec.to_dict(), result)
+
+
+def test_records_answer_dict_reads():
+    federal = calculate_federal(dict(BASE))
+    rec = FederalResult.from_dict(federal)
+    assert rec["agi"] == rec.get("agi") == federal["agi"]
+    assert "agi" in rec and "nope" not in rec and rec.get("nope", 7) == 7
+    with pytest.raises(KeyError):
+        rec["nope"]
+    assert list(rec.keys()) == list(federal)
+    state = StateResult.from_dict(calculate_state_tax("KS", dict(BASE, agi=federal["agi"])))
+    assert state["state"] == "KS"
+
+
+def test_calculate_tax_record_handles_both_shapes():
+    assert calculate_tax_record(dict(BASE, state="NY")).to_dict() == calculate_tax(dict(BASE, state="NY"))
+    assert calculate_tax_record(dict(MOVED)).to_dict() == calculate_tax(dict(MOVED))
+
+
+def test_compare_tables_are_cached_as_records():
+    clear_cache()
+    first = compare_states(92000, "single", 1)
+    again = compare_states(92000, "single", 1)
+    _same(again[0], first[0])
+    assert again == first and again is not first
+    assert list(first[0]) == list(StateRankRow.FIELDS)
+    again[0]["state_tax"] = -1          # callers get copies, not the cache
+    assert compare_states(92000, "single", 1) == first
@@ -0,0 +1,154 @@
+# ============================================================
+# SCENARIOS - staged federal calculation, what-if variants
+# ============================================================
+
+import random
+
+import pytest
+
+from tax_engine import calculate_tax
+from tax_engine.calculator.federal import calculator as federal
+from tax_engine.calculator.inputs import normalize_input
+from tax_engine.scenarios import MAX_SCENARIOS, METRICS, apply_variant, run_scenarios
+
+STATUSES = ("single", "married_filing_jointly", "married_filing_separately", "head_of_household")
+
+
+def _returns(n=300, seed=50):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield normalize_input({
+            "filing_status": rng.choice(STATUSES),
+            "tax_year": rng.choice((2025, 2026)),
+            "wages": rng.randint(0, 250000),
+            "federal_withheld": rng.randint(0, 30000),
+            "qualifying_children_under_17": rng.randint(0, 3),
+            "other_dependents": rng.randint(0, 1),
+            "interest_income": rng.randint(0, 3000) * rng.randint(0, 1),
+            "long_term_gains": rng.randint(-8000, 40000) * rng.randint(0, 1),
+            "qualified_dividends": rng.randint(0, 5000) * rng.randint(0, 1),
+            "ira_contribution": rng.choice((0, 0, 3000, 7000)),
+            "hsa_contribution": rng.choice((0, 0, 4000)),
+            "social_security_benefits": rng.randint(0, 30000) * (rng.random() < .2),
+            "self_employment_income": rng.randint(0, 60000) * (rng.random() < .2),
+            "tips_received": rng.randint(0, 20000) * (rng.random() < .2),
+            "taxpayer_age": rng.randint(20, 80),
+            "estimated_payments": rng.randint(0, 5000) * (rng.random() < .2),
+        })
+
+
+def test_federal_summary_is_part_of_the_result():
+    for data in _returns():
+        ctx = federal.CalcContext()
+        for _, stage in federal.STAGES:
+            stage(data, ctx)
+        result = federal.federal_result(ctx)
+        assert result == federal.calculate(data)
+        assert federal.federal_summary(ctx).items() <= result.items()
+
+
+def test_a_finished_context_resumes_from_any_later_stage():
+    # ira_contribution is first read by adjustments (STAGES[2])
+    for data in _returns(50):
+        ctx = federal.CalcContext()
+        for _, stage in federal.STAGES:
+            stage(data, ctx)
+        changed = dict(data, ira_contribution=data["ira_contribution"] + 1500)
+        resumed = ctx.copy()
+        for _, stage in federal.STAGES[2:]:
+            stage(changed, resumed)
+        assert federal.federal_result(resumed) == federal.calculate(changed)
+        assert federal.federal_result(ctx) == federal.calculate(data)
+
+
+BASE = {"filing_status": "married_filing_jointly", "wages": 145000, "federal_withheld": 16000,
+        "state_withholding": 6000, "interest_income": 800, "qualifying_children_under_17": 1,
+        "ira_contribution": 2000, "taxpayer_age": 44, "spouse_age": 42, "has_retirement_plan": True}
+
+VARIANTS = [
+    {"name": "Max IRA", "set": {"ira_contribution": 7000}},
+    {"name": "No IRA", "set": {"ira_contribution": None}},
+    {"name": "Another child", "add": {"qualifying_children_under_17": 1}},
+    {"name": "Sell stock", "set": {"long_term_gains": 40000}},
+    {"name": "Raise", "add": {"wages": 10000}},
+    {"name": "Separate", "set": {"filing_status": "married_filing_separately"}},
+    {"name": "2026", "set": {"tax_year": 2026}},
+    {"name": "Move to Kansas", "set": {"state": "KS"}},
+    {"name": "Withholding", "set": {"state_withholding": 9000}},
+    {"name": "Same as base", "set": {"wages": 145000}},
+    {"name": "Grid", "set": {"ira_contribution": 5000}, "add": {"qualifying_children_under_17": 2}},
+]
+
+
+@pytest.mark.parametrize("state", ["CA", "KS", "TX"])
+def test_scenarios_match_calculate_tax(state):
+    out = run_scenarios(dict(BASE), VARIANTS, state, include_details=True)
+    base = normalize_input(dict(BASE, state=state))
+    expected = [calculate_tax(dict(base))] + [calculate_tax(dict(apply_variant(base, v))) for v in VARIANTS]
+    assert len(out["scenarios"]) == len(expected)
+    for scenario, want in zip(out["scenarios"], expected):
+        assert scenario["federal"] == want["federal"], scenario["name"]
+        assert scenario["state"] == want["state"], scenario["name"]
+
+
+@pytest.mark.parametrize("state", ["CA", "KS", "TX"])
+def test_summaries_do_not_depend_on_details(state):
+    brief = run_scenarios(dict(BASE), VARIANTS, state)
+    full = run_scenarios(dict(BASE), VARIANTS, state, include_details=True)
+    assert brief["matrix"] == full["matrix"]
+    assert "federal" not in brief["scenarios"][1]
+
+
+def test_matrix_has_a_row_per_metric_and_a_column_per_scenario():
+    out = run_scenarios(dict(BASE), VARIANTS, "KS")
+    matrix = out["matrix"]
+    assert matrix["columns"] == ["base"] + [v["name"] for v in VARIANTS]
+    assert set(matrix["rows"]) == set(matrix["delta"]) == set(METRICS)
+    for m in METRICS:
+        assert len(matrix["rows"][m]) == len(matrix["delta"][m]) == len(VARIANTS) + 1
+        assert matrix["delta"][m][0] == 0
+    assert out["state"] == "KS" and out["tax_year"] == 2025
+
+
+def test_variants_resume_from_the_first_stage_they_change():
+    rows = {s["name"]: s for s in run_scenarios(dict(BASE), VARIANTS, "TX")["scenarios"]}
+    assert rows["Another child"]["stages_run"] == ["credits", "payments"]
+    assert rows["Max IRA"]["stages_run"][0] == "adjustments"
+    assert rows["Same as base"]["changed"] == [] and rows["Same as base"]["stages_run"] == []
+    # Texas reads neither AGI nor the changed fields: one state calculation serves all
+    assert rows["Raise"]["state_reused"] and rows["Max IRA"]["state_reused"]
+    assert not rows["Withholding"]["state_reused"]
+    # State-only changes take the base's federal result
+    assert rows["Move to Kansas"]["stages_run"] == [] and rows["Withholding"]["stages_run"] == []
+
+
+def test_repeated_variants_share_one_outcome():
+    out = run_scenarios(dict(BASE), [VARIANTS[2]] * 5, "CA", include_details=True)["scenarios"]
+    assert out[1]["stages_run"] == ["credits", "payments"]
+    assert all(s["stages_run"] == [] and s["state"] is out[1]["state"] for s in out[2:])
+    assert all(s["federal"] == out[1]["federal"] for s in out[2:])
+
+
+def test_state_result_is_reused_only_when_agi_and_its_reads_are_unchanged():
+    rows = {s["name"]: s for s in run_scenarios(dict(BASE), VARIANTS, "KS")["scenarios"]}
+    assert not rows["Max IRA"]["state_reused"]           # AGI changed
+    assert not rows["Another child"]["state_reused"]     # Kansas reads dependents
+    assert not rows["Withholding"]["state_reused"]       # read by every state
+    assert rows["Same as base"]["state_reused"]
+
+
+@pytest.mark.parametrize("variants, message", [
+    ([{}] * (MAX_SCENARIOS + 1), "At most"),
+    ([{"name": "x", "set": {}, "remove": ["wages"]}], "Each variant"),
+    ([{"set": [("wages", 1)]}], "Each variant"),
+    (["wages"], "Each variant"),
+    ([{"add": {"wages": "lots"}}], "'add' needs a number"),
+])
+def test_bad_variants_are_rejected(variants, message):
+    with pytest.raises(ValueError, match=message):
+        run_scenarios(dict(BASE), variants, "KS")
+
+
+def test_residency_returns_are_rejected():
+    with pytest.raises(ValueError, match="single-state"):
+        run_scenarios(dict(BASE, residency=[{"state": "CA"}, {"state": "NY", "start": "2025-07-01"}]), [], None)
@@ -0,0 +1,102 @@
+# ============================================================
+# update_session_if_changed / diff_set_paths
+# ============================================================
+# Runs against a small in-memory collection (find_one with a
+# projection, update_one with dotted $set / $unset).
+
+import copy
+
+import pytest
+
+from tax_engine import mongodb_client
+from tax_engine.mongodb_client import diff_set_paths, update_session_if_changed
+
+
+class _Collection:
+    def __init__(self, doc):
+        self.doc = doc
+        self.updates = []
+
+    def find_one(self, query, projection):
+        if self.doc is None:
+            return None
+        return {k: copy.deepcopy(v) for k, v in self.doc.items() if k in projection}
+
+    def update_one(self, query, update):
+        self.updates.append(update)
+        for path, value in update.get("$set", {}).items():
+            *parents, leaf = path.split(".")
+            node = self.doc
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = copy.deepcopy(value)
+        for path in update.get("$unset", {}):
+            *parents, leaf = path.split(".")
+            node = self.doc
+            for part in parents:
+                node = node.get(part, {})
+            node.pop(leaf, None)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    coll = _Collection({"userId": "u1", "taxYear": 2025, "status": "draft"})
+    monkeypatch.setattr(mongodb_client, "PYMONGO_AVAILABLE", True)
+    monkeypatch.setattr(mongodb_client, "get_collection", lambda: coll)
+    return coll
+
+
+def _save(data):
+    return update_session_if_changed("u1", 2025, data, fingerprint_field="validationFingerprint",
+                                     volatile_fields=("validatedAt",))
+
+
+def _validated(refund=1200.0, stamp="t1"):
+    return {"status": "validated", "validatedAt": stamp,
+            "taxCalculation": {"refund": refund, "amount_owed": 0.0}}
+
+
+def test_diff_set_paths_sends_only_changed_leaves():
+    old = {"taxCalculation": {"refund": 10, "owed": 0, "gone": 1}, "status": "a"}
+    new = {"taxCalculation": {"refund": 12, "owed": 0}, "status": "a"}
+    assert diff_set_paths(old, new) == ({"taxCalculation.refund": 12}, {"taxCalculation.gone": ""})
+
+
+def test_first_save_writes_then_repeat_only_touches(collection):
+    assert _save(_validated())["action"] == "updated"
+    assert collection.doc["taxCalculation"]["refund"] == 1200.0
+
+    result = _save(_validated(stamp="t2"))
+    assert result == {"success": True, "action": "touched", "fields": 1}
+    assert collection.updates[-1] == {"$set": {"validatedAt": "t2"}}
+
+
+def test_unchanged_without_volatile_fields_is_skipped(collection):
+    data = {"status": "validated"}
+    _save(data)
+    assert _save(data)["action"] == "skipped"
+
+
+def test_changed_content_sends_dotted_paths(collection):
+    _save(_validated())
+    _save(_validated(refund=900.0, stamp="t2"))
+    update = collection.updates[-1]["$set"]
+    assert update["taxCalculation.refund"] == 900.0
+    assert "taxCalculation.amount_owed" not in update
+    assert update["validatedAt"] == "t2"
+
+
+def test_write_by_another_service_is_overwritten(collection):
+    """Node rewrites taxCalculation/status on the same document; the fingerprint must not hide that."""
+    _save(_validated())
+    collection.doc["taxCalculation"]["refund"] = 5.0
+    collection.doc["status"] = "in_progress"
+
+    assert _save(_validated(stamp="t2"))["action"] == "updated"
+    assert collection.doc["taxCalculation"]["refund"] == 1200.0
+    assert collection.doc["status"] == "validated"
+
+
+def test_missing_session(collection):
+    collection.doc = None
+    assert _save(_validated())["action"] == "not_found"
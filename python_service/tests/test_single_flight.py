@@ -0,0 +1,68 @@
+# ============================================================
+# SingleFlight - shared in-flight calls and the debounce window
+# ============================================================
+
+import threading
+
+import pytest
+
+from tax_engine.job_queue import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight(window=0)
+    gate = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        gate.wait(5)
+        return {"ok": True}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    while flight.stats()["in_flight"] == 0:
+        pass
+    joiners = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+    for t in joiners:
+        t.start()
+    while flight.stats()["joined"] < 4:
+        pass
+    gate.set()
+    for t in [leader] + joiners:
+        t.join(5)
+
+    assert len(runs) == 1
+    assert sorted(how for _, how in results) == ["executed"] + ["joined"] * 4
+    assert all(r == {"ok": True} for r, _ in results)
+
+
+def test_recent_result_is_reused_within_window():
+    flight = SingleFlight(window=60)
+    calls = []
+    assert flight.do("k", lambda: calls.append(1) or "first") == ("first", "executed")
+    assert flight.do("k", lambda: calls.append(1) or "second") == ("first", "reused")
+    assert len(calls) == 1
+
+
+def test_force_and_forget_recompute():
+    flight = SingleFlight(window=60)
+    flight.do("k", lambda: 1)
+    assert flight.do("k", lambda: 2, force=True) == (2, "executed")
+    assert flight.do("k", lambda: 3) == (2, "reused")
+    flight.forget("k")
+    assert flight.do("k", lambda: 4) == (4, "executed")
+
+
+def test_errors_and_rejected_results_are_not_cached():
+    flight = SingleFlight(window=60, keep=lambda r: r is not None and r.get("success"))
+
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: {"success": False}) == ({"success": False}, "executed")
+    assert flight.do("k", lambda: {"success": True}) == ({"success": True}, "executed")
+    assert flight.do("k", lambda: {"success": False}) == ({"success": True}, "reused")
@@ -0,0 +1,142 @@
+# ============================================================
+# STATE COMPARISON - tax curves, ranked tables, AGI grids
+# ============================================================
+
+import random
+
+import pytest
+
+from tax_engine.curves import TaxCurve, locate, sample_piecewise, simplify
+from tax_engine.state_compare import (
+    MAX_GRID_POINTS,
+    compare_grid,
+    compare_states,
+    get_curve,
+    household,
+    run_state_calculator,
+    state_tax_amount,
+)
+from tax_engine.state_router import ALL_STATE_CODES, NO_TAX_STATES
+
+TAXED = [c for c in ALL_STATE_CODES if c not in NO_TAX_STATES]
+
+
+def _exact(code, agi, fs="single", deps=0):
+    return state_tax_amount(run_state_calculator(code, household(agi, fs, deps)))
+
+
+# ============================================================
+# CURVES
+# ============================================================
+
+def _brackets(x):
+    # 2% to 10k, 5% to 40k, 8% above; a $300 credit that stops at 25,000
+    tax = 0.02 * min(x, 10000) + 0.05 * min(max(x - 10000, 0), 30000) + 0.08 * max(x - 40000, 0)
+    return (tax - (300 if x < 25000 else 0),)
+
+
+def test_sample_piecewise_finds_kinks_and_cliffs():
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        return _brackets(x)
+
+    knots, values = sample_piecewise(f, range(0, 100001, 20000))
+    assert len(calls) == len(set(calls))           # each x runs once
+    assert 25000 in knots and 24999 in knots        # the cliff, to the dollar
+    assert any(abs(k - 10000) <= 50 for k in knots) and any(abs(k - 40000) <= 50 for k in knots)
+    assert values == [_brackets(k) for k in knots]
+    curve = TaxCurve("XX", knots, [v[0] for v in values])
+    for x in range(0, 100001, 137):
+        assert curve(x) == pytest.approx(_brackets(x)[0], abs=1.0)
+    assert curve.rates([5000, 30000, 90000]) == pytest.approx([0.02, 0.05, 0.08])
+
+
+def test_any_series_splits_an_interval():
+    knots, values = sample_piecewise(lambda x: (0.1 * x, 0.2 * max(x - 3000, 0)), [0, 10000])
+    assert any(abs(k - 3000) <= 50 for k in knots)
+    assert [v[0] for v in values] == pytest.approx([0.1 * k for k in knots])
+
+
+def test_simplify_merges_whole_dollar_jitter():
+    knots = [float(x) for x in range(0, 10001, 100)]
+    values = [(float(round(0.0425 * x)),) for x in knots]
+    kept, kept_values = simplify(knots, values)
+    assert kept == [0.0, 10000.0] and kept_values == [values[0], values[-1]]
+
+
+def test_simplify_keeps_real_kinks():
+    knots = [float(x) for x in range(0, 10001, 500)]
+    values = [(0.02 * x + 0.03 * max(x - 5000, 0),) for x in knots]
+    assert simplify(knots, values)[0] == [0.0, 5000.0, 10000.0]
+    assert simplify(knots[:2], values[:2]) == (knots[:2], values[:2])
+
+
+def test_locate_walks_unsorted_points():
+    knots = [0.0, 10.0, 20.0]
+    assert locate(knots, [25, -5, 10, 9.99, 15]) == [2, 0, 1, 0, 1]
+
+
+@pytest.mark.parametrize("fs, deps", [("single", 0), ("married_filing_jointly", 2)])
+def test_curves_are_within_a_dollar_of_the_calculators(fs, deps):
+    rng = random.Random(41)
+    for code in TAXED:
+        curve = get_curve(code, fs, deps)
+        for _ in range(40):
+            agi = rng.choice((rng.randint(0, 150000), rng.randint(0, 600000), round(rng.uniform(0, 90000), 2)))
+            assert abs(curve(agi) - _exact(code, agi, fs, deps)) <= 1.0, (code, agi)
+
+
+# ============================================================
+# RANKED TABLES
+# ============================================================
+
+def test_compare_states_ranks_the_real_calculators():
+    rows = compare_states(85000, "married_filing_jointly", 2)
+    assert len(rows) == len(ALL_STATE_CODES) and [r["rank"] for r in rows] == list(range(1, len(rows) + 1))
+    assert [(r["state_tax"], r["state"]) for r in rows] == sorted((r["state_tax"], r["state"]) for r in rows)
+    for r in rows:
+        want = 0.0 if r["state"] in NO_TAX_STATES else _exact(r["state"], 85000, "married_filing_jointly", 2)
+        assert r["state_tax"] == round(want, 2)
+        assert r["effective_rate"] == round(want / 85000 * 100, 2)
+    # no-tax states first, alphabetically
+    assert [r["state"] for r in rows[:len(NO_TAX_STATES)]] == sorted(NO_TAX_STATES)
+
+
+# ============================================================
+# GRIDS
+# ============================================================
+
+def test_compare_grid_matches_the_curves_and_ranks_by_total():
+    agis = [120000, 0, 35000.5, 60000, 250000]         # unsorted on purpose
+    out = compare_grid(agis, "Single", 0)
+    assert out["agi"] == [float(a) for a in agis] and out["filing_status"] == "single"
+    rows = out["comparison"]
+    assert out["total_states"] == len(rows) == len(ALL_STATE_CODES)
+    assert [(r["total_tax"], r["state"]) for r in rows] == sorted((r["total_tax"], r["state"]) for r in rows)
+    assert [r["rank"] for r in rows] == list(range(1, len(rows) + 1))
+    for r in rows:
+        curve = get_curve(r["state"], "single", 0)
+        assert r["state_tax"] == pytest.approx([curve(a) for a in agis], abs=0.0051)   # to the cent
+        assert r["total_tax"] == pytest.approx(sum(r["state_tax"]), abs=0.05)
+        assert r["effective_rate"] == round(r["total_tax"] / sum(agis) * 100, 2)
+        if r["state"] in TAXED:
+            assert [abs(t - _exact(r["state"], a)) <= 1.0 for t, a in zip(r["state_tax"], agis)] == [True] * 5
+
+
+def test_lowest_is_the_first_ranked_state_at_its_minimum():
+    agis = [20000, 80000, 400000]
+    out = compare_grid(agis, "head_of_household", 1)
+    rows = out["comparison"]
+    for j, code in enumerate(out["lowest"]):
+        low = min(r["state_tax"][j] for r in rows)
+        assert code == next(r["state"] for r in rows if r["state_tax"][j] == low)
+    # every no-tax state ties at zero; ranking breaks the tie alphabetically
+    assert out["lowest"] == [min(NO_TAX_STATES)] * len(agis)
+    assert out["comparison"][0]["state"] == min(NO_TAX_STATES)
+
+
+def test_grid_size_is_bounded():
+    with pytest.raises(ValueError, match="At most"):
+        compare_grid([1000.0] * (MAX_GRID_POINTS + 1))
@@ -0,0 +1,83 @@
+# ============================================================
+# SPEC STATES - pinned spec-engine output for every specs/XX.json
+# ============================================================
+# tests/golden/spec_states.json holds calculate() for each spec state
+# over CASES. A spec edit that changes any result fails here; if the
+# change is intended, regenerate and review the golden diff:
+#   TAXSKY_UPDATE_GOLDEN=1 python -m pytest -q tests/test_state_specs.py
+# ============================================================
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tax_engine.calculator.states.spec_engine import FILING_STATUSES, SPEC_DIR, SPEC_STATES, load_state
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "spec_states.json"
+
+
+def _case(fs, agi, **extra):
+    data = {"filing_status": fs, "federal_agi": agi, "agi": agi, "wages": agi,
+            "state_withholding": round(agi * 0.04, 2)}
+    data.update(extra)
+    return data
+
+
+CASES = [
+    _case(fs, agi, qualifying_children_under_17=kids)
+    for fs in FILING_STATUSES
+    for agi, kids in ((0, 0), (38000, 1), (95000, 2), (260000, 0))
+] + [
+    _case("single", 72000, federal_tax=7400),                     # AL, LA, OR federal tax deduction
+    _case("married_filing_jointly", 150000, federal_tax=60000),   # ... capped at a share of AGI
+    _case("married_filing_jointly", 1250000, num_dependents=1),   # MA surtax
+    _case("single", 64000, local_jurisdiction="MD-0300"),         # Baltimore City
+    _case("single", 64000, zip="44114"),                          # Cleveland
+    _case("mfs", 51000, qualifying_children_under_17=3),
+]
+
+
+def _results():
+    return {code: [state.calculate(dict(data)) for data in CASES] for code, state in sorted(SPEC_STATES.items())}
+
+
+def test_every_spec_file_compiles():
+    files = sorted(name[:-5] for name in os.listdir(SPEC_DIR) if name.endswith(".json"))
+    assert files == sorted(SPEC_STATES)
+    assert len(files) == 35
+
+
+def test_spec_output_matches_golden():
+    results = json.loads(json.dumps(_results()))
+    if os.getenv("TAXSKY_UPDATE_GOLDEN"):
+        GOLDEN.write_text("{\n" + ",\n".join(f"  {json.dumps(code)}: {json.dumps(rows)}"
+                                             for code, rows in results.items()) + "\n}\n", encoding="utf-8")
+    golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    assert sorted(golden) == sorted(results)
+    for code, rows in results.items():
+        for data, got, want in zip(CASES, rows, golden[code]):
+            assert got == want, f"{code} {data}"
+
+
+@pytest.mark.parametrize("code", ["AL", "CT", "LA", "MS"])
+def test_formerly_single_only_states_compute_every_status(code):
+    # These modules raised for anything but single before the spec engine
+    state = SPEC_STATES[code]
+    taxes = [state.calculate(_case(fs, 95000))["state_tax"] for fs in FILING_STATUSES]
+    assert all(t > 0 for t in taxes)
+    assert taxes[1] < taxes[0]  # MFJ pays less than single on the same AGI
+
+
+def test_ma_surtax_applies_over_threshold():
+    ma = SPEC_STATES["MA"]
+    below = ma.calculate(_case("single", 900000))
+    above = ma.calculate(_case("single", 1100000))
+    extra = above["state_tax"] - below["state_tax"]
+    assert extra > 200000 * 0.05  # more than the flat rate alone on the added income
+
+
+def test_plug_in_modules_win_over_specs():
+    assert load_state("CA") is not SPEC_STATES.get("CA")
+    assert load_state("KS") is SPEC_STATES["KS"]
@@ -0,0 +1,95 @@
+# ============================================================
+# TAX PARAMETER STORE - per-year tables, "extends", state years
+# ============================================================
+
+import json
+
+import pytest
+
+from tax_engine.calculator import tax_params
+from tax_engine.calculator.federal.calculator import calculate, calculate_eitc
+from tax_engine.calculator.tax_params import federal_params, get_params, tax_years
+from tax_engine.state_router import calculate_state_tax
+
+
+def test_years_available():
+    assert tax_years("US") == (2024, 2025, 2026)
+    assert tax_years("CA") == (2024, 2025)
+
+
+def test_unknown_year_is_rejected():
+    with pytest.raises(ValueError):
+        federal_params(2019)
+    with pytest.raises(ValueError):
+        calculate({"filing_status": "single", "wages": 50000, "tax_year": 2019})
+
+
+def test_extends_merges_nested_keys_and_replaces_lists(tmp_path, monkeypatch):
+    (tmp_path / "ZZ_2030.json").write_text(json.dumps(
+        {"tax_year": 2030, "a": {"x": 1, "y": 2}, "rows": [1, 2, 3], "keep": "base"}))
+    (tmp_path / "ZZ_2031.json").write_text(json.dumps(
+        {"tax_year": 2031, "extends": 2030, "a": {"y": 20}, "rows": [9]}))
+    monkeypatch.setattr(tax_params, "TAX_YEARS_DIR", str(tmp_path))
+    monkeypatch.setattr(tax_params, "_FILES", tax_params._scan())
+
+    table = tax_params._raw("ZZ", 2031)
+    assert table == {"tax_year": 2031, "a": {"x": 1, "y": 20}, "rows": [9], "keep": "base"}
+
+
+def test_circular_extends_is_an_error(tmp_path, monkeypatch):
+    (tmp_path / "ZZ_2030.json").write_text(json.dumps({"tax_year": 2030, "extends": 2031}))
+    (tmp_path / "ZZ_2031.json").write_text(json.dumps({"tax_year": 2031, "extends": 2030}))
+    monkeypatch.setattr(tax_params, "TAX_YEARS_DIR", str(tmp_path))
+    monkeypatch.setattr(tax_params, "_FILES", tax_params._scan())
+    with pytest.raises(ValueError):
+        tax_params._raw("ZZ", 2031)
+
+
+def test_2026_overrides_and_inherits_2025():
+    p25, p26 = federal_params(2025), federal_params(2026)
+    assert p26.tax_year == 2026
+    assert p26.standard_deduction["single"] == 16100
+    assert p26.ctc_amount == 2200
+    assert p26.ctc_other_dependent == p25.ctc_other_dependent   # inherited
+    assert p26.k401_limit == 24500
+
+
+def test_2026_eitc_table():
+    eitc = federal_params(2026).eitc
+    assert [eitc["single"][n]["max"] for n in range(4)] == [664, 4427, 7316, 8231]
+    assert eitc["married_filing_jointly"][3]["phase_out_end"] == 70244
+    assert eitc["investment_income_limit"] == 12200
+    credit, _ = calculate_eitc(20000, 20000, "single", 2, tax_year=2026)
+    assert credit == 7316
+
+
+def test_tables_are_read_only_and_cached():
+    p = federal_params(2025)
+    assert federal_params(2025) is p
+    with pytest.raises(AttributeError):
+        p.ctc_amount = 0
+    with pytest.raises(TypeError):
+        p.standard_deduction["single"] = 0
+    assert get_params("CA", 2024)["tax_year"] == 2024
+
+
+def test_federal_result_follows_tax_year():
+    base = {"filing_status": "single", "wages": 60000}
+    results = {y: calculate(dict(base, tax_year=y)) for y in (2024, 2025, 2026)}
+    assert [results[y]["tax_year"] for y in results] == [2024, 2025, 2026]
+    assert len({results[y]["standard_deduction"] for y in results}) == 3
+
+
+@pytest.mark.parametrize("year", [2024, 2026])
+def test_state_result_flags_tables_from_another_year(year):
+    result = calculate_state_tax("KS", {"filing_status": "single", "federal_agi": 60000, "tax_year": year})
+    assert result["tax_year"] == 2025
+    assert result["requested_tax_year"] == year
+    assert result["warnings"]
+
+
+def test_state_result_for_covered_year_has_no_warning():
+    result = calculate_state_tax("CA", {"filing_status": "single", "federal_agi": 60000, "tax_year": 2025})
+    assert result["tax_year"] == 2025
+    assert "warnings" not in result
+    assert "warnings" not in calculate_state_tax("TX", {"federal_agi": 60000, "tax_year": 2024})
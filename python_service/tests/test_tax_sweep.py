@@ -0,0 +1,144 @@
+# ============================================================
+# TAX SWEEP - series vs the calculators, marginal rates, breakpoints
+# ============================================================
+
+import random
+
+import pytest
+
+from tax_engine.calculator.inputs import normalize_input
+from tax_engine.calculator.tax_params import federal_params
+from tax_engine.tax_sweep import (
+    BREAKPOINT_MIN_CHANGE,
+    MAX_POINTS,
+    _breakpoints,
+    grid,
+    sweep,
+    sweep_field,
+    tax_function,
+)
+
+P = federal_params(2025)
+SINGLE = {"filing_status": "single", "tax_year": 2025}
+
+
+# ============================================================
+# SERIES VS THE CALCULATORS
+# ============================================================
+
+CASES = [
+    (SINGLE, "wages", "CA", 0, 250000),
+    (SINGLE, "wages", "OR", 0, 120000),
+    ({"filing_status": "head_of_household", "qualifying_children_under_17": 2, "num_dependents": 2},
+     "wages", "NY", 0, 90000),
+    ({"filing_status": "married_filing_jointly", "wages": 95000}, "self_employment_income", "KS", 0, 80000),
+    ({"filing_status": "single", "wages": 70000, "taxpayer_age": 52}, "ira_contribution", "CA", 0, 8000),
+    ({"filing_status": "married_filing_jointly", "qualifying_children_under_17": 1}, "wages", None, 0, 150000),
+]
+
+
+@pytest.mark.parametrize("profile, variable, state, lo, hi", CASES)
+def test_series_are_within_two_dollars_of_the_calculators(profile, variable, state, lo, hi):
+    rng = random.Random(42)
+    xs = sorted({float(rng.randint(lo, hi)) for _ in range(60)} | {float(lo), float(hi)})
+    out = sweep(dict(profile), variable, xs, state)
+    f = tax_function(normalize_input(profile), sweep_field(variable), state)
+    for x, fed, st, total in zip(xs, out["federal_tax"], out["state_tax"], out["total_tax"]):
+        want_fed, want_st, _ = f(x)
+        assert abs(fed - want_fed) <= 2.0, ("federal", x)
+        assert abs(st - want_st) <= 2.0, ("state", x)
+        assert total == pytest.approx(fed + st, abs=0.011)
+
+
+def test_no_tax_state_has_no_state_series():
+    out = sweep(dict(SINGLE), "wages", [20000, 90000], "tx")
+    assert out["state"] == "TX"
+    assert out["state_tax"] == [0.0, 0.0] and out["state_marginal_rate"] == [0.0, 0.0]
+
+
+# ============================================================
+# MARGINAL RATES
+# ============================================================
+
+@pytest.mark.parametrize("profile, rate", [
+    (SINGLE, 22.0),
+    ({"filing_status": "married_filing_jointly"}, 12.0),
+    ({"filing_status": "single", "state": "TX"}, 22.0),
+])
+def test_federal_marginal_rate_is_the_bracket_rate(profile, rate):
+    out = sweep(dict(profile), "wages", [80000])
+    assert out["federal_marginal_rate"] == [rate]
+    assert out["marginal_rate"] == [rate]
+
+
+def test_rates_inside_a_bracket_do_not_depend_on_the_grid():
+    coarse = sweep(dict(SINGLE), "wages", grid(70000, 110000, 10000))
+    fine = sweep(dict(SINGLE), "wages", grid(70000, 110000, 250))
+    assert set(coarse["federal_marginal_rate"]) == set(fine["federal_marginal_rate"]) == {22.0}
+
+
+def test_state_rates_are_the_bracket_rates():
+    out = sweep(dict(SINGLE), "wages", grid(60000, 100000, 2000), "CA")
+    assert set(out["state_marginal_rate"]) <= {6.0, 8.0, 9.3}
+    assert out["marginal_rate"] == [round(a + b, 2) for a, b in
+                                    zip(out["federal_marginal_rate"], out["state_marginal_rate"])]
+
+
+# ============================================================
+# BREAKPOINTS
+# ============================================================
+
+def test_breakpoints_are_the_bracket_edges():
+    out = sweep(dict(SINGLE), "wages", grid(30000, 130000, 1000))
+    std = P.standard_deduction["single"]
+    edges = [limit + std for limit, _ in P.brackets["single"][1:3]]       # 12% -> 22% -> 24%
+    points = out["breakpoints"]
+    assert len(points) == 2
+    for point, edge, rate in zip(points, edges, (22.0, 24.0)):
+        assert abs(point["x"] - edge) <= 50
+        assert point["marginal_rate"] == pytest.approx(rate, abs=0.05)
+
+
+def test_breakpoints_match_the_direct_slopes():
+    xs = grid(0, 200000, 1000)
+    out = sweep(dict(SINGLE), "wages", xs, "CA")
+    f = tax_function(normalize_input(SINGLE), "taxpayer_wages", "CA")
+    points = out["breakpoints"]
+    assert points and all(0 < p["x"] <= 200000 for p in points)
+    edges = [p["x"] for p in points] + [200000]
+    for point, nxt in zip(points, edges[1:]):
+        a, b = point["x"] + 60, nxt - 60                  # clear of both kinks
+        if b - a < 2000:
+            continue
+        slope = (sum(f(b)[:2]) - sum(f(a)[:2])) / (b - a) * 100
+        assert slope == pytest.approx(point["marginal_rate"], abs=0.3), point
+
+
+def test_breakpoints_need_a_real_change_inside_the_range():
+    knots = [0.0, 100.0, 200.0, 300.0, 400.0]
+    fed = [0.10, 0.12, 0.1205, 0.22, 0.22]
+    st = [0.0, 0.0, 0.0, 0.0, 0.05]
+    assert _breakpoints(knots, fed, st, 0, 400) == [
+        {"x": 100.0, "marginal_rate": 12.0},
+        {"x": 300.0, "marginal_rate": 22.0},
+        {"x": 400.0, "marginal_rate": 27.0},
+    ]
+    assert BREAKPOINT_MIN_CHANGE > 0.05
+    assert _breakpoints(knots, fed, st, 100, 350) == [{"x": 300.0, "marginal_rate": 22.0}]
+
+
+# ============================================================
+# ARGUMENTS
+# ============================================================
+
+def test_grid_and_variable_checks():
+    assert grid(0, 10, 5) == [0, 5, 10]
+    assert sweep_field("selfEmploymentIncome") == sweep_field("self_employment_income")
+    with pytest.raises(ValueError, match="step > 0"):
+        grid(0, 10, 0)
+    with pytest.raises(ValueError, match="At most"):
+        grid(0, MAX_POINTS, 1)
+    with pytest.raises(ValueError, match="Cannot sweep"):
+        sweep_field("filing_status")
+    with pytest.raises(ValueError, match="Empty"):
+        sweep(dict(SINGLE), "wages", [])